@@ -4,9 +4,9 @@ from .models import Document, Annotation, AnnotationCategory
 
 @admin.register(Document)
 class DocumentAdmin(admin.ModelAdmin):
-    list_display = ["title", "uploaded_at", "converted_at"]
-    list_filter = ["uploaded_at", "converted_at"]
-    search_fields = ["title"]
+    list_display = ["title", "conversion_status", "uploaded_at", "converted_at"]
+    list_filter = ["conversion_status", "uploaded_at", "converted_at"]
+    search_fields = ["title", "pdf_sha256"]
 
 
 @admin.register(Annotation)
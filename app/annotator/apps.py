@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AnnotatorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'annotator'
+
+    def ready(self):
+        """Import signals when app is ready."""
+        import annotator.signals
@@ -0,0 +1,344 @@
+"""
+PDF to HTML conversion for annotator documents.
+
+Conversions run in the background on the dedicated "conversion" Celery queue,
+whose worker concurrency bounds how many pdf2htmlEX processes run at once
+(see convert_document_task). Converters are tried in order:
+
+1. pdf2htmlEX in a long-lived converter container (``docker exec`` into
+   PDF2HTMLEX_CONTAINER, which mounts the media directory at MEDIA_ROOT), so
+   no container is started per document
+2. pdf2htmlEX in a throwaway container (``docker run --rm``)
+3. Plain text extraction with pypdf
+
+Converted HTML is shared between documents with the same PDF content, so
+re-uploading a paper is instant.
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from webApp.services.file_hashing import file_hash
+
+from .models import Document
+
+logger = logging.getLogger(__name__)
+
+# Celery queue served by the bounded conversion worker
+CONVERSION_QUEUE = "conversion"
+
+DOCKER_IMAGE = "pdf2htmlex/pdf2htmlex:0.18.8.rc2-master-20200820-ubuntu-20.04-x86_64"
+
+PDF2HTMLEX_OPTIONS = ["--process-outline", "0", "--zoom", "1.7"]
+
+# Seconds a single pdf2htmlEX run may take
+CONVERSION_TIMEOUT = 120
+
+# A conversion still "processing" after this long lost its worker (pdf2htmlEX
+# is killed after CONVERSION_TIMEOUT; the margin covers the pypdf fallback)
+STALE_CONVERSION_AFTER = timedelta(seconds=2 * CONVERSION_TIMEOUT)
+
+
+# ============================================================================
+# Scheduling
+# ============================================================================
+
+
+def enqueue_conversion(document: Document) -> bool:
+    """
+    Schedule the HTML conversion of a document.
+
+    Documents whose PDF content was already converted reuse that HTML
+    immediately instead of being queued.
+
+    Args:
+        document: Saved document with a PDF file
+
+    Returns:
+        True if a conversion was queued, False if cached HTML was reused
+    """
+    if not document.pdf_sha256:
+        document.pdf_sha256 = file_hash(document.pdf_file.path)
+
+    if reuse_converted_html(document):
+        return False
+
+    document.conversion_status = "pending"
+    document.conversion_error = None
+    document.save(update_fields=["pdf_sha256", "conversion_status", "conversion_error"])
+
+    from .tasks import convert_document_task
+
+    # Only dispatch once the worker can see the committed row
+    transaction.on_commit(
+        lambda: convert_document_task.apply_async(
+            args=[document.pk], queue=CONVERSION_QUEUE
+        )
+    )
+    return True
+
+
+def claimable_conversions() -> Q:
+    """
+    Documents a conversion worker may claim.
+
+    Pending and failed documents, and documents left "processing" by a
+    worker that died mid-conversion (treated as failed).
+    """
+    return Q(conversion_status__in=["pending", "failed"]) | (
+        Q(conversion_status="processing")
+        & (
+            Q(conversion_started_at__isnull=True)
+            | Q(conversion_started_at__lt=timezone.now() - STALE_CONVERSION_AFTER)
+        )
+    )
+
+
+def is_conversion_stale(document: Document) -> bool:
+    """Whether a "processing" document has outlived its conversion worker."""
+    return document.conversion_status == "processing" and (
+        document.conversion_started_at is None
+        or document.conversion_started_at < timezone.now() - STALE_CONVERSION_AFTER
+    )
+
+
+def reuse_converted_html(document: Document) -> bool:
+    """
+    Point a document at the HTML of an identical, already converted PDF.
+
+    Returns:
+        True if cached HTML was found and the document is now converted
+    """
+    if not document.pdf_sha256:
+        return False
+
+    source = (
+        Document.objects.filter(
+            pdf_sha256=document.pdf_sha256, conversion_status="success"
+        )
+        .exclude(pk=document.pk)
+        .exclude(html_file="")
+        .exclude(html_file__isnull=True)
+        .order_by("-converted_at")
+        .first()
+    )
+    if source is None or not source.html_file.storage.exists(source.html_file.name):
+        return False
+
+    document.html_file = source.html_file.name
+    document.converted_at = timezone.now()
+    document.conversion_status = "success"
+    document.conversion_error = None
+    document.save(
+        update_fields=[
+            "pdf_sha256",
+            "html_file",
+            "converted_at",
+            "conversion_status",
+            "conversion_error",
+        ]
+    )
+    logger.info(
+        f"Reused HTML of document {source.pk} for document {document.pk} "
+        f"(pdf {document.pdf_sha256[:12]})"
+    )
+    return True
+
+
+# ============================================================================
+# Converters
+# ============================================================================
+
+
+def convert_pdf_to_html(document: Document) -> str:
+    """
+    Convert a document's PDF to HTML and mark it converted.
+
+    Runs in the conversion worker; use enqueue_conversion() from requests.
+
+    Returns:
+        Path of the written HTML file
+
+    Raises:
+        Exception: If every converter failed (the document is marked failed)
+    """
+    pdf_path = document.pdf_file.path
+    output_dir = os.path.join(settings.MEDIA_ROOT, "htmls")
+    os.makedirs(output_dir, exist_ok=True)
+
+    base_name = Path(pdf_path).stem.replace(" ", "_")
+    output_filename = f"{base_name}_{document.pk}.html"
+    output_path = os.path.join(output_dir, output_filename)
+
+    docker_error = None
+    if shutil.which("docker") is not None:
+        try:
+            _run_pdf2htmlex(pdf_path, output_dir, output_filename)
+            _mark_converted(document, output_filename)
+            return output_path
+        except Exception as e:
+            docker_error = str(e)
+            logger.warning(
+                f"pdf2htmlEX conversion of document {document.pk} failed, "
+                f"falling back to pypdf: {e}"
+            )
+
+    try:
+        _convert_with_pypdf(document, pdf_path, output_path)
+        _mark_converted(document, output_filename)
+        return output_path
+    except Exception as e:
+        error = str(e) if docker_error is None else f"{docker_error}\n{e}"
+        document.conversion_status = "failed"
+        document.conversion_error = error[:2000]
+        document.save(update_fields=["conversion_status", "conversion_error"])
+        raise Exception(f"PDF to HTML conversion failed: {str(e)}")
+
+
+def _mark_converted(document: Document, output_filename: str):
+    document.html_file = os.path.join("htmls", output_filename)
+    document.converted_at = timezone.now()
+    document.conversion_status = "success"
+    document.conversion_error = None
+    document.save(
+        update_fields=["html_file", "converted_at", "conversion_status", "conversion_error"]
+    )
+
+
+def _run_pdf2htmlex(pdf_path: str, output_dir: str, output_filename: str):
+    """Run pdf2htmlEX, preferring the long-lived converter container."""
+    container = os.environ.get("PDF2HTMLEX_CONTAINER")
+    if container:
+        # The converter mounts the media directory at the same path as we do
+        cmd = [
+            "docker",
+            "exec",
+            container,
+            "pdf2htmlEX",
+            *PDF2HTMLEX_OPTIONS,
+            "--dest-dir",
+            output_dir,
+            pdf_path,
+            output_filename,
+        ]
+        try:
+            _run(cmd)
+            return
+        except Exception as e:
+            logger.warning(f"Converter container {container} unavailable: {e}")
+
+    host_pdf_dir, host_output_dir = _host_paths(pdf_path, output_dir)
+    cmd = [
+        "docker",
+        "run",
+        "--rm",
+        "-v",
+        f"{host_pdf_dir}:/pdf:ro",
+        "-v",
+        f"{host_output_dir}:/output",
+        DOCKER_IMAGE,
+        *PDF2HTMLEX_OPTIONS,
+        "--dest-dir",
+        "/output",
+        f"/pdf/{os.path.basename(pdf_path)}",
+        output_filename,
+    ]
+    _run(cmd)
+
+
+def _run(cmd):
+    logger.info(f"Running Docker command: {' '.join(cmd)}")
+    try:
+        subprocess.run(
+            cmd, capture_output=True, text=True, check=True, timeout=CONVERSION_TIMEOUT
+        )
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(
+            e.stderr[:500] if e.stderr else f"Docker error (code {e.returncode})"
+        )
+
+
+def _host_paths(pdf_path: str, output_dir: str):
+    """
+    Map container paths to host paths for ``docker run`` volume mounts.
+
+    Inside the container media lives at /app/media; on the host it is
+    media_${STACK_SUFFIX} in dev and media in prod.
+    """
+    host_project_path = os.environ.get("HOST_PROJECT_PATH")
+    if not host_project_path:
+        raise ValueError("HOST_PROJECT_PATH environment variable is not set")
+
+    stack_suffix = os.environ.get("STACK_SUFFIX", "")
+    rel_pdf_path = os.path.relpath(pdf_path, settings.BASE_DIR)
+    rel_output_dir = os.path.relpath(output_dir, settings.BASE_DIR)
+    if stack_suffix and rel_pdf_path.startswith("media/"):
+        rel_pdf_path = rel_pdf_path.replace("media/", f"media_{stack_suffix}/", 1)
+    if stack_suffix and rel_output_dir.startswith("media/"):
+        rel_output_dir = rel_output_dir.replace("media/", f"media_{stack_suffix}/", 1)
+
+    host_pdf_path = os.path.join(host_project_path, rel_pdf_path)
+    return os.path.dirname(host_pdf_path), os.path.join(host_project_path, rel_output_dir)
+
+
+def _convert_with_pypdf(document: Document, pdf_path: str, output_path: str):
+    """Basic text-only HTML, used when pdf2htmlEX is not available."""
+    from pypdf import PdfReader
+
+    pdf_reader = PdfReader(pdf_path)
+
+    html_parts = [
+        "<!DOCTYPE html>",
+        "<html>",
+        "<head>",
+        '<meta charset="UTF-8">',
+        '<meta name="viewport" content="width=device-width, initial-scale=1.0">',
+        "<title>" + document.title + "</title>",
+        "<style>",
+        "body { font-family: Arial, sans-serif; margin: 20px; background: #f5f5f5; }",
+        ".page { background: white; margin: 20px auto; padding: 40px; max-width: 850px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); position: relative; min-height: 800px; }",
+        ".page-number { position: absolute; top: 10px; right: 10px; color: #999; font-size: 12px; }",
+        ".text-block { margin: 8px 0; line-height: 1.5; }",
+        ".warning { background: #fff3cd; padding: 10px; margin: 10px 0; border-left: 4px solid #ffc107; }",
+        "</style>",
+        "</head>",
+        "<body>",
+        '<div class="warning">⚠️ Note: This document was converted using basic text extraction. Install Docker and pull bwits/pdf2htmlex image for better style preservation.</div>',
+    ]
+
+    for page_num, page in enumerate(pdf_reader.pages):
+        html_parts.append(f'<div class="page" id="page-{page_num + 1}">')
+        html_parts.append(
+            f'<div class="page-number">Page {page_num + 1} of {len(pdf_reader.pages)}</div>'
+        )
+
+        text = page.extract_text()
+
+        if text:
+            for para in text.split("\n"):
+                para = para.strip()
+                if para:
+                    para = (
+                        para.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+                    )
+                    html_parts.append(f'<div class="text-block">{para}</div>')
+        else:
+            html_parts.append(
+                '<div class="text-block" style="color: #999; font-style: italic;">No text extracted from this page</div>'
+            )
+
+        html_parts.append("</div>")
+
+    html_parts.extend(["</body>", "</html>"])
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(html_parts))
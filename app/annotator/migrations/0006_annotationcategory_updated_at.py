@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('annotator', '0005_annotation_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='annotationcategory',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('annotator', '0006_annotationcategory_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='pdf_sha256',
+            field=models.CharField(blank=True, db_index=True, default='', help_text='SHA-256 of the PDF, used to reuse HTML of identical uploads', max_length=64),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('annotator', '0007_document_pdf_sha256'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='conversion_started_at',
+            field=models.DateTimeField(blank=True, help_text='When a worker claimed the current conversion', null=True),
+        ),
+    ]
@@ -27,12 +27,22 @@ class Document(models.Model):
     html_file = models.FileField(upload_to="htmls/", null=True, blank=True)
     uploaded_at = models.DateTimeField(default=timezone.now)
     converted_at = models.DateTimeField(null=True, blank=True)
+    conversion_started_at = models.DateTimeField(
+        null=True, blank=True, help_text="When a worker claimed the current conversion"
+    )
     conversion_status = models.CharField(
         max_length=20, choices=STATUS_CHOICES, default="pending"
     )
     conversion_error = models.TextField(
         blank=True, null=True, help_text="Error message if conversion failed"
     )
+    pdf_sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        db_index=True,
+        help_text="SHA-256 of the PDF, used to reuse HTML of identical uploads",
+    )
 
     class Meta:
         ordering = ["-uploaded_at"]
@@ -58,6 +68,7 @@ class AnnotationCategory(models.Model):
         related_name="subcategories",
     )
     order = models.IntegerField(default=0, help_text="Order for display")
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name_plural = "Annotation Categories"
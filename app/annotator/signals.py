@@ -0,0 +1,14 @@
+"""
+Signal handlers for the annotator app.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+@receiver(post_save, sender="annotator.AnnotationCategory")
+@receiver(post_delete, sender="annotator.AnnotationCategory")
+def invalidate_category_index(sender, **kwargs):
+    """Rebuild the category suggestion matrix after a category changes."""
+    from annotator.utils import category_index
+
+    category_index.invalidate()
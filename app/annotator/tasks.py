@@ -0,0 +1,44 @@
+# annotator/tasks.py
+import logging
+
+from celery import shared_task
+
+from .models import Document
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True)
+def convert_document_task(self, document_id: int):
+    """
+    Convert a document's PDF to HTML in the background.
+
+    Dispatched to the "conversion" queue by annotator.conversion.enqueue_conversion.
+
+    Args:
+        document_id: Document to convert
+    """
+    from django.utils import timezone
+
+    from .conversion import claimable_conversions, convert_pdf_to_html, reuse_converted_html
+
+    # Claim the document so duplicate dispatches do not convert it twice
+    claimed = Document.objects.filter(claimable_conversions(), pk=document_id).update(
+        conversion_status="processing",
+        conversion_error=None,
+        conversion_started_at=timezone.now(),
+    )
+    if not claimed:
+        return
+
+    document = Document.objects.get(pk=document_id)
+
+    # An identical PDF may have been converted while this one was queued
+    if reuse_converted_html(document):
+        return
+
+    try:
+        convert_pdf_to_html(document)
+        logger.info(f"Converted document {document_id} to HTML")
+    except Exception as e:
+        logger.error(f"Error converting document {document_id}: {e}")
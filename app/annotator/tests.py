@@ -1,3 +1,116 @@
+"""
+Tests for annotator.
+
+Run with:
+    python manage.py test annotator
+"""
 from django.test import TestCase
 
-# Create your tests here.
+
+class CategoryIndexTestCase(TestCase):
+    """Test the cached category suggestion matrix."""
+    
+    def test_top_k_uses_cached_matrix_until_categories_change(self):
+        """Test that suggestions come from one matmul and follow category edits."""
+        from annotator.models import AnnotationCategory
+        from annotator.utils import CategoryIndex
+        
+        parent = AnnotationCategory.objects.create(name='Data', embedding=[1.0, 0.0, 0.0])
+        AnnotationCategory.objects.create(name='Splits', embedding=[0.9, 0.1, 0.0], parent=parent)
+        code = AnnotationCategory.objects.create(name='Code', embedding=[0.0, 1.0, 0.0])
+        AnnotationCategory.objects.create(name='Unembedded', embedding={})
+        index = CategoryIndex()
+        
+        top = index.top_k([2.0, 0.1, 0.0], k=2)
+        self.assertEqual([c['name'] for c in top], ['Data', 'Splits'])
+        self.assertEqual(top[1]['parent_name'], 'Data')
+        self.assertAlmostEqual(top[0]['score'], 0.99875, places=4)
+        
+        # A warm index costs only the fingerprint query
+        with self.assertNumQueries(1):
+            index.top_k([0.0, 1.0, 0.0], k=1)
+        
+        code.embedding = [1.0, 0.05, 0.0]
+        code.save()
+        self.assertEqual(index.top_k([1.0, 0.05, 0.0], k=1)[0]['name'], 'Code')
+
+
+class DocumentConversionTestCase(TestCase):
+    """Test background PDF to HTML conversion with content-hash reuse."""
+    
+    def test_conversion_is_queued_and_reused_for_identical_pdfs(self):
+        """Test that uploads enqueue a conversion and identical PDFs reuse its HTML."""
+        import tempfile
+        from unittest import mock
+        import pymupdf
+        from django.core.files.base import ContentFile
+        from django.test import override_settings
+        from annotator.conversion import CONVERSION_QUEUE, enqueue_conversion
+        from annotator.models import Document
+        from annotator.tasks import convert_document_task
+        
+        pdf = pymupdf.open()
+        pdf.new_page().insert_text((50, 72), 'Annotated methods section.')
+        content = pdf.tobytes()
+        pdf.close()
+        
+        with override_settings(MEDIA_ROOT=tempfile.mkdtemp()):
+            first = Document(title='First')
+            first.pdf_file.save('first.pdf', ContentFile(content))
+            
+            with mock.patch.object(convert_document_task, 'apply_async') as apply_async:
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.assertTrue(enqueue_conversion(first))
+            apply_async.assert_called_once_with(args=[first.pk], queue=CONVERSION_QUEUE)
+            first.refresh_from_db()
+            self.assertEqual(first.conversion_status, 'pending')
+            
+            # No docker here: the worker falls back to pypdf
+            with mock.patch('annotator.conversion.shutil.which', return_value=None):
+                convert_document_task(first.pk)
+            first.refresh_from_db()
+            self.assertEqual(first.conversion_status, 'success')
+            self.assertIn('Annotated methods section.', first.html_file.read().decode())
+            
+            second = Document(title='Second')
+            second.pdf_file.save('second.pdf', ContentFile(content))
+            with mock.patch.object(convert_document_task, 'apply_async') as apply_async:
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.assertFalse(enqueue_conversion(second))
+            apply_async.assert_not_called()
+            second.refresh_from_db()
+            self.assertEqual(second.conversion_status, 'success')
+            self.assertEqual(second.html_file.name, first.html_file.name)
+    
+    def test_conversion_stuck_in_processing_is_reclaimed(self):
+        """Test that a document left processing by a dead worker can be converted again."""
+        import tempfile
+        from datetime import timedelta
+        from unittest import mock
+        from django.core.files.base import ContentFile
+        from django.test import override_settings
+        from django.utils import timezone
+        from annotator.conversion import STALE_CONVERSION_AFTER, is_conversion_stale
+        from annotator.models import Document
+        from annotator.tasks import convert_document_task
+        
+        with override_settings(MEDIA_ROOT=tempfile.mkdtemp()):
+            document = Document(title='Stuck', conversion_status='processing', conversion_started_at=timezone.now())
+            document.pdf_file.save('stuck.pdf', ContentFile(b'%PDF-1.4 stuck'))
+            self.assertFalse(is_conversion_stale(document))
+            
+            with mock.patch('annotator.conversion.convert_pdf_to_html') as convert:
+                convert_document_task(document.pk)
+                convert.assert_not_called()
+                
+                Document.objects.filter(pk=document.pk).update(
+                    conversion_started_at=timezone.now() - STALE_CONVERSION_AFTER - timedelta(seconds=1)
+                )
+                document.refresh_from_db()
+                self.assertTrue(is_conversion_stale(document))
+                convert_document_task(document.pk)
+                convert.assert_called_once()
+            
+            document.refresh_from_db()
+            self.assertEqual(document.conversion_status, 'processing')
+            self.assertGreater(document.conversion_started_at, timezone.now() - timedelta(minutes=1))
@@ -30,6 +30,9 @@ urlpatterns = [
         "document/<int:pk>/export/", views.export_annotations, name="export_annotations"
     ),
     path("document/<int:pk>/retry/", views.retry_conversion, name="retry_conversion"),
+    path(
+        "document/<int:pk>/status/", views.conversion_status, name="conversion_status"
+    ),
     path("document/<int:pk>/delete/", views.delete_document, name="delete_document"),
     path("category/suggest/", views.suggest_categories, name="suggest_categories"),
     # TODO deprecated endpoint, remove in future releases
@@ -1,8 +1,12 @@
 import os
+import hashlib
+import threading
 import numpy as np
 from openai import OpenAI
-from typing import List
+from typing import Any, Dict, List, Optional
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
 
 # Initialize client
 # Assuming OPENAI_API_KEY is in settings or env
@@ -57,3 +61,119 @@ def cosine_similarity(a: List[float], b: List[float]) -> float:
         return 0.0
 
     return float(np.dot(a_arr, b_arr) / (norm_a * norm_b))
+
+
+# Selection embeddings are cached by text hash for this long (seconds)
+EMBEDDING_CACHE_SECONDS = 24 * 60 * 60
+
+
+def get_cached_embedding(text: str, model: str = EMBEDDING_MODEL) -> np.ndarray:
+    """
+    get_embedding() with results cached by a hash of the text.
+
+    Repeated suggestion requests for the same selection skip the API call.
+    """
+    key = f"annotator:embedding:{model}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+    cached = cache.get(key)
+    if cached is not None:
+        return np.frombuffer(cached, dtype=np.float32)
+
+    embedding = get_embedding(text, model=model)
+    if embedding is not None and len(embedding) > 0:
+        cache.set(key, np.asarray(embedding, dtype=np.float32).tobytes(), EMBEDDING_CACHE_SECONDS)
+    return embedding
+
+
+class CategoryIndex:
+    """
+    In-memory matrix of L2-normalized category embeddings.
+
+    Built once per process and reused until a category changes: the
+    post_save/post_delete signals invalidate it locally, and a cheap
+    (count, latest updated_at) fingerprint catches edits made by other
+    processes. Suggestions are then a single matrix-vector product.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        # Embedding dimension -> (normalized matrix, category metadata rows)
+        self._matrices: Dict[int, tuple] = {}
+
+    def invalidate(self):
+        with self._lock:
+            self._fingerprint = None
+
+    @staticmethod
+    def _current_fingerprint():
+        from .models import AnnotationCategory
+
+        stats = AnnotationCategory.objects.aggregate(
+            count=Count("id"), updated=Max("updated_at")
+        )
+        return stats["count"], stats["updated"]
+
+    def _build(self):
+        from .models import AnnotationCategory
+
+        rows: Dict[int, List[Dict[str, Any]]] = {}
+        vectors: Dict[int, List[np.ndarray]] = {}
+        categories = AnnotationCategory.objects.select_related("parent").only(
+            "id", "name", "color", "description", "embedding", "parent__name"
+        )
+        for cat in categories:
+            # Skip if embedding is empty or not a list/valid structure
+            if not cat.embedding or not isinstance(cat.embedding, list):
+                continue
+            vector = np.asarray(cat.embedding, dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            if norm == 0:
+                continue
+            vectors.setdefault(len(vector), []).append(vector / norm)
+            rows.setdefault(len(vector), []).append(
+                {
+                    "id": cat.id,
+                    "name": cat.name,
+                    "color": cat.color,
+                    "parent_name": cat.parent.name if cat.parent else None,
+                    "description": cat.description,
+                }
+            )
+        return {dim: (np.vstack(vectors[dim]), rows[dim]) for dim in vectors}
+
+    def _matrices_for_request(self) -> Dict[int, tuple]:
+        fingerprint = self._current_fingerprint()
+        with self._lock:
+            if fingerprint == self._fingerprint:
+                return self._matrices
+        matrices = self._build()
+        with self._lock:
+            self._matrices = matrices
+            self._fingerprint = fingerprint
+        return matrices
+
+    def top_k(self, embedding, k: int = 3) -> List[Dict[str, Any]]:
+        """
+        Categories most similar to an embedding, best first.
+
+        Returns:
+            Category dicts (id, name, color, parent_name, description) with a
+            cosine similarity ``score``
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        entry = self._matrices_for_request().get(len(query))
+        if entry is None:
+            return []
+        matrix, rows = entry
+
+        norm = np.linalg.norm(query)
+        scores = matrix @ (query / norm) if norm else np.zeros(len(rows), dtype=np.float32)
+
+        k = min(k, len(rows))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [{**rows[i], "score": float(scores[i])} for i in best]
+
+
+# Convenience singleton instance
+category_index = CategoryIndex()
@@ -3,18 +3,14 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
 from django.core.files.base import ContentFile
-from django.utils import timezone
 from django.contrib import messages
-import subprocess
-import os
 import json
-from pathlib import Path
-import shutil
 import struct
 
 from .models import Document, Annotation, AnnotationCategory
+from .conversion import enqueue_conversion, is_conversion_stale
 from .forms import DocumentUploadForm
-from .utils import get_embedding, cosine_similarity
+from .utils import get_cached_embedding, cosine_similarity, category_index
 
 import logging
 
@@ -28,17 +24,19 @@ def home(request):
 
 
 def upload_document(request):
-    """Upload and convert PDF document"""
+    """Upload a PDF document and queue its HTML conversion"""
     if request.method == "POST":
         form = DocumentUploadForm(request.POST, request.FILES)
         if form.is_valid():
             document = form.save()
 
-            # Convert PDF to HTML
             try:
-                document.conversion_status = "processing"
-                document.save()
-                convert_pdf_to_html(document)
+                if enqueue_conversion(document):
+                    messages.info(
+                        request,
+                        f'Document "{document.title}" uploaded, conversion queued.',
+                    )
+                    return redirect("document_list")
                 messages.success(
                     request,
                     f'Document "{document.title}" uploaded and converted successfully!',
@@ -48,7 +46,7 @@ def upload_document(request):
                 document.conversion_status = "failed"
                 document.conversion_error = str(e)
                 document.save()
-                messages.error(request, f"Error converting PDF: {str(e)}")
+                messages.error(request, f"Error queueing PDF conversion: {str(e)}")
                 return redirect("document_list")
     else:
         form = DocumentUploadForm()
@@ -56,203 +54,6 @@ def upload_document(request):
     return render(request, "annotator/upload.html", {"form": form})
 
 
-def convert_pdf_to_html(document):
-    """Convert PDF to HTML using pdf2htmlEX via Docker (with fallback to pypdf)"""
-    from django.conf import settings
-
-    # Get paths
-    pdf_path = document.pdf_file.path
-    output_dir = os.path.join(settings.MEDIA_ROOT, "htmls")
-    os.makedirs(output_dir, exist_ok=True)
-
-    host_project_path = os.environ.get("HOST_PROJECT_PATH")
-
-    # Generate output filename
-    base_name = Path(pdf_path).stem.replace(" ", "_")
-    output_filename = f"{base_name}_{document.pk}.html"
-    output_path = os.path.join(output_dir, output_filename)
-
-    # Try pdf2htmlEX via Docker first (preserves style)
-    docker_available = shutil.which("docker") is not None
-    if docker_available and host_project_path:
-        try:
-            # Validate HOST_PROJECT_PATH is set
-            if not host_project_path:
-                raise ValueError("HOST_PROJECT_PATH environment variable is not set")
-
-            # Get STACK_SUFFIX for media directory mapping
-            # In dev: media_dev, etc.
-            # In prod: just media (no suffix)
-            stack_suffix = os.environ.get("STACK_SUFFIX", "")
-
-            rel_pdf_path = os.path.relpath(pdf_path, settings.BASE_DIR)
-            rel_output_dir = os.path.relpath(output_dir, settings.BASE_DIR)
-
-            # Adjust paths to account for media_${STACK_SUFFIX} on host vs /app/media in container
-            # Inside container: /app/media/pdfs/file.pdf
-            # On host (dev): /path/to/project/media_dev/pdfs/file.pdf
-            # On host (prod): /path/to/project/media/pdfs/file.pdf
-            if stack_suffix and rel_pdf_path.startswith("media/"):
-                rel_pdf_path = rel_pdf_path.replace(
-                    "media/", f"media_{stack_suffix}/", 1
-                )
-            if stack_suffix and rel_output_dir.startswith("media/"):
-                rel_output_dir = rel_output_dir.replace(
-                    "media/", f"media_{stack_suffix}/", 1
-                )
-
-            # Get absolute paths on host
-            host_pdf_path = os.path.join(host_project_path, rel_pdf_path)
-            host_output_dir = os.path.join(host_project_path, rel_output_dir)
-            host_pdf_dir = os.path.dirname(host_pdf_path)
-            pdf_filename = os.path.basename(pdf_path)
-
-            # Log paths for debugging
-            logger.info(f"PDF conversion paths:")
-            logger.info(f"  Container PDF path: {pdf_path}")
-            logger.info(f"  Host PDF path: {host_pdf_path}")
-            logger.info(f"  Host PDF dir: {host_pdf_dir}")
-            logger.info(f"  PDF filename: {pdf_filename}")
-            logger.info(f"  Host output dir: {host_output_dir}")
-
-            DOCKER_IMAGE = (
-                "pdf2htmlex/pdf2htmlex:0.18.8.rc2-master-20200820-ubuntu-20.04-x86_64"
-            )
-            cmd = [
-                "docker",
-                "run",
-                "--rm",
-                "-v",
-                f"{host_pdf_dir}:/pdf:ro",
-                "-v",
-                f"{host_output_dir}:/output",
-                DOCKER_IMAGE,
-                "--process-outline",
-                "0",
-                "--zoom",
-                "1.7",
-                "--dest-dir",
-                "/output",
-                f"/pdf/{pdf_filename}",
-                output_filename,
-            ]
-
-            logger.info(f"Running Docker command: {' '.join(cmd)}")
-
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, check=True, timeout=120
-            )
-
-            # Update document with HTML file path
-            relative_path = os.path.join("htmls", output_filename)
-            document.html_file = relative_path
-            document.converted_at = timezone.now()
-            document.conversion_status = "success"
-            document.conversion_error = None
-            document.save()
-
-            return output_path
-
-        except subprocess.CalledProcessError as e:
-            error_msg = f"Docker conversion failed!\n"
-            error_msg += f"Command: {' '.join(cmd)}\n"
-            error_msg += f"Return code: {e.returncode}\n"
-            error_msg += f"STDOUT: {e.stdout}\n"
-            error_msg += f"STDERR: {e.stderr}"
-            logger.error(error_msg)
-            print(error_msg)
-
-            # Save error to database
-            document.conversion_status = "failed"
-            document.conversion_error = (
-                e.stderr[:500] if e.stderr else f"Docker error (code {e.returncode})"
-            )
-            document.save()
-
-            # Don't raise, fall through to pypdf fallback
-            logger.info("Falling back to pypdf conversion")
-        except Exception as e:
-            error_msg = f"Docker conversion setup failed: {str(e)}"
-            logger.error(error_msg)
-            print(error_msg)
-
-            # Don't save to database, fall through to pypdf fallback
-            logger.info("Falling back to pypdf conversion")
-    # Fallback to pypdf if pdf2htmlEX not available or failed
-    try:
-        from pypdf import PdfReader
-
-        pdf_reader = PdfReader(pdf_path)
-
-        # Create HTML content
-        html_parts = [
-            "<!DOCTYPE html>",
-            "<html>",
-            "<head>",
-            '<meta charset="UTF-8">',
-            '<meta name="viewport" content="width=device-width, initial-scale=1.0">',
-            "<title>" + document.title + "</title>",
-            "<style>",
-            "body { font-family: Arial, sans-serif; margin: 20px; background: #f5f5f5; }",
-            ".page { background: white; margin: 20px auto; padding: 40px; max-width: 850px; box-shadow: 0 2px 8px rgba(0,0,0,0.1); position: relative; min-height: 800px; }",
-            ".page-number { position: absolute; top: 10px; right: 10px; color: #999; font-size: 12px; }",
-            ".text-block { margin: 8px 0; line-height: 1.5; }",
-            ".warning { background: #fff3cd; padding: 10px; margin: 10px 0; border-left: 4px solid #ffc107; }",
-            "</style>",
-            "</head>",
-            "<body>",
-            '<div class="warning">⚠️ Note: This document was converted using basic text extraction. Install Docker and pull bwits/pdf2htmlex image for better style preservation.</div>',
-        ]
-
-        # Process each page
-        for page_num, page in enumerate(pdf_reader.pages):
-            html_parts.append(f'<div class="page" id="page-{page_num + 1}">')
-            html_parts.append(
-                f'<div class="page-number">Page {page_num + 1} of {len(pdf_reader.pages)}</div>'
-            )
-
-            text = page.extract_text()
-
-            if text:
-                paragraphs = text.split("\n")
-                for para in paragraphs:
-                    para = para.strip()
-                    if para:
-                        para = (
-                            para.replace("&", "&amp;")
-                            .replace("<", "&lt;")
-                            .replace(">", "&gt;")
-                        )
-                        html_parts.append(f'<div class="text-block">{para}</div>')
-            else:
-                html_parts.append(
-                    '<div class="text-block" style="color: #999; font-style: italic;">No text extracted from this page</div>'
-                )
-
-            html_parts.append("</div>")
-
-        html_parts.extend(["</body>", "</html>"])
-
-        # Write HTML file
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write("\n".join(html_parts))
-
-        # Update document
-        relative_path = os.path.join("htmls", output_filename)
-        document.html_file = relative_path
-        document.converted_at = timezone.now()
-        document.conversion_status = "success"
-        document.conversion_error = None
-        document.save()
-
-        return output_path
-    except Exception as e:
-        document.conversion_status = "failed"
-        document.conversion_error = str(e)
-        document.save()
-        raise Exception(f"PDF to HTML conversion failed: {str(e)}")
-
-
 @login_required
 def annotate_document(request, pk):
     """View for annotating a document"""
@@ -483,24 +284,41 @@ def export_annotations(request, pk):
 
 
 def retry_conversion(request, pk):
-    """Retry PDF to HTML conversion for failed documents"""
+    """Queue PDF to HTML conversion again for failed or stuck documents"""
     document = get_object_or_404(Document, pk=pk)
 
-    try:
-        document.conversion_status = "processing"
-        document.conversion_error = None
-        document.save()
+    if document.conversion_status == "processing" and not is_conversion_stale(document):
+        messages.info(request, f'Document "{document.title}" is already being converted.')
+        return redirect("document_list")
 
-        convert_pdf_to_html(document)
-        messages.success(
-            request, f'Document "{document.title}" converted successfully!'
-        )
+    try:
+        if enqueue_conversion(document):
+            messages.info(request, f'Conversion of "{document.title}" queued.')
+        else:
+            messages.success(
+                request, f'Document "{document.title}" converted successfully!'
+            )
     except Exception as e:
         messages.error(request, f"Conversion failed: {str(e)}")
 
     return redirect("document_list")
 
 
+def conversion_status(request, pk):
+    """Conversion state of a document, for pages polling queued conversions"""
+    document = get_object_or_404(Document, pk=pk)
+    return JsonResponse(
+        {
+            "id": document.pk,
+            "status": document.conversion_status,
+            "error": document.conversion_error,
+            "converted_at": (
+                document.converted_at.isoformat() if document.converted_at else None
+            ),
+        }
+    )
+
+
 @require_http_methods(["POST"])
 def delete_document(request, pk):
     """Delete a document"""
@@ -593,8 +411,8 @@ def suggest_categories(request):
                 {"status": "error", "message": "No text provided"}, status=400
             )
 
-        # Get embedding for the text
-        text_embedding = get_embedding(text)
+        # Get embedding for the text (cached by text hash)
+        text_embedding = get_cached_embedding(text)
 
         if text_embedding is None or len(text_embedding) == 0:
             return JsonResponse(
@@ -602,31 +420,8 @@ def suggest_categories(request):
                 status=500,
             )
 
-        # Get all categories with embeddings
-        # We fetch all and filter in python to be safe with JSONField quirks across DBs
-        categories = AnnotationCategory.objects.all()
-
-        scored_categories = []
-        for cat in categories:
-            # Skip if embedding is empty or not a list/valid structure
-            if not cat.embedding or not isinstance(cat.embedding, list):
-                continue
-
-            score = cosine_similarity(text_embedding, cat.embedding)
-            scored_categories.append(
-                {
-                    "id": cat.id,
-                    "name": cat.name,
-                    "color": cat.color,
-                    "score": score,
-                    "parent_name": cat.parent.name if cat.parent else None,
-                    "description": cat.description,
-                }
-            )
-
-        # Sort by score descending and take top 3
-        scored_categories.sort(key=lambda x: x["score"], reverse=True)
-        top_categories = scored_categories[:3]
+        # Top 3 categories from the cached, pre-normalized category matrix
+        top_categories = category_index.top_k(text_embedding, k=3)
 
         return JsonResponse(
             {
@@ -1,6 +1,7 @@
 # web/celery.py
 import os
 from celery import Celery
+from celery.signals import worker_process_init
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "web.settings")
@@ -31,9 +32,23 @@ app.conf.beat_schedule = {
         'task': 'workflow_engine.tasks.cleanup_stale_claims_task',
         'schedule': crontab(minute='*/5'),  # Every 5 minutes
     },
+    
+    # Provider batch jobs of llm_batch runs - submit, poll, resume nodes
+    'process-llm-batches': {
+        'task': 'workflow_engine.tasks.process_llm_batches_task',
+        'schedule': 60.0,  # Every minute
+    },
 }
 
 
+@worker_process_init.connect
+def warm_worker_process(**kwargs):
+    """Compile workflow graphs and open connections before the first task."""
+    from webApp.services.worker_runtime import warm_worker
+
+    warm_worker()
+
+
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
     print(f"Request: {self.request!r}")
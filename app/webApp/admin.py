@@ -4,6 +4,9 @@ from django.db import models
 import json
 from .models import (
     AnalysisTask,
+    BulkOperation,
+    EvaluationResult,
+    HumanEvaluation,
     Operations,
     Conference,
     Paper,
@@ -14,6 +17,9 @@ from .models import (
     BugReport,
     TokenUsage,
     LLMModelConfig,
+    LLMRateLimitBucket,
+    ConferenceTokenStats,
+    HighlightedPDF,
     Prompt,
     PaperSectionEmbedding,
     CodeFileEmbedding,
@@ -362,6 +368,12 @@ class LLMModelConfigAdmin(admin.ModelAdmin):
                 "fields": ("temperature", "reasoning_effort"),
             },
         ),
+        (
+            "Rate Limits",
+            {
+                "fields": ("tokens_per_minute", "requests_per_minute"),
+            },
+        ),
         (
             "Status",
             {
@@ -371,6 +383,28 @@ class LLMModelConfigAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(LLMRateLimitBucket)
+class LLMRateLimitBucketAdmin(admin.ModelAdmin):
+    list_display = ["config", "available_tokens", "available_requests", "refilled_at"]
+    readonly_fields = ["refilled_at"]
+
+
+@admin.register(ConferenceTokenStats)
+class ConferenceTokenStatsAdmin(admin.ModelAdmin):
+    list_display = ["conference", "node_id", "count", "sum_total_tokens", "updated_at"]
+    list_filter = ["conference"]
+    search_fields = ["conference__name", "node_id"]
+    readonly_fields = ["updated_at"]
+
+
+@admin.register(HighlightedPDF)
+class HighlightedPDFAdmin(admin.ModelAdmin):
+    list_display = ["id", "status", "highlights_found", "pdf_sha256", "created_at", "updated_at"]
+    list_filter = ["status"]
+    search_fields = ["pdf_sha256", "evidence_sha256"]
+    readonly_fields = ["created_at", "updated_at"]
+
+
 @admin.register(Prompt)
 class PromptAdmin(admin.ModelAdmin):
     list_display = ["name", "template", "created_at", "updated_at"]
@@ -386,6 +420,46 @@ class AnalysisTaskAdmin(admin.ModelAdmin):
     readonly_fields = ["created_at", "updated_at"]
 
 
+@admin.register(BulkOperation)
+class BulkOperationAdmin(admin.ModelAdmin):
+    list_display = [
+        "id",
+        "conference",
+        "operation",
+        "status",
+        "processed_papers",
+        "total_papers",
+        "cancelled_runs",
+        "tasks_enqueued",
+        "created_at",
+    ]
+    list_filter = ["operation", "status", "created_at"]
+    search_fields = ["conference__name", "user__username"]
+    readonly_fields = ["created_at", "updated_at", "completed_at"]
+
+
+@admin.register(HumanEvaluation)
+class HumanEvaluationAdmin(admin.ModelAdmin):
+    list_display = ["paper", "paper_type", "user", "updated_at"]
+    list_filter = ["paper_type", "paper__conference"]
+    search_fields = ["paper__title", "user__username"]
+    raw_id_fields = ["paper"]
+    readonly_fields = ["created_at", "updated_at"]
+
+
+@admin.register(EvaluationResult)
+class EvaluationResultAdmin(admin.ModelAdmin):
+    list_display = [
+        "workflow_definition",
+        "conference",
+        "paper_count",
+        "snapshot_sha256",
+        "created_at",
+    ]
+    list_filter = ["workflow_definition", "conference"]
+    readonly_fields = ["created_at"]
+
+
 @admin.register(DatabaseSchema)
 class DatabaseSchemaAdmin(admin.ModelAdmin):
     list_display = ["created_at", "migration_name", "schema_preview"]
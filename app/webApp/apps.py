@@ -6,5 +6,8 @@ class WebappConfig(AppConfig):
     name = 'webApp'
     
     def ready(self):
-        """Import signals when app is ready."""
+        """Import signals and time DB queries of workflow nodes when app is ready."""
         import webApp.signals
+        from webApp.services.spans import install_db_instrumentation
+
+        install_db_instrumentation()
@@ -17,6 +17,7 @@ import re
 import shutil
 
 from webApp.models import Paper, TokenUsage
+from webApp.services.spans import span
 
 
 os.environ.setdefault(
@@ -351,7 +352,10 @@ def get_pdf_content(
     try:
         with open(pdf_path, "rb") as pdf_file:
             files = {"input": ("paper.pdf", pdf_file, "application/pdf")}
-            response = requests.post(grobid_url, files=files, data=params, timeout=60)
+            with span("grobid", path=str(pdf_path)):
+                response = requests.post(
+                    grobid_url, files=files, data=params, timeout=60
+                )
 
         if response.status_code != 200:
             print(f"Error Grobid: {response.status_code}")
@@ -0,0 +1,125 @@
+"""Benchmark the paper processing workflow offline on synthetic papers."""
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from webApp.services.benchmark import run_benchmark
+from webApp.services.offline import StubLLMConfig
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the paper processing workflow over synthetic papers with stub LLM, Grobid '
+        'and git services, and report per-node latency, DB queries, throughput and memory'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--papers', type=int, default=10, help='Number of synthetic papers (default: 10)')
+        parser.add_argument('--concurrency', type=int, default=4, help='Workflows run at once (default: 4)')
+        parser.add_argument(
+            '--code-fraction',
+            type=float,
+            default=0.5,
+            help='Share of papers linking a fixture repository (default: 0.5)'
+        )
+        parser.add_argument('--model', default='gpt-5', help='Model name passed to the workflow (default: gpt-5)')
+        parser.add_argument('--latency', type=float, default=0.0, help='Seconds per LLM request')
+        parser.add_argument(
+            '--seconds-per-output-token',
+            type=float,
+            default=0.0,
+            help='Added LLM latency per generated token'
+        )
+        parser.add_argument('--embedding-latency', type=float, default=0.0, help='Seconds per embeddings request')
+        parser.add_argument('--rpm', type=int, help='Simulated provider requests per minute')
+        parser.add_argument('--tpm', type=int, help='Simulated provider tokens per minute')
+        parser.add_argument('--grobid-latency', type=float, default=0.0, help='Seconds per Grobid document')
+        parser.add_argument(
+            '--words-per-section',
+            type=int,
+            default=250,
+            help='Length of the synthetic papers\' sections (default: 250)'
+        )
+        parser.add_argument('--no-memory', action='store_true', help='Skip tracemalloc (lower overhead)')
+        parser.add_argument(
+            '--current-db',
+            action='store_true',
+            help='Write to the configured database instead of a throwaway test database'
+        )
+        parser.add_argument('--output', help='Write the full report as JSON to this file')
+
+    def handle(self, *args, **options):
+        llm_config = StubLLMConfig(
+            latency_seconds=options['latency'],
+            seconds_per_output_token=options['seconds_per_output_token'],
+            embedding_latency_seconds=options['embedding_latency'],
+            rpm=options['rpm'],
+            tpm=options['tpm'],
+        )
+
+        old_name = connection.settings_dict['NAME']
+        if not options['current_db']:
+            test_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            self.stdout.write(f"Using throwaway database {test_name}")
+        try:
+            report = run_benchmark(
+                papers=options['papers'],
+                concurrency=options['concurrency'],
+                code_fraction=options['code_fraction'],
+                model=options['model'],
+                llm_config=llm_config,
+                grobid_latency_seconds=options['grobid_latency'],
+                words_per_section=options['words_per_section'],
+                trace_memory=not options['no_memory'],
+            )
+        finally:
+            if not options['current_db']:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        runs = report['runs']
+        self.stdout.write(
+            f"\n{options['papers']} paper(s) in {report['wall_seconds']:.2f}s "
+            f"({report['throughput_papers_per_minute']} papers/min, setup {report['setup_seconds']:.2f}s)"
+        )
+        self.stdout.write(f"Run statuses: {runs['statuses']}")
+        if runs['failed_papers']:
+            self.stdout.write(self.style.WARNING(f"Failed papers: {runs['failed_papers']}"))
+        self.stdout.write(
+            f"Per run: {runs['latency_seconds'].get('mean', 0):.2f}s mean, "
+            f"{runs['queries'].get('mean', 0):.0f} queries mean "
+            f"(+{runs['queries_outside_nodes']} outside nodes in total)"
+        )
+
+        self.stdout.write(
+            f"\n{'Node':<28} | {'Mean s':>8} | {'p95 s':>8} | {'Queries':>8} | {'Tokens':>10} | Statuses"
+        )
+        self.stdout.write('-' * 100)
+        for node_id, node in report['nodes'].items():
+            latency = node['latency_seconds']
+            self.stdout.write(
+                f"{node_id:<28} | {latency.get('mean', 0):>8.3f} | {latency.get('p95', 0):>8.3f} | "
+                f"{node['queries'].get('mean', 0):>8.1f} | {node['tokens']:>10,} | {node['statuses']}"
+            )
+
+        self.stdout.write('\nMean seconds per node run, by operation:')
+        for node_id, node in report['nodes'].items():
+            if node['spans']:
+                breakdown = ', '.join(
+                    f"{kind} {span['avg_seconds']:.3f}s (x{span['avg_count']:g})"
+                    for kind, span in node['spans'].items()
+                )
+                self.stdout.write(f"  {node_id:<28} {breakdown}")
+
+        memory = report['memory']
+        self.stdout.write(
+            f"\nMemory: peak Python {memory['peak_python_mb']} MB, max RSS {memory['max_rss_mb']} MB"
+        )
+        self.stdout.write('LLM stub:')
+        for endpoint, stats in report['llm'].items():
+            self.stdout.write(f"  {endpoint:<18} {stats}")
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2, default=str)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
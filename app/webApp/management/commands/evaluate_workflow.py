@@ -0,0 +1,91 @@
+"""Evaluate workflow output against human evaluations."""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from webApp.models import Conference
+from webApp.services.evaluation import evaluate_workflow
+from workflow_engine.models import WorkflowDefinition
+
+
+class Command(BaseCommand):
+    help = 'Compute accuracy, MCC and token usage of a workflow version against human evaluations'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workflow',
+            default='paper_processing_with_reproducibility',
+            help='Workflow definition name (default: paper_processing_with_reproducibility)'
+        )
+        parser.add_argument(
+            '--workflow-version',
+            type=int,
+            help='Workflow version (default: latest)'
+        )
+        parser.add_argument(
+            '--conference-id',
+            type=int,
+            help='Only evaluate papers of this conference'
+        )
+        parser.add_argument(
+            '--paper-id',
+            type=int,
+            action='append',
+            help='Only evaluate this paper (repeatable)'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the full results as JSON to this file'
+        )
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            help='Recompute even if cached results exist'
+        )
+
+    def handle(self, *args, **options):
+        definitions = WorkflowDefinition.objects.filter(name=options['workflow'])
+        if options['workflow_version'] is not None:
+            definitions = definitions.filter(version=options['workflow_version'])
+        workflow_definition = definitions.order_by('-version').first()
+        if workflow_definition is None:
+            raise CommandError(
+                f"Workflow '{options['workflow']}' (version {options['workflow_version'] or 'any'}) not found"
+            )
+
+        conference = None
+        if options['conference_id'] is not None:
+            try:
+                conference = Conference.objects.get(id=options['conference_id'])
+            except Conference.DoesNotExist:
+                raise CommandError(f"Conference {options['conference_id']} not found")
+
+        results = evaluate_workflow(
+            workflow_definition,
+            conference=conference,
+            paper_ids=options['paper_id'],
+            refresh=options['refresh'],
+        )
+
+        self.stdout.write(
+            f"{workflow_definition.name} v{workflow_definition.version}: "
+            f"{results['paper_count']} paper(s) evaluated"
+        )
+        self.stdout.write(f"\n{'Analysis Category':<20} | {'% Agr.':>8} | {'MCC':>8} | {'N':<4}")
+        self.stdout.write('-' * 50)
+        for name in ('Code', 'Paper', 'Dataset', 'Global'):
+            row = results['summary'].get(name)
+            if not row:
+                continue
+            accuracy = f"{row['mean_accuracy']:.2f}%" if row['mean_accuracy'] is not None else 'NaN'
+            mcc = f"{row['mean_mcc']:.4f}" if row['mean_mcc'] is not None else 'NaN'
+            self.stdout.write(f"{name:<20} | {accuracy:>8} | {mcc:>8} | {row['count']:<4}")
+
+        self.stdout.write('\nMean tokens per paper:')
+        for group, tokens in results['tokens']['mean_per_paper'].items():
+            self.stdout.write(f"  {group:<8} {tokens['total_tokens']:>12,.0f}")
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
@@ -0,0 +1,45 @@
+"""Import human reference labels exported as JSON (analyses/*_human_5.json)."""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from webApp.models import HumanEvaluation, Paper
+
+
+class Command(BaseCommand):
+    help = 'Store a JSON file of human labels (paper_analysis, dataset_analysis, code_analysis) for a paper'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paper_id', type=int, help='Paper the labels belong to')
+        parser.add_argument('file', help='JSON file with the human labels')
+        parser.add_argument(
+            '--paper-type',
+            choices=[choice for choice, _ in HumanEvaluation.PAPER_TYPE_CHOICES],
+            default='method',
+            help='Contribution type of the paper (default: method)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            paper = Paper.objects.get(id=options['paper_id'])
+        except Paper.DoesNotExist:
+            raise CommandError(f"Paper {options['paper_id']} not found")
+
+        try:
+            with open(options['file']) as f:
+                labels = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise CommandError(f"Could not read {options['file']}: {e}")
+
+        sections = {'paper_analysis', 'dataset_analysis', 'code_analysis'}
+        if not isinstance(labels, dict) or not sections & labels.keys():
+            raise CommandError(f"Expected an object with any of: {', '.join(sorted(sections))}")
+
+        evaluation = HumanEvaluation.objects.create(
+            paper=paper,
+            paper_type=options['paper_type'],
+            labels={key: labels[key] for key in sections if key in labels},
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored human evaluation {evaluation.id} for paper {paper.id}'
+        ))
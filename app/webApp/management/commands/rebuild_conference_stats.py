@@ -0,0 +1,24 @@
+"""Rebuild the materialized per-conference token statistics."""
+from django.core.management.base import BaseCommand
+
+from webApp.services.conference_stats import rebuild_conference_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute conference token statistics from the latest completed workflow run of each paper'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--conference-id',
+            type=int,
+            action='append',
+            help='Conference ID to rebuild (repeatable; default: all conferences)'
+        )
+
+    def handle(self, *args, **options):
+        conference_ids = options.get('conference_id')
+        papers = rebuild_conference_stats(conference_ids)
+        scope = f'{len(conference_ids)} conference(s)' if conference_ids else 'all conferences'
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt statistics for {scope} from {papers} paper(s) with a completed run'
+        ))
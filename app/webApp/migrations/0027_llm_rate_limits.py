@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webApp', '0026_datasetdocumentationcriterion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='llmmodelconfig',
+            name='requests_per_minute',
+            field=models.PositiveIntegerField(blank=True, help_text='Provider RPM limit shared by all workers (empty = unlimited)', null=True, verbose_name='Requests per Minute'),
+        ),
+        migrations.AddField(
+            model_name='llmmodelconfig',
+            name='tokens_per_minute',
+            field=models.PositiveIntegerField(blank=True, help_text='Provider TPM limit shared by all workers (empty = unlimited)', null=True, verbose_name='Tokens per Minute'),
+        ),
+        migrations.CreateModel(
+            name='LLMRateLimitBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('available_tokens', models.FloatField(default=0)),
+                ('available_requests', models.FloatField(default=0)),
+                ('refilled_at', models.DateTimeField()),
+                ('config', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rate_limit_bucket', to='webApp.llmmodelconfig')),
+            ],
+            options={
+                'verbose_name': 'LLM Rate Limit Bucket',
+                'verbose_name_plural': 'LLM Rate Limit Buckets',
+            },
+        ),
+    ]
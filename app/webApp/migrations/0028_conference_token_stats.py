@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webApp', '0027_llm_rate_limits'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConferenceStatsContribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('node_id', models.CharField(blank=True, default='', max_length=100)),
+                ('workflow_run_id', models.UUIDField()),
+                ('run_created_at', models.DateTimeField()),
+                ('input_tokens', models.IntegerField(default=0)),
+                ('output_tokens', models.IntegerField(default=0)),
+                ('total_tokens', models.IntegerField(default=0)),
+                ('paper', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats_contributions', to='webApp.paper')),
+            ],
+            options={
+                'verbose_name': 'Conference Stats Contribution',
+                'verbose_name_plural': 'Conference Stats Contributions',
+                'unique_together': {('paper', 'node_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ConferenceTokenStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('node_id', models.CharField(blank=True, default='', help_text='Workflow node, or empty for whole-run totals', max_length=100)),
+                ('count', models.IntegerField(default=0)),
+                ('sum_input_tokens', models.BigIntegerField(default=0)),
+                ('sum_sq_input_tokens', models.BigIntegerField(default=0)),
+                ('sum_output_tokens', models.BigIntegerField(default=0)),
+                ('sum_sq_output_tokens', models.BigIntegerField(default=0)),
+                ('sum_total_tokens', models.BigIntegerField(default=0)),
+                ('sum_sq_total_tokens', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('conference', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='token_stats', to='webApp.conference')),
+            ],
+            options={
+                'verbose_name': 'Conference Token Statistics',
+                'verbose_name_plural': 'Conference Token Statistics',
+                'unique_together': {('conference', 'node_id')},
+            },
+        ),
+    ]
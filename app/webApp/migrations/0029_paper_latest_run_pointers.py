@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_run_pointers(apps, schema_editor):
+    Paper = apps.get_model('webApp', 'Paper')
+    WorkflowRun = apps.get_model('workflow_engine', 'WorkflowRun')
+
+    runs = WorkflowRun.objects.filter(paper_id=OuterRef('pk')).order_by('-created_at')
+    Paper.objects.update(
+        latest_workflow_run=Subquery(runs.values('id')[:1]),
+        latest_completed_workflow_run=Subquery(
+            runs.filter(status='completed').values('id')[:1]
+        ),
+        workflow_run_count=Coalesce(
+            Subquery(
+                WorkflowRun.objects.filter(paper_id=OuterRef('pk'))
+                .order_by()
+                .values('paper_id')
+                .annotate(count=Count('id'))
+                .values('count')
+            ),
+            0,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webApp', '0028_conference_token_stats'),
+        ('workflow_engine', '0015_workflowstatusevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paper',
+            name='latest_completed_workflow_run',
+            field=models.ForeignKey(blank=True, help_text='Most recently created workflow run that completed', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='workflow_engine.workflowrun'),
+        ),
+        migrations.AddField(
+            model_name='paper',
+            name='latest_workflow_run',
+            field=models.ForeignKey(blank=True, help_text='Most recently created workflow run', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='workflow_engine.workflowrun'),
+        ),
+        migrations.AddField(
+            model_name='paper',
+            name='workflow_run_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of workflow runs for this paper'),
+        ),
+        migrations.RunPython(backfill_run_pointers, migrations.RunPython.noop),
+    ]
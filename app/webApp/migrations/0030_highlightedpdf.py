@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webApp', '0029_paper_latest_run_pointers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HighlightedPDF',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pdf_sha256', models.CharField(max_length=64)),
+                ('evidence_sha256', models.CharField(max_length=64)),
+                ('evidence', models.JSONField(default=list, help_text='Evidence to highlight: [{text, color}, ...]')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('file', models.FileField(blank=True, null=True, upload_to='highlighted_pdfs/')),
+                ('highlights_found', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Highlighted PDF',
+                'verbose_name_plural': 'Highlighted PDFs',
+                'unique_together': {('pdf_sha256', 'evidence_sha256')},
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:57
+
+from django.db import migrations, models
+
+# The DDL is spelled out here rather than taken from webApp.services.paper_search,
+# so later changes to that module cannot change what this migration does.
+
+MYSQL_CREATE = [
+    "ALTER TABLE `webApp_paper` ADD FULLTEXT INDEX `webapp_paper_search` "
+    "(`title`, `authors`, `abstract`, `text`)",
+]
+
+MYSQL_DROP = [
+    "ALTER TABLE `webApp_paper` DROP INDEX `webapp_paper_search`",
+]
+
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS webApp_paper_fts USING fts5("
+    "title, authors, abstract, text, content='webApp_paper', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS webApp_paper_fts_ai AFTER INSERT ON webApp_paper BEGIN "
+    "INSERT INTO webApp_paper_fts(rowid, title, authors, abstract, text) "
+    "VALUES (new.id, new.title, new.authors, new.abstract, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS webApp_paper_fts_ad AFTER DELETE ON webApp_paper BEGIN "
+    "INSERT INTO webApp_paper_fts(webApp_paper_fts, rowid, title, authors, abstract, text) "
+    "VALUES ('delete', old.id, old.title, old.authors, old.abstract, old.text); END",
+    "CREATE TRIGGER IF NOT EXISTS webApp_paper_fts_au AFTER UPDATE OF title, authors, abstract, text "
+    "ON webApp_paper BEGIN "
+    "INSERT INTO webApp_paper_fts(webApp_paper_fts, rowid, title, authors, abstract, text) "
+    "VALUES ('delete', old.id, old.title, old.authors, old.abstract, old.text); "
+    "INSERT INTO webApp_paper_fts(rowid, title, authors, abstract, text) "
+    "VALUES (new.id, new.title, new.authors, new.abstract, new.text); END",
+    "INSERT INTO webApp_paper_fts(webApp_paper_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP = [
+    "DROP TRIGGER IF EXISTS webApp_paper_fts_ai",
+    "DROP TRIGGER IF EXISTS webApp_paper_fts_ad",
+    "DROP TRIGGER IF EXISTS webApp_paper_fts_au",
+    "DROP TABLE IF EXISTS webApp_paper_fts",
+]
+
+
+def _execute(schema_editor, statements_by_vendor):
+    for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    _execute(schema_editor, {"mysql": MYSQL_CREATE, "sqlite": SQLITE_CREATE})
+
+
+def remove_search_index(apps, schema_editor):
+    _execute(schema_editor, {"mysql": MYSQL_DROP, "sqlite": SQLITE_DROP})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webApp', '0030_highlightedpdf'),
+        ('workflow_engine', '0015_workflowstatusevent'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='paper',
+            index=models.Index(fields=['title'], name='webapp_paper_title_idx'),
+        ),
+        migrations.RunPython(create_search_index, remove_search_index),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webApp', '0032_bulkoperation'),
+        ('workflow_engine', '0015_workflowstatusevent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvaluationResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('snapshot_sha256', models.CharField(max_length=64)),
+                ('paper_count', models.IntegerField(default=0)),
+                ('results', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('conference', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='evaluation_results', to='webApp.conference')),
+                ('workflow_definition', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='evaluation_results', to='workflow_engine.workflowdefinition')),
+            ],
+            options={
+                'unique_together': {('workflow_definition', 'snapshot_sha256')},
+            },
+        ),
+        migrations.CreateModel(
+            name='HumanEvaluation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('paper_type', models.CharField(choices=[('method', 'Method'), ('both', 'Method and dataset'), ('dataset', 'Dataset')], default='method', help_text='Contribution type, selects the paper category weights', max_length=20)),
+                ('labels', models.JSONField(default=dict)),
+                ('notes', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('paper', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='human_evaluations', to='webApp.paper')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-updated_at'],
+                'indexes': [models.Index(fields=['paper', '-updated_at'], name='webApp_huma_paper_i_beff31_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webApp', '0033_humanevaluation_evaluationresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='codefileembedding',
+            name='token_count',
+            field=models.IntegerField(default=0, help_text='Tokens in file_content (set on save, see services.token_counter)'),
+        ),
+        migrations.AddField(
+            model_name='papersectionembedding',
+            name='token_count',
+            field=models.IntegerField(default=0, help_text='Tokens in section_text (set on save, see services.token_counter)'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webApp', '0034_embedding_token_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conferencestatscontribution',
+            name='spans',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='conferencetokenstats',
+            name='span_count',
+            field=models.IntegerField(default=0, help_text='Runs (or nodes) included in span_totals'),
+        ),
+        migrations.AddField(
+            model_name='conferencetokenstats',
+            name='span_totals',
+            field=models.JSONField(blank=True, default=dict, help_text='Summed spans: {kind: {count, seconds}}'),
+        ),
+    ]
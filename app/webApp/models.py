@@ -175,9 +175,33 @@ class Paper(models.Model):
         auto_now=True, verbose_name="Last update", blank=True, null=True
     )
 
+    # Denormalized workflow run pointers, maintained by WorkflowOrchestrator
+    latest_workflow_run = models.ForeignKey(
+        "workflow_engine.WorkflowRun",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        blank=True,
+        null=True,
+        help_text="Most recently created workflow run",
+    )
+    latest_completed_workflow_run = models.ForeignKey(
+        "workflow_engine.WorkflowRun",
+        on_delete=models.SET_NULL,
+        related_name="+",
+        blank=True,
+        null=True,
+        help_text="Most recently created workflow run that completed",
+    )
+    workflow_run_count = models.PositiveIntegerField(
+        default=0, help_text="Number of workflow runs for this paper"
+    )
+
     class Meta:
         verbose_name = "Paper"
         verbose_name_plural = "Papers"
+        # Full-text search uses a backend-specific index, see
+        # webApp.services.paper_search
+        indexes = [models.Index(fields=["title"], name="webapp_paper_title_idx")]
 
     def __str__(self):
         return self.title
@@ -498,6 +522,20 @@ class LLMModelConfig(models.Model):
         help_text="Reasoning effort level (for OpenAI models)",
     )
 
+    # Provider rate limits
+    tokens_per_minute = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        verbose_name="Tokens per Minute",
+        help_text="Provider TPM limit shared by all workers (empty = unlimited)",
+    )
+    requests_per_minute = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        verbose_name="Requests per Minute",
+        help_text="Provider RPM limit shared by all workers (empty = unlimited)",
+    )
+
     # Status
     is_active = models.BooleanField(
         default=True,
@@ -558,6 +596,202 @@ class LLMModelConfig(models.Model):
         }
 
 
+class LLMRateLimitBucket(models.Model):
+    """
+    Shared token-bucket state for an LLM model configuration.
+
+    Both buckets hold one minute of capacity and refill continuously at the
+    configured TPM/RPM rate. Levels may go negative: a caller that overdraws
+    the bucket waits until it has refilled back to zero.
+    """
+
+    config = models.OneToOneField(
+        LLMModelConfig,
+        on_delete=models.CASCADE,
+        related_name="rate_limit_bucket",
+    )
+    available_tokens = models.FloatField(default=0)
+    available_requests = models.FloatField(default=0)
+    refilled_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "LLM Rate Limit Bucket"
+        verbose_name_plural = "LLM Rate Limit Buckets"
+
+    def __str__(self):
+        return f"{self.config.model_key}: {self.available_tokens:.0f} tokens, {self.available_requests:.1f} requests"
+
+
+class ConferenceTokenStats(models.Model):
+    """
+    Materialized token statistics for a conference.
+
+    Aggregates the latest completed workflow run of each paper, either as a
+    whole (node_id "") or per workflow node. Running sums and sums of squares
+    are kept so that replacing a paper's latest run is an O(1) update and the
+    mean and sample standard deviation can be derived without scanning runs.
+
+    Span totals (see WorkflowNode.spans) are summed the same way over the
+    runs that recorded spans.
+    """
+
+    conference = models.ForeignKey(
+        Conference, on_delete=models.CASCADE, related_name="token_stats"
+    )
+    node_id = models.CharField(
+        max_length=100,
+        blank=True,
+        default="",
+        help_text="Workflow node, or empty for whole-run totals",
+    )
+    count = models.IntegerField(default=0)
+    sum_input_tokens = models.BigIntegerField(default=0)
+    sum_sq_input_tokens = models.BigIntegerField(default=0)
+    sum_output_tokens = models.BigIntegerField(default=0)
+    sum_sq_output_tokens = models.BigIntegerField(default=0)
+    sum_total_tokens = models.BigIntegerField(default=0)
+    sum_sq_total_tokens = models.BigIntegerField(default=0)
+    span_count = models.IntegerField(
+        default=0, help_text="Runs (or nodes) included in span_totals"
+    )
+    span_totals = models.JSONField(
+        default=dict, blank=True, help_text="Summed spans: {kind: {count, seconds}}"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    METRICS = ("input_tokens", "output_tokens", "total_tokens")
+
+    class Meta:
+        verbose_name = "Conference Token Statistics"
+        verbose_name_plural = "Conference Token Statistics"
+        unique_together = [["conference", "node_id"]]
+
+    def __str__(self):
+        return f"{self.conference} / {self.node_id or 'all nodes'}: {self.count} run(s)"
+
+    def add(self, values, sign=1):
+        """Add (sign=1) or remove (sign=-1) one observation of each metric."""
+        self.count += sign
+        for metric in self.METRICS:
+            value = values[metric] or 0
+            setattr(self, f"sum_{metric}", getattr(self, f"sum_{metric}") + sign * value)
+            setattr(
+                self,
+                f"sum_sq_{metric}",
+                getattr(self, f"sum_sq_{metric}") + sign * value * value,
+            )
+
+    def add_spans(self, spans, sign=1):
+        """Add (sign=1) or remove (sign=-1) one span summary."""
+        self.span_count += sign
+        for kind, entry in spans.items():
+            totals = self.span_totals.setdefault(kind, {"count": 0, "seconds": 0.0})
+            totals["count"] += sign * entry.get("count", 0)
+            totals["seconds"] = round(totals["seconds"] + sign * entry.get("seconds", 0.0), 4)
+            if totals["count"] <= 0:
+                del self.span_totals[kind]
+
+    def span_summary(self):
+        """Mean span count and seconds per run (or node execution), by kind."""
+        if self.span_count <= 0:
+            return {}
+        return {
+            kind: {
+                "avg_count": totals["count"] / self.span_count,
+                "avg_seconds": totals["seconds"] / self.span_count,
+            }
+            for kind, totals in sorted(self.span_totals.items())
+        }
+
+    def summary(self):
+        """Mean and sample standard deviation of each metric, plus totals and spans."""
+        result = {
+            "count": self.count,
+            "sum_total_tokens": self.sum_total_tokens,
+            "span_count": self.span_count,
+            "spans": self.span_summary(),
+        }
+        for metric in self.METRICS:
+            if self.count <= 0:
+                result[f"avg_{metric}"] = None
+                result[f"stddev_{metric}"] = None
+                continue
+            total = getattr(self, f"sum_{metric}")
+            result[f"avg_{metric}"] = total / self.count
+            if self.count == 1:
+                result[f"stddev_{metric}"] = 0.0
+            else:
+                squares = getattr(self, f"sum_sq_{metric}") - total * total / self.count
+                result[f"stddev_{metric}"] = (max(squares, 0) / (self.count - 1)) ** 0.5
+        return result
+
+
+class ConferenceStatsContribution(models.Model):
+    """
+    What a paper currently contributes to its ConferenceTokenStats rows.
+
+    One row per paper for the whole run (node_id "") and one per node with
+    tokens or spans, copied from the paper's latest completed run so the
+    contribution can be subtracted again when a newer run completes.
+    """
+
+    paper = models.ForeignKey(
+        Paper, on_delete=models.CASCADE, related_name="stats_contributions"
+    )
+    node_id = models.CharField(max_length=100, blank=True, default="")
+    workflow_run_id = models.UUIDField()
+    run_created_at = models.DateTimeField()
+    input_tokens = models.IntegerField(default=0)
+    output_tokens = models.IntegerField(default=0)
+    total_tokens = models.IntegerField(default=0)
+    spans = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        verbose_name = "Conference Stats Contribution"
+        verbose_name_plural = "Conference Stats Contributions"
+        unique_together = [["paper", "node_id"]]
+
+    def __str__(self):
+        return f"Paper {self.paper_id} / {self.node_id or 'all nodes'}: run {self.workflow_run_id}"
+
+
+class HighlightedPDF(models.Model):
+    """
+    Cached evidence-highlighted copy of a paper PDF.
+
+    Keyed by the content hash of the source PDF and a hash of the evidence
+    set, so workflow runs that produced identical evidence for the same file
+    share one generated output.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    pdf_sha256 = models.CharField(max_length=64)
+    evidence_sha256 = models.CharField(max_length=64)
+    evidence = models.JSONField(
+        default=list, help_text="Evidence to highlight: [{text, color}, ...]"
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    file = models.FileField(upload_to="highlighted_pdfs/", blank=True, null=True)
+    highlights_found = models.IntegerField(default=0)
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Highlighted PDF"
+        verbose_name_plural = "Highlighted PDFs"
+        unique_together = [["pdf_sha256", "evidence_sha256"]]
+
+    def __str__(self):
+        return f"{self.pdf_sha256[:12]}/{self.evidence_sha256[:12]} ({self.status})"
+
+
 class Prompt(models.Model):
     """Stores prompt templates for LLM interactions."""
 
@@ -614,6 +848,163 @@ class AnalysisTask(models.Model):
         return f"Task {self.id} - {self.status}"
 
 
+class BulkOperation(models.Model):
+    """
+    Progress of a conference-wide workflow rerun or stop.
+
+    Created by the bulk views. Reruns are carried out by
+    bulk_workflow_operation_task, so the request returns at once and the page
+    polls this row; stops finish within the request.
+    """
+
+    OPERATION_CHOICES = [
+        ("rerun", "Rerun workflows"),
+        ("stop", "Stop workflows"),
+    ]
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    conference = models.ForeignKey(
+        Conference, on_delete=models.CASCADE, related_name="bulk_operations"
+    )
+    operation = models.CharField(max_length=10, choices=OPERATION_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    params = models.JSONField(
+        default=dict, blank=True, help_text="Operation arguments (workflow_id, limit, ...)"
+    )
+
+    total_papers = models.IntegerField(default=0)
+    processed_papers = models.IntegerField(default=0)
+    cancelled_runs = models.IntegerField(default=0)
+    tasks_enqueued = models.IntegerField(default=0)
+    purged_tasks = models.IntegerField(default=0)
+    message = models.TextField(blank=True, default="")
+    error = models.TextField(blank=True, null=True)
+
+    user = models.ForeignKey(
+        "auth.User", on_delete=models.SET_NULL, null=True, blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.get_operation_display()} for {self.conference_id} ({self.status})"
+
+    @property
+    def progress(self) -> int:
+        """Percentage of papers processed."""
+        if self.status == "completed":
+            return 100
+        if not self.total_papers:
+            return 0
+        return int(100 * self.processed_papers / self.total_papers)
+
+    def to_dict(self):
+        return {
+            "id": str(self.id),
+            "conference_id": self.conference_id,
+            "operation": self.operation,
+            "status": self.status,
+            "progress": self.progress,
+            "total_papers": self.total_papers,
+            "processed_papers": self.processed_papers,
+            "cancelled_runs": self.cancelled_runs,
+            "tasks_enqueued": self.tasks_enqueued,
+            "purged_tasks": self.purged_tasks,
+            "message": self.message,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+        }
+
+
+class HumanEvaluation(models.Model):
+    """
+    Human reference labels for a paper, used to evaluate workflow output.
+
+    ``labels`` has the shape of the workflow artifacts it is compared to:
+    {"paper_analysis": [{criterion_id, category, present, ...}],
+    "dataset_analysis": [...], "code_analysis": {...}}. The most recently
+    updated evaluation of a paper is the reference.
+    """
+
+    PAPER_TYPE_CHOICES = [
+        ("method", "Method"),
+        ("both", "Method and dataset"),
+        ("dataset", "Dataset"),
+    ]
+
+    paper = models.ForeignKey(
+        Paper, on_delete=models.CASCADE, related_name="human_evaluations"
+    )
+    user = models.ForeignKey(
+        "auth.User", on_delete=models.SET_NULL, null=True, blank=True
+    )
+    paper_type = models.CharField(
+        max_length=20,
+        choices=PAPER_TYPE_CHOICES,
+        default="method",
+        help_text="Contribution type, selects the paper category weights",
+    )
+    labels = models.JSONField(default=dict)
+    notes = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-updated_at"]
+        indexes = [models.Index(fields=["paper", "-updated_at"])]
+
+    def __str__(self):
+        return f"Human evaluation of paper {self.paper_id}"
+
+
+class EvaluationResult(models.Model):
+    """
+    Cached agreement metrics between workflow output and human evaluations.
+
+    Keyed by the workflow definition and a hash of the evaluated snapshot
+    (the runs and human evaluations that went in), so results are recomputed
+    only after a new run completes or a label changes.
+    """
+
+    conference = models.ForeignKey(
+        Conference,
+        on_delete=models.CASCADE,
+        related_name="evaluation_results",
+        null=True,
+        blank=True,
+    )
+    workflow_definition = models.ForeignKey(
+        "workflow_engine.WorkflowDefinition",
+        on_delete=models.CASCADE,
+        related_name="evaluation_results",
+    )
+    snapshot_sha256 = models.CharField(max_length=64)
+    paper_count = models.IntegerField(default=0)
+    results = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = [["workflow_definition", "snapshot_sha256"]]
+
+    def __str__(self):
+        return (
+            f"Evaluation of {self.workflow_definition_id} "
+            f"({self.paper_count} papers, {self.snapshot_sha256[:12]})"
+        )
+
+
 class PaperSectionEmbedding(models.Model):
     """
     Stores vector embeddings for paper sections.
@@ -644,6 +1035,10 @@ class PaperSectionEmbedding(models.Model):
         default=1536,
         help_text='Dimension of the embedding vector'
     )
+    token_count = models.IntegerField(
+        default=0,
+        help_text='Tokens in section_text (set on save, see services.token_counter)'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -664,6 +1059,12 @@ class PaperSectionEmbedding(models.Model):
 
     def __str__(self):
         return f"Embedding: {self.paper.title[:50]} - {self.section_type}"
+
+    def save(self, *args, **kwargs):
+        from webApp.services.token_counter import count_tokens
+
+        self.token_count = count_tokens(self.section_text)
+        super().save(*args, **kwargs)
     
     def compute_cosine_similarity(self, other_embedding: list) -> float:
         """
@@ -748,6 +1149,10 @@ class CodeFileEmbedding(models.Model):
         default=0,
         help_text='Number of tokens used for this embedding'
     )
+    token_count = models.IntegerField(
+        default=0,
+        help_text='Tokens in file_content (set on save, see services.token_counter)'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -770,6 +1175,12 @@ class CodeFileEmbedding(models.Model):
     def __str__(self):
         chunk_info = f" (chunk {self.chunk_index + 1}/{self.total_chunks})" if self.total_chunks > 1 else ""
         return f"Code Embedding: {self.paper.title[:30]} - {self.file_path}{chunk_info}"
+
+    def save(self, *args, **kwargs):
+        from webApp.services.token_counter import count_tokens
+
+        self.token_count = count_tokens(self.file_content)
+        super().save(*args, **kwargs)
     
     def compute_cosine_similarity(self, other_embedding: list) -> float:
         """
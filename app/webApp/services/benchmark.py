@@ -0,0 +1,383 @@
+"""
+End-to-end benchmark of PaperProcessingWorkflow without network access.
+
+run_benchmark() builds a synthetic corpus and runs the full workflow over it
+with the offline stand-ins of webApp.services.offline:
+
+- Papers are ingested from placeholder PDFs through get_pdf_content() and
+  the Grobid stub
+- A share of the papers links to a fixture repository on the local git
+  server, so the code branch (availability, embeddings, analysis) runs
+- LLM and embedding calls go to StubOpenAI, with the configured latency and
+  rate limits
+
+It reports per-node latency, DB queries and spans (time per operation
+kind), per-run queries, throughput and memory, plus the stub's request and
+token counts. Results are comparable
+between commits as long as the options are the same: the corpus and every
+LLM answer are deterministic.
+
+The benchmark writes papers, criteria and runs to the database; the
+benchmark_workflow command runs it against a throwaway test database.
+"""
+
+import asyncio
+import logging
+import os
+import resource
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from asgiref.sync import async_to_sync
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from webApp.models import (
+    DatasetDocumentationCriterion,
+    Paper,
+    ReproducibilityChecklistCriterion,
+)
+from webApp.services.offline import (
+    GitFixtureServer,
+    GrobidStubServer,
+    StubLLMConfig,
+    StubOpenAI,
+    stub_pdf,
+    synthetic_repository,
+)
+from webApp.services.offline.llm import stub_embedding
+from webApp.services.rate_limiter import current_node
+from webApp.services.spans import merge_spans
+from webApp.services.worker_runtime import override_openai_client
+from workflow_engine.models import WorkflowNode, WorkflowRun
+
+logger = logging.getLogger(__name__)
+
+# Embedding model the nodes query criteria with
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+# ============================================================================
+# Measurements
+# ============================================================================
+
+
+class QueryCounter:
+    """
+    Count DB queries on every connection, attributed to the running node.
+
+    Installs an execute wrapper on the connections of the current thread and
+    on every connection opened while active (ORM calls of async nodes run
+    in sync_to_async threads). Nodes are identified through the rate
+    limiter's node_scope(), which the workflow graphs set for each node.
+    """
+
+    def __init__(self):
+        self.by_run_node: Counter = Counter()
+        self.outside_nodes = 0
+        self._lock = threading.Lock()
+        self._wrapped = []
+
+    def __call__(self, execute, sql, params, many, context):
+        node = current_node()
+        with self._lock:
+            if node is None:
+                self.outside_nodes += 1
+            else:
+                self.by_run_node[node] += 1
+        return execute(sql, params, many, context)
+
+    def _install(self, connection):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+            self._wrapped.append(connection)
+
+    def _on_connection_created(self, sender, connection, **kwargs):
+        self._install(connection)
+
+    def __enter__(self):
+        for connection in connections.all():
+            self._install(connection)
+        connection_created.connect(self._on_connection_created)
+        return self
+
+    def __exit__(self, *exc):
+        connection_created.disconnect(self._on_connection_created)
+        for connection in self._wrapped:
+            if self in connection.execute_wrappers:
+                connection.execute_wrappers.remove(self)
+        self._wrapped = []
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    return {
+        "mean": round(statistics.fmean(ordered), 4),
+        "p50": round(ordered[len(ordered) // 2], 4),
+        "p95": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 4),
+        "max": round(ordered[-1], 4),
+    }
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+@contextmanager
+def _environment(**values: str):
+    previous = {key: os.environ.get(key) for key in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+# ============================================================================
+# Corpus
+# ============================================================================
+
+
+def seed_criteria(client: StubOpenAI) -> int:
+    """Create checklist and dataset criteria with stub embeddings if missing."""
+    from webApp.services.nodes import dataset_documentation_criteria, reproducibility_criteria
+
+    created = 0
+    for model, definitions in (
+        (ReproducibilityChecklistCriterion, reproducibility_criteria.get_all_criteria()),
+        (DatasetDocumentationCriterion, dataset_documentation_criteria.get_all_criteria()),
+    ):
+        for criterion in definitions:
+            context = criterion.get_embedding_context()
+            embedding = stub_embedding(
+                context, client.config.embedding_dimension, client.config.seed
+            )
+            _, was_created = model.objects.get_or_create(
+                criterion_id=criterion.criterion_id,
+                embedding_model=EMBEDDING_MODEL,
+                defaults={
+                    "criterion_number": criterion.criterion_number,
+                    "criterion_name": criterion.criterion_name,
+                    "category": criterion.category,
+                    "description": criterion.description,
+                    "criterion_context": context,
+                    "embedding": embedding,
+                    "embedding_dimension": len(embedding),
+                },
+            )
+            created += was_created
+    return created
+
+
+def has_code(index: int, code_fraction: float) -> bool:
+    """Whether paper ``index`` links a repository, spreading papers with code evenly."""
+    return int((index + 1) * code_fraction) > int(index * code_fraction)
+
+
+def create_corpus(
+    count: int,
+    grobid: GrobidStubServer,
+    git: GitFixtureServer,
+    code_fraction: float = 0.5,
+) -> List[int]:
+    """
+    Ingest ``count`` synthetic papers through the Grobid stub.
+
+    Returns:
+        IDs of the created papers
+    """
+    from webApp.functions import get_pdf_content
+
+    paper_ids = []
+    with tempfile.TemporaryDirectory(prefix="benchmark_pdfs_") as directory, _environment(
+        GROBID_URL=grobid.url
+    ):
+        for index in range(count):
+            pdf_path = Path(directory) / f"paper_{index}.pdf"
+            pdf_path.write_bytes(stub_pdf(index))
+            title, text, sections = get_pdf_content(str(pdf_path))
+            if text is None:
+                raise RuntimeError(f"Grobid stub failed to process paper {index}")
+
+            code_url = ""
+            if has_code(index, code_fraction):
+                code_url = git.add_repository(
+                    "benchmark", f"paper-{index}", synthetic_repository(index)
+                )
+            paper = Paper.objects.create(
+                title=title,
+                doi=f"10.0000/benchmark.{index}",
+                abstract=sections.get("Abstract"),
+                text=text,
+                sections=sections,
+                code_url=code_url,
+            )
+            paper_ids.append(paper.id)
+    return paper_ids
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+
+async def _run_workflows(paper_ids: List[int], model: str, concurrency: int):
+    from webApp.services.graphs.paper_processing_workflow import process_paper_workflow
+
+    semaphore = asyncio.Semaphore(concurrency)
+    durations = {}
+
+    async def run(paper_id):
+        async with semaphore:
+            started = time.perf_counter()
+            result = await process_paper_workflow(paper_id, force_reprocess=True, model=model)
+            durations[paper_id] = time.perf_counter() - started
+            return result
+
+    results = await asyncio.gather(*(run(paper_id) for paper_id in paper_ids))
+    return results, durations
+
+
+def _node_report(run_ids, queries: QueryCounter) -> Dict[str, Dict[str, Any]]:
+    latencies: Dict[str, List[float]] = {}
+    statuses: Dict[str, Counter] = {}
+    node_queries: Dict[str, List[int]] = {}
+    tokens: Counter = Counter()
+    spans: Dict[str, List[Dict[str, Any]]] = {}
+
+    for node in WorkflowNode.objects.filter(workflow_run_id__in=run_ids).only(
+        "workflow_run_id",
+        "node_id",
+        "status",
+        "started_at",
+        "completed_at",
+        "total_tokens",
+        "spans",
+    ):
+        statuses.setdefault(node.node_id, Counter())[node.status] += 1
+        tokens[node.node_id] += node.total_tokens or 0
+        if node.spans:
+            spans.setdefault(node.node_id, []).append(node.spans)
+        if node.status == "completed" and node.started_at and node.completed_at:
+            latencies.setdefault(node.node_id, []).append(
+                (node.completed_at - node.started_at).total_seconds()
+            )
+        if node.status != "pending":
+            node_queries.setdefault(node.node_id, []).append(
+                queries.by_run_node[(str(node.workflow_run_id), node.node_id)]
+            )
+
+    return {
+        node_id: {
+            "statuses": dict(statuses[node_id]),
+            "latency_seconds": _summary(latencies.get(node_id, [])),
+            "queries": _summary(node_queries.get(node_id, [])),
+            "tokens": tokens[node_id],
+            "spans": {
+                kind: {
+                    "avg_count": round(totals["count"] / len(spans[node_id]), 2),
+                    "avg_seconds": round(totals["seconds"] / len(spans[node_id]), 4),
+                }
+                for kind, totals in merge_spans(spans.get(node_id, [])).items()
+            },
+        }
+        for node_id in statuses
+    }
+
+
+def run_benchmark(
+    papers: int = 10,
+    concurrency: int = 4,
+    code_fraction: float = 0.5,
+    model: str = "gpt-5",
+    llm_config: Optional[StubLLMConfig] = None,
+    grobid_latency_seconds: float = 0.0,
+    words_per_section: int = 250,
+    trace_memory: bool = True,
+) -> Dict[str, Any]:
+    """
+    Run PaperProcessingWorkflow over a synthetic corpus with offline services.
+
+    Args:
+        papers: Number of synthetic papers
+        concurrency: Workflows run at the same time
+        code_fraction: Share of papers linking a fixture repository
+        model: Model name passed to the workflow (and stub)
+        llm_config: Latency/rate-limit behaviour of the LLM stub
+        grobid_latency_seconds: Processing time of the Grobid stub per paper
+        words_per_section: Length of the synthetic papers' sections
+        trace_memory: Track peak Python allocations with tracemalloc (slower)
+
+    Returns:
+        Report with setup, throughput, per-run and per-node figures, memory
+        and LLM usage
+    """
+    client = StubOpenAI(llm_config)
+    report: Dict[str, Any] = {
+        "config": {
+            "papers": papers,
+            "concurrency": concurrency,
+            "code_fraction": code_fraction,
+            "model": model,
+            "words_per_section": words_per_section,
+            "grobid_latency_seconds": grobid_latency_seconds,
+            "llm": vars(client.config),
+        }
+    }
+
+    with GrobidStubServer(grobid_latency_seconds, words_per_section) as grobid, GitFixtureServer() as git:
+        started = time.perf_counter()
+        seed_criteria(client)
+        paper_ids = create_corpus(papers, grobid, git, code_fraction)
+        report["setup_seconds"] = round(time.perf_counter() - started, 3)
+
+        if trace_memory:
+            tracemalloc.start()
+        with override_openai_client(client), QueryCounter() as queries:
+            started = time.perf_counter()
+            results, durations = async_to_sync(_run_workflows)(paper_ids, model, concurrency)
+            wall_seconds = time.perf_counter() - started
+        peak_python = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+
+    run_ids = [result["workflow_run_id"] for result in results if result.get("workflow_run_id")]
+    runs = WorkflowRun.objects.filter(id__in=run_ids)
+    run_queries = Counter()
+    for (run_id, _), count in queries.by_run_node.items():
+        run_queries[run_id] += count
+    report.update(
+        {
+            "wall_seconds": round(wall_seconds, 3),
+            "throughput_papers_per_minute": round(papers / wall_seconds * 60, 2) if wall_seconds else None,
+            "runs": {
+                "statuses": dict(Counter(runs.values_list("status", flat=True))),
+                "failed_papers": [r["paper_id"] for r in results if not r.get("success")],
+                "latency_seconds": _summary(list(durations.values())),
+                "queries": _summary([run_queries[str(run_id)] for run_id in run_ids]),
+                "queries_outside_nodes": queries.outside_nodes,
+            },
+            "nodes": _node_report(run_ids, queries),
+            "memory": {
+                "peak_python_mb": round(peak_python / 2**20, 1) if peak_python is not None else None,
+                "max_rss_mb": _max_rss_mb(),
+            },
+            "llm": client.stats,
+            "grobid_requests": grobid.requests,
+        }
+    )
+    return report
@@ -0,0 +1,302 @@
+"""
+Conference-wide workflow reruns and stops.
+
+The bulk views record a BulkOperation and return its id. Reruns are done by
+bulk_workflow_operation_task; stops run inside the request, because they are
+only two UPDATEs and a queue purge and must not wait behind busy workers:
+
+- Active runs are cancelled set-based (one UPDATE for their nodes, one for
+  the runs) instead of saving every run and node
+- Reruns are published to the broker in Celery groups of
+  DISPATCH_CHUNK_SIZE signatures, with progress recorded after each group
+- Reruns with ``llm_batch`` are created as workflow engine runs instead,
+  whose nodes wait for provider batch jobs (workflow_engine.services.llm_batches)
+"""
+
+import logging
+from typing import Callable, List, Optional, Sequence
+
+from django.db import transaction
+from django.utils import timezone
+
+from webApp.models import BulkOperation, Paper
+from workflow_engine.models import WorkflowDefinition, WorkflowNode, WorkflowRun
+from workflow_engine.services.status_feed import publish as publish_status_events
+
+logger = logging.getLogger(__name__)
+
+# Run and node states cancelled by a bulk operation
+ACTIVE_STATUSES = ["running", "pending"]
+
+# Workflow tasks published per Celery group
+DISPATCH_CHUNK_SIZE = 200
+
+
+# ============================================================================
+# Building blocks
+# ============================================================================
+
+
+def cancel_active_runs(paper_ids: Sequence[int], reason: str) -> int:
+    """
+    Fail all running/pending workflow runs of the given papers.
+
+    Args:
+        paper_ids: Papers whose active runs are cancelled
+        reason: Appended to the run and node error messages
+
+    Returns:
+        Number of runs cancelled
+    """
+    cancelled = list(
+        WorkflowRun.objects.filter(
+            paper_id__in=list(paper_ids), status__in=ACTIVE_STATUSES
+        ).values_list("id", "paper_id")
+    )
+    if not cancelled:
+        return 0
+
+    run_ids = [run_id for run_id, _ in cancelled]
+    now = timezone.now()
+    with transaction.atomic():
+        WorkflowNode.objects.filter(
+            workflow_run_id__in=run_ids, status__in=ACTIVE_STATUSES + ["waiting"]
+        ).update(status="failed", completed_at=now, error_message=f"Node cancelled {reason}")
+        WorkflowRun.objects.filter(id__in=run_ids, status__in=ACTIVE_STATUSES).update(
+            status="failed", completed_at=now, error_message=f"Workflow cancelled {reason}"
+        )
+
+    # Bulk UPDATEs bypass the status signals
+    publish_status_events((run_id, paper_id, None, "failed") for run_id, paper_id in cancelled)
+    logger.info(f"Cancelled {len(run_ids)} active workflow run(s) {reason}")
+    return len(run_ids)
+
+
+def dispatch_paper_workflows(
+    paper_ids: List[int],
+    on_progress: Optional[Callable[[int], None]] = None,
+    **task_kwargs,
+) -> int:
+    """
+    Enqueue process_paper_workflow_task for many papers on the bulk queue.
+
+    Args:
+        paper_ids: Papers to process
+        on_progress: Called with the number of papers enqueued after each group
+        **task_kwargs: Other arguments of process_paper_workflow_task
+
+    Returns:
+        Number of tasks enqueued
+    """
+    from celery import group
+    from webApp.tasks import paper_workflow_signature
+
+    enqueued = 0
+    for start in range(0, len(paper_ids), DISPATCH_CHUNK_SIZE):
+        chunk = paper_ids[start : start + DISPATCH_CHUNK_SIZE]
+        group(
+            paper_workflow_signature(
+                WorkflowRun.PRIORITY_BULK, paper_id=paper_id, **task_kwargs
+            )
+            for paper_id in chunk
+        ).apply_async()
+        enqueued += len(chunk)
+        if on_progress:
+            on_progress(enqueued)
+    return enqueued
+
+
+def start_batch_mode_runs(
+    workflow_definition: WorkflowDefinition,
+    paper_ids: List[int],
+    on_progress: Optional[Callable[[int], None]] = None,
+    force_reprocess: bool = True,
+) -> int:
+    """
+    Start workflow engine runs whose LLM requests go to provider batch jobs.
+
+    The scheduler executes their nodes; nodes waiting for a batch job are
+    suspended instead of holding a worker.
+
+    Returns:
+        Number of runs started
+    """
+    from workflow_engine.services.orchestrator import WorkflowOrchestrator
+
+    orchestrator = WorkflowOrchestrator()
+    started = 0
+    for start in range(0, len(paper_ids), DISPATCH_CHUNK_SIZE):
+        chunk = paper_ids[start : start + DISPATCH_CHUNK_SIZE]
+        run_ids = [
+            orchestrator.create_workflow_run(
+                workflow_name=workflow_definition.name,
+                paper=paper,
+                input_data={"llm_batch": True, "force_reprocess": force_reprocess},
+                priority=WorkflowRun.PRIORITY_BULK,
+            ).id
+            for paper in Paper.objects.filter(id__in=chunk).only("id")
+        ]
+        WorkflowRun.objects.filter(id__in=run_ids).update(
+            status="running", started_at=timezone.now()
+        )
+        started += len(run_ids)
+        if on_progress:
+            on_progress(started)
+    return started
+
+
+def purge_pending_tasks() -> int:
+    """Drop all tasks waiting in the Celery queues."""
+    from celery import current_app
+
+    try:
+        purged = current_app.control.purge() or 0
+        logger.info(f"Purged {purged} pending tasks from Celery queue")
+        return purged
+    except Exception as e:
+        logger.error(f"Failed to purge Celery queue: {e}", exc_info=True)
+        return 0
+
+
+# ============================================================================
+# Operations
+# ============================================================================
+
+
+def start_bulk_operation(conference, operation: str, user=None, **params) -> BulkOperation:
+    """
+    Record a bulk operation and carry it out.
+
+    A rerun is dispatched to a worker once committed. A stop is executed
+    right away: during a large rerun every worker process can be busy with
+    workflow tasks, and a queued stop would wait behind them.
+
+    Args:
+        conference: Conference whose papers are affected
+        operation: "rerun" or "stop"
+        user: Requesting user (optional)
+        **params: Operation arguments (workflow_id, force_reprocess, limit, llm_batch)
+
+    Returns:
+        The BulkOperation (pending for a rerun, finished for a stop)
+    """
+    from webApp.tasks import bulk_workflow_operation_task
+
+    bulk_operation = BulkOperation.objects.create(
+        conference=conference,
+        operation=operation,
+        params=params,
+        user=user if user is not None and user.is_authenticated else None,
+    )
+    if operation == "stop":
+        run_bulk_operation(bulk_operation.id)
+        bulk_operation.refresh_from_db()
+        return bulk_operation
+
+    transaction.on_commit(
+        lambda: bulk_workflow_operation_task.delay(str(bulk_operation.id))
+    )
+    return bulk_operation
+
+
+def run_bulk_operation(operation_id) -> None:
+    """Execute a pending bulk operation, recording its progress and outcome."""
+    # Claim the operation so duplicate dispatches do not run it twice
+    claimed = BulkOperation.objects.filter(id=operation_id, status="pending").update(
+        status="running", updated_at=timezone.now()
+    )
+    if not claimed:
+        return
+
+    bulk_operation = BulkOperation.objects.get(id=operation_id)
+    try:
+        papers = Paper.objects.filter(conference_id=bulk_operation.conference_id).order_by(
+            "id"
+        )
+        limit = bulk_operation.params.get("limit")
+        if limit and limit > 0:
+            papers = papers[:limit]
+        paper_ids = list(papers.values_list("id", flat=True))
+
+        bulk_operation.total_papers = len(paper_ids)
+        bulk_operation.save(update_fields=["total_papers", "updated_at"])
+
+        if bulk_operation.operation == "rerun":
+            _rerun(bulk_operation, paper_ids)
+        else:
+            _stop(bulk_operation, paper_ids)
+
+        bulk_operation.status = "completed"
+        bulk_operation.completed_at = timezone.now()
+        bulk_operation.save()
+        logger.info(
+            f"Bulk {bulk_operation.operation} {operation_id} completed for conference "
+            f"{bulk_operation.conference_id}: {bulk_operation.message}"
+        )
+    except Exception as e:
+        logger.exception(f"Bulk operation {operation_id} failed: {e}")
+        BulkOperation.objects.filter(id=operation_id).update(
+            status="failed",
+            error=str(e),
+            completed_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+
+
+def _set_progress(bulk_operation: BulkOperation, processed: int):
+    bulk_operation.processed_papers = processed
+    BulkOperation.objects.filter(id=bulk_operation.id).update(
+        processed_papers=processed, updated_at=timezone.now()
+    )
+
+
+def _rerun(bulk_operation: BulkOperation, paper_ids: List[int]):
+    from workflow_engine.services.concurrency import workflow_admission
+
+    params = bulk_operation.params
+    workflow_definition = WorkflowDefinition.objects.get(id=params["workflow_id"])
+
+    # Forced cleanup: a rerun replaces whatever is still active
+    bulk_operation.cancelled_runs = cancel_active_runs(paper_ids, "for bulk rerun")
+
+    if params.get("llm_batch"):
+        bulk_operation.tasks_enqueued = start_batch_mode_runs(
+            workflow_definition,
+            paper_ids,
+            on_progress=lambda started: _set_progress(bulk_operation, started),
+            force_reprocess=params.get("force_reprocess", True),
+        )
+    else:
+        bulk_operation.tasks_enqueued = dispatch_paper_workflows(
+            paper_ids,
+            on_progress=lambda enqueued: _set_progress(bulk_operation, enqueued),
+            force_reprocess=params.get("force_reprocess", True),
+            model="gpt-5",
+            workflow_id=str(workflow_definition.id),
+        )
+
+    enqueued = bulk_operation.tasks_enqueued
+    message = f"{enqueued} workflow task{'s' if enqueued != 1 else ''} queued for processing"
+    message += f" using '{workflow_definition.description or workflow_definition.name}'"
+    if params.get("limit"):
+        message += f" (limited to {params['limit']})"
+    if params.get("llm_batch"):
+        message += ". LLM requests are sent as provider batch jobs; results arrive within 24 hours."
+    else:
+        max_concurrent = workflow_admission.get_pool().max_concurrent
+        message += f". Celery workers will process {max_concurrent} at a time."
+    bulk_operation.message = message
+
+
+def _stop(bulk_operation: BulkOperation, paper_ids: List[int]):
+    cancelled = cancel_active_runs(paper_ids, "by user (bulk stop)")
+    purged = purge_pending_tasks()
+
+    bulk_operation.cancelled_runs = cancelled
+    bulk_operation.purged_tasks = purged
+    bulk_operation.processed_papers = len(paper_ids)
+
+    message = f"Successfully stopped {cancelled} workflow{'s' if cancelled != 1 else ''}"
+    if purged > 0:
+        message += f" and removed {purged} pending task{'s' if purged != 1 else ''} from queue"
+    bulk_operation.message = message
@@ -0,0 +1,235 @@
+"""
+Materialized per-conference token statistics.
+
+ConferenceTokenStats holds running sums over the latest completed workflow
+run of every paper in a conference. They are updated incrementally when a
+run completes (see workflow_engine.signals and update_workflow_run_status),
+so the conference pages read a handful of rows instead of aggregating the
+whole workflow history on every request.
+
+Each row also sums the span summaries (time per operation kind, see
+webApp.services.spans) of the runs and nodes that recorded them.
+
+Paper moves between conferences and deleted runs are not tracked
+incrementally; `manage.py rebuild_conference_stats` recomputes from scratch.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Q
+
+from webApp.models import ConferenceStatsContribution, ConferenceTokenStats, Paper
+from webApp.services.spans import merge_spans
+from workflow_engine.models import WorkflowNode, WorkflowRun
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# Incremental updates
+# ============================================================================
+
+
+def record_completed_runs(run_ids: Iterable) -> int:
+    """
+    Fold completed workflow runs into their conference statistics.
+
+    A run replaces its paper's current contribution only if it is newer;
+    recording the same run twice is a no-op.
+
+    Args:
+        run_ids: IDs of workflow runs that just completed
+
+    Returns:
+        Number of runs that changed the statistics
+    """
+    run_ids = list(run_ids)
+    if not run_ids:
+        return 0
+
+    runs = (
+        WorkflowRun.objects.filter(
+            id__in=run_ids,
+            status="completed",
+            paper__conference_id__isnull=False,
+        )
+        .values(
+            "id",
+            "paper_id",
+            "paper__conference_id",
+            "created_at",
+            "total_input_tokens",
+            "total_output_tokens",
+            "total_tokens",
+        )
+        .order_by("created_at")
+    )
+    by_conference = defaultdict(list)
+    for run in runs:
+        by_conference[run["paper__conference_id"]].append(run)
+
+    recorded = 0
+    for conference_id, conference_runs in by_conference.items():
+        try:
+            recorded += _record_conference_runs(conference_id, conference_runs)
+        except Exception as e:
+            # Statistics are derived data; never fail a run transition on them
+            logger.warning(f"Failed to update statistics for conference {conference_id}: {e}")
+    return recorded
+
+
+def _record_conference_runs(conference_id: int, runs: List[Dict[str, Any]]) -> int:
+    with transaction.atomic():
+        # The whole-run row serializes all updates of one conference
+        ConferenceTokenStats.objects.get_or_create(conference_id=conference_id, node_id="")
+        stats = {
+            row.node_id: row
+            for row in ConferenceTokenStats.objects.select_for_update().filter(
+                conference_id=conference_id
+            )
+        }
+
+        contributions = defaultdict(list)
+        for row in ConferenceStatsContribution.objects.filter(
+            paper_id__in={run["paper_id"] for run in runs}
+        ):
+            contributions[row.paper_id].append(row)
+
+        recorded = 0
+        for run in runs:
+            current = next(
+                (row for row in contributions[run["paper_id"]] if row.node_id == ""), None
+            )
+            if current and (
+                current.workflow_run_id == run["id"]
+                or current.run_created_at > run["created_at"]
+            ):
+                continue
+
+            for row in contributions[run["paper_id"]]:
+                if row.node_id in stats:
+                    _apply(stats[row.node_id], row, sign=-1)
+
+            # Nodes without tokens or spans (e.g. cached runs that tracked
+            # none) are left out so they do not deflate the averages
+            nodes = [
+                node
+                for node in WorkflowNode.objects.filter(workflow_run_id=run["id"]).values(
+                    "node_id", "input_tokens", "output_tokens", "total_tokens", "spans"
+                )
+                if node["total_tokens"] > 0 or node["spans"]
+            ]
+            new_rows = [
+                ConferenceStatsContribution(
+                    paper_id=run["paper_id"],
+                    node_id="",
+                    workflow_run_id=run["id"],
+                    run_created_at=run["created_at"],
+                    input_tokens=run["total_input_tokens"] or 0,
+                    output_tokens=run["total_output_tokens"] or 0,
+                    total_tokens=run["total_tokens"] or 0,
+                    spans=merge_spans(node["spans"] for node in nodes),
+                )
+            ]
+            for node in nodes:
+                new_rows.append(
+                    ConferenceStatsContribution(
+                        paper_id=run["paper_id"],
+                        workflow_run_id=run["id"],
+                        run_created_at=run["created_at"],
+                        **node,
+                    )
+                )
+
+            for row in new_rows:
+                if row.node_id not in stats:
+                    stats[row.node_id] = ConferenceTokenStats(
+                        conference_id=conference_id, node_id=row.node_id
+                    )
+                _apply(stats[row.node_id], row)
+
+            ConferenceStatsContribution.objects.filter(paper_id=run["paper_id"]).delete()
+            contributions[run["paper_id"]] = ConferenceStatsContribution.objects.bulk_create(
+                new_rows
+            )
+            recorded += 1
+
+        for row in stats.values():
+            row.save()
+
+    return recorded
+
+
+def _apply(stats: ConferenceTokenStats, row: ConferenceStatsContribution, sign: int = 1):
+    # Node rows that only carry spans leave the token averages alone
+    if row.node_id == "" or row.total_tokens > 0:
+        stats.add(_metrics(row), sign=sign)
+    if row.spans:
+        stats.add_spans(row.spans, sign=sign)
+
+
+def _metrics(row: ConferenceStatsContribution) -> Dict[str, int]:
+    return {
+        "input_tokens": row.input_tokens,
+        "output_tokens": row.output_tokens,
+        "total_tokens": row.total_tokens,
+    }
+
+
+def rebuild_conference_stats(conference_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute statistics from the workflow history.
+
+    Args:
+        conference_ids: Conferences to rebuild (all if None)
+
+    Returns:
+        Number of papers with a completed run
+    """
+    latest_runs = WorkflowRun.objects.filter(
+        status="completed",
+        paper__conference_id__isnull=False,
+        id__in=Paper.objects.values("latest_completed_workflow_run"),
+    )
+    stats = ConferenceTokenStats.objects.all()
+    contributions = ConferenceStatsContribution.objects.all()
+    if conference_ids is not None:
+        conference_ids = list(conference_ids)
+        latest_runs = latest_runs.filter(paper__conference_id__in=conference_ids)
+        stats = stats.filter(conference_id__in=conference_ids)
+        contributions = contributions.filter(paper__conference_id__in=conference_ids)
+
+    with transaction.atomic():
+        stats.delete()
+        contributions.delete()
+        return record_completed_runs(latest_runs.values_list("id", flat=True))
+
+
+# ============================================================================
+# Reading
+# ============================================================================
+
+
+def conference_summaries(conference_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Whole-run statistics per conference (missing if no completed runs)."""
+    return {
+        row.conference_id: row.summary()
+        for row in ConferenceTokenStats.objects.filter(
+            conference_id__in=list(conference_ids), node_id="", count__gt=0
+        )
+    }
+
+
+def node_summaries(conference_id: int) -> Dict[str, Dict[str, Any]]:
+    """Per-node statistics of a conference, keyed by node_id."""
+    return {
+        row.node_id: row.summary()
+        for row in ConferenceTokenStats.objects.filter(
+            Q(count__gt=0) | Q(span_count__gt=0), conference_id=conference_id
+        )
+        .exclude(node_id="")
+        .order_by("node_id")
+    }
@@ -0,0 +1,210 @@
+"""
+Token-budgeted context packing for retrieval.
+
+Retrieval used to take candidates in similarity order and stop at the first
+one that did not fit, so a single large file could end selection with most
+of the budget unused. pack_context() instead treats selection as a budgeted
+knapsack with diminishing returns:
+
+- The value of a candidate is its relevance (similarity to the query),
+  reduced when it nearly duplicates an already selected candidate (cosine
+  similarity above DUPLICATE_SIMILARITY between their embeddings)
+- Candidates are picked greedily by value per token among those that still
+  fit, and the result is compared with the best single candidate (the usual
+  guarantee for budgeted submodular selection)
+- Leftover budget is filled with the head of the best candidate that did
+  not fit, truncated at a token boundary
+
+The returned PackingReport records utilisation and what was dropped.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from webApp.services.token_counter import token_counter
+
+# Similarity between two candidates above which they start to count as
+# near-duplicates; at 1.0 a duplicate adds no value
+DUPLICATE_SIMILARITY = 0.8
+
+# Smallest truncated head worth adding to fill leftover budget
+MIN_TRUNCATED_TOKENS = 200
+
+
+@dataclass
+class PackItem:
+    """A retrieval candidate."""
+
+    key: Any
+    text: str
+    tokens: int
+    relevance: float
+    embedding: Optional[Sequence[float]] = None
+    payload: Any = None
+
+
+@dataclass
+class PackedItem:
+    """A selected candidate, possibly truncated to fit."""
+
+    item: PackItem
+    text: str
+    tokens: int
+    truncated: bool = False
+
+
+@dataclass
+class PackingReport:
+    budget: int
+    tokens_used: int
+    selected: int
+    truncated: List[Any] = field(default_factory=list)
+    dropped: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def utilisation(self) -> float:
+        return self.tokens_used / self.budget if self.budget else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "budget": self.budget,
+            "tokens_used": self.tokens_used,
+            "utilisation": round(self.utilisation, 3),
+            "selected": self.selected,
+            "truncated": [str(key) for key in self.truncated],
+            "dropped": self.dropped,
+        }
+
+    def summary(self) -> str:
+        return (
+            f"{self.selected} selected ({len(self.truncated)} truncated), "
+            f"{len(self.dropped)} dropped, {self.tokens_used:,}/{self.budget:,} tokens "
+            f"({self.utilisation:.0%})"
+        )
+
+
+@dataclass
+class PackingResult:
+    packed: List[PackedItem]
+    report: PackingReport
+
+
+def _redundancy(items: List[PackItem]) -> Optional[np.ndarray]:
+    """
+    (n, n) near-duplicate factors in [0, 1], or None without embeddings.
+
+    0 below DUPLICATE_SIMILARITY, rising linearly to 1 for identical vectors.
+    """
+    if len(items) < 2 or any(item.embedding is None for item in items):
+        return None
+    dimensions = {len(item.embedding) for item in items}
+    if len(dimensions) != 1:
+        return None
+
+    matrix = np.array([item.embedding for item in items], dtype=np.float64)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0.0)
+    return np.clip(
+        (similarity - DUPLICATE_SIMILARITY) / (1.0 - DUPLICATE_SIMILARITY), 0.0, 1.0
+    )
+
+
+def _greedy(items: List[PackItem], budget: int, redundancy: Optional[np.ndarray]):
+    """Greedy selection by marginal value per token; returns (indices, value)."""
+    n = len(items)
+    relevance = np.array([max(item.relevance, 0.0) for item in items])
+    tokens = np.array([item.tokens for item in items], dtype=np.int64)
+    # Largest near-duplicate factor of each candidate against the selection
+    overlap = np.zeros(n)
+    available = np.ones(n, dtype=bool)
+
+    selected, value, remaining = [], 0.0, budget
+    while True:
+        fits = available & (tokens <= remaining)
+        if not fits.any():
+            break
+        gain = relevance * (1.0 - overlap)
+        ratio = np.where(fits, gain / np.maximum(tokens, 1), -np.inf)
+        best = int(np.argmax(ratio))
+        if gain[best] <= 0 and tokens[best] > 0:
+            break
+        selected.append(best)
+        value += gain[best]
+        remaining -= int(tokens[best])
+        available[best] = False
+        if redundancy is not None:
+            overlap = np.maximum(overlap, redundancy[best])
+    return selected, value
+
+
+def pack_context(
+    items: Sequence[PackItem],
+    budget: int,
+    allow_truncation: bool = True,
+    min_truncated_tokens: int = MIN_TRUNCATED_TOKENS,
+) -> PackingResult:
+    """
+    Select candidates that maximize relevance within a token budget.
+
+    Args:
+        items: Candidates (already filtered by any similarity threshold)
+        budget: Maximum total tokens
+        allow_truncation: Fill leftover budget with a truncated candidate
+        min_truncated_tokens: Smallest truncated head worth adding
+
+    Returns:
+        PackingResult whose packed items are ordered by relevance (highest first)
+    """
+    items = list(items)
+    redundancy = _redundancy(items)
+
+    selected, value = _greedy(items, budget, redundancy)
+
+    # Guard against a greedy start on many small, weak items
+    fitting = [i for i, item in enumerate(items) if item.tokens <= budget]
+    if fitting:
+        best_single = max(fitting, key=lambda i: items[i].relevance)
+        if items[best_single].relevance > value:
+            selected = [best_single]
+
+    packed = [PackedItem(items[i], items[i].text, items[i].tokens) for i in selected]
+    tokens_used = sum(p.tokens for p in packed)
+    chosen = set(selected)
+
+    truncated = []
+    remaining = budget - tokens_used
+    if allow_truncation and remaining >= min_truncated_tokens:
+        overlap = np.zeros(len(items))
+        if redundancy is not None and selected:
+            overlap = redundancy[selected].max(axis=0)
+        candidates = [
+            i for i, item in enumerate(items) if i not in chosen and item.tokens > remaining
+        ]
+        if candidates:
+            best = max(candidates, key=lambda i: items[i].relevance * (1.0 - overlap[i]))
+            text = token_counter.truncate(items[best].text, remaining)
+            tokens = token_counter.count(text)
+            if min_truncated_tokens <= tokens <= remaining:
+                packed.append(PackedItem(items[best], text, tokens, truncated=True))
+                tokens_used += tokens
+                chosen.add(best)
+                truncated.append(items[best].key)
+
+    packed.sort(key=lambda p: p.item.relevance, reverse=True)
+    dropped = [
+        {"key": str(item.key), "tokens": item.tokens, "relevance": round(item.relevance, 4)}
+        for i, item in enumerate(items)
+        if i not in chosen
+    ]
+    report = PackingReport(
+        budget=budget,
+        tokens_used=tokens_used,
+        selected=len(packed),
+        truncated=truncated,
+        dropped=dropped,
+    )
+    return PackingResult(packed, report)
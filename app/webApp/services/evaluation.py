@@ -0,0 +1,601 @@
+"""
+Agreement between workflow output and human evaluations.
+
+Replaces the file-based scripts in analyses/ (aggregate_metrics.py,
+metrics_cont.py) and extract_workflow_token_data.py. For every paper with a
+HumanEvaluation, the latest completed run of a workflow definition is
+compared with the human labels:
+
+- Paper checklist (reproducibility_checklist), per category
+- Dataset documentation (dataset_documentation_check), per category
+- Code analysis (code_repository_analysis), as one group of booleans
+
+The data is read in a fixed number of queries regardless of the number of
+papers, and the metrics are computed on NumPy arrays: every compared label
+is one element, and confusion counts per paper/category/criterion are
+bincounts over it. Per-paper section and global scores use the weights of
+aggregate_metrics.py so results stay comparable.
+
+Results are cached in EvaluationResult per (workflow definition, snapshot),
+where the snapshot hashes the evaluated runs and human evaluations.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.utils import timezone
+
+from webApp.models import EvaluationResult, HumanEvaluation
+from workflow_engine.models import NodeArtifact, WorkflowNode, WorkflowRun
+
+logger = logging.getLogger(__name__)
+
+# (section, node_id, artifact name) of the workflow output that is evaluated
+WORKFLOW_SOURCES = (
+    ("paper_analysis", "reproducibility_checklist", "criterion_analyses"),
+    ("dataset_analysis", "dataset_documentation_check", "criterion_analyses"),
+    ("code_analysis", "code_repository_analysis", "result"),
+)
+
+PAPER_CATEGORIES = ("models", "datasets", "experiments")
+DATASET_CATEGORIES = ("data_collection", "annotation", "ethics_availability")
+
+# Compared label groups, in array column order
+GROUPS = (
+    ("Code", "code"),
+    *(("Dataset", category) for category in DATASET_CATEGORIES),
+    *(("Paper", category) for category in PAPER_CATEGORIES),
+)
+CODE_GROUP = 0
+DATASET_GROUPS = slice(1, 1 + len(DATASET_CATEGORIES))
+PAPER_GROUPS = slice(1 + len(DATASET_CATEGORIES), len(GROUPS))
+
+# Paper checklist category weights by paper type (unknown types use "method")
+PAPER_WEIGHTS = {
+    "method": (0.45, 0.20, 0.35),
+    "both": (0.35, 0.35, 0.35),
+}
+DATASET_WEIGHTS = (0.35, 0.40, 0.25)
+
+SECTIONS = ("Paper", "Code", "Dataset")
+
+# Global weights of (Paper, Code, Dataset) by which sections were compared
+GLOBAL_WEIGHTS = {
+    (True, True, True): (0.5, 0.2, 0.3),
+    (True, True, False): (0.6, 0.4, 0.0),
+    (True, False, True): (0.6, 0.0, 0.4),
+    (True, False, False): (1.0, 0.0, 0.0),
+}
+
+# Token usage groups
+NODE_GROUPS = {
+    "paper": (
+        "paper_type_classification",
+        "section_embeddings",
+        "reproducibility_checklist",
+        "final_aggregation",
+    ),
+    "code": ("code_embedding", "code_repository_analysis"),
+    "dataset": ("dataset_documentation_check",),
+}
+
+# Code analysis sections under their artifact and export names
+CODE_SECTION_KEYS = {
+    "methodology": ("research_methodology", "methodology"),
+    "structure": ("repository_structure", "structure"),
+    "components": ("code_components", "components"),
+    "artifacts": ("artifacts",),
+    "splits": ("dataset_splits",),
+    "documentation": ("documentation",),
+}
+
+CODE_BOOLEAN_FIELDS = {
+    "structure": ("has_requirements",),
+    "components": ("has_training_code", "has_evaluation_code", "has_documented_commands"),
+    "artifacts": ("has_checkpoints", "has_dataset_links"),
+    "splits": ("splits_specified", "splits_provided", "random_seeds_documented"),
+    "documentation": ("has_readme", "has_results_table", "has_reproduction_commands"),
+}
+
+
+# ============================================================================
+# Label extraction
+# ============================================================================
+
+
+def _unwrap(data: Any) -> Any:
+    """Inline artifacts store non-dict data as {"value": data}."""
+    if isinstance(data, dict) and set(data) == {"value"}:
+        return data["value"]
+    return data
+
+
+def criterion_labels(items: Optional[Iterable[Dict]]) -> Dict[Tuple[str, str], bool]:
+    """(category, criterion_id) -> present for checklist analyses."""
+    labels = {}
+    for item in items or []:
+        if not isinstance(item, dict) or "criterion_id" not in item:
+            continue
+        category = item.get("category") or "unknown"
+        labels[(category, item["criterion_id"])] = bool(item.get("present"))
+    return labels
+
+
+def code_labels(code_analysis: Optional[Dict]) -> Dict[str, bool]:
+    """
+    Booleans of a code analysis, following compute_reproducibility_score.
+
+    Accepts both the CodeReproducibilityAnalysis artifact and the exported
+    shape of analyses/*_human_5.json (methodology/structure/components).
+    """
+    if not code_analysis:
+        return {}
+
+    sections = {}
+    for name, keys in CODE_SECTION_KEYS.items():
+        section = next((code_analysis[k] for k in keys if code_analysis.get(k)), None)
+        sections[name] = section if isinstance(section, dict) else {}
+
+    labels = {}
+    for name, fields in CODE_BOOLEAN_FIELDS.items():
+        for field in fields:
+            if field in sections[name]:
+                labels[f"{name}.{field}"] = bool(sections[name][field])
+
+    structure = sections["structure"]
+    if "requirements_match_imports" in structure:
+        labels["structure.requirements_match_imports"] = (
+            structure["requirements_match_imports"] is not False
+        )
+
+    requires_datasets = sections["methodology"].get("requires_datasets", True)
+    if "dataset_coverage" in sections["artifacts"] and requires_datasets:
+        labels["artifacts.dataset_coverage_full"] = (
+            sections["artifacts"]["dataset_coverage"] == "full"
+        )
+    return labels
+
+
+def grouped_labels(analysis: Dict[str, Any]) -> Dict[int, Dict[str, bool]]:
+    """Labels of one side (human or workflow) by GROUPS index and criterion key."""
+    groups: Dict[int, Dict[str, bool]] = {}
+    group_index = {group: index for index, group in enumerate(GROUPS)}
+
+    groups[CODE_GROUP] = code_labels(analysis.get("code_analysis"))
+    for section, key in (("Dataset", "dataset_analysis"), ("Paper", "paper_analysis")):
+        for (category, criterion_id), present in criterion_labels(
+            analysis.get(key)
+        ).items():
+            index = group_index.get((section, category))
+            if index is not None:
+                groups.setdefault(index, {})[criterion_id] = present
+    return groups
+
+
+# ============================================================================
+# Metrics
+# ============================================================================
+
+
+def confusion_counts(keys: np.ndarray, size: int, human: np.ndarray, predicted: np.ndarray):
+    """
+    Confusion counts per key.
+
+    Args:
+        keys: Integer key of every compared label (0 <= key < size)
+        size: Number of keys
+        human: Reference labels
+        predicted: Workflow labels
+
+    Returns:
+        Arrays (tp, tn, fp, fn) of length ``size``
+    """
+    cell = human.astype(np.int64) * 2 + predicted.astype(np.int64)
+    counts = np.bincount(keys * 4 + cell, minlength=size * 4).reshape(size, 4)
+    tn, fp, fn, tp = counts.T
+    return tp, tn, fp, fn
+
+
+def accuracy_and_mcc(tp, tn, fp, fn):
+    """Percent agreement and Matthews correlation (NaN where undefined)."""
+    tp, tn, fp, fn = (np.asarray(x, dtype=np.float64) for x in (tp, tn, fp, fn))
+    total = tp + tn + fp + fn
+    denominator = (tp + fp) * (tp + fn) * (tn + fp) * (tn + fn)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        accuracy = np.where(total > 0, (tp + tn) / total * 100, np.nan)
+        mcc = np.where(denominator > 0, (tp * tn - fp * fn) / np.sqrt(denominator), np.nan)
+    return accuracy, mcc
+
+
+def weighted_section(accuracy, mcc, present, weights):
+    """
+    Weighted per-paper score over a section's categories.
+
+    Like aggregate_metrics.py, categories with undefined MCC count toward the
+    MCC denominator.
+
+    Args:
+        accuracy, mcc, present: (papers, categories) arrays
+        weights: (papers, categories) or (categories,) category weights
+
+    Returns:
+        (accuracy, mcc, present) arrays of length papers
+    """
+    weights = np.where(present, weights, 0.0)
+    total = weights.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        section_accuracy = np.nansum(np.where(present, accuracy, 0.0) * weights, axis=1) / total
+        section_mcc = np.nansum(np.where(np.isnan(mcc), 0.0, mcc) * weights, axis=1) / total
+    has_section = total > 0
+    return (
+        np.where(has_section, section_accuracy, np.nan),
+        np.where(has_section, section_mcc, np.nan),
+        has_section,
+    )
+
+
+def global_weights(present: np.ndarray) -> np.ndarray:
+    """(papers, 3) weights of (Paper, Code, Dataset) by section availability."""
+    weights = np.where(present, 1.0, 0.0)
+    count = weights.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weights = np.where(count > 0, weights / count, 0.0)
+    for available, fixed in GLOBAL_WEIGHTS.items():
+        rows = (present == np.array(available)).all(axis=1)
+        weights[rows] = fixed
+    return weights
+
+
+def _number(value) -> Optional[float]:
+    """JSON-safe float (NaN becomes None)."""
+    value = float(value)
+    return None if np.isnan(value) else round(value, 6)
+
+
+def _nanmean(values: np.ndarray) -> float:
+    """Mean excluding NaN (NaN if there is nothing to average)."""
+    values = values[~np.isnan(values)]
+    return float(values.mean()) if values.size else float("nan")
+
+
+def _metric_rows(names, tp, tn, fp, fn) -> Dict[str, Dict[str, Any]]:
+    accuracy, mcc = accuracy_and_mcc(tp, tn, fp, fn)
+    rows = {}
+    for i, name in enumerate(names):
+        n = int(tp[i] + tn[i] + fp[i] + fn[i])
+        if n:
+            rows[name] = {
+                "accuracy": _number(accuracy[i]),
+                "mcc": _number(mcc[i]),
+                "tp": int(tp[i]),
+                "tn": int(tn[i]),
+                "fp": int(fp[i]),
+                "fn": int(fn[i]),
+                "n": n,
+            }
+    return rows
+
+
+def compute_metrics(
+    papers: List[Tuple[Any, str, Dict, Dict]],
+) -> Dict[str, Any]:
+    """
+    Agreement metrics for a set of papers.
+
+    Args:
+        papers: (paper_id, paper_type, human analysis, workflow analysis)
+            tuples; analyses are dicts with paper_analysis, dataset_analysis
+            and code_analysis
+
+    Returns:
+        {"summary", "categories", "criteria", "papers"}
+    """
+    paper_index, group_index, criterion_index, human, predicted = [], [], [], [], []
+    criteria: Dict[str, int] = {}
+
+    for i, (_, _, human_analysis, workflow_analysis) in enumerate(papers):
+        human_groups = grouped_labels(human_analysis)
+        workflow_groups = grouped_labels(workflow_analysis)
+        for group, human_labels in human_groups.items():
+            workflow_labels = workflow_groups.get(group, {})
+            for key in human_labels.keys() & workflow_labels.keys():
+                name = f"{GROUPS[group][1]}.{key}" if group == CODE_GROUP else key
+                paper_index.append(i)
+                group_index.append(group)
+                criterion_index.append(criteria.setdefault(name, len(criteria)))
+                human.append(human_labels[key])
+                predicted.append(workflow_labels[key])
+
+    paper_index = np.array(paper_index, dtype=np.int64)
+    group_index = np.array(group_index, dtype=np.int64)
+    criterion_index = np.array(criterion_index, dtype=np.int64)
+    human = np.array(human, dtype=bool)
+    predicted = np.array(predicted, dtype=bool)
+
+    n_papers, n_groups = len(papers), len(GROUPS)
+
+    # Per paper and category
+    counts = confusion_counts(
+        paper_index * n_groups + group_index, n_papers * n_groups, human, predicted
+    )
+    tp, tn, fp, fn = (c.reshape(n_papers, n_groups) for c in counts)
+    accuracy, mcc = accuracy_and_mcc(tp, tn, fp, fn)
+    present = (tp + tn + fp + fn) > 0
+
+    paper_weights = np.array(
+        [PAPER_WEIGHTS.get(paper_type, PAPER_WEIGHTS["method"]) for _, paper_type, _, _ in papers]
+    ).reshape(n_papers, len(PAPER_CATEGORIES))
+
+    sections = {
+        "Paper": weighted_section(
+            accuracy[:, PAPER_GROUPS], mcc[:, PAPER_GROUPS], present[:, PAPER_GROUPS], paper_weights
+        ),
+        "Code": (accuracy[:, CODE_GROUP], mcc[:, CODE_GROUP], present[:, CODE_GROUP]),
+        "Dataset": weighted_section(
+            accuracy[:, DATASET_GROUPS],
+            mcc[:, DATASET_GROUPS],
+            present[:, DATASET_GROUPS],
+            np.array(DATASET_WEIGHTS),
+        ),
+    }
+
+    section_accuracy = np.stack([sections[s][0] for s in SECTIONS], axis=1)
+    section_mcc = np.stack([sections[s][1] for s in SECTIONS], axis=1)
+    section_present = np.stack([sections[s][2] for s in SECTIONS], axis=1)
+    weights = global_weights(section_present)
+    mcc_weights = np.where(np.isnan(section_mcc), 0.0, weights)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        global_accuracy = np.nansum(
+            np.where(section_present, section_accuracy, 0.0) * weights, axis=1
+        ) / weights.sum(axis=1)
+        global_mcc = np.nansum(
+            np.where(np.isnan(section_mcc), 0.0, section_mcc) * mcc_weights, axis=1
+        ) / mcc_weights.sum(axis=1)
+    has_any = section_present.any(axis=1)
+    sections["Global"] = (
+        np.where(has_any, global_accuracy, np.nan),
+        np.where(mcc_weights.sum(axis=1) > 0, global_mcc, np.nan),
+        has_any,
+    )
+
+    summary = {}
+    for name, (section_acc, section_m, section_has) in sections.items():
+        count = int(section_has.sum())
+        if not count:
+            continue
+        summary[name] = {
+            "mean_accuracy": _number(_nanmean(section_acc[section_has])),
+            "mean_mcc": _number(_nanmean(section_m[section_has])),
+            "count": count,
+        }
+
+    paper_rows = {}
+    for i, (paper_id, paper_type, _, _) in enumerate(papers):
+        paper_rows[str(paper_id)] = {
+            "paper_type": paper_type,
+            "sections": {
+                name: {"accuracy": _number(values[0][i]), "mcc": _number(values[1][i])}
+                for name, values in sections.items()
+                if values[2][i]
+            },
+        }
+
+    group_counts = confusion_counts(group_index, n_groups, human, predicted)
+    criterion_counts = confusion_counts(criterion_index, len(criteria), human, predicted)
+    return {
+        "summary": summary,
+        "categories": _metric_rows(
+            [f"{section}.{category}" for section, category in GROUPS], *group_counts
+        ),
+        "criteria": _metric_rows(list(criteria), *criterion_counts),
+        "papers": paper_rows,
+    }
+
+
+def token_usage(run_ids: List) -> Dict[str, Any]:
+    """
+    Token usage of the evaluated runs by node group (see NODE_GROUPS).
+
+    Returns:
+        {"totals": {group: {input_tokens, output_tokens, total_tokens}},
+         "mean_per_paper": {...}}
+    """
+    group_of = {node_id: name for name, node_ids in NODE_GROUPS.items() for node_id in node_ids}
+    group_names = list(NODE_GROUPS)
+
+    rows = list(
+        WorkflowNode.objects.filter(
+            workflow_run_id__in=run_ids, node_id__in=list(group_of)
+        ).values_list("node_id", "input_tokens", "output_tokens", "total_tokens")
+    )
+    if rows:
+        node_ids, *tokens = zip(*rows)
+        groups = np.array([group_names.index(group_of[n]) for n in node_ids], dtype=np.int64)
+        tokens = np.array(tokens, dtype=np.int64).T
+    else:
+        groups = np.zeros(0, dtype=np.int64)
+        tokens = np.zeros((0, 3), dtype=np.int64)
+
+    # (groups, 3) sums of input/output/total tokens
+    sums = np.stack(
+        [np.bincount(groups, weights=tokens[:, k], minlength=len(group_names)) for k in range(3)],
+        axis=1,
+    )
+    fields = ("input_tokens", "output_tokens", "total_tokens")
+    papers = max(len(run_ids), 1)
+    return {
+        "totals": {
+            group: dict(zip(fields, (int(v) for v in sums[i])))
+            for i, group in enumerate(group_names)
+        },
+        "mean_per_paper": {
+            group: dict(zip(fields, (round(float(v) / papers, 1) for v in sums[i])))
+            for i, group in enumerate(group_names)
+        },
+    }
+
+
+# ============================================================================
+# Loading
+# ============================================================================
+
+
+def latest_human_evaluations(paper_ids: Optional[List] = None, conference=None) -> Dict:
+    """paper_id -> (evaluation id, updated_at) of each paper's latest human evaluation."""
+    query = HumanEvaluation.objects.all()
+    if conference is not None:
+        query = query.filter(paper__conference=conference)
+    if paper_ids is not None:
+        query = query.filter(paper_id__in=list(paper_ids))
+
+    latest = {}
+    for paper_id, evaluation_id, updated_at in query.order_by(
+        "paper_id", "-updated_at", "-id"
+    ).values_list("paper_id", "id", "updated_at"):
+        latest.setdefault(paper_id, (evaluation_id, updated_at))
+    return latest
+
+
+def latest_completed_runs(workflow_definition, paper_ids: List) -> Dict:
+    """paper_id -> id of the latest completed run of the workflow definition."""
+    latest = {}
+    for paper_id, run_id in (
+        WorkflowRun.objects.filter(
+            workflow_definition=workflow_definition,
+            status="completed",
+            paper_id__in=list(paper_ids),
+        )
+        .order_by("paper_id", "-completed_at", "-created_at")
+        .values_list("paper_id", "id")
+    ):
+        latest.setdefault(paper_id, run_id)
+    return latest
+
+
+def load_workflow_analyses(run_ids: List) -> Dict[Any, Dict[str, Any]]:
+    """run_id -> {section: artifact data} for WORKFLOW_SOURCES, in one query."""
+    sections = {(node_id, name): section for section, node_id, name in WORKFLOW_SOURCES}
+    analyses: Dict[Any, Dict[str, Any]] = {run_id: {} for run_id in run_ids}
+
+    rows = (
+        NodeArtifact.objects.filter(
+            node__workflow_run_id__in=list(run_ids),
+            node__node_id__in=[node_id for _, node_id, _ in WORKFLOW_SOURCES],
+            name__in=list({name for _, _, name in WORKFLOW_SOURCES}),
+        )
+        .order_by("created_at")
+        .values_list("node__workflow_run_id", "node__node_id", "name", "inline_data")
+    )
+    for run_id, node_id, name, data in rows:
+        section = sections.get((node_id, name))
+        if section:
+            # Later artifacts (retries) replace earlier ones
+            analyses[run_id][section] = _unwrap(data)
+    return analyses
+
+
+def snapshot_hash(runs: Dict, evaluations: Dict) -> str:
+    """Hash of the evaluated (paper, run) pairs and human evaluation versions."""
+    snapshot = [
+        [paper_id, str(runs[paper_id]), evaluations[paper_id][0], evaluations[paper_id][1].isoformat()]
+        for paper_id in sorted(runs)
+    ]
+    return hashlib.sha256(json.dumps(snapshot).encode("utf-8")).hexdigest()
+
+
+# ============================================================================
+# Entry point
+# ============================================================================
+
+
+def evaluate_workflow(
+    workflow_definition,
+    conference=None,
+    paper_ids: Optional[List] = None,
+    refresh: bool = False,
+) -> Dict[str, Any]:
+    """
+    Evaluate a workflow definition against human evaluations.
+
+    Papers are those with a human evaluation and a completed run of the
+    workflow definition, optionally limited to a conference or paper ids.
+
+    Args:
+        workflow_definition: WorkflowDefinition (a specific version) to evaluate
+        conference: Only evaluate papers of this conference
+        paper_ids: Only evaluate these papers
+        refresh: Recompute even if a cached result exists
+
+    Returns:
+        JSON-serializable results (see compute_metrics), plus the workflow,
+        snapshot, paper count, per-paper run ids and token usage
+    """
+    evaluations = latest_human_evaluations(paper_ids, conference)
+    runs = latest_completed_runs(workflow_definition, list(evaluations))
+    evaluations = {paper_id: evaluations[paper_id] for paper_id in runs}
+    snapshot = snapshot_hash(runs, evaluations)
+
+    if not refresh:
+        cached = (
+            EvaluationResult.objects.filter(
+                workflow_definition=workflow_definition, snapshot_sha256=snapshot
+            )
+            .values_list("results", flat=True)
+            .first()
+        )
+        if cached is not None:
+            return cached
+
+    human = {
+        row["paper_id"]: row
+        for row in HumanEvaluation.objects.filter(
+            id__in=[evaluation_id for evaluation_id, _ in evaluations.values()]
+        ).values("paper_id", "paper_type", "labels")
+    }
+    analyses = load_workflow_analyses(list(runs.values()))
+
+    papers = [
+        (
+            paper_id,
+            human[paper_id]["paper_type"],
+            human[paper_id]["labels"] or {},
+            analyses[runs[paper_id]],
+        )
+        for paper_id in sorted(runs)
+    ]
+    results = compute_metrics(papers)
+    for paper_id, run_id in runs.items():
+        results["papers"][str(paper_id)]["workflow_run_id"] = str(run_id)
+
+    results.update(
+        {
+            "workflow": {
+                "id": str(workflow_definition.id),
+                "name": workflow_definition.name,
+                "version": workflow_definition.version,
+            },
+            "conference_id": conference.id if conference is not None else None,
+            "snapshot": snapshot,
+            "paper_count": len(papers),
+            "tokens": token_usage(list(runs.values())),
+            "computed_at": timezone.now().isoformat(),
+        }
+    )
+
+    EvaluationResult.objects.update_or_create(
+        workflow_definition=workflow_definition,
+        snapshot_sha256=snapshot,
+        defaults={
+            "conference": conference,
+            "paper_count": len(papers),
+            "results": results,
+        },
+    )
+    logger.info(
+        f"Evaluated {workflow_definition.name} v{workflow_definition.version} "
+        f"on {len(papers)} paper(s)"
+    )
+    return results
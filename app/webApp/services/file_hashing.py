@@ -0,0 +1,42 @@
+"""
+Content hashes of stored files.
+
+Highlighted PDFs and converted annotator documents are cached by the SHA-256
+of their source PDF. cached_file_hash() remembers the hash of a file by path,
+modification time and size, so a view that is polled while a background task
+runs does not read the whole PDF on every request.
+"""
+
+import hashlib
+import os
+
+from django.core.cache import cache
+
+# Seconds a file hash stays cached (a changed file gets a new key anyway)
+FILE_HASH_CACHE_TIMEOUT = 24 * 3600
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_file_hash(path: str) -> str:
+    """
+    SHA-256 of a file, computed once per version of the file.
+
+    Raises:
+        OSError: If the file does not exist or is not readable
+    """
+    stat = os.stat(path)
+    path_digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+    key = f"file-sha256:{path_digest}:{stat.st_mtime_ns}:{stat.st_size}"
+    sha256 = cache.get(key)
+    if sha256 is None:
+        sha256 = file_hash(path)
+        cache.set(key, sha256, FILE_HASH_CACHE_TIMEOUT)
+    return sha256
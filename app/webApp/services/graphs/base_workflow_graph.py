@@ -9,17 +9,21 @@ Subclasses must implement:
 - execute_workflow(): Execute the complete workflow from start
 """
 
-import os
+import asyncio
 import logging
-import threading
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any
 
+from django.conf import settings
 from django.utils import timezone
 from asgiref.sync import sync_to_async
-from openai import OpenAI
 
+from workflow_engine.models import WorkflowRun
 from workflow_engine.services.async_orchestrator import async_ops
+from workflow_engine.services.concurrency import workflow_admission, LeaseHeartbeat
+from workflow_engine.services.status_feed import publish as publish_status_events
+from webApp.services.rate_limiter import rate_limited_client, run_scoped
+from webApp.services.worker_runtime import get_compiled_graph, openai_client
 from ..graphs_state import PaperProcessingState
 
 logger = logging.getLogger(__name__)
@@ -29,47 +33,99 @@ logger = logging.getLogger(__name__)
 # Global Concurrency Control
 # ============================================================================
 
-# Global semaphore to limit concurrent workflow executions (per worker process)
-# This prevents system overload when multiple workflows are triggered simultaneously
-MAX_CONCURRENT_WORKFLOWS = 8
-_workflow_semaphore = threading.Semaphore(MAX_CONCURRENT_WORKFLOWS)
+# Default size of the cluster-wide workflow pool. The live limit (and the
+# per-model / per-user quotas) are stored on the ConcurrencyPool row, so every
+# web and Celery worker process enforces the same ceiling.
+MAX_CONCURRENT_WORKFLOWS = getattr(settings, "WORKFLOW_MAX_CONCURRENT", 8)
+
+# How often a queued workflow re-checks whether it has been admitted
+ADMISSION_POLL_SECONDS = 2.0
+
+# Heartbeat threads of leases held by this process, keyed by lease id
+_lease_heartbeats: Dict[str, LeaseHeartbeat] = {}
+
+
+async def acquire_workflow_slot(
+    paper_id: int,
+    model: str = "",
+    user_id: Optional[int] = None,
+    priority: int = WorkflowRun.PRIORITY_NORMAL,
+):
+    """
+    Wait for a cluster-wide workflow slot and start heartbeating it.
+
+    Returns:
+        Active WorkflowLease; pass it to release_workflow_slot() when done
+    """
+    lease = await sync_to_async(workflow_admission.enqueue)(
+        paper_id=paper_id, model=model, user_id=user_id, priority=priority
+    )
+    try:
+        while not await sync_to_async(workflow_admission.try_acquire)(lease):
+            position = await sync_to_async(workflow_admission.queue_position)(lease)
+            logger.debug(f"Paper {paper_id} waiting for workflow slot (position {position})")
+            await asyncio.sleep(ADMISSION_POLL_SECONDS)
+    except BaseException:
+        # Leave the queue if we are cancelled while waiting
+        await sync_to_async(workflow_admission.release)(lease)
+        raise
+
+    heartbeat = LeaseHeartbeat(workflow_admission, lease)
+    heartbeat.start()
+    _lease_heartbeats[str(lease.id)] = heartbeat
+    return lease
+
+
+async def release_workflow_slot(lease) -> None:
+    """Stop heartbeating a lease and release its slot."""
+    if lease is None:
+        return
+    heartbeat = _lease_heartbeats.pop(str(lease.id), None)
+    if heartbeat:
+        await sync_to_async(heartbeat.stop, thread_sensitive=False)()
+    await sync_to_async(workflow_admission.release)(lease)
 
 
 @sync_to_async
 def get_active_workflow_count() -> int:
-    """Get the current number of active workflows by querying database."""
-    # Import here to avoid circular imports
-    from workflow_engine.models import WorkflowRun
+    """Get the current number of admitted workflows across the cluster."""
+    from workflow_engine.models import WorkflowLease
 
-    # Count workflows with running or pending status
-    return WorkflowRun.objects.filter(status__in=["running", "pending"]).count()
+    return WorkflowLease.objects.filter(
+        pool__name=workflow_admission.pool_name, status="active"
+    ).count()
 
 
 @sync_to_async
 def get_active_workflows() -> Dict[int, Dict[str, Any]]:
-    """Get information about currently active workflows from database."""
-    from workflow_engine.models import WorkflowRun
+    """Get information about currently admitted workflows from their leases."""
+    from workflow_engine.models import WorkflowLease
 
-    active_runs = (
-        WorkflowRun.objects.filter(status__in=["running", "pending"])
-        .select_related("paper")
-        .values("paper__id", "id", "status", "started_at", "created_at")
+    active_leases = WorkflowLease.objects.filter(
+        pool__name=workflow_admission.pool_name, status="active"
+    ).values(
+        "paper_id", "workflow_run_id", "workflow_run__status", "acquired_at", "holder", "model"
     )
 
     workflows = {}
-    for run in active_runs:
-        paper_id = run["paper__id"]
-        workflows[paper_id] = {
-            "workflow_run_id": str(run["id"]),
-            "status": run["status"],
-            "started_at": (run["started_at"] or run["created_at"]).isoformat(),
+    for lease in active_leases:
+        workflows[lease["paper_id"]] = {
+            "workflow_run_id": (
+                str(lease["workflow_run_id"]) if lease["workflow_run_id"] else None
+            ),
+            "status": lease["workflow_run__status"] or "starting",
+            "started_at": lease["acquired_at"].isoformat(),
+            "holder": lease["holder"],
+            "model": lease["model"],
         }
 
     return workflows
 
 
-async def _register_workflow(paper_id: int, workflow_run_id: str):
-    """Register a workflow as active (logging only, tracking via DB)."""
+async def _register_workflow(paper_id: int, workflow_run_id: str, lease=None):
+    """Register a workflow as active by attaching its run to the held lease."""
+    if lease is not None:
+        await sync_to_async(workflow_admission.attach_run)(lease, workflow_run_id)
     active_count = await get_active_workflow_count()
     logger.info(
         f"Workflow started for paper {paper_id}. Active workflows: {active_count}/{MAX_CONCURRENT_WORKFLOWS}"
@@ -77,7 +133,7 @@ async def _register_workflow(paper_id: int, workflow_run_id: str):
 
 
 async def _unregister_workflow(paper_id: int):
-    """Unregister a workflow (logging only, tracking via DB)."""
+    """Unregister a workflow (logging only, the lease is released separately)."""
     active_count = await get_active_workflow_count()
     logger.info(
         f"Workflow finished for paper {paper_id}. Active workflows: {active_count}/{MAX_CONCURRENT_WORKFLOWS}"
@@ -86,15 +142,25 @@ async def _unregister_workflow(paper_id: int):
 
 @sync_to_async
 def cleanup_stale_workflows(max_age_minutes: int = 30):
-    """Clean up workflows that have been active for too long (likely crashed)."""
+    """
+    Clean up workflows whose executing process is gone.
+
+    Runs executed under a lease are failed as soon as their lease stops
+    heartbeating. Only runs that never held a lease (e.g. scheduler-driven
+    runs) fall back to the age-based timeout.
+    """
     from datetime import timedelta
     from workflow_engine.models import WorkflowRun, WorkflowNode
 
+    expired_leases = workflow_admission.expire_stale()
+
     cutoff_time = timezone.now() - timedelta(minutes=max_age_minutes)
 
-    # Find stale workflows
+    # Find stale workflows without a lease
     stale_runs = WorkflowRun.objects.filter(
-        status__in=["running", "pending"], started_at__lt=cutoff_time
+        status__in=["running", "pending"],
+        started_at__lt=cutoff_time,
+        leases__isnull=True,
     )
 
     stale_count = 0
@@ -109,20 +175,31 @@ def cleanup_stale_workflows(max_age_minutes: int = 30):
         run.save()
 
         # Also mark running/pending nodes as failed
+        stale_nodes = dict(
+            WorkflowNode.objects.filter(
+                workflow_run=run, status__in=["running", "pending"]
+            ).values_list("id", "node_id")
+        )
         WorkflowNode.objects.filter(
-            workflow_run=run, status__in=["running", "pending"]
+            id__in=list(stale_nodes), status__in=["running", "pending"]
         ).update(
             status="failed",
             completed_at=timezone.now(),
             error_message=f"Node timeout after {max_age_minutes} minutes",
         )
+        # Bulk UPDATEs bypass save signals, so publish the transitions here
+        publish_status_events(
+            (run.id, run.paper_id, node_id, "failed") for node_id in stale_nodes.values()
+        )
 
         stale_count += 1
 
-    if stale_count > 0:
-        logger.info(f"Cleaned up {stale_count} stale workflows")
+    if stale_count or expired_leases:
+        logger.info(
+            f"Cleaned up {stale_count} stale workflows and {expired_leases} expired leases"
+        )
 
-    return stale_count
+    return stale_count + expired_leases
 
 
 class BaseWorkflowGraph(ABC):
@@ -148,6 +225,15 @@ class BaseWorkflowGraph(ABC):
         """
         pass
 
+    def compiled_workflow(self):
+        """
+        Compiled workflow, built once per process for
+        (WORKFLOW_NAME, WORKFLOW_VERSION).
+        """
+        return get_compiled_graph(
+            self.WORKFLOW_NAME, self.WORKFLOW_VERSION, self.build_workflow
+        )
+
     @abstractmethod
     async def execute_workflow(
         self,
@@ -155,6 +241,7 @@ class BaseWorkflowGraph(ABC):
         force_reprocess: bool = False,
         openai_api_key: Optional[str] = None,
         model: str = "gpt-5",
+        priority: int = WorkflowRun.PRIORITY_NORMAL,
     ) -> Dict[str, Any]:
         """
         Execute the complete workflow for a paper.
@@ -164,6 +251,7 @@ class BaseWorkflowGraph(ABC):
             force_reprocess: If True, bypass cache and reprocess all nodes
             openai_api_key: OpenAI API key (uses env var if not provided)
             model: OpenAI model to use
+            priority: Scheduling priority (WorkflowRun.PRIORITY_*)
 
         Returns:
             Dictionary with workflow results
@@ -205,8 +293,7 @@ class BaseWorkflowGraph(ABC):
             )
 
             # Initialize OpenAI client
-            api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
-            client = OpenAI(api_key=api_key)
+            client = rate_limited_client(openai_client(openai_api_key))
 
             # Build state for this node execution
             state: PaperProcessingState = {
@@ -232,7 +319,11 @@ class BaseWorkflowGraph(ABC):
             state["current_node_id"] = node.node_id
 
             # Execute node - subclass should override this method to handle node execution
-            result = await self._execute_node_function(node.node_id, state)
+            result = await run_scoped(
+                state["workflow_run_id"],
+                node.node_id,
+                self._execute_node_function(node.node_id, state),
+            )
 
             # Merge results into state
             if result:
@@ -403,8 +494,7 @@ class BaseWorkflowGraph(ABC):
             )
 
             # Initialize OpenAI client
-            api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
-            client = OpenAI(api_key=api_key)
+            client = rate_limited_client(openai_client(openai_api_key))
 
             # Build initial state
             state: PaperProcessingState = {
@@ -430,7 +520,11 @@ class BaseWorkflowGraph(ABC):
 
                 logger.info(f"Executing node: {node_id}")
 
-                result = await self._execute_node_function(node_id, state)
+                result = await run_scoped(
+                    state["workflow_run_id"],
+                    node_id,
+                    self._execute_node_function(node_id, state),
+                )
 
                 if result:
                     for key, value in result.items():
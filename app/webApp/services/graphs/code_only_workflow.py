@@ -8,7 +8,6 @@ This workflow is independent and doesn't require paper type classification.
 Useful for quickly checking code availability across all papers.
 """
 
-import os
 import logging
 
 from typing import Dict, Any, Optional
@@ -16,16 +15,19 @@ from typing import Dict, Any, Optional
 from django.utils import timezone
 
 from langgraph.graph import StateGraph, END
-from openai import OpenAI
 
+from workflow_engine.models import WorkflowRun
 from workflow_engine.services.async_orchestrator import async_ops
+from webApp.services.worker_runtime import ensure_workflow_definition, openai_client
+from webApp.services.rate_limiter import rate_limited_client, scoped_node
 
 from webApp.services.nodes.code_availability_check import code_availability_check_node
 
 from ..graphs_state import PaperProcessingState
 from .base_workflow_graph import (
     BaseWorkflowGraph,
-    _workflow_semaphore,
+    acquire_workflow_slot,
+    release_workflow_slot,
     get_active_workflow_count,
     _register_workflow,
     _unregister_workflow,
@@ -66,7 +68,10 @@ class CodeOnlyWorkflow(BaseWorkflowGraph):
         workflow = StateGraph(PaperProcessingState)
 
         # Add node
-        workflow.add_node("code_availability_check", code_availability_check_node)
+        workflow.add_node(
+            "code_availability_check",
+            scoped_node("code_availability_check", code_availability_check_node),
+        )
 
         # Set entry point and end
         workflow.set_entry_point("code_availability_check")
@@ -121,6 +126,7 @@ class CodeOnlyWorkflow(BaseWorkflowGraph):
         force_reprocess: bool = False,
         openai_api_key: Optional[str] = None,
         model: str = "gpt-5",
+        priority: int = WorkflowRun.PRIORITY_NORMAL,
     ) -> Dict[str, Any]:
         """
         Execute the code-only workflow for a paper.
@@ -130,22 +136,23 @@ class CodeOnlyWorkflow(BaseWorkflowGraph):
             force_reprocess: If True, reprocess even if already analyzed
             openai_api_key: OpenAI API key (uses env var if not provided)
             model: OpenAI model to use
+            priority: Scheduling priority (WorkflowRun.PRIORITY_*)
 
         Returns:
             Dictionary with workflow results and statistics
         """
         logger.info(f"Starting code-only workflow for paper ID {paper_id}")
 
-        # Acquire semaphore (blocks until available)
-        _workflow_semaphore.acquire()
+        # Wait for a cluster-wide slot (blocks until admitted)
+        lease = await acquire_workflow_slot(paper_id, model=model, priority=priority)
         active_count = await get_active_workflow_count()
         logger.info(
-            f"Acquired workflow slot for paper {paper_id}. Active: {active_count + 1}/{MAX_CONCURRENT_WORKFLOWS}"
+            f"Acquired workflow slot for paper {paper_id}. Active: {active_count}/{MAX_CONCURRENT_WORKFLOWS}"
         )
 
         try:
             # Get or create workflow definition
-            workflow_def = await async_ops.get_or_create_workflow_definition(
+            workflow_def = await ensure_workflow_definition(
                 name="code_only_pipeline",
                 version=1,
                 description="Single-node workflow: code availability check only",
@@ -177,6 +184,7 @@ class CodeOnlyWorkflow(BaseWorkflowGraph):
                 workflow_name=self.WORKFLOW_NAME,
                 paper_id=paper_id,
                 input_data=config,
+                priority=priority,
             )
 
             # Update workflow run status to running
@@ -185,11 +193,10 @@ class CodeOnlyWorkflow(BaseWorkflowGraph):
             )
 
             # Register this workflow as active
-            await _register_workflow(paper_id, str(workflow_run.id))
+            await _register_workflow(paper_id, str(workflow_run.id), lease)
 
             # Initialize OpenAI client
-            api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
-            client = OpenAI(api_key=api_key)
+            client = rate_limited_client(openai_client(openai_api_key))
 
             # Initialize state
             initial_state: PaperProcessingState = {
@@ -207,8 +214,8 @@ class CodeOnlyWorkflow(BaseWorkflowGraph):
                 "errors": [],
             }
 
-            # Build and run workflow
-            workflow = self.build_workflow()
+            # Run the workflow (compiled once per worker process)
+            workflow = self.compiled_workflow()
 
             final_state = await workflow.ainvoke(initial_state)
 
@@ -278,9 +285,9 @@ class CodeOnlyWorkflow(BaseWorkflowGraph):
             }
 
         finally:
-            # Unregister workflow and release sempahore
+            # Unregister workflow and release the lease
             await _unregister_workflow(paper_id)
-            _workflow_semaphore.release()
+            await release_workflow_slot(lease)
 
 
 # ============================================================================
@@ -301,6 +308,7 @@ async def execute_workflow(
     force_reprocess: bool = False,
     openai_api_key: Optional[str] = None,
     model: str = "gpt-5",
+    priority: int = WorkflowRun.PRIORITY_NORMAL,
 ) -> Dict[str, Any]:
     """
     Execute the code-only workflow for a paper.
@@ -310,10 +318,11 @@ async def execute_workflow(
         force_reprocess: If True, reprocess even if already analyzed
         openai_api_key: Optional OpenAI API key (uses env var if not provided)
         model: OpenAI model to use for analysis
+        priority: Scheduling priority (WorkflowRun.PRIORITY_*)
 
     Returns:
         Dict containing code_availability_result and workflow execution status
     """
     return await _workflow_instance.execute_workflow(
-        paper_id, force_reprocess, openai_api_key, model
+        paper_id, force_reprocess, openai_api_key, model, priority
     )
@@ -27,7 +27,6 @@ Properly integrated with the workflow_engine models for:
 - Parallel execution and synchronization
 """
 
-import os
 import logging
 import asyncio
 
@@ -36,9 +35,11 @@ from typing import Optional, Dict, Any, List
 from django.utils import timezone
 
 from langgraph.graph import StateGraph, END
-from openai import OpenAI
 
+from workflow_engine.models import WorkflowRun
 from workflow_engine.services.async_orchestrator import async_ops
+from webApp.services.worker_runtime import ensure_workflow_definition, openai_client
+from webApp.services.rate_limiter import rate_limited_client, scoped_node
 
 from webApp.services.nodes.paper_type_classification import (
     paper_type_classification_node,
@@ -65,7 +66,8 @@ from ..pydantic_schemas import (
 from ..graphs_state import PaperProcessingState
 from .base_workflow_graph import (
     BaseWorkflowGraph,
-    _workflow_semaphore,
+    acquire_workflow_slot,
+    release_workflow_slot,
     get_active_workflow_count,
     _register_workflow,
     _unregister_workflow,
@@ -141,17 +143,19 @@ class PaperProcessingWorkflow(BaseWorkflowGraph):
 
         workflow = StateGraph(PaperProcessingState)
 
-        # Add all nodes
-        workflow.add_node("paper_type_classification", paper_type_classification_node)
-        workflow.add_node("section_embeddings", section_embeddings_node)
-        workflow.add_node(
-            "dataset_documentation_check", dataset_documentation_check_node
-        )
-        workflow.add_node("reproducibility_checklist", reproducibility_checklist_node)
-        workflow.add_node("code_availability_check", code_availability_check_node)
-        workflow.add_node("code_embedding", code_embedding_node)
-        workflow.add_node("code_repository_analysis", code_repository_analysis_node)
-        workflow.add_node("final_aggregation", final_aggregation_node)
+        # Add all nodes (scoped so rate-limiter waits are attributed per node)
+        nodes = {
+            "paper_type_classification": paper_type_classification_node,
+            "section_embeddings": section_embeddings_node,
+            "dataset_documentation_check": dataset_documentation_check_node,
+            "reproducibility_checklist": reproducibility_checklist_node,
+            "code_availability_check": code_availability_check_node,
+            "code_embedding": code_embedding_node,
+            "code_repository_analysis": code_repository_analysis_node,
+            "final_aggregation": final_aggregation_node,
+        }
+        for node_id, node_fn in nodes.items():
+            workflow.add_node(node_id, scoped_node(node_id, node_fn))
 
         # Define routing function after section embeddings
         def route_after_embeddings(state: PaperProcessingState) -> List[str]:
@@ -612,6 +616,7 @@ class PaperProcessingWorkflow(BaseWorkflowGraph):
         openai_api_key: Optional[str] = None,
         model: str = "gpt-5",
         user_id: Optional[int] = None,
+        priority: int = WorkflowRun.PRIORITY_NORMAL,
     ) -> Dict[str, Any]:
         """
         Execute the complete paper processing workflow using workflow_engine.
@@ -622,23 +627,26 @@ class PaperProcessingWorkflow(BaseWorkflowGraph):
             openai_api_key: OpenAI API key (uses env var if not provided)
             model: OpenAI model to use
             user_id: Optional user ID for tracking
+            priority: Scheduling priority (WorkflowRun.PRIORITY_*)
 
         Returns:
             Dictionary with workflow results and statistics
         """
         logger.info(f"Starting paper processing workflow for paper ID {paper_id}")
 
-        # Acquire semaphore (blocks until available - no timeout when running in Celery)
-        # This ensures worker-level concurrency control
-        _workflow_semaphore.acquire()
+        # Wait for a cluster-wide slot (no timeout when running in Celery)
+        # This ensures concurrency control across all worker processes
+        lease = await acquire_workflow_slot(
+            paper_id, model=model, user_id=user_id, priority=priority
+        )
         active_count = await get_active_workflow_count()
         logger.info(
-            f"Acquired workflow slot for paper {paper_id}. Active: {active_count + 1}/{MAX_CONCURRENT_WORKFLOWS}"
+            f"Acquired workflow slot for paper {paper_id}. Active: {active_count}/{MAX_CONCURRENT_WORKFLOWS}"
         )
 
         try:
             # Get or create workflow definition
-            workflow_def = await async_ops.get_or_create_workflow_definition(
+            workflow_def = await ensure_workflow_definition(
                 name="paper_processing_with_reproducibility",
                 version=8,  # Version 8 - removed LangGraph conditional routing to final_aggregation, linear chain with progressive skipping
                 description="Eight-node workflow: paper type → section embeddings → parallel branches (reproducibility checklist, code availability→embeddings→analysis, dataset documentation) → all converge at final aggregation. Progressive skipping marks nodes as skipped when branches are inapplicable.",
@@ -779,6 +787,7 @@ class PaperProcessingWorkflow(BaseWorkflowGraph):
                 workflow_name=self.WORKFLOW_NAME,
                 paper_id=paper_id,
                 input_data=config,
+                priority=priority,
             )
 
             # Update workflow run status to running
@@ -787,11 +796,10 @@ class PaperProcessingWorkflow(BaseWorkflowGraph):
             )
 
             # Register this workflow as active
-            await _register_workflow(paper_id, str(workflow_run.id))
+            await _register_workflow(paper_id, str(workflow_run.id), lease)
 
             # Initialize OpenAI client
-            api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
-            client = OpenAI(api_key=api_key)
+            client = rate_limited_client(openai_client(openai_api_key))
 
             # Initialize state
             initial_state: PaperProcessingState = {
@@ -809,8 +817,8 @@ class PaperProcessingWorkflow(BaseWorkflowGraph):
                 "errors": [],
             }
 
-            # Build and run workflow
-            workflow = self.build_workflow()
+            # Run the workflow (compiled once per worker process)
+            workflow = self.compiled_workflow()
 
             final_state = await workflow.ainvoke(initial_state)
 
@@ -926,9 +934,9 @@ class PaperProcessingWorkflow(BaseWorkflowGraph):
                 "total_output_tokens": 0,
             }
         finally:
-            # Always unregister workflow and release semaphore
+            # Always unregister workflow and release the lease
             await _unregister_workflow(paper_id)
-            _workflow_semaphore.release()
+            await release_workflow_slot(lease)
             active_count = await get_active_workflow_count()
             logger.info(
                 f"Released workflow slot for paper {paper_id}. Active: {active_count}/{MAX_CONCURRENT_WORKFLOWS}"
@@ -948,6 +956,7 @@ async def execute_workflow(
     force_reprocess: bool = False,
     openai_api_key: Optional[str] = None,
     model: str = "gpt-5",
+    priority: int = WorkflowRun.PRIORITY_NORMAL,
 ) -> Dict[str, Any]:
     """
     Execute the complete paper processing workflow.
@@ -956,7 +965,7 @@ async def execute_workflow(
     Note: This matches the naming convention in process_code_availability.py
     """
     return await _workflow_instance.execute_workflow(
-        paper_id, force_reprocess, openai_api_key, model
+        paper_id, force_reprocess, openai_api_key, model, priority=priority
     )
 
 
@@ -966,6 +975,7 @@ async def process_paper_workflow(
     openai_api_key: Optional[str] = None,
     model: str = "gpt-5",
     user_id: Optional[int] = None,
+    priority: int = WorkflowRun.PRIORITY_NORMAL,
 ) -> Dict[str, Any]:
     """
     Execute the complete paper processing workflow.
@@ -974,7 +984,7 @@ async def process_paper_workflow(
     Kept for backward compatibility.
     """
     return await _workflow_instance.execute_workflow(
-        paper_id, force_reprocess, openai_api_key, model, user_id
+        paper_id, force_reprocess, openai_api_key, model, user_id, priority
     )
 
 
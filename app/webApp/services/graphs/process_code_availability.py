@@ -12,7 +12,6 @@ Properly integrated with the workflow_engine models for:
 - Progress monitoring
 """
 
-import os
 import logging
 
 from typing import Optional, Dict, Any
@@ -20,9 +19,10 @@ from typing import Optional, Dict, Any
 from django.utils import timezone
 
 from langgraph.graph import StateGraph, END
-from openai import OpenAI
 
+from workflow_engine.models import WorkflowRun
 from workflow_engine.services.async_orchestrator import async_ops
+from webApp.services.worker_runtime import ensure_workflow_definition, openai_client
 
 from webApp.services.nodes.paper_type_classification import (
     paper_type_classification_node,
@@ -148,6 +148,7 @@ class CodeAvailabilityWorkflow(BaseWorkflowGraph):
         force_reprocess: bool = False,
         openai_api_key: Optional[str] = None,
         model: str = "gpt-5",
+        priority: int = WorkflowRun.PRIORITY_NORMAL,
     ) -> Dict[str, Any]:
         """
         Execute the code availability workflow for a paper.
@@ -157,6 +158,7 @@ class CodeAvailabilityWorkflow(BaseWorkflowGraph):
             force_reprocess: If True, bypass cache and reprocess all nodes
             openai_api_key: OpenAI API key (uses env var if not provided)
             model: OpenAI model to use (default: gpt-5)
+            priority: Scheduling priority (WorkflowRun.PRIORITY_*)
 
         Returns:
             Dictionary with workflow results including:
@@ -173,7 +175,7 @@ class CodeAvailabilityWorkflow(BaseWorkflowGraph):
 
         try:
             # Ensure workflow definition exists
-            await async_ops.get_or_create_workflow_definition(
+            await ensure_workflow_definition(
                 name=self.WORKFLOW_NAME,
                 version=self.WORKFLOW_VERSION,
                 description="Two-node workflow: paper type classification and code availability check",
@@ -218,6 +220,7 @@ class CodeAvailabilityWorkflow(BaseWorkflowGraph):
                 workflow_name=self.WORKFLOW_NAME,
                 paper_id=paper_id,
                 input_data=config,
+                priority=priority,
             )
 
             # Update workflow run status to running
@@ -226,8 +229,7 @@ class CodeAvailabilityWorkflow(BaseWorkflowGraph):
             )
 
             # Initialize OpenAI client
-            api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
-            client = OpenAI(api_key=api_key)
+            client = openai_client(openai_api_key)
 
             # Initialize state
             initial_state: PaperProcessingState = {
@@ -243,8 +245,8 @@ class CodeAvailabilityWorkflow(BaseWorkflowGraph):
                 "errors": [],
             }
 
-            # Build and run workflow
-            workflow = self.build_workflow()
+            # Run the workflow (compiled once per worker process)
+            workflow = self.compiled_workflow()
 
             final_state = await workflow.ainvoke(initial_state)
 
@@ -345,6 +347,7 @@ async def execute_workflow(
     force_reprocess: bool = False,
     openai_api_key: Optional[str] = None,
     model: str = "gpt-5",
+    priority: int = WorkflowRun.PRIORITY_NORMAL,
 ) -> Dict[str, Any]:
     """
     Execute the code availability workflow for a paper.
@@ -352,7 +355,7 @@ async def execute_workflow(
     Convenience function that uses the singleton workflow instance.
     """
     return await _workflow_instance.execute_workflow(
-        paper_id, force_reprocess, openai_api_key, model
+        paper_id, force_reprocess, openai_api_key, model, priority
     )
 
 
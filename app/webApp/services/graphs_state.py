@@ -37,5 +37,6 @@ class PaperProcessingState(TypedDict):
     dataset_documentation_result: Optional[DatasetDocumentationCheck]  # Dataset docs evaluation
     reproducibility_checklist_result: Optional[ReproducibilityChecklist]  # MICCAI checklist
     code_availability_result: Optional[CodeAvailabilityCheck]
+    repository_revision: Optional[str]  # HEAD of the found repository, resolved once per run
     code_embedding_result: Optional[CodeEmbeddingResult]  # Node F: Code file embeddings
     code_reproducibility_result: Optional[CodeReproducibilityAnalysis]  # Node C: Code analysis
@@ -0,0 +1,238 @@
+"""
+Workflow node details for the node inspector.
+
+Node details used to be one response with every log line, the full
+input/output data and every inline artifact. Here they are split so a click
+only loads what is shown:
+
+- node_detail(): selected node fields (heavy JSON fields only on request)
+- node_logs(): log lines after a cursor, walking the (node, timestamp) index
+- node_artifacts() / node_artifact(): artifact metadata, and one artifact's
+  data on demand
+
+Everything is read with values() so no model instances are built.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from workflow_engine.models import NodeArtifact, NodeLog, WorkflowNode
+
+# Returned when no fields are requested
+SUMMARY_FIELDS = (
+    "id",
+    "node_id",
+    "node_type",
+    "handler",
+    "status",
+    "attempt_count",
+    "max_retries",
+    "error_message",
+    "celery_task_id",
+    "started_at",
+    "completed_at",
+    "duration",
+    "rate_limit_wait_seconds",
+    "spans",
+    "input_tokens",
+    "output_tokens",
+    "total_tokens",
+    "cached_input_tokens",
+    "was_cached",
+)
+
+# Potentially large fields, only returned when asked for by name
+HEAVY_FIELDS = ("input_data", "output_data", "error_traceback")
+
+ARTIFACT_METADATA_FIELDS = (
+    "id",
+    "name",
+    "artifact_type",
+    "file_path",
+    "url",
+    "mime_type",
+    "size_bytes",
+    "metadata",
+    "created_at",
+)
+
+DEFAULT_LOG_LIMIT = 200
+MAX_LOG_LIMIT = 1000
+
+# Bytes per chunk of a streamed JSON response
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+# ============================================================================
+# Node fields
+# ============================================================================
+
+
+def parse_fields(value: Optional[str]) -> Tuple[str, ...]:
+    """
+    Fields requested with ``?fields=a,b`` (summary fields if none).
+
+    Raises:
+        ValueError: For unknown field names
+    """
+    if not value:
+        return SUMMARY_FIELDS
+    fields = tuple(dict.fromkeys(f.strip() for f in value.split(",") if f.strip()))
+    unknown = set(fields) - set(SUMMARY_FIELDS) - set(HEAVY_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    return fields
+
+
+def node_detail(node_id, fields: Sequence[str] = SUMMARY_FIELDS) -> Optional[Dict[str, Any]]:
+    """
+    Selected fields of a node, or None if it does not exist.
+
+    ``duration`` (seconds from start to completion) is derived from the
+    timestamps.
+    """
+    columns = [field for field in fields if field != "duration"]
+    helpers = []
+    if "duration" in fields:
+        helpers = [f for f in ("started_at", "completed_at") if f not in columns]
+
+    row = (
+        WorkflowNode.objects.filter(id=node_id)
+        .values(*dict.fromkeys(["id", *columns, *helpers]))
+        .first()
+    )
+    if row is None:
+        return None
+
+    if "duration" in fields:
+        started, completed = row["started_at"], row["completed_at"]
+        row["duration"] = (
+            (completed - started).total_seconds() if started and completed else None
+        )
+        for field in helpers:
+            row.pop(field)
+    return row
+
+
+# ============================================================================
+# Logs
+# ============================================================================
+
+
+def encode_log_cursor(timestamp, log_id) -> str:
+    return f"{timestamp.isoformat()}_{log_id}"
+
+
+def decode_log_cursor(cursor: str):
+    """
+    Raises:
+        ValueError: For malformed cursors
+    """
+    timestamp, _, log_id = cursor.rpartition("_")
+    parsed = parse_datetime(timestamp)
+    if parsed is None or not log_id:
+        raise ValueError("Invalid log cursor")
+    return parsed, log_id
+
+
+def node_logs(
+    node_id, after: Optional[str] = None, limit: int = DEFAULT_LOG_LIMIT
+) -> Dict[str, Any]:
+    """
+    One page of a node's logs, oldest first.
+
+    Args:
+        node_id: WorkflowNode primary key
+        after: Cursor returned by a previous page (start from the beginning if None)
+        limit: Maximum number of log lines (capped at MAX_LOG_LIMIT)
+
+    Returns:
+        {"logs": [...], "next_cursor": str or None, "has_more": bool}. While a
+        node runs, polling with next_cursor returns only new lines.
+
+    Raises:
+        ValueError: For malformed cursors
+    """
+    limit = max(1, min(limit, MAX_LOG_LIMIT))
+    query = NodeLog.objects.filter(node_id=node_id)
+    if after:
+        timestamp, log_id = decode_log_cursor(after)
+        query = query.filter(
+            Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=log_id)
+        )
+
+    rows = list(
+        query.order_by("timestamp", "id").values(
+            "id", "level", "message", "context", "timestamp"
+        )[: limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = after
+    if rows:
+        next_cursor = encode_log_cursor(rows[-1]["timestamp"], rows[-1]["id"])
+    return {"logs": rows, "next_cursor": next_cursor, "has_more": has_more}
+
+
+# ============================================================================
+# Artifacts
+# ============================================================================
+
+
+def node_artifacts(node_id) -> List[Dict[str, Any]]:
+    """Metadata of a node's artifacts, without inline data."""
+    return list(
+        NodeArtifact.objects.filter(node_id=node_id)
+        .order_by("created_at")
+        .values(*ARTIFACT_METADATA_FIELDS)
+    )
+
+
+def node_artifact(node_id, name: str) -> Optional[Dict[str, Any]]:
+    """
+    One artifact of a node with its data, or None if it does not exist.
+
+    Inline artifacts carry their JSON in ``data``.
+    """
+    row = (
+        NodeArtifact.objects.filter(node_id=node_id, name=name)
+        .order_by("-created_at")
+        .values(*ARTIFACT_METADATA_FIELDS, "inline_data", "node__node_id")
+        .first()
+    )
+    if row is None:
+        return None
+
+    data = row.pop("inline_data")
+    node_key = row.pop("node__node_id")
+
+    # Code embeddings are stored in their own table and not needed for display
+    if node_key == "code_embedding" and name == "result" and isinstance(data, dict):
+        if "embedded_files" in data:
+            data = {**data, "embedded_files": []}
+
+    row["data"] = data
+    return row
+
+
+# ============================================================================
+# Streaming
+# ============================================================================
+
+
+def iter_json(data: Any, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Encode JSON incrementally in chunks of about ``chunk_size`` bytes."""
+    buffer: List[str] = []
+    size = 0
+    for piece in DjangoJSONEncoder().iterencode(data):
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
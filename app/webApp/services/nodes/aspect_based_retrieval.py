@@ -5,8 +5,13 @@ Provides functions to:
 1. Initialize/get aspect embeddings
 2. Retrieve relevant sections and code based on similarity to aspects
 3. Perform aspect-focused LLM analysis
+
+retrieve_aspect_contexts() retrieves for all aspects at once: the paper's
+section and code embeddings are loaded once and scored against every aspect
+in one matrix product.
 """
 
+import copy
 import logging
 import numpy as np
 from typing import List, Dict, Tuple, Any, Optional
@@ -19,6 +24,9 @@ from webApp.models import (
     PaperSectionEmbedding,
     CodeFileEmbedding,
 )
+from webApp.services.context_packing import PackItem, PackingResult, pack_context
+from webApp.services.rate_limiter import acall
+from webApp.services.token_counter import count_tokens, stored_token_count
 from .reproducibility_aspects import get_aspect, get_aspect_ids, REPRODUCIBILITY_ASPECTS
 from .shared_helpers import retrieve_sections_by_embedding
 
@@ -33,13 +41,14 @@ ASPECT_RETRIEVAL_CONFIG = {
     "code_budget_ratio": 0.6,  # 60% of budget for code (12K tokens)
 }
 
+# Aspect analyses of one repository that may call the LLM at the same time
+# (the rate limiter still bounds overall TPM/RPM)
+MAX_CONCURRENT_ASPECTS = 6
+
 
 def estimate_tokens(text: str) -> int:
-    """
-    Estimate token count from text length.
-    Rough approximation: 1 token ≈ 4 characters.
-    """
-    return len(text) // 4
+    """Token count of text (see webApp.services.token_counter)."""
+    return count_tokens(text)
 
 
 async def get_or_create_aspect_embedding(
@@ -75,7 +84,7 @@ async def get_or_create_aspect_embedding(
     logger.info(f"Creating new embedding for aspect: {aspect_id}")
 
     # Generate embedding
-    response = client.embeddings.create(model=model, input=context_text)
+    response = await acall(client.embeddings.create, model=model, input=context_text)
 
     embedding_vector = response.data[0].embedding
     dimension = len(embedding_vector)
@@ -95,6 +104,241 @@ async def get_or_create_aspect_embedding(
     return aspect_emb
 
 
+def _aspect_context_text(aspect_id: str) -> str:
+    aspect_def = get_aspect(aspect_id)
+    return f"{aspect_def.aspect_name}\n\n{aspect_def.aspect_description}\n\nAnalysis Focus:\n{aspect_def.analysis_prompt_template[:500]}"
+
+
+async def get_or_create_aspect_embeddings(
+    aspect_ids: List[str], client: OpenAI, model: str = "text-embedding-3-small"
+) -> Dict[str, ReproducibilityAspectEmbedding]:
+    """
+    Get the embeddings of several aspects, creating missing ones in one API call.
+
+    Args:
+        aspect_ids: IDs of the aspects
+        client: OpenAI client
+        model: Embedding model to use
+
+    Returns:
+        Dict mapping aspect_id to ReproducibilityAspectEmbedding
+    """
+    existing = await sync_to_async(
+        lambda: {
+            emb.aspect_id: emb
+            for emb in ReproducibilityAspectEmbedding.objects.filter(
+                aspect_id__in=aspect_ids, embedding_model=model
+            )
+        }
+    )()
+
+    missing = [aspect_id for aspect_id in aspect_ids if aspect_id not in existing]
+    if missing:
+        logger.info(f"Creating new embeddings for aspects: {', '.join(missing)}")
+        context_texts = [_aspect_context_text(aspect_id) for aspect_id in missing]
+        response = await acall(
+            client.embeddings.create, model=model, input=context_texts
+        )
+
+        for aspect_id, context_text, item in zip(missing, context_texts, response.data):
+            aspect_def = get_aspect(aspect_id)
+            existing[aspect_id] = await sync_to_async(
+                ReproducibilityAspectEmbedding.objects.create
+            )(
+                aspect_id=aspect_id,
+                aspect_name=aspect_def.aspect_name,
+                aspect_description=aspect_def.aspect_description,
+                aspect_context=context_text,
+                embedding=item.embedding,
+                embedding_model=model,
+                embedding_dimension=len(item.embedding),
+            )
+
+    return {aspect_id: existing[aspect_id] for aspect_id in aspect_ids}
+
+
+def cosine_similarity_matrix(queries: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+    """
+    Cosine similarities of every query to every candidate.
+
+    Args:
+        queries: (n_queries, dim) array
+        candidates: (n_candidates, dim) array
+
+    Returns:
+        (n_queries, n_candidates) array; zero-norm vectors have similarity 0
+    """
+    query_norms = np.linalg.norm(queries, axis=1, keepdims=True)
+    candidate_norms = np.linalg.norm(candidates, axis=1, keepdims=True)
+    queries = np.divide(queries, query_norms, out=np.zeros_like(queries), where=query_norms > 0)
+    candidates = np.divide(
+        candidates, candidate_norms, out=np.zeros_like(candidates), where=candidate_norms > 0
+    )
+    return queries @ candidates.T
+
+
+def _with_text(row: Any, field: str, text: str) -> Any:
+    """Unsaved copy of an embedding row with truncated text."""
+    row = copy.copy(row)
+    setattr(row, field, text)
+    return row
+
+
+def _section_item(section: PaperSectionEmbedding, similarity: float) -> PackItem:
+    return PackItem(
+        key=section.section_type,
+        text=section.section_text,
+        tokens=stored_token_count(section, section.section_text),
+        relevance=similarity,
+        embedding=section.embedding,
+        payload=section,
+    )
+
+
+def _code_item(code_file: CodeFileEmbedding, similarity: float) -> PackItem:
+    return PackItem(
+        key=f"{code_file.file_path}#{code_file.chunk_index}",
+        text=code_file.file_content,
+        tokens=stored_token_count(code_file, code_file.file_content),
+        relevance=similarity,
+        embedding=code_file.embedding,
+        payload=code_file,
+    )
+
+
+def _packed_rows(packing: PackingResult, field: str) -> List[Tuple[Any, float]]:
+    """(row, similarity) pairs of a packing, most similar first."""
+    return [
+        (
+            _with_text(packed.item.payload, field, packed.text)
+            if packed.truncated
+            else packed.item.payload,
+            packed.item.relevance,
+        )
+        for packed in packing.packed
+    ]
+
+
+def _select_within_budget(
+    items: List[Any],
+    similarities: np.ndarray,
+    make_item,
+    field: str,
+    min_similarity: float,
+    token_budget: int,
+) -> Tuple[List[Tuple[Any, float]], PackingResult]:
+    """Pack the items above the similarity threshold into the token budget."""
+    candidates = [
+        make_item(items[index], float(similarities[index]))
+        for index in np.argsort(-similarities, kind="stable")
+        if similarities[index] >= min_similarity
+    ]
+    packing = pack_context(candidates, token_budget)
+    return _packed_rows(packing, field), packing
+
+
+def _embedding_matrix(rows: List[Any], dimension: int) -> Tuple[List[Any], np.ndarray]:
+    """Rows whose embedding has the given dimension, and their (n, dim) matrix."""
+    rows = [row for row in rows if isinstance(row.embedding, list) and len(row.embedding) == dimension]
+    if not rows:
+        return [], np.zeros((0, dimension))
+    return rows, np.array([row.embedding for row in rows], dtype=np.float64)
+
+
+async def retrieve_aspect_contexts(
+    paper_id: int,
+    code_url: str,
+    aspect_embeddings: Dict[str, ReproducibilityAspectEmbedding],
+    section_budget: int,
+    code_budget: int,
+    min_similarity: float = None,
+) -> Dict[str, Tuple[List[Tuple[PaperSectionEmbedding, float]], List[Tuple[CodeFileEmbedding, float]]]]:
+    """
+    Retrieve relevant sections and code for several aspects in one pass.
+
+    Selection per aspect matches retrieve_relevant_sections() and
+    retrieve_relevant_code(): candidates above the similarity threshold are
+    packed into the token budget with pack_context().
+
+    Args:
+        paper_id: Paper ID
+        code_url: Repository URL
+        aspect_embeddings: Dict mapping aspect_id to its embedding
+        section_budget: Maximum section tokens per aspect
+        code_budget: Maximum code tokens per aspect
+        min_similarity: Minimum similarity threshold (uses config default if None)
+
+    Returns:
+        Dict mapping aspect_id to (sections, code_files), each a list of
+        (embedding row, similarity) tuples sorted by similarity (descending)
+    """
+    if min_similarity is None:
+        min_similarity = ASPECT_RETRIEVAL_CONFIG["min_similarity_threshold"]
+
+    aspect_ids = list(aspect_embeddings)
+    contexts = {aspect_id: ([], []) for aspect_id in aspect_ids}
+    if not aspect_ids:
+        return contexts
+
+    embedding_models = {emb.embedding_model for emb in aspect_embeddings.values()}
+    sections, code_files = await sync_to_async(
+        lambda: (
+            list(
+                PaperSectionEmbedding.objects.filter(paper_id=paper_id)
+                .exclude(section_text__isnull=True)
+                .exclude(section_text="")
+            ),
+            list(
+                CodeFileEmbedding.objects.filter(
+                    paper_id=paper_id,
+                    code_url=code_url,
+                    embedding_model__in=embedding_models,
+                )
+            ),
+        )
+    )()
+
+    dimension = len(aspect_embeddings[aspect_ids[0]].embedding)
+    queries = np.array([aspect_embeddings[a].embedding for a in aspect_ids], dtype=np.float64)
+
+    sections, section_matrix = _embedding_matrix(sections, dimension)
+    code_files, code_matrix = _embedding_matrix(code_files, dimension)
+    section_similarities = cosine_similarity_matrix(queries, section_matrix)
+    code_similarities = cosine_similarity_matrix(queries, code_matrix)
+
+    code_models = np.array([c.embedding_model for c in code_files], dtype=object)
+
+    for row, aspect_id in enumerate(aspect_ids):
+        # Code embeddings are only comparable within the aspect's embedding model
+        code_row = np.where(
+            code_models == aspect_embeddings[aspect_id].embedding_model,
+            code_similarities[row],
+            -np.inf,
+        )
+        selected_sections, section_packing = _select_within_budget(
+            sections,
+            section_similarities[row],
+            _section_item,
+            "section_text",
+            min_similarity,
+            section_budget,
+        )
+        selected_code, code_packing = _select_within_budget(
+            code_files, code_row, _code_item, "file_content", min_similarity, code_budget
+        )
+        contexts[aspect_id] = (selected_sections, selected_code)
+        logger.info(
+            f"Aspect {aspect_id}: sections {section_packing.report.summary()}; "
+            f"code {code_packing.report.summary()}"
+        )
+
+    logger.info(
+        f"Retrieved context for {len(aspect_ids)} aspects from {len(sections)} sections "
+        f"and {len(code_files)} code files of paper {paper_id}"
+    )
+    return contexts
+
+
 async def retrieve_relevant_sections(
     paper_id: int,
     aspect_embedding: ReproducibilityAspectEmbedding,
@@ -144,8 +388,14 @@ async def retrieve_relevant_sections(
             f"min={min_sim:.3f}, max={max_sim:.3f}, avg={avg_sim:.3f}"
         )
 
-    # Convert to expected format (section, similarity)
-    section_similarities = [(section, similarity) for section, similarity, _ in results]
+    # Convert to expected format (section, similarity), keeping truncated text
+    section_similarities = [
+        (
+            section if text == section.section_text else _with_text(section, "section_text", text),
+            similarity,
+        )
+        for section, similarity, text in results
+    ]
 
     logger.info(
         f"Retrieved {len(section_similarities)} sections for aspect {aspect_embedding.aspect_id} "
@@ -232,19 +482,16 @@ async def retrieve_relevant_code(
         top_similarity = code_similarities[0][1] if code_similarities else 0
         logger.debug(f"Top code similarity: {top_similarity:.3f}")
 
-    # Fill until token budget exhausted
-    selected_code = []
-    tokens_used = 0
-
-    for code_file, similarity in code_similarities:
-        code_tokens = estimate_tokens(code_file.file_content)
-
-        if tokens_used + code_tokens <= token_budget:
-            selected_code.append((code_file, similarity))
-            tokens_used += code_tokens
-        else:
-            # Budget exhausted
-            break
+    # Pack the most relevant, least redundant files into the budget
+    packing = pack_context(
+        [_code_item(code_file, similarity) for code_file, similarity in code_similarities],
+        token_budget,
+    )
+    selected_code = _packed_rows(packing, "file_content")
+    tokens_used = packing.report.tokens_used
+    logger.info(
+        f"Packed code for aspect {aspect_embedding.aspect_id}: {packing.report.summary()}"
+    )
 
     if selected_code:
         avg_similarity = np.mean([s[1] for s in selected_code])
@@ -275,10 +522,14 @@ async def analyze_aspect(
     max_context_tokens: int = None,
     section_budget_ratio: float = None,
     code_budget_ratio: float = None,
+    context: Optional[Tuple[List, List]] = None,
 ) -> Dict[str, Any]:
     """
     Perform focused analysis for a single aspect using retrieved sections/code.
 
+    The LLM call runs in a worker thread, so several aspects can be analyzed
+    concurrently on one event loop.
+
     Args:
         aspect_id: ID of aspect to analyze
         paper_id: Paper ID
@@ -289,6 +540,8 @@ async def analyze_aspect(
         max_context_tokens: Maximum total tokens (uses config default if None)
         section_budget_ratio: Ratio of budget for sections (uses config default if None)
         code_budget_ratio: Ratio of budget for code (uses config default if None)
+        context: (sections, code_files) already retrieved with
+            retrieve_aspect_contexts(); retrieved here if None
 
     Returns:
         Dict with aspect analysis results and token usage
@@ -318,13 +571,19 @@ async def analyze_aspect(
     # Get aspect definition
     aspect_def = get_aspect(aspect_id)
 
-    # Get or create aspect embedding
-    aspect_emb = await get_or_create_aspect_embedding(aspect_id, client)
+    if context is None:
+        # Get or create aspect embedding
+        aspect_emb = await get_or_create_aspect_embedding(aspect_id, client)
 
-    # Retrieve relevant sections with token budget
-    relevant_sections = await retrieve_relevant_sections(
-        paper_id, aspect_emb, token_budget=section_budget
-    )
+        # Retrieve relevant sections and code with token budgets
+        relevant_sections = await retrieve_relevant_sections(
+            paper_id, aspect_emb, token_budget=section_budget
+        )
+        relevant_code = await retrieve_relevant_code(
+            paper_id, code_url, aspect_emb, token_budget=code_budget
+        )
+    else:
+        relevant_sections, relevant_code = context
 
     logger.info(f"Aspect {aspect_id}: Retrieved {len(relevant_sections)} sections")
     if node:
@@ -353,11 +612,6 @@ async def analyze_aspect(
                 node, "WARNING", "No sections retrieved - analysis may be incomplete"
             )
 
-    # Retrieve relevant code with token budget
-    relevant_code = await retrieve_relevant_code(
-        paper_id, code_url, aspect_emb, token_budget=code_budget
-    )
-
     logger.info(f"Aspect {aspect_id}: Retrieved {len(relevant_code)} code files")
     if node:
         await async_ops.create_node_log(
@@ -463,7 +717,8 @@ async def analyze_aspect(
         )
 
     # Call OpenAI API
-    response = client.chat.completions.create(
+    response = await acall(
+        client.chat.completions.create,
         model=model,
         messages=[
             {
@@ -10,6 +10,12 @@ from pydantic import BaseModel, Field
 
 from webApp.models import Paper
 from workflow_engine.services.async_orchestrator import async_ops
+from workflow_engine.services.llm_batches import BatchPending, raise_if_pending
+from webApp.services.nodes.fingerprints import (
+    availability_revision,
+    node_fingerprint,
+    reuse_previous_result,
+)
 from .shared_helpers import ingest_with_steroids
 
 from webApp.services.pydantic_schemas import (
@@ -17,6 +23,8 @@ from webApp.services.pydantic_schemas import (
     CodeAvailabilityCheck,
 )
 from webApp.services.graphs_state import PaperProcessingState
+from webApp.services.rate_limiter import acall
+from webApp.services.token_counter import count_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -48,74 +56,18 @@ async def code_availability_check_node(
     await async_ops.create_node_log(node, "INFO", "Starting code availability check")
 
     try:
-        # Check for previous analysis
+        # Reuse the latest result computed from the same inputs
         force_reprocess = state.get("force_reprocess", False)
+        fingerprint = await node_fingerprint(node_id, state)
+        await async_ops.set_node_input_fingerprint(node, fingerprint)
         if not force_reprocess:
-            previous = await async_ops.check_previous_analysis(
-                state["paper_id"], node_id
-            )
-            if previous:
-                logger.info(f"Found previous check from {previous['completed_at']}")
-                await async_ops.create_node_log(
-                    node, "INFO", f"Using cached result from run {previous['run_id']}"
-                )
-
-                result = CodeAvailabilityCheck(**previous["result"])
-
-                # Copy tokens from previous execution
-                previous_node = await async_ops.get_most_recent_completed_node(
-                    paper_id=state["paper_id"],
-                    node_id=node_id,
-                    exclude_run_id=state["workflow_run_id"],
-                )
-
-                if previous_node:
-                    await async_ops.update_node_tokens(
-                        node,
-                        input_tokens=previous_node.input_tokens,
-                        output_tokens=previous_node.output_tokens,
-                        was_cached=True,
-                    )
-                    logger.info(
-                        f"Copied tokens from previous execution: {previous_node.total_tokens} total"
-                    )
-
-                    # Copy all artifacts from previous node to current node
-                    # This ensures the frontend can display the full results even when using cache
-                    previous_artifacts = await async_ops.get_node_artifacts(
-                        previous_node
-                    )
-                    for artifact in previous_artifacts:
-                        await async_ops.create_node_artifact(
-                            node,
-                            name=artifact.name,
-                            data=(
-                                artifact.inline_data
-                                if artifact.artifact_type == "inline"
-                                else {
-                                    "type": artifact.artifact_type,
-                                    "file_path": artifact.file_path,
-                                    "url": artifact.url,
-                                    "mime_type": artifact.mime_type,
-                                    "size_bytes": artifact.size_bytes,
-                                    "metadata": artifact.metadata,
-                                }
-                            ),
-                            artifact_type=artifact.artifact_type,
-                            mime_type=artifact.mime_type,
-                            size_bytes=artifact.size_bytes,
-                            metadata=artifact.metadata,
-                        )
-
-                    logger.info(
-                        f"Copied {len(previous_artifacts)} artifact(s) from previous node"
-                    )
-
-                await async_ops.update_node_status(
-                    node, "completed", completed_at=timezone.now()
-                )
-
-                return {"code_availability_result": result}
+            previous = await reuse_previous_result(node, state, fingerprint)
+            if previous is not None:
+                result = CodeAvailabilityCheck(**previous)
+                return {
+                    "code_availability_result": result,
+                    "repository_revision": await availability_revision(result),
+                }
 
         # Get paper from database
         paper = await async_ops.get_paper(state["paper_id"])
@@ -215,7 +167,8 @@ Indicators that it is NOT the official repo:
 
 Respond with your assessment."""
 
-                            response = client.responses.parse(
+                            response = await acall(
+                                client.responses.parse,
                                 model=model,
                                 input=[
                                     {"role": "user", "content": verification_prompt}
@@ -435,12 +388,12 @@ Respond with your assessment."""
                                 str(clone_path) if clone_path else None
                             )
                             logger.info(
-                                f"Repository verified: contains {len(content)//4} tokens of code"
+                                f"Repository verified: contains {count_tokens(content)} tokens of code"
                             )
                             await async_ops.create_node_log(
                                 node,
                                 "INFO",
-                                f"Repository verified: contains code ({len(content)//4} tokens).",
+                                f"Repository verified: contains code ({count_tokens(content)} tokens).",
                             )
 
                             if code_url != paper.code_url:
@@ -515,6 +468,9 @@ Respond with your assessment."""
                 or "No code repository found in paper, text, or online",
             )
 
+        # Suspend rather than record a result while the search waits for a batch job
+        raise_if_pending(client)
+
         # Store result as artifact
         await async_ops.create_node_artifact(node, "result", result)
 
@@ -570,8 +526,13 @@ Respond with your assessment."""
                     )
                     logger.info(f"Marked {node_id} as skipped (no code available)")
 
-        return {"code_availability_result": result}
+        return {
+            "code_availability_result": result,
+            "repository_revision": await availability_revision(result),
+        }
 
+    except BatchPending:
+        raise
     except Exception as e:
         logger.error(f"Error in code availability check: {e}", exc_info=True)
 
@@ -637,7 +598,8 @@ Provide:
 4. Notes about the search process"""
 
     try:
-        response = client.responses.parse(
+        response = await acall(
+            client.responses.parse,
             model=model,
             input=[
                 {
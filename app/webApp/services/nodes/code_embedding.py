@@ -23,6 +23,9 @@ from django.utils import timezone
 from asgiref.sync import sync_to_async
 
 from workflow_engine.services.async_orchestrator import async_ops
+from workflow_engine.services.llm_batches import BatchPending
+from workflow_engine.services.checkpoints import NodeCheckpoints
+from webApp.services.nodes.fingerprints import node_fingerprint, reuse_previous_result
 from .shared_helpers import ingest_with_steroids
 from webApp.services.pydantic_schemas import (
     CodeAvailabilityCheck,
@@ -31,9 +34,17 @@ from webApp.services.pydantic_schemas import (
     PatternExtraction,
 )
 from webApp.services.graphs_state import PaperProcessingState
+from webApp.services.rate_limiter import acall
+from webApp.services.token_counter import token_counter
 
 logger = logging.getLogger(__name__)
 
+# Token budget of the files selected for embedding
+MAX_EMBEDDED_TOKENS = 100000
+
+# Checkpoint item of the LLM file selection
+PATTERNS_CHECKPOINT = "patterns"
+
 
 def chunk_text(text: str, max_chars: int = 20000) -> List[str]:
     """
@@ -68,6 +79,52 @@ def chunk_text(text: str, max_chars: int = 20000) -> List[str]:
     return chunks
 
 
+def chunk_checkpoint_key(file_path: str, chunk_index: int, content_hash: str) -> str:
+    """Checkpoint key of one embedded chunk (file content hash, index, path)."""
+    return f"{content_hash[:16]}:{chunk_index}:{file_path}"[:255]
+
+
+async def _stored_chunk_embeddings(
+    paper_id: int, code_url: str, embedding_model: str
+) -> Dict[Tuple[str, int], Dict[str, Any]]:
+    """Stored chunk embeddings of a repository, keyed by (file path, chunk index)."""
+    from webApp.models import CodeFileEmbedding
+
+    rows = await sync_to_async(
+        lambda: list(
+            CodeFileEmbedding.objects.filter(
+                paper_id=paper_id, code_url=code_url, embedding_model=embedding_model
+            ).values("file_path", "chunk_index", "content_hash", "embedding")
+        )
+    )()
+    return {(row["file_path"], row["chunk_index"]): row for row in rows}
+
+
+def select_files_within_budget(
+    files: Dict[str, str], token_budget: int
+) -> Tuple[Dict[str, str], List[str], int]:
+    """
+    Keep files in order while their total token count fits the budget.
+
+    Args:
+        files: File path -> content, in priority order
+        token_budget: Maximum total tokens
+
+    Returns:
+        (selected files, dropped file paths, selected token count)
+    """
+    counts = token_counter.count_many(list(files.values()))
+    selected, dropped = {}, []
+    tokens_used = 0
+    for (file_path, content), tokens in zip(files.items(), counts):
+        if tokens_used + tokens <= token_budget:
+            selected[file_path] = content
+            tokens_used += tokens
+        else:
+            dropped.append(file_path)
+    return selected, dropped, tokens_used
+
+
 async def compute_embedding(
     client, text: str, model: str = "text-embedding-3-small"
 ) -> Tuple[List[float], int]:
@@ -83,12 +140,9 @@ async def compute_embedding(
         Tuple of (embedding vector, tokens_used)
     """
     try:
-        # OpenAI embedding API is synchronous, wrap for async
-        response = await sync_to_async(
-            lambda: client.embeddings.create(
-                model=model, input=text, encoding_format="float"
-            )
-        )()
+        response = await acall(
+            client.embeddings.create, model=model, input=text, encoding_format="float"
+        )
 
         embedding = response.data[0].embedding
         tokens_used = response.usage.total_tokens
@@ -157,75 +211,14 @@ async def code_embedding_node(state: PaperProcessingState) -> Dict[str, Any]:
     await async_ops.create_node_log(node, "INFO", "Starting code repository embedding")
 
     try:
-        # Check for previous embedding
+        # Reuse the latest result computed from the same inputs
         force_reprocess = state.get("force_reprocess", False)
+        fingerprint = await node_fingerprint(node_id, state)
+        await async_ops.set_node_input_fingerprint(node, fingerprint)
         if not force_reprocess:
-            previous = await async_ops.check_previous_analysis(
-                state["paper_id"], node_id
-            )
-            if previous:
-                logger.info(
-                    f"Found previous code embedding from {previous['completed_at']}"
-                )
-                await async_ops.create_node_log(
-                    node, "INFO", f"Using cached result from run {previous['run_id']}"
-                )
-
-                result = CodeEmbeddingResult(**previous["result"])
-
-                # Copy tokens from previous execution
-                previous_node = await async_ops.get_most_recent_completed_node(
-                    paper_id=state["paper_id"],
-                    node_id=node_id,
-                    exclude_run_id=state["workflow_run_id"],
-                )
-
-                if previous_node:
-                    await async_ops.update_node_tokens(
-                        node,
-                        input_tokens=previous_node.input_tokens,
-                        output_tokens=previous_node.output_tokens,
-                        was_cached=True,
-                    )
-                    logger.info(
-                        f"Copied tokens from previous execution: {previous_node.total_tokens} total"
-                    )
-
-                    # Copy all artifacts from previous node to current node
-                    previous_artifacts = await async_ops.get_node_artifacts(
-                        previous_node
-                    )
-                    for artifact in previous_artifacts:
-                        await async_ops.create_node_artifact(
-                            node,
-                            name=artifact.name,
-                            data=(
-                                artifact.inline_data
-                                if artifact.artifact_type == "inline"
-                                else {
-                                    "type": artifact.artifact_type,
-                                    "file_path": artifact.file_path,
-                                    "url": artifact.url,
-                                    "mime_type": artifact.mime_type,
-                                    "size_bytes": artifact.size_bytes,
-                                    "metadata": artifact.metadata,
-                                }
-                            ),
-                            artifact_type=artifact.artifact_type,
-                            mime_type=artifact.mime_type,
-                            size_bytes=artifact.size_bytes,
-                            metadata=artifact.metadata,
-                        )
-
-                    logger.info(
-                        f"Copied {len(previous_artifacts)} artifact(s) from previous node"
-                    )
-
-                await async_ops.update_node_status(
-                    node, "completed", completed_at=timezone.now()
-                )
-
-                return {"code_embedding_result": result}
+            previous = await reuse_previous_result(node, state, fingerprint)
+            if previous is not None:
+                return {"code_embedding_result": CodeEmbeddingResult(**previous)}
 
         # Get code URL from Node B
         code_availability = state.get("code_availability_result")
@@ -321,26 +314,52 @@ In the tree structure next to the filename is also provided the tokens of each f
 Generate the output ready to be transformed into a Python list of strings.
 """
 
-        logger.info("Calling LLM to select important files...")
-        await async_ops.create_node_log(
-            node, "INFO", "Calling LLM to select important files for embedding..."
-        )
+        # Work finished by an interrupted attempt on the same inputs (file
+        # selection, embedded chunks) is reused instead of being paid for again
+        checkpoints = NodeCheckpoints(paper.id, node_id, scope={"fingerprint": fingerprint})
+        finished = await checkpoints.aload()
 
-        response = client.responses.parse(
-            model=model,
-            input=[
+        selection = finished.get(PATTERNS_CHECKPOINT)
+        if selection:
+            await async_ops.create_node_log(
+                node,
+                "INFO",
+                f"Resuming: reusing file selection and {len(finished) - 1} embedded "
+                "chunk(s) from a previous attempt",
+            )
+            retrieved_patterns = PatternExtraction(**selection["patterns"])
+            total_input_tokens += selection["input_tokens"]
+            total_output_tokens += selection["output_tokens"]
+        else:
+            logger.info("Calling LLM to select important files...")
+            await async_ops.create_node_log(
+                node, "INFO", "Calling LLM to select important files for embedding..."
+            )
+
+            response = await acall(
+                client.responses.parse,
+                model=model,
+                input=[
+                    {
+                        "role": "system",
+                        "content": "You are an expert code reviewer. Focus on identifying files essential for reproducibility.",
+                    },
+                    {"role": "user", "content": code_info_prompt},
+                ],
+                text_format=PatternExtraction,
+                reasoning={"effort": "minimal"},
+            )
+            retrieved_patterns = response.output_parsed
+            total_input_tokens += response.usage.input_tokens
+            total_output_tokens += response.usage.output_tokens
+            await checkpoints.asave(
+                PATTERNS_CHECKPOINT,
                 {
-                    "role": "system",
-                    "content": "You are an expert code reviewer. Focus on identifying files essential for reproducibility.",
+                    "patterns": retrieved_patterns.model_dump(),
+                    "input_tokens": response.usage.input_tokens,
+                    "output_tokens": response.usage.output_tokens,
                 },
-                {"role": "user", "content": code_info_prompt},
-            ],
-            text_format=PatternExtraction,
-            reasoning={"effort": "minimal"},
-        )
-        retrieved_patterns = response.output_parsed
-        total_input_tokens += response.usage.input_tokens
-        total_output_tokens += response.usage.output_tokens
+            )
 
         logger.info(
             f"LLM suggested code file patterns: {retrieved_patterns.included_patterns}"
@@ -409,6 +428,28 @@ Generate the output ready to be transformed into a Python list of strings.
             f"Parsed {len(files)} files for embedding",
         )
 
+        # The LLM was asked to stay within MAX_EMBEDDED_TOKENS; enforce it
+        # with real counts, keeping files in the suggested order
+        files, dropped_files, selected_tokens = select_files_within_budget(
+            files, MAX_EMBEDDED_TOKENS
+        )
+        if dropped_files:
+            logger.warning(
+                f"Dropped {len(dropped_files)} files over the {MAX_EMBEDDED_TOKENS:,}-token "
+                f"budget: {dropped_files}"
+            )
+            await async_ops.create_node_log(
+                node,
+                "WARNING",
+                f"Selected files exceed {MAX_EMBEDDED_TOKENS:,} tokens; skipped "
+                f"{len(dropped_files)} file(s): {', '.join(dropped_files[:10])}",
+            )
+        await async_ops.create_node_log(
+            node,
+            "INFO",
+            f"Embedding {len(files)} files ({selected_tokens:,} tokens)",
+        )
+
         # Step 5 & 6: Chunk large files and compute embeddings
         embedded_files = []
         total_chunks = 0
@@ -421,6 +462,13 @@ Generate the output ready to be transformed into a Python list of strings.
         # embedding model, but this is something to refactor in the future.
         embedding_model = "text-embedding-3-small"
 
+        # Embeddings of chunks checkpointed by a previous attempt are already stored
+        stored_embeddings = {}
+        if finished:
+            stored_embeddings = await _stored_chunk_embeddings(
+                paper.id, code_url, embedding_model
+            )
+
         for file_path, file_content in files.items():
             # Compute content hash
             content_hash = hashlib.sha256(file_content.encode("utf-8")).hexdigest()
@@ -432,6 +480,28 @@ Generate the output ready to be transformed into a Python list of strings.
             logger.info(f"Processing {file_path}: {len(chunks)} chunk(s)")
 
             for chunk_index, chunk_content in enumerate(chunks):
+                chunk_key = chunk_checkpoint_key(file_path, chunk_index, content_hash)
+                stored = stored_embeddings.get((file_path, chunk_index))
+                if (
+                    chunk_key in finished
+                    and stored
+                    and stored["content_hash"] == content_hash
+                ):
+                    tokens_used = finished[chunk_key]["tokens_used"]
+                    total_tokens_for_embedding += tokens_used
+                    embedded_files.append(
+                        CodeFileEmbeddingInfo(
+                            file_path=file_path,
+                            file_content=chunk_content,
+                            chunk_index=chunk_index,
+                            total_chunks=len(chunks),
+                            content_hash=content_hash,
+                            embedding=stored["embedding"],
+                            tokens_used=tokens_used,
+                        )
+                    )
+                    continue
+
                 # Compute embedding
                 try:
                     embedding, tokens_used = await compute_embedding(
@@ -473,6 +543,8 @@ Generate the output ready to be transformed into a Python list of strings.
                         },
                     )
 
+                    await checkpoints.asave(chunk_key, {"tokens_used": tokens_used})
+
                     logger.info(
                         f"Embedded {file_path} chunk {chunk_index + 1}/{len(chunks)}: {tokens_used} tokens"
                     )
@@ -550,9 +622,12 @@ Generate the output ready to be transformed into a Python list of strings.
             completed_at=timezone.now(),
             output_data={"total_files": len(files), "total_chunks": total_chunks},
         )
+        await checkpoints.aclear()
 
         return {"code_embedding_result": result}
 
+    except BatchPending:
+        raise
     except Exception as e:
         logger.error(f"Error in code embedding: {e}", exc_info=True)
         await async_ops.create_node_log(
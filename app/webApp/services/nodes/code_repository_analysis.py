@@ -7,6 +7,7 @@ from pathlib import Path as PathlibPath
 
 
 from workflow_engine.services.async_orchestrator import async_ops
+from webApp.services.nodes.fingerprints import node_fingerprint, reuse_previous_result
 from .shared_helpers_v2 import analyze_repository_with_aspects
 
 from webApp.services.pydantic_schemas import (
@@ -105,76 +106,14 @@ async def code_repository_analysis_node(
     )
 
     try:
-        # Check for previous analysis
+        # Reuse the latest result computed from the same inputs
         force_reprocess = state.get("force_reprocess", False)
+        fingerprint = await node_fingerprint(node_id, state)
+        await async_ops.set_node_input_fingerprint(node, fingerprint)
         if not force_reprocess:
-            previous = await async_ops.check_previous_analysis(
-                state["paper_id"], node_id
-            )
-            if previous:
-                logger.info(
-                    f"Found previous code analysis from {previous['completed_at']}"
-                )
-                await async_ops.create_node_log(
-                    node, "INFO", f"Using cached result from run {previous['run_id']}"
-                )
-
-                result = CodeReproducibilityAnalysis(**previous["result"])
-
-                # Copy tokens from previous execution
-                previous_node = await async_ops.get_most_recent_completed_node(
-                    paper_id=state["paper_id"],
-                    node_id=node_id,
-                    exclude_run_id=state["workflow_run_id"],
-                )
-
-                if previous_node:
-                    await async_ops.update_node_tokens(
-                        node,
-                        input_tokens=previous_node.input_tokens,
-                        output_tokens=previous_node.output_tokens,
-                        was_cached=True,
-                    )
-                    logger.info(
-                        f"Copied tokens from previous execution: {previous_node.total_tokens} total"
-                    )
-
-                    # Copy all artifacts from previous node to current node
-                    # This ensures the frontend can display the full results even when using cache
-                    previous_artifacts = await async_ops.get_node_artifacts(
-                        previous_node
-                    )
-                    for artifact in previous_artifacts:
-                        await async_ops.create_node_artifact(
-                            node,
-                            name=artifact.name,
-                            data=(
-                                artifact.inline_data
-                                if artifact.artifact_type == "inline"
-                                else {
-                                    "type": artifact.artifact_type,
-                                    "file_path": artifact.file_path,
-                                    "url": artifact.url,
-                                    "mime_type": artifact.mime_type,
-                                    "size_bytes": artifact.size_bytes,
-                                    "metadata": artifact.metadata,
-                                }
-                            ),
-                            artifact_type=artifact.artifact_type,
-                            mime_type=artifact.mime_type,
-                            size_bytes=artifact.size_bytes,
-                            metadata=artifact.metadata,
-                        )
-
-                    logger.info(
-                        f"Copied {len(previous_artifacts)} artifact(s) from previous node"
-                    )
-
-                await async_ops.update_node_status(
-                    node, "completed", completed_at=timezone.now()
-                )
-
-                return {"code_reproducibility_result": result}
+            previous = await reuse_previous_result(node, state, fingerprint)
+            if previous is not None:
+                return {"code_reproducibility_result": CodeReproducibilityAnalysis(**previous)}
 
         # Get code URL from Node B (code_availability_check_node)
         code_availability = state.get("code_availability_result")
@@ -14,6 +14,8 @@ from typing import Dict, Any, List, Optional
 
 from django.utils import timezone
 from workflow_engine.services.async_orchestrator import async_ops
+from workflow_engine.services.llm_batches import BatchPending
+from webApp.services.nodes.fingerprints import node_fingerprint, reuse_previous_result
 
 from webApp.services.pydantic_schemas import (
     AggregatedReproducibilityAnalysis,
@@ -23,6 +25,7 @@ from webApp.services.pydantic_schemas import (
     FinalQualitativeAssessment,
 )
 from webApp.services.graphs_state import PaperProcessingState
+from webApp.services.rate_limiter import acall
 
 logger = logging.getLogger(__name__)
 
@@ -231,80 +234,14 @@ async def final_aggregation_node(
             f"dataset_docs={dataset_docs is not None}"
         )
 
-        # Check for force_reprocess flag
+        # Reuse the latest result computed from the same inputs
         force_reprocess = state.get("force_reprocess", False)
-
-        # Check if already analyzed
+        fingerprint = await node_fingerprint(node_id, state)
+        await async_ops.set_node_input_fingerprint(node, fingerprint)
         if not force_reprocess:
-            previous_node = await async_ops.get_most_recent_completed_node(
-                paper_id=state["paper_id"],
-                node_id=node_id,
-                exclude_run_id=state["workflow_run_id"],
-            )
-
-            if previous_node:
-                # Get the result from the previous node's artifact
-                previous_artifact = await async_ops.get_node_artifact(
-                    previous_node, "result"
-                )
-                if previous_artifact and previous_artifact.inline_data:
-                    logger.info(
-                        f"Found previous aggregation from {previous_node.completed_at}"
-                    )
-                    await async_ops.create_node_log(
-                        node,
-                        "INFO",
-                        f"Using cached result from run {previous_node.workflow_run_id}",
-                    )
-
-                    result = FinalReproducibilityAssessment(
-                        **previous_artifact.inline_data
-                    )
-
-                    # Copy tokens from previous node
-                    await async_ops.update_node_tokens(
-                        node,
-                        input_tokens=previous_node.input_tokens,
-                        output_tokens=previous_node.output_tokens,
-                        was_cached=True,
-                    )
-
-                    # Copy all artifacts from previous node to current node
-                    # This ensures the frontend can display the full results even when using cache
-                    previous_artifacts = await async_ops.get_node_artifacts(
-                        previous_node
-                    )
-                    for artifact in previous_artifacts:
-                        await async_ops.create_node_artifact(
-                            node,
-                            name=artifact.name,
-                            data=(
-                                artifact.inline_data
-                                if artifact.artifact_type == "inline"
-                                else {
-                                    "type": artifact.artifact_type,
-                                    "file_path": artifact.file_path,
-                                    "url": artifact.url,
-                                    "mime_type": artifact.mime_type,
-                                    "size_bytes": artifact.size_bytes,
-                                    "metadata": artifact.metadata,
-                                }
-                            ),
-                            artifact_type=artifact.artifact_type,
-                            mime_type=artifact.mime_type,
-                            size_bytes=artifact.size_bytes,
-                            metadata=artifact.metadata,
-                        )
-
-                    logger.info(
-                        f"Copied {len(previous_artifacts)} artifact(s) from previous node"
-                    )
-
-                await async_ops.update_node_status(
-                    node, "completed", completed_at=timezone.now()
-                )
-
-                return {"final_assessment_result": result}
+            previous = await reuse_previous_result(node, state, fingerprint)
+            if previous is not None:
+                return {"final_assessment_result": FinalReproducibilityAssessment(**previous)}
 
         # Get paper and client from state
         paper = await async_ops.get_paper(state["paper_id"])
@@ -469,7 +406,8 @@ Generate:
 Create a unified narrative connecting findings across all evaluation dimensions."""
 
         # Call OpenAI API
-        response = client.chat.completions.parse(
+        response = await acall(
+            client.chat.completions.parse,
             model=model,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -655,6 +593,8 @@ Create a unified narrative connecting findings across all evaluation dimensions.
 
         return {"final_assessment_result": final_result}
 
+    except BatchPending:
+        raise
     except Exception as e:
         logger.error(f"Error in final aggregation: {e}", exc_info=True)
         await async_ops.create_node_log(node, "ERROR", f"Failed: {str(e)}")
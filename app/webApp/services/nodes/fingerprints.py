@@ -0,0 +1,377 @@
+"""
+Input fingerprints for incremental re-analysis.
+
+Every node records a fingerprint of its effective inputs on its
+WorkflowNode: the node version, the LLM model, the paper content, the
+criteria it evaluates, the repository revision and the results of the
+upstream nodes it reads. Without force_reprocess, a node reuses the latest
+completed result whose fingerprint matches and reruns otherwise. Editing one
+checklist criterion therefore reruns reproducibility_checklist and
+final_aggregation for each paper, but not the code branch.
+
+Results computed before fingerprints were recorded never match and are
+recomputed once.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+
+from workflow_engine.services.async_orchestrator import async_ops
+from webApp.models import (
+    DatasetDocumentationCriterion,
+    Paper,
+    PaperSectionEmbedding,
+    ReproducibilityAspectEmbedding,
+    ReproducibilityChecklistCriterion,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump a node's version when its prompt or processing logic changes, so
+# results of the previous code are not reused
+NODE_VERSIONS = {
+    "paper_type_classification": 1,
+    "section_embeddings": 1,
+    "dataset_documentation_check": 2,
+    "reproducibility_checklist": 2,
+    "code_availability_check": 1,
+    "code_embedding": 1,
+    "code_repository_analysis": 1,
+    "final_aggregation": 1,
+}
+
+# Inputs each node depends on (see INPUT_SOURCES)
+NODE_INPUTS = {
+    "paper_type_classification": ("model", "paper"),
+    "section_embeddings": ("paper",),
+    "dataset_documentation_check": ("model", "paper_type", "sections", "dataset_criteria"),
+    "reproducibility_checklist": ("model", "paper_type", "sections", "checklist_criteria"),
+    "code_availability_check": ("model", "paper"),
+    "code_embedding": ("model", "code_availability", "repository"),
+    "code_repository_analysis": (
+        "model",
+        "paper_type",
+        "sections",
+        "code_availability",
+        "repository",
+        "code_embedding",
+        "aspects",
+    ),
+    "final_aggregation": (
+        "model",
+        "paper_type",
+        "code_availability",
+        "reproducibility_checklist",
+        "dataset_documentation",
+        "code_reproducibility",
+    ),
+}
+
+# Result fields that differ between runs without reflecting different content
+VOLATILE_FIELDS = {"clone_path", "analysis_timestamp", "embedded_files"}
+
+# Seconds to wait for git to report the HEAD of a repository
+LS_REMOTE_TIMEOUT = 20
+
+
+# ============================================================================
+# Hashing
+# ============================================================================
+
+
+def _strip_volatile(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: _strip_volatile(item)
+            for key, item in value.items()
+            if key not in VOLATILE_FIELDS
+        }
+    if isinstance(value, (list, tuple)):
+        return [_strip_volatile(item) for item in value]
+    return value
+
+
+def content_hash(value: Any) -> Optional[str]:
+    """
+    SHA-256 of a JSON-serializable value or pydantic model (None stays None).
+
+    Fields listed in VOLATILE_FIELDS are ignored.
+    """
+    if value is None:
+        return None
+    if hasattr(value, "model_dump"):
+        value = value.model_dump(mode="json")
+    encoded = json.dumps(_strip_volatile(value), sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+# ============================================================================
+# Inputs
+# ============================================================================
+
+
+@sync_to_async
+def paper_content_hash(paper_id: int) -> Optional[str]:
+    """Hash of the paper fields nodes read (title, abstract, text, sections, code URL)."""
+    row = (
+        Paper.objects.filter(id=paper_id)
+        .values("title", "abstract", "text", "sections", "code_url")
+        .first()
+    )
+    return content_hash(row)
+
+
+@sync_to_async
+def section_embeddings_hash(paper_id: int) -> Optional[str]:
+    """Hash of the paper's embedded sections (what retrieval can return)."""
+    rows = PaperSectionEmbedding.objects.filter(paper_id=paper_id).order_by(
+        "section_type", "id"
+    )
+    return content_hash(
+        [
+            [row["section_type"], row["embedding_model"], content_hash(row["section_text"])]
+            for row in rows.values("section_type", "embedding_model", "section_text")
+        ]
+    )
+
+
+def _criteria_hash(model, *fields) -> Callable[[], Awaitable[Optional[str]]]:
+    @sync_to_async
+    def compute():
+        return content_hash(list(model.objects.order_by(fields[0]).values_list(*fields)))
+
+    return compute
+
+
+checklist_criteria_hash = _criteria_hash(
+    ReproducibilityChecklistCriterion,
+    "criterion_id",
+    "criterion_number",
+    "criterion_name",
+    "category",
+    "description",
+    "criterion_context",
+    "embedding_model",
+)
+dataset_criteria_hash = _criteria_hash(
+    DatasetDocumentationCriterion,
+    "criterion_id",
+    "criterion_number",
+    "criterion_name",
+    "category",
+    "description",
+    "criterion_context",
+    "embedding_model",
+)
+aspects_hash = _criteria_hash(
+    ReproducibilityAspectEmbedding,
+    "aspect_id",
+    "aspect_name",
+    "aspect_description",
+    "aspect_context",
+    "embedding_model",
+)
+
+
+async def _git_output(*args: str) -> Optional[str]:
+    """First word of a git command's output, or None if the command fails."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "git",
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+        )
+        stdout, _ = await asyncio.wait_for(
+            process.communicate(), timeout=LS_REMOTE_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        process.kill()
+        logger.warning(f"Timed out running git {' '.join(args)}")
+        return None
+    except Exception as e:
+        logger.warning(f"Could not run git {' '.join(args)}: {e}")
+        return None
+    if process.returncode != 0 or not stdout:
+        return None
+    return stdout.split()[0].decode("ascii", "replace")
+
+
+async def repository_revision(code_url: Optional[str]) -> Optional[str]:
+    """
+    Commit SHA of a repository's HEAD, or None if it cannot be determined.
+
+    Uses ``git ls-remote``, which asks the remote without cloning.
+    """
+    if not code_url:
+        return None
+    return await _git_output("ls-remote", "--quiet", "--", code_url, "HEAD")
+
+
+async def clone_revision(clone_path: Optional[str]) -> Optional[str]:
+    """Commit SHA checked out in a local clone, or None."""
+    if not clone_path or not os.path.isdir(clone_path):
+        return None
+    return await _git_output("-C", clone_path, "rev-parse", "HEAD")
+
+
+async def availability_revision(result) -> Optional[str]:
+    """
+    Revision of the repository found by code_availability_check.
+
+    Read from the node's verified clone when there is one, so the remote is
+    asked at most once per run. The node stores it in the state as
+    ``repository_revision`` for the fingerprints of the code nodes.
+    """
+    if result is None or not result.code_available:
+        return None
+    revision = await clone_revision(result.clone_path)
+    return revision or await repository_revision(result.code_url)
+
+
+async def _repository(state):
+    if "repository_revision" in state:
+        return state["repository_revision"]
+    return await repository_revision(_code_url(state))
+
+
+def _code_url(state) -> Optional[str]:
+    availability = state.get("code_availability_result")
+    return availability.code_url if availability else None
+
+
+async def _paper_type(state):
+    result = state.get("paper_type_result")
+    return result.paper_type if result else "unknown"
+
+
+def _state_hash(key: str):
+    async def source(state):
+        return content_hash(state.get(key))
+
+    return source
+
+
+async def _model(state):
+    return state.get("model")
+
+
+INPUT_SOURCES: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {
+    "model": _model,
+    "paper": lambda state: paper_content_hash(state["paper_id"]),
+    "sections": lambda state: section_embeddings_hash(state["paper_id"]),
+    "checklist_criteria": lambda state: checklist_criteria_hash(),
+    "dataset_criteria": lambda state: dataset_criteria_hash(),
+    "aspects": lambda state: aspects_hash(),
+    "repository": _repository,
+    "paper_type": _paper_type,
+    "code_availability": _state_hash("code_availability_result"),
+    "code_embedding": _state_hash("code_embedding_result"),
+    "reproducibility_checklist": _state_hash("reproducibility_checklist_result"),
+    "dataset_documentation": _state_hash("dataset_documentation_result"),
+    "code_reproducibility": _state_hash("code_reproducibility_result"),
+}
+
+
+async def node_inputs(node_id: str, state: Dict[str, Any]) -> Dict[str, Any]:
+    """Effective inputs of a node, as hashes or plain values."""
+    names = NODE_INPUTS[node_id]
+    values = await asyncio.gather(*(INPUT_SOURCES[name](state) for name in names))
+    return {"version": NODE_VERSIONS[node_id], **dict(zip(names, values))}
+
+
+async def node_fingerprint(node_id: str, state: Dict[str, Any]) -> str:
+    """Fingerprint of a node's effective inputs for the paper in ``state``."""
+    return content_hash({"node": node_id, **await node_inputs(node_id, state)})
+
+
+# ============================================================================
+# Reuse
+# ============================================================================
+
+
+async def reuse_previous_result(
+    node, state: Dict[str, Any], fingerprint: str, require_result: bool = True
+) -> Optional[Dict[str, Any]]:
+    """
+    Complete ``node`` from the latest completed node with the same fingerprint.
+
+    Copies the previous node's tokens (marked as cached) and artifacts, so
+    the frontend shows the full results, and marks ``node`` completed.
+
+    Args:
+        node: WorkflowNode of the current run
+        state: Workflow state
+        fingerprint: Fingerprint of the node's current inputs
+        require_result: Only reuse nodes that stored a "result" artifact
+
+    Returns:
+        Data of the previous "result" artifact ({} if it has none and
+        require_result is False), or None if nothing can be reused
+    """
+    previous_node = await async_ops.get_completed_node_by_fingerprint(
+        paper_id=state["paper_id"],
+        node_id=node.node_id,
+        fingerprint=fingerprint,
+        exclude_run_id=state["workflow_run_id"],
+    )
+    if previous_node is None:
+        return None
+
+    previous_artifact = await async_ops.get_node_artifact(previous_node, "result")
+    result = previous_artifact.inline_data if previous_artifact else None
+    if not result:
+        if require_result:
+            return None
+        result = {}
+
+    logger.info(
+        f"Reusing {node.node_id} from run {previous_node.workflow_run_id} (inputs unchanged)"
+    )
+    await async_ops.create_node_log(
+        node,
+        "INFO",
+        f"Inputs unchanged, using cached result from run {previous_node.workflow_run_id}",
+    )
+    await async_ops.update_node_tokens(
+        node,
+        input_tokens=previous_node.input_tokens,
+        output_tokens=previous_node.output_tokens,
+        was_cached=True,
+        cached_input_tokens=previous_node.cached_input_tokens,
+    )
+
+    previous_artifacts = await async_ops.get_node_artifacts(previous_node)
+    for artifact in previous_artifacts:
+        await async_ops.create_node_artifact(
+            node,
+            name=artifact.name,
+            data=(
+                artifact.inline_data
+                if artifact.artifact_type == "inline"
+                else {
+                    "type": artifact.artifact_type,
+                    "file_path": artifact.file_path,
+                    "url": artifact.url,
+                    "mime_type": artifact.mime_type,
+                    "size_bytes": artifact.size_bytes,
+                    "metadata": artifact.metadata,
+                }
+            ),
+            artifact_type=artifact.artifact_type,
+            mime_type=artifact.mime_type,
+            size_bytes=artifact.size_bytes,
+            metadata=artifact.metadata,
+        )
+    logger.info(f"Copied {len(previous_artifacts)} artifact(s) from previous node")
+
+    await async_ops.update_node_status(node, "completed", completed_at=timezone.now())
+    return result
@@ -4,9 +4,12 @@ import logging
 from typing import Dict, Any
 from django.utils import timezone
 from workflow_engine.services.async_orchestrator import async_ops
+from workflow_engine.services.llm_batches import BatchPending
+from webApp.services.nodes.fingerprints import node_fingerprint, reuse_previous_result
 
 from webApp.services.pydantic_schemas import PaperTypeClassification
 from webApp.services.graphs_state import PaperProcessingState
+from webApp.services.rate_limiter import acall
 
 logger = logging.getLogger(__name__)
 
@@ -35,76 +38,14 @@ async def paper_type_classification_node(state: PaperProcessingState) -> Dict[st
     await async_ops.create_node_log(node, "INFO", "Starting paper type classification")
 
     try:
-        # Check for force_reprocess flag
+        # Reuse the latest result computed from the same inputs
         force_reprocess = state.get("force_reprocess", False)
-
-        # Check if already classified
+        fingerprint = await node_fingerprint(node_id, state)
+        await async_ops.set_node_input_fingerprint(node, fingerprint)
         if not force_reprocess:
-            previous = await async_ops.check_previous_analysis(
-                state["paper_id"], node_id
-            )
-            if previous:
-                logger.info(f"Found previous analysis from {previous['completed_at']}")
-                await async_ops.create_node_log(
-                    node, "INFO", f"Using cached result from run {previous['run_id']}"
-                )
-
-                result = PaperTypeClassification(**previous["result"])
-
-                # Copy tokens from previous execution
-                previous_node = await async_ops.get_most_recent_completed_node(
-                    paper_id=state["paper_id"],
-                    node_id=node_id,
-                    exclude_run_id=state["workflow_run_id"],
-                )
-
-                if previous_node:
-                    await async_ops.update_node_tokens(
-                        node,
-                        input_tokens=previous_node.input_tokens,
-                        output_tokens=previous_node.output_tokens,
-                        was_cached=True,
-                    )
-                    logger.info(
-                        f"Copied tokens from previous execution: {previous_node.total_tokens} total"
-                    )
-
-                    # Copy all artifacts from previous node to current node
-                    # This ensures the frontend can display the full results even when using cache
-                    previous_artifacts = await async_ops.get_node_artifacts(
-                        previous_node
-                    )
-                    for artifact in previous_artifacts:
-                        await async_ops.create_node_artifact(
-                            node,
-                            name=artifact.name,
-                            data=(
-                                artifact.inline_data
-                                if artifact.artifact_type == "inline"
-                                else {
-                                    "type": artifact.artifact_type,
-                                    "file_path": artifact.file_path,
-                                    "url": artifact.url,
-                                    "mime_type": artifact.mime_type,
-                                    "size_bytes": artifact.size_bytes,
-                                    "metadata": artifact.metadata,
-                                }
-                            ),
-                            artifact_type=artifact.artifact_type,
-                            mime_type=artifact.mime_type,
-                            size_bytes=artifact.size_bytes,
-                            metadata=artifact.metadata,
-                        )
-
-                    logger.info(
-                        f"Copied {len(previous_artifacts)} artifact(s) from previous node"
-                    )
-
-                await async_ops.update_node_status(
-                    node, "completed", completed_at=timezone.now()
-                )
-
-                return {"paper_type_result": result}
+            previous = await reuse_previous_result(node, state, fingerprint)
+            if previous is not None:
+                return {"paper_type_result": PaperTypeClassification(**previous)}
 
         # Get paper from database
         paper = await async_ops.get_paper(state["paper_id"])
@@ -159,7 +100,8 @@ Provide:
 
         # Call OpenAI API
         client = state["client"]
-        response = client.chat.completions.create(
+        response = await acall(
+            client.chat.completions.create,
             model=state["model"],
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -234,6 +176,8 @@ Provide:
 
         return {"paper_type_result": result}
 
+    except BatchPending:
+        raise
     except Exception as e:
         logger.error(f"Error in paper type classification: {e}", exc_info=True)
 
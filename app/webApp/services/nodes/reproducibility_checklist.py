@@ -4,9 +4,11 @@ Node G: Reproducibility Checklist Analysis (Multi-Step Process)
 Analyzes 20 MICCAI reproducibility criteria (excludes code-related 12-17).
 Uses a multi-step process similar to Node C:
 1. Load criteria from database with embeddings
-2. For each criterion: retrieve relevant sections → LLM analysis
+2. For each criterion: rank relevant sections → LLM analysis
 3. Aggregate results with final LLM call → compute scores
 
+Criterion requests share one per-paper prompt prefix (see paper_prompts).
+
 Adapts evaluation weights based on paper type.
 """
 
@@ -18,6 +20,9 @@ import numpy as np
 from django.utils import timezone
 from asgiref.sync import sync_to_async
 from workflow_engine.services.async_orchestrator import async_ops
+from workflow_engine.services.llm_batches import BatchPending, raise_if_pending
+from workflow_engine.services.checkpoints import NodeCheckpoints
+from webApp.services.nodes.fingerprints import node_fingerprint, reuse_previous_result
 
 from webApp.models import ReproducibilityChecklistCriterion, PaperSectionEmbedding
 from webApp.services.pydantic_schemas import (
@@ -25,7 +30,14 @@ from webApp.services.pydantic_schemas import (
     AggregatedReproducibilityAnalysis,
 )
 from webApp.services.graphs_state import PaperProcessingState
+from webApp.services.rate_limiter import acall
 from webApp.services.nodes.reproducibility_criteria import get_all_criteria
+from webApp.services.paper_prompts import (
+    apaper_prefix,
+    cached_input_tokens,
+    criterion_messages,
+    format_section_hint,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -70,7 +82,7 @@ async def reproducibility_checklist_node(
     Process:
     1. Load 20 criteria from database (with embeddings)
     2. For each criterion:
-       - Find most relevant paper sections via cosine similarity
+       - Rank paper sections by cosine similarity (hint after the shared paper prefix)
        - Analyze with LLM (SingleCriterionAnalysis)
     3. Aggregate all analyses with final LLM call
     4. Compute category scores and weighted score
@@ -105,83 +117,14 @@ async def reproducibility_checklist_node(
 
         logger.info(f"Paper type: {paper_type}")
 
-        # Check for force_reprocess flag
+        # Reuse the latest result computed from the same inputs
         force_reprocess = state.get("force_reprocess", False)
-
-        # Check if already analyzed
+        fingerprint = await node_fingerprint(node_id, state)
+        await async_ops.set_node_input_fingerprint(node, fingerprint)
         if not force_reprocess:
-            previous_node = await async_ops.get_most_recent_completed_node(
-                paper_id=state["paper_id"],
-                node_id=node_id,
-                exclude_run_id=state["workflow_run_id"],
-            )
-
-            if previous_node:
-                # Get the result from the previous node's artifact
-                previous_artifact = await async_ops.get_node_artifact(
-                    previous_node, "result"
-                )
-                if previous_artifact and previous_artifact.inline_data:
-                    logger.info(
-                        f"Found previous analysis from {previous_node.completed_at}"
-                    )
-                    await async_ops.create_node_log(
-                        node,
-                        "INFO",
-                        f"Using cached result from run {previous_node.workflow_run_id}",
-                    )
-
-                    result = AggregatedReproducibilityAnalysis(
-                        **previous_artifact.inline_data
-                    )
-
-                    # Copy tokens from previous node
-                    await async_ops.update_node_tokens(
-                        node,
-                        input_tokens=previous_node.input_tokens,
-                        output_tokens=previous_node.output_tokens,
-                        was_cached=True,
-                    )
-                    logger.info(
-                        f"Copied tokens from previous execution: {previous_node.total_tokens} total"
-                    )
-
-                    # Copy all artifacts from previous node to current node
-                    # This ensures the frontend can display the full results even when using cache
-                    previous_artifacts = await async_ops.get_node_artifacts(
-                        previous_node
-                    )
-                    for artifact in previous_artifacts:
-                        await async_ops.create_node_artifact(
-                            node,
-                            name=artifact.name,
-                            data=(
-                                artifact.inline_data
-                                if artifact.artifact_type == "inline"
-                                else {
-                                    "type": artifact.artifact_type,
-                                    "file_path": artifact.file_path,
-                                    "url": artifact.url,
-                                    "mime_type": artifact.mime_type,
-                                    "size_bytes": artifact.size_bytes,
-                                    "metadata": artifact.metadata,
-                                }
-                            ),
-                            artifact_type=artifact.artifact_type,
-                            mime_type=artifact.mime_type,
-                            size_bytes=artifact.size_bytes,
-                            metadata=artifact.metadata,
-                        )
-
-                    logger.info(
-                        f"Copied {len(previous_artifacts)} artifact(s) from previous node"
-                    )
-
-                await async_ops.update_node_status(
-                    node, "completed", completed_at=timezone.now()
-                )
-
-                return {"reproducibility_checklist_result": result}
+            previous = await reuse_previous_result(node, state, fingerprint)
+            if previous is not None:
+                return {"reproducibility_checklist_result": AggregatedReproducibilityAnalysis(**previous)}
 
         # Get paper and client from state
         paper = await async_ops.get_paper(state["paper_id"])
@@ -212,51 +155,51 @@ async def reproducibility_checklist_node(
         # Step 2: Analyze each criterion individually
         criterion_analyses = []
         total_input_tokens = 0
+        total_cached_tokens = 0
         total_output_tokens = 0
 
+        # Paper title, type and sections, shared by every criterion request
+        prefix = await apaper_prefix(paper, paper_type)
+
+        # Criteria finished by an interrupted attempt on the same inputs
+        # (criteria, sections, paper type, model) are not analyzed again
+        checkpoints = NodeCheckpoints(paper.id, node_id, scope={"fingerprint": fingerprint})
+        finished = await checkpoints.aload()
+        if finished:
+            await async_ops.create_node_log(
+                node,
+                "INFO",
+                f"Resuming: {len(finished)} criteria already analyzed by a previous attempt",
+            )
+
         for i, criterion_model in enumerate(criteria_models, 1):
+            checkpoint = finished.get(criterion_model.criterion_id)
+            if checkpoint:
+                criterion_analyses.append(
+                    SingleCriterionAnalysis(**checkpoint["analysis"])
+                )
+                total_input_tokens += checkpoint["input_tokens"]
+                total_cached_tokens += checkpoint.get("cached_tokens", 0)
+                total_output_tokens += checkpoint["output_tokens"]
+                continue
+
             logger.info(f"Analyzing criterion {i}/20: {criterion_model.criterion_name}")
 
-            # Retrieve relevant sections using cosine similarity
-            relevant_sections = await _retrieve_sections_for_criterion(
-                paper_id=paper.id,
+            # Point the request at the most similar sections of the prefix
+            relevant_sections = _rank_sections_for_criterion(
+                prefix.sections,
                 criterion_embedding=criterion_model.embedding,
                 top_k=3,
-                max_chars_per_section=1500,
             )
 
-            if relevant_sections:
-                sections_text = "\n\n".join(
-                    [
-                        f"=== {sec_type.upper()} (similarity: {sim:.3f}) ===\n{text}"
-                        for sim, sec_type, text in relevant_sections
-                    ]
-                )
-                logger.debug(
-                    f"  Found {len(relevant_sections)} relevant sections "
-                    f"(avg similarity: {np.mean([s[0] for s in relevant_sections]):.3f})"
-                )
-            else:
-                sections_text = f"Abstract: {paper.abstract or 'N/A'}"
-                logger.warning(f"  No relevant sections found, using abstract only")
-
-            # Build LLM prompt for this criterion
-            system_prompt = f"""You are evaluating a single MICCAI reproducibility criterion for a {paper_type} paper.
+            # Criterion-specific suffix after the shared paper prefix
+            criterion_prompt = f"""Evaluate a single MICCAI reproducibility criterion for this {paper_type} paper.
 
 Criterion: {criterion_model.criterion_name}
 Description: {criterion_model.description}
 Category: {criterion_model.category}
+{format_section_hint(relevant_sections)}
 
-Assess whether this criterion is satisfied based on the paper sections provided.
-Be precise and evidence-based. Quote specific text when possible."""
-
-            user_prompt = f"""Paper Title: {paper.title}
-Paper Type: {paper_type}
-
-Relevant Paper Sections:
-{sections_text}
-
-Evaluate criterion "{criterion_model.criterion_name}" for this paper.
 Provide your assessment with:
 1. Whether the criterion is present/satisfied (true/false)
 2. Your confidence (0-1)
@@ -267,12 +210,11 @@ Provide your assessment with:
 
             try:
                 # Call OpenAI API
-                response = client.chat.completions.parse(
+                response = await acall(
+                    client.chat.completions.parse,
                     model=model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt},
-                    ],
+                    messages=criterion_messages(prefix, criterion_prompt),
+                    prompt_cache_key=prefix.cache_key,
                     response_format=SingleCriterionAnalysis,
                     reasoning_effort="minimal",
                     # temperature=0.1,
@@ -291,9 +233,21 @@ Provide your assessment with:
                 criterion_analyses.append(analysis)
 
                 # Track tokens
+                cached_tokens = cached_input_tokens(response.usage)
                 total_input_tokens += response.usage.prompt_tokens
+                total_cached_tokens += cached_tokens
                 total_output_tokens += response.usage.completion_tokens
 
+                await checkpoints.asave(
+                    criterion_model.criterion_id,
+                    {
+                        "analysis": analysis.model_dump(),
+                        "input_tokens": response.usage.prompt_tokens,
+                        "cached_tokens": cached_tokens,
+                        "output_tokens": response.usage.completion_tokens,
+                    },
+                )
+
                 logger.info(
                     f"  Result: present={analysis.present}, confidence={analysis.confidence:.2f}, "
                     f"importance={analysis.importance}"
@@ -311,6 +265,9 @@ Provide your assessment with:
                 # Continue with other criteria
                 continue
 
+        # Suspend rather than aggregate while criteria wait for a batch job
+        raise_if_pending(client)
+
         logger.info(
             f"Completed individual criterion analyses: {len(criterion_analyses)}/20"
         )
@@ -340,13 +297,14 @@ Provide your assessment with:
             input_tokens=total_input_tokens,
             output_tokens=total_output_tokens,
             was_cached=False,
+            cached_input_tokens=total_cached_tokens,
         )
 
         logger.info(
             f"Reproducibility analysis complete. Overall: {aggregated_result.overall_score:.1f}, "
             f"Weighted ({paper_type}): {aggregated_result.weighted_score:.1f}. "
             f"Tokens: {total_input_tokens + total_output_tokens} "
-            f"(in: {total_input_tokens}, out: {total_output_tokens})"
+            f"(in: {total_input_tokens}, cached: {total_cached_tokens}, out: {total_output_tokens})"
         )
 
         # Store result as NodeArtifact
@@ -364,9 +322,12 @@ Provide your assessment with:
             completed_at=timezone.now(),
             output_summary=f"Reproducibility: {aggregated_result.weighted_score:.1f}/100 ({paper_type} paper). {aggregated_result.summary}",
         )
+        await checkpoints.aclear()
 
         return {"reproducibility_checklist_result": aggregated_result}
 
+    except BatchPending:
+        raise
     except Exception as e:
         logger.error(f"Error in reproducibility checklist: {e}", exc_info=True)
         await async_ops.create_node_log(node, "ERROR", f"Failed: {str(e)}")
@@ -374,57 +335,32 @@ Provide your assessment with:
         raise
 
 
-async def _retrieve_sections_for_criterion(
-    paper_id: int,
+def _rank_sections_for_criterion(
+    sections: List[PaperSectionEmbedding],
     criterion_embedding: List[float],
     top_k: int = 3,
-    max_chars_per_section: int = 1500,
     min_similarity: float = 0.15,
-) -> List[Tuple[float, str, str]]:
+) -> List[Tuple[float, str]]:
     """
-    Retrieve most relevant paper sections for a criterion using cosine similarity.
+    Rank a paper's sections by cosine similarity to a criterion.
 
     Args:
-        paper_id: Paper ID
+        sections: Section rows of the paper (already loaded for the prefix)
         criterion_embedding: Criterion embedding vector
-        top_k: Number of sections to retrieve
-        max_chars_per_section: Max characters per section
+        top_k: Number of sections to return
         min_similarity: Minimum similarity threshold
 
     Returns:
-        List of (similarity, section_type, text) tuples sorted by similarity descending
+        List of (similarity, section_type) tuples sorted by similarity descending
     """
-    # Get all section embeddings for this paper
-    sections = await sync_to_async(
-        lambda: list(PaperSectionEmbedding.objects.filter(paper_id=paper_id))
-    )()
-
-    if not sections:
-        logger.warning(f"No section embeddings found for paper {paper_id}")
-        return []
-
-    # Compute cosine similarity for each section
     similarities = []
     for section in sections:
         similarity = _compute_cosine_similarity(criterion_embedding, section.embedding)
         if similarity >= min_similarity:
-            similarities.append((similarity, section))
+            similarities.append((similarity, section.section_type))
 
-    # Sort by similarity descending
     similarities.sort(key=lambda x: x[0], reverse=True)
-
-    # Take top_k sections
-    top_sections = similarities[:top_k]
-    # TODO Is the truncation useful?
-    # Format results with text truncation
-    results = []
-    for similarity, section in top_sections:
-        text = section.section_text[:max_chars_per_section]
-        if len(section.section_text) > max_chars_per_section:
-            text += "... [truncated]"
-        results.append((similarity, section.section_type, text))
-
-    return results
+    return similarities[:top_k]
 
 
 def _compute_cosine_similarity(
@@ -13,8 +13,11 @@ from typing import Dict, Any, List, Tuple
 from django.utils import timezone
 from asgiref.sync import sync_to_async
 from workflow_engine.services.async_orchestrator import async_ops
+from webApp.services.nodes.fingerprints import node_fingerprint, reuse_previous_result
 
 from webApp.services.graphs_state import PaperProcessingState
+from webApp.services.rate_limiter import acall
+from webApp.services.token_counter import count_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -103,12 +106,9 @@ async def compute_embedding(
         List of floats representing the embedding
     """
     try:
-        # OpenAI embedding API is synchronous, wrap for async
-        response = await sync_to_async(
-            lambda: client.embeddings.create(
-                model=model, input=text, encoding_format="float"
-            )
-        )()
+        response = await acall(
+            client.embeddings.create, model=model, input=text, encoding_format="float"
+        )
 
         embedding = response.data[0].embedding
         return embedding
@@ -150,6 +150,8 @@ async def section_embeddings_node(state: PaperProcessingState) -> Dict[str, Any]
     try:
         # Check for force_reprocess flag
         force_reprocess = state.get("force_reprocess", False)
+        fingerprint = await node_fingerprint(node_id, state)
+        await async_ops.set_node_input_fingerprint(node, fingerprint)
 
         # Get paper from database
         paper = await async_ops.get_paper(state["paper_id"])
@@ -176,7 +178,7 @@ async def section_embeddings_node(state: PaperProcessingState) -> Dict[str, Any]
                 "section_embeddings_result": {"sections_processed": 0, "skipped": True}
             }
 
-        # Check if embeddings already exist
+        # Reuse stored embeddings computed from the same paper content
         if not force_reprocess:
             from webApp.models import PaperSectionEmbedding
 
@@ -185,68 +187,17 @@ async def section_embeddings_node(state: PaperProcessingState) -> Dict[str, Any]
             )()
 
             if existing_count > 0:
-                logger.info(f"Found {existing_count} existing embeddings")
-                await async_ops.create_node_log(
-                    node, "INFO", f"Using {existing_count} cached embeddings"
-                )
-
-                # Copy tokens from previous execution
-                previous_node = await async_ops.get_most_recent_completed_node(
-                    paper_id=state["paper_id"],
-                    node_id=node_id,
-                    exclude_run_id=state["workflow_run_id"],
+                previous = await reuse_previous_result(
+                    node, state, fingerprint, require_result=False
                 )
-
-                if previous_node:
-                    await async_ops.update_node_tokens(
-                        node,
-                        input_tokens=previous_node.input_tokens,
-                        output_tokens=previous_node.output_tokens,
-                        was_cached=True,
-                    )
-                    logger.info(
-                        f"Copied tokens from previous execution: {previous_node.total_tokens} total"
-                    )
-
-                    # Copy all artifacts from previous node to current node
-                    previous_artifacts = await async_ops.get_node_artifacts(
-                        previous_node
-                    )
-                    for artifact in previous_artifacts:
-                        await async_ops.create_node_artifact(
-                            node,
-                            name=artifact.name,
-                            data=(
-                                artifact.inline_data
-                                if artifact.artifact_type == "inline"
-                                else {
-                                    "type": artifact.artifact_type,
-                                    "file_path": artifact.file_path,
-                                    "url": artifact.url,
-                                    "mime_type": artifact.mime_type,
-                                    "size_bytes": artifact.size_bytes,
-                                    "metadata": artifact.metadata,
-                                }
-                            ),
-                            artifact_type=artifact.artifact_type,
-                            mime_type=artifact.mime_type,
-                            size_bytes=artifact.size_bytes,
-                            metadata=artifact.metadata,
-                        )
-
-                    logger.info(
-                        f"Copied {len(previous_artifacts)} artifact(s) from previous node"
-                    )
-
-                await async_ops.update_node_status(
-                    node, "completed", completed_at=timezone.now()
-                )
-                return {
-                    "section_embeddings_result": {
-                        "sections_processed": existing_count,
-                        "cached": True,
+                if previous is not None:
+                    logger.info(f"Using {existing_count} cached embeddings")
+                    return {
+                        "section_embeddings_result": {
+                            "sections_processed": existing_count,
+                            "cached": True,
+                        }
                     }
-                }
 
         # Get sections from database (preferred) or fallback to extraction
         sections = []
@@ -323,8 +274,7 @@ async def section_embeddings_node(state: PaperProcessingState) -> Dict[str, Any]
                     client, section_text, embedding_model
                 )
 
-                # Estimate tokens (rough: ~4 chars per token)
-                estimated_tokens = len(section_text) // 4
+                estimated_tokens = count_tokens(section_text)
                 total_tokens += estimated_tokens
 
                 # Store in database
@@ -35,9 +35,17 @@ from webApp.services.pydantic_schemas import (
     DatasetSplitsAnalysis,
     ReproducibilityDocumentation,
 )
+from webApp.services.context_packing import PackItem, pack_context
+from webApp.services.rate_limiter import acall
+from webApp.services.spans import span, traced
+from webApp.services.token_counter import CHARS_PER_TOKEN, count_tokens, stored_token_count
 
 logger = logging.getLogger(__name__)
 
+# Files up to this size are tokenized for the repository tree; larger ones
+# are estimated from their size
+TREE_TOKENIZE_MAX_BYTES = 100000
+
 
 def prepare_paper_content(paper, max_chars: int = 12000) -> str:
     """
@@ -86,7 +94,8 @@ async def retrieve_sections_by_embedding(
         top_k: Return top K sections (if using simple cutoff)
         min_similarity: Minimum similarity threshold to include
         max_chars_per_section: Character limit per section
-        token_budget: Token budget for selection (alternative to top_k)
+        token_budget: Token budget for selection (alternative to top_k); sections
+            are packed with pack_context(), so the last one may be truncated
 
     Returns:
         List of (section_object, similarity, section_text) tuples
@@ -128,21 +137,30 @@ async def retrieve_sections_by_embedding(
     selected = []
 
     if token_budget is not None:
-        # Token budget strategy: fill until budget exhausted
-        tokens_used = 0
-        for section, similarity, text in similarities:
-            section_tokens = len(text) // 4  # Rough estimate
-            if tokens_used + section_tokens <= token_budget:
-                selected.append(
-                    (
-                        section,
-                        similarity,
-                        text[:max_chars_per_section] if max_chars_per_section else text,
-                    )
+        # Token budget strategy: most relevant, least redundant sections that fit
+        packing = pack_context(
+            [
+                PackItem(
+                    key=section.section_type,
+                    text=text,
+                    tokens=stored_token_count(section, text),
+                    relevance=similarity,
+                    embedding=section.embedding,
+                    payload=section,
                 )
-                tokens_used += section_tokens
-            else:
-                break
+                for section, similarity, text in similarities
+            ],
+            token_budget,
+        )
+        logger.info(f"Packed sections of paper {paper_id}: {packing.report.summary()}")
+        selected = [
+            (
+                packed.item.payload,
+                packed.item.relevance,
+                packed.text[:max_chars_per_section] if max_chars_per_section else packed.text,
+            )
+            for packed in packing.packed
+        ]
     else:
         # Top-k strategy: just take top K
         k = top_k if top_k is not None else len(similarities)
@@ -192,7 +210,8 @@ async def get_relevant_sections_by_similarity(
             client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
         # Compute query embedding
-        query_response = client.embeddings.create(
+        query_response = await acall(
+            client.embeddings.create,
             model="text-embedding-3-small", input=query
         )
         query_embedding = query_response.data[0].embedding
@@ -487,6 +506,7 @@ def compute_reproducibility_score(
     return total_score, breakdown_normalized, recommendations
 
 
+@traced("repository_ingest")
 async def ingest_with_steroids(
     source: str,
     *,
@@ -574,7 +594,8 @@ async def ingest_with_steroids(
             # Clone the full repository (not sparse)
             clone_config = query.extract_clone_config()
             logger.info(f"Cloning repository to: {clone_path}")
-            await clone_repo(clone_config, token=token)
+            with span("git_clone", repository=query.url):
+                await clone_repo(clone_config, token=token)
         else:
             # Local path scenario
             logger.info("Processing local directory", extra={"source": source})
@@ -784,6 +805,18 @@ Total Size: {total_size} bytes
                 logger.warning(f"Error cleaning up temp directory: {e}")
 
 
+def _file_tokens(path: PathlibPath) -> int:
+    """Token count of a repository file for the tree listing."""
+    file_size = path.stat().st_size
+    if file_size > TREE_TOKENIZE_MAX_BYTES:
+        return file_size // CHARS_PER_TOKEN
+    try:
+        return count_tokens(path.read_text(encoding="utf-8"))
+    except (UnicodeDecodeError, OSError):
+        # Binary files: estimate from size
+        return file_size // CHARS_PER_TOKEN
+
+
 def _generate_basic_tree(
     path: PathlibPath, prefix: str = "", max_depth: int = 5, current_depth: int = 0
 ) -> str:
@@ -832,10 +865,7 @@ def _generate_basic_tree(
             # For files, add estimated token count
             if item.is_file():
                 try:
-                    # Get file size in bytes
-                    file_size = item.stat().st_size
-                    # Estimate tokens (1 token ≈ 4 characters/bytes)
-                    estimated_tokens = file_size // 4
+                    estimated_tokens = _file_tokens(item)
                     tree_lines.append(
                         f"{prefix}{current_prefix}{item.name} - {estimated_tokens}\n"
                     )
@@ -937,7 +967,8 @@ ADD "/" in front of a name to include only a file in the root, otherwise everyfi
 In the tree structure next to the filename is also provided the tokens of each file. Select the included_patterns in a way to reach at maximum 100000 tokens as the count of every file selected, prioritizing the most important files for reproducibility. DO NOT exceed the token limit. DO NOT provide tokens in output, just the filenames or the patterns.
 Generate the output ready to be transformed into a Python list of strings.
 """
-        response = client.responses.parse(
+        response = await acall(
+            client.responses.parse,
             model=model,
             input=[
                 {
@@ -971,13 +1002,13 @@ Generate the output ready to be transformed into a Python list of strings.
 
         file_count = len(tree.splitlines())  # directories included
         logger.info(
-            f"Repository ingested: {file_count} files, {len(content)// 4} tokens"
+            f"Repository ingested: {file_count} files, {count_tokens(content)} tokens"
         )
         if node:
             await async_ops.create_node_log(
                 node,
                 "INFO",
-                f"Repository ingested: {file_count} files, {len(content)// 4} tokens",
+                f"Repository ingested: {file_count} files, {count_tokens(content)} tokens",
             )
 
         # Prepare paper text (truncate if too long to avoid token limits)
@@ -1067,7 +1098,8 @@ NOTE: Do NOT compute a numeric score - focus on extracting factual information o
             )
 
         # Call LLM with structured output
-        response = client.responses.create(
+        response = await acall(
+            client.responses.create,
             model=model,
             input=[
                 {
@@ -1171,7 +1203,8 @@ Output the complete JSON object with ALL fields filled in based on the analysis
             )
 
         # Call OpenAI API
-        structured_response = client.chat.completions.create(
+        structured_response = await acall(
+            client.chat.completions.create,
             model=model,
             messages=[
                 {
@@ -4,21 +4,31 @@ Aspect-Based Repository Analysis (Version 2)
 Refactored version of analyze_repository_comprehensive that uses:
 1. Aspect embeddings for targeted retrieval
 2. Section embeddings and code embeddings from previous nodes
-3. Per-aspect LLM calls with focused context
+3. Per-aspect LLM calls with focused context, run concurrently
 4. Final aggregation call for overall assessment
 """
 
+import asyncio
 import json
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
 from openai import OpenAI
 from asgiref.sync import sync_to_async
 from workflow_engine.services.async_orchestrator import async_ops
+from workflow_engine.services.llm_batches import BatchPending, raise_if_pending
 from webApp.models import Paper
-
-from .aspect_based_retrieval import analyze_aspect, get_aspect_ids
+from webApp.services.rate_limiter import acall
+
+from .aspect_based_retrieval import (
+    ASPECT_RETRIEVAL_CONFIG,
+    MAX_CONCURRENT_ASPECTS,
+    analyze_aspect,
+    get_aspect_ids,
+    get_or_create_aspect_embeddings,
+    retrieve_aspect_contexts,
+)
 from .reproducibility_aspects import get_aspect
 from .shared_helpers import (
     compute_reproducibility_score,
@@ -33,6 +43,55 @@ from .shared_helpers import (
 logger = logging.getLogger(__name__)
 
 
+async def _retrieve_contexts(
+    aspect_ids: List[str],
+    paper_id: int,
+    code_url: str,
+    client: OpenAI,
+    section_budget: int,
+    code_budget: int,
+    node: "WorkflowNode" = None,
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Retrieve the contexts of all aspects, keeping failures per aspect.
+
+    Embeddings and contexts are fetched for all aspects at once; if that
+    fails, each aspect is retried on its own so an error only affects the
+    aspects it belongs to.
+
+    Returns
+    -------
+    Tuple[Dict[str, Any], Dict[str, str]]
+        Contexts by aspect_id, and error messages of the aspects without one
+    """
+    try:
+        aspect_embeddings = await get_or_create_aspect_embeddings(aspect_ids, client)
+        contexts = await retrieve_aspect_contexts(
+            paper_id, code_url, aspect_embeddings, section_budget, code_budget
+        )
+        return contexts, {}
+    except Exception as e:
+        logger.warning(f"Batched aspect retrieval failed, retrying per aspect: {e}")
+
+    contexts, errors = {}, {}
+    for aspect_id in aspect_ids:
+        try:
+            aspect_embeddings = await get_or_create_aspect_embeddings([aspect_id], client)
+            contexts.update(
+                await retrieve_aspect_contexts(
+                    paper_id, code_url, aspect_embeddings, section_budget, code_budget
+                )
+            )
+        except Exception as e:
+            logger.error(f"Error retrieving context for aspect {aspect_id}: {e}", exc_info=True)
+            if node:
+                await async_ops.create_node_log(
+                    node, "ERROR", f"Error retrieving context for aspect {aspect_id}: {e}"
+                )
+            errors[aspect_id] = str(e)
+    return contexts, errors
+
+
 async def analyze_repository_with_aspects(
     code_url: str,
     paper: Paper,
@@ -45,11 +104,13 @@ async def analyze_repository_with_aspects(
 
     This function:
     1. Verifies section and code embeddings exist (from Nodes D and F)
-    2. For each aspect (0-5):
-       - Retrieves relevant sections/code from database via similarity
-       - Performs focused LLM analysis
-    3. Aggregates results into final assessment
-    4. Build structured data and compute reproducibility score
+    2. Retrieves relevant sections/code for all aspects (0-5) in one
+       similarity pass over the paper's embeddings
+    3. Analyzes the aspects concurrently (at most MAX_CONCURRENT_ASPECTS LLM
+       calls at once); an aspect whose retrieval or analysis fails is
+       recorded without stopping the others
+    4. Aggregates results into final assessment
+    5. Build structured data and compute reproducibility score
 
     All code and section data comes from database embeddings created by previous nodes.
     No repository re-fetching is needed.
@@ -135,46 +196,65 @@ async def analyze_repository_with_aspects(
                     node, "INFO", f"Found {code_count} code file embeddings"
                 )
 
-        # Step 2: Analyze each aspect (0-5)
+        # Step 2: Retrieve context for all aspects (0-5) at once
         aspect_ids = get_aspect_ids()[:-1]  # Exclude 'overall' for now
 
-        for aspect_id in aspect_ids:
-            logger.info(f"Analyzing aspect: {aspect_id}")
-            if node:
-                await async_ops.create_node_log(
-                    node, "INFO", f"Analyzing aspect: {aspect_id}"
-                )
-
-            try:
-                aspect_result = await analyze_aspect(
-                    aspect_id=aspect_id,
-                    paper_id=paper.id,
-                    code_url=code_url,
-                    client=client,
-                    model=model,
-                    node=node,
-                )
-
-                aspect_results[aspect_id] = json.loads(aspect_result["analysis"])
-                total_input_tokens += aspect_result["input_tokens"]
-                total_output_tokens += aspect_result["output_tokens"]
-
-                logger.info(
-                    f"Aspect {aspect_id} complete - "
-                    f"used {aspect_result['sections_used']} sections, "
-                    f"{aspect_result['code_files_used']} code files"
-                )
+        section_budget = int(
+            ASPECT_RETRIEVAL_CONFIG["max_context_tokens"]
+            * ASPECT_RETRIEVAL_CONFIG["section_budget_ratio"]
+        )
+        code_budget = int(
+            ASPECT_RETRIEVAL_CONFIG["max_context_tokens"]
+            * ASPECT_RETRIEVAL_CONFIG["code_budget_ratio"]
+        )
+        contexts, retrieval_errors = await _retrieve_contexts(
+            aspect_ids, paper.id, code_url, client, section_budget, code_budget, node
+        )
 
-            except Exception as e:
-                logger.error(f"Error analyzing aspect {aspect_id}: {e}", exc_info=True)
-                if node:
-                    await async_ops.create_node_log(
-                        node, "ERROR", f"Error analyzing aspect {aspect_id}: {e}"
+        # Step 3: Analyze the aspects concurrently
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_ASPECTS)
+
+        async def run_aspect(aspect_id: str) -> Dict[str, Any]:
+            if aspect_id in retrieval_errors:
+                return {"parsed": {"error": retrieval_errors[aspect_id]}}
+            async with semaphore:
+                logger.info(f"Analyzing aspect: {aspect_id}")
+                try:
+                    aspect_result = await analyze_aspect(
+                        aspect_id=aspect_id,
+                        paper_id=paper.id,
+                        code_url=code_url,
+                        client=client,
+                        model=model,
+                        node=node,
+                        context=contexts[aspect_id],
                     )
-                # Store error but continue with other aspects
-                aspect_results[aspect_id] = {"error": str(e)}
-
-        # Step 3: Aggregate results for overall assessment
+                    aspect_result["parsed"] = json.loads(aspect_result["analysis"])
+                    logger.info(
+                        f"Aspect {aspect_id} complete - "
+                        f"used {aspect_result['sections_used']} sections, "
+                        f"{aspect_result['code_files_used']} code files"
+                    )
+                    return aspect_result
+                except Exception as e:
+                    logger.error(f"Error analyzing aspect {aspect_id}: {e}", exc_info=True)
+                    if node:
+                        await async_ops.create_node_log(
+                            node, "ERROR", f"Error analyzing aspect {aspect_id}: {e}"
+                        )
+                    # Store error but continue with other aspects
+                    return {"parsed": {"error": str(e)}}
+
+        outcomes = await asyncio.gather(*(run_aspect(aspect_id) for aspect_id in aspect_ids))
+        for aspect_id, outcome in zip(aspect_ids, outcomes):
+            aspect_results[aspect_id] = outcome["parsed"]
+            total_input_tokens += outcome.get("input_tokens", 0)
+            total_output_tokens += outcome.get("output_tokens", 0)
+
+        # Aspects waiting for a batch job leave the overall assessment for the next round
+        raise_if_pending(client)
+
+        # Step 4: Aggregate results for overall assessment
         logger.info("Generating overall assessment from aspect analyses")
         if node:
             await async_ops.create_node_log(
@@ -197,7 +277,8 @@ Generate a JSON with:
 - overall_assessment: string (comprehensive summary of reproducibility status, key strengths, and critical weaknesses)
 """
         # Call OpenAI API
-        overall_response = client.chat.completions.create(
+        overall_response = await acall(
+            client.chat.completions.create,
             model=model,
             messages=[
                 {
@@ -220,7 +301,7 @@ Generate a JSON with:
         if node:
             await async_ops.create_node_log(node, "INFO", "Overall assessment complete")
 
-        # Step 4: Build structured data from aspect results
+        # Step 5: Build structured data from aspect results
         structured_data = {
             "methodology": aspect_results.get("methodology", {}),
             "structure": aspect_results.get("structure", {}),
@@ -231,7 +312,7 @@ Generate a JSON with:
             "overall_assessment": overall_result.get("overall_assessment", ""),
         }
 
-        # Step 5: Create Pydantic models for structured data
+        # Step 6: Create Pydantic models for structured data
         def safe_model_create(model_class, data):
             """Create Pydantic model only if data is not empty."""
             if not data or not isinstance(data, dict):
@@ -279,7 +360,7 @@ Generate a JSON with:
             ReproducibilityDocumentation, structured_data.get("documentation")
         )
 
-        # Step 6: Compute reproducibility score
+        # Step 7: Compute reproducibility score
         logger.info("Computing reproducibility score...")
         if node:
             await async_ops.create_node_log(
@@ -316,7 +397,7 @@ Generate a JSON with:
                     f'Top recommendations:\n{rec_preview}{"\n  ..." if len(recommendations) > 3 else ""}',
                 )
 
-        # Step 7: Compile final result
+        # Step 8: Compile final result
         result = {
             "methodology": methodology_obj,
             "structure": structure_obj,
@@ -343,6 +424,8 @@ Generate a JSON with:
         )
         return result
 
+    except BatchPending:
+        raise
     except Exception as e:
         logger.error(f"Error in aspect-based repository analysis: {e}", exc_info=True)
         if node:
@@ -0,0 +1,26 @@
+"""
+Offline stand-ins for the external services of the workflow.
+
+- StubOpenAI: deterministic OpenAI chat/responses/embeddings endpoints with
+  simulated latency, token usage and rate limits
+- GrobidStubServer: Grobid's fulltext endpoint returning synthetic papers
+- GitFixtureServer: smart HTTP git server for fixture repositories
+
+Together with webApp.services.benchmark they run the full workflow without
+network access or API spend.
+"""
+
+from webApp.services.offline.fixtures import synthetic_paper, synthetic_repository
+from webApp.services.offline.git_server import GitFixtureServer
+from webApp.services.offline.grobid import GrobidStubServer, stub_pdf
+from webApp.services.offline.llm import StubLLMConfig, StubOpenAI
+
+__all__ = [
+    "GitFixtureServer",
+    "GrobidStubServer",
+    "StubLLMConfig",
+    "StubOpenAI",
+    "stub_pdf",
+    "synthetic_paper",
+    "synthetic_repository",
+]
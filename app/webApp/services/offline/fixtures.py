@@ -0,0 +1,182 @@
+"""
+Deterministic synthetic papers and code repositories.
+
+The same index always yields the same content, so benchmark runs over N
+papers are comparable between commits.
+"""
+
+import random
+from typing import Dict, Optional
+
+TOPICS = (
+    "Brain Tumor Segmentation",
+    "Chest X-Ray Classification",
+    "Cardiac MRI Registration",
+    "Histopathology Detection",
+    "Retinal Vessel Segmentation",
+    "Low-Dose CT Denoising",
+    "Ultrasound Landmark Localization",
+    "Skin Lesion Classification",
+)
+
+SECTION_SENTENCES = {
+    "Introduction": (
+        "Accurate {topic} remains a challenging problem in medical image analysis.",
+        "Existing approaches rely on large annotated cohorts that are rarely shared.",
+        "We propose a lightweight network that generalizes across scanners and sites.",
+        "Our contributions are a new architecture, a public benchmark and an ablation study.",
+    ),
+    "Related Work": (
+        "Convolutional encoder-decoder models have dominated {topic} for years.",
+        "Transformer backbones were recently adapted to volumetric inputs.",
+        "Self-supervised pretraining reduces the need for manual annotation.",
+    ),
+    "Methods": (
+        "The encoder uses residual blocks with instance normalization and leaky ReLU.",
+        "We optimize a combination of Dice and cross-entropy losses with AdamW.",
+        "The learning rate starts at 1e-4 and follows a cosine schedule over 300 epochs.",
+        "All hyperparameters were selected on the validation split only.",
+        "Training used a batch size of 2 on a single NVIDIA A100 GPU with 40 GB of memory.",
+    ),
+    "Datasets": (
+        "We evaluate on a public dataset of 484 studies acquired at three hospitals.",
+        "Patients were split into 70% training, 10% validation and 20% test sets.",
+        "Annotations were produced by two radiologists and adjudicated by a third.",
+        "The data is available under a research license after registration.",
+    ),
+    "Experiments": (
+        "We report mean and standard deviation over five runs with different seeds.",
+        "Statistical significance is assessed with a paired Wilcoxon signed-rank test.",
+        "Baselines were retrained with the official implementations and default settings.",
+        "Inference takes 1.2 seconds per volume on the same hardware.",
+    ),
+    "Results": (
+        "Our method improves the Dice score by 2.1 points over the strongest baseline.",
+        "The ablation shows that the attention gate contributes most of the gain.",
+        "Failure cases mainly involve small lesions near the image border.",
+    ),
+    "Conclusion": (
+        "We presented a simple and reproducible approach to {topic}.",
+        "Future work will extend the evaluation to external cohorts.",
+    ),
+}
+
+AUTHORS = ("A. Rossi", "M. Chen", "S. Müller", "L. Dubois", "K. Tanaka", "P. Silva")
+
+
+def _rng(kind: str, index: int, seed: int) -> random.Random:
+    return random.Random(f"{kind}:{seed}:{index}")
+
+
+def synthetic_paper(
+    index: int,
+    words_per_section: int = 250,
+    code_url: Optional[str] = None,
+    seed: int = 0,
+) -> Dict[str, object]:
+    """
+    Synthetic paper with title, authors, abstract and sections.
+
+    Args:
+        index: Paper number; the same index always gives the same paper
+        words_per_section: Approximate length of each section
+        code_url: Repository URL mentioned in the text (none if not given)
+        seed: Changes every paper at once
+
+    Returns:
+        Dictionary with title, authors, abstract, sections ({name: text})
+        and text (abstract and sections joined, as stored on Paper.text)
+    """
+    rng = _rng("paper", index, seed)
+    topic = TOPICS[index % len(TOPICS)]
+
+    sections = {}
+    for name, sentences in SECTION_SENTENCES.items():
+        paragraphs = []
+        words = 0
+        while words < words_per_section:
+            sentence = rng.choice(sentences).format(topic=topic.lower())
+            paragraphs.append(sentence)
+            words += len(sentence.split())
+        sections[name] = " ".join(paragraphs)
+    if code_url:
+        sections["Conclusion"] += f" Code and trained models are available at {code_url}."
+
+    abstract = (
+        f"We study {topic.lower()} on public data. "
+        + " ".join(rng.sample(SECTION_SENTENCES["Introduction"], 2)).format(
+            topic=topic.lower()
+        )
+    )
+    text = "\n\n".join(
+        [f"Abstract\n\n{abstract}"]
+        + [f"{name}\n\n{content}" for name, content in sections.items()]
+    )
+    return {
+        "title": f"{topic} with Residual Attention Networks ({index})",
+        "authors": ", ".join(rng.sample(AUTHORS, 3)),
+        "abstract": abstract,
+        "sections": sections,
+        "text": text,
+    }
+
+
+def synthetic_repository(index: int, seed: int = 0) -> Dict[str, str]:
+    """
+    Files of a small research code repository, keyed by relative path.
+
+    Args:
+        index: Repository number; the same index always gives the same files
+        seed: Changes every repository at once
+    """
+    rng = _rng("repository", index, seed)
+    topic = TOPICS[index % len(TOPICS)]
+    epochs = rng.choice((100, 200, 300))
+    learning_rate = rng.choice(("1e-3", "3e-4", "1e-4"))
+
+    return {
+        "README.md": (
+            f"# {topic} ({index})\n\n"
+            "Official implementation of the paper.\n\n"
+            "## Installation\n\n    pip install -r requirements.txt\n\n"
+            "## Training\n\n    python train.py --config configs/default.yaml\n\n"
+            "## Evaluation\n\n    python evaluate.py --checkpoint checkpoints/best.pt\n\n"
+            "Pretrained weights are attached to the GitHub release.\n"
+        ),
+        "requirements.txt": "torch==2.2.0\nnumpy==1.26.4\nmonai==1.3.0\npyyaml==6.0.1\n",
+        "configs/default.yaml": (
+            f"epochs: {epochs}\nlearning_rate: {learning_rate}\nbatch_size: 2\n"
+            "seed: 42\nsplits: data/splits.json\n"
+        ),
+        "data/splits.json": '{"train": "ids_train.txt", "val": "ids_val.txt", "test": "ids_test.txt"}\n',
+        "model.py": (
+            "import torch\nfrom torch import nn\n\n\n"
+            "class ResidualBlock(nn.Module):\n"
+            "    def __init__(self, channels):\n"
+            "        super().__init__()\n"
+            "        self.conv = nn.Conv3d(channels, channels, 3, padding=1)\n"
+            "        self.norm = nn.InstanceNorm3d(channels)\n\n"
+            "    def forward(self, x):\n"
+            "        return x + torch.relu(self.norm(self.conv(x)))\n"
+        ),
+        "train.py": (
+            "import argparse\n\nimport torch\nimport yaml\n\nfrom model import ResidualBlock\n\n\n"
+            "def main():\n"
+            "    parser = argparse.ArgumentParser()\n"
+            "    parser.add_argument('--config', default='configs/default.yaml')\n"
+            "    config = yaml.safe_load(open(parser.parse_args().config))\n"
+            "    torch.manual_seed(config['seed'])\n"
+            "    model = ResidualBlock(32)\n"
+            "    optimizer = torch.optim.AdamW(model.parameters(), lr=float(config['learning_rate']))\n"
+            "    for epoch in range(config['epochs']):\n"
+            "        optimizer.zero_grad()\n\n\n"
+            "if __name__ == '__main__':\n"
+            "    main()\n"
+        ),
+        "evaluate.py": (
+            "import argparse\n\nimport torch\n\n\n"
+            "def dice(prediction, target):\n"
+            "    intersection = (prediction * target).sum()\n"
+            "    return 2 * intersection / (prediction.sum() + target.sum())\n"
+        ),
+    }
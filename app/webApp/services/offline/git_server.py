@@ -0,0 +1,211 @@
+"""
+Local git fixture server.
+
+Serves bare repositories over git's smart HTTP protocol (through
+``git http-backend``), so clones, ``git ls-remote`` and shallow fetches
+behave as against a hosted repository. Repositories are created from a
+{path: content} mapping with fixed commit dates, so their commit SHAs are
+identical in every run.
+
+A repository added as (owner, name) is reachable at ``<url>/owner/name``,
+which also answers plain GET/HEAD requests like a repository web page.
+
+While running, the server makes itself usable through gitingest, which only
+accepts known git hosts and always queries ``https://``: its host is added to
+gitingest's KNOWN_GIT_HOSTS and git is configured (through GIT_CONFIG_*
+environment variables) to rewrite ``https://<host>/`` to ``http://<host>/``.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+from webApp.services.offline.server import BackgroundServer, QuietHandler
+
+# Fixed identity and dates for reproducible commit SHAs
+COMMIT_ENV = {
+    "GIT_AUTHOR_NAME": "Fixture",
+    "GIT_AUTHOR_EMAIL": "fixture@example.com",
+    "GIT_COMMITTER_NAME": "Fixture",
+    "GIT_COMMITTER_EMAIL": "fixture@example.com",
+    "GIT_AUTHOR_DATE": "2024-01-01T00:00:00+00:00",
+    "GIT_COMMITTER_DATE": "2024-01-01T00:00:00+00:00",
+}
+
+
+def _git(*args, cwd=None, env=None):
+    subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        env={**os.environ, **(env or {})},
+        check=True,
+        capture_output=True,
+    )
+
+
+class GitHandler(QuietHandler):
+    def _repository_path(self):
+        """(PATH_INFO for http-backend, query string), or None for a web page request."""
+        path, _, query = self.path.partition("?")
+        parts = path.strip("/").split("/")
+        if len(parts) < 2:
+            return None, query
+        owner, name = parts[0], parts[1]
+        if not name.endswith(".git"):
+            name += ".git"
+        if len(parts) == 2:
+            return None, query
+        return "/" + "/".join([owner, name, *parts[2:]]), query
+
+    def _page(self):
+        parts = self.path.partition("?")[0].strip("/").split("/")
+        name = parts[1] if len(parts) >= 2 else ""
+        if not name.endswith(".git"):
+            name += ".git"
+        exists = len(parts) >= 2 and (self.server.owner.root / parts[0] / name).is_dir()
+        if exists:
+            self.send_body(200, f"<html><body>{parts[0]}/{parts[1]}</body></html>".encode(), "text/html")
+        else:
+            self.send_body(404, b"not found", "text/plain")
+
+    def _backend(self, body: bytes = b""):
+        path_info, query = self._repository_path()
+        if path_info is None:
+            self._page()
+            return
+
+        env = {
+            **os.environ,
+            "GIT_PROJECT_ROOT": str(self.server.owner.root),
+            "GIT_HTTP_EXPORT_ALL": "1",
+            "REQUEST_METHOD": self.command,
+            "PATH_INFO": path_info,
+            "QUERY_STRING": query,
+            "CONTENT_TYPE": self.headers.get("Content-Type", ""),
+            "CONTENT_LENGTH": str(len(body)),
+            "REMOTE_ADDR": self.client_address[0],
+        }
+        if self.headers.get("Content-Encoding"):
+            env["HTTP_CONTENT_ENCODING"] = self.headers["Content-Encoding"]
+        if self.headers.get("Git-Protocol"):
+            env["GIT_PROTOCOL"] = self.headers["Git-Protocol"]
+
+        result = subprocess.run(
+            ["git", "http-backend"], input=body, env=env, capture_output=True
+        )
+        separator = b"\r\n\r\n" if b"\r\n\r\n" in result.stdout else b"\n\n"
+        head, _, payload = result.stdout.partition(separator)
+
+        status = 200
+        content_type = "text/plain"
+        headers = {}
+        for line in head.decode("latin-1").splitlines():
+            name, _, value = line.partition(":")
+            if name.lower() == "status":
+                status = int(value.split()[0])
+            elif name.lower() == "content-type":
+                content_type = value.strip()
+            elif name.lower() != "content-length":
+                headers[name] = value.strip()
+        self.send_body(status, payload, content_type, headers)
+
+    def do_GET(self):
+        self._backend()
+
+    def do_HEAD(self):
+        self._page()
+
+    def do_POST(self):
+        self._backend(self.read_body())
+
+
+class GitFixtureServer(BackgroundServer):
+    """
+    Smart HTTP server for local fixture repositories.
+
+    Args:
+        root: Directory of the bare repositories (a temporary directory,
+            removed on stop(), if not given)
+        port: Port to listen on (0 picks a free one)
+
+    Usage:
+        with GitFixtureServer() as git:
+            url = git.add_repository("lab", "segmentation", {"README.md": "# Demo"})
+    """
+
+    handler_class = GitHandler
+
+    def __init__(self, root: Optional[str] = None, port: int = 0):
+        super().__init__(port)
+        self._owns_root = root is None
+        self.root = Path(root or tempfile.mkdtemp(prefix="git_fixtures_"))
+        self._config_keys = []
+
+    @property
+    def host(self) -> str:
+        return f"127.0.0.1:{self.port}"
+
+    def repository_url(self, owner: str, name: str) -> str:
+        return f"{self.url}/{owner}/{name}"
+
+    def add_repository(self, owner: str, name: str, files: Dict[str, str]) -> str:
+        """
+        Create (or replace) a repository with one commit of ``files``.
+
+        Returns:
+            URL of the repository
+        """
+        bare = self.root / owner / f"{name}.git"
+        if bare.exists():
+            shutil.rmtree(bare)
+        with tempfile.TemporaryDirectory(prefix="git_fixture_work_") as work:
+            for path, content in files.items():
+                target = Path(work) / path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_text(content, encoding="utf-8")
+            _git("init", "-q", "-b", "main", cwd=work)
+            _git("add", "-A", cwd=work)
+            _git("commit", "-q", "-m", "Initial commit", cwd=work, env=COMMIT_ENV)
+            bare.parent.mkdir(parents=True, exist_ok=True)
+            _git("clone", "-q", "--bare", work, str(bare))
+        return self.repository_url(owner, name)
+
+    # ------------------------------------------------------------------
+    # gitingest routing
+    # ------------------------------------------------------------------
+
+    def _route(self):
+        from gitingest.utils.query_parser_utils import KNOWN_GIT_HOSTS
+
+        KNOWN_GIT_HOSTS.append(self.host)
+        count = int(os.environ.get("GIT_CONFIG_COUNT", "0"))
+        key = f"url.http://{self.host}/.insteadOf"
+        os.environ[f"GIT_CONFIG_KEY_{count}"] = key
+        os.environ[f"GIT_CONFIG_VALUE_{count}"] = f"https://{self.host}/"
+        os.environ["GIT_CONFIG_COUNT"] = str(count + 1)
+        self._config_keys.append(count)
+
+    def _unroute(self):
+        from gitingest.utils.query_parser_utils import KNOWN_GIT_HOSTS
+
+        if self.host in KNOWN_GIT_HOSTS:
+            KNOWN_GIT_HOSTS.remove(self.host)
+        for index in self._config_keys:
+            # Keep later entries valid: blank this one instead of renumbering
+            os.environ[f"GIT_CONFIG_KEY_{index}"] = "fixture.unused"
+            os.environ[f"GIT_CONFIG_VALUE_{index}"] = ""
+        self._config_keys = []
+
+    def start(self):
+        super().start()
+        self._route()
+        return self
+
+    def stop(self):
+        self._unroute()
+        super().stop()
+        if self._owns_root:
+            shutil.rmtree(self.root, ignore_errors=True)
@@ -0,0 +1,98 @@
+"""
+Local stand-in for the Grobid service.
+
+Answers ``/api/isalive`` and ``/api/processFulltextDocument`` with a TEI
+document of a synthetic paper (see fixtures.synthetic_paper). The paper is
+chosen from the uploaded bytes: a file containing ``paper-index: <n>``
+yields paper n, any other file a paper derived from its hash. Point
+GROBID_URL at the server to run ingestion (webApp.functions.get_pdf_content)
+offline.
+"""
+
+import hashlib
+import re
+import time
+from xml.sax.saxutils import escape
+
+from webApp.services.offline.fixtures import synthetic_paper
+from webApp.services.offline.server import BackgroundServer, QuietHandler
+
+INDEX_PATTERN = re.compile(rb"paper-index:\s*(\d+)")
+
+
+def stub_pdf(index: int) -> bytes:
+    """Bytes of a placeholder PDF the stub maps to synthetic paper ``index``."""
+    return f"%PDF-1.4\n% paper-index: {index}\n%%EOF\n".encode("ascii")
+
+
+def tei_document(paper) -> str:
+    """TEI XML in the layout Grobid returns for a processed paper."""
+    divs = "\n".join(
+        f"<div><head>{escape(name)}</head><p>{escape(text)}</p></div>"
+        for name, text in paper["sections"].items()
+    )
+    authors = "".join(
+        f"<author><persName><surname>{escape(name)}</surname></persName></author>"
+        for name in paper["authors"].split(", ")
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<TEI xmlns="http://www.tei-c.org/ns/1.0">\n'
+        "<teiHeader><fileDesc><titleStmt>"
+        f'<title level="a" type="main">{escape(paper["title"])}</title>'
+        "</titleStmt><sourceDesc><biblStruct><analytic>"
+        f"{authors}</analytic></biblStruct></sourceDesc></fileDesc>"
+        f'<profileDesc><abstract><div><p>{escape(paper["abstract"])}</p></div></abstract></profileDesc>'
+        "</teiHeader>\n"
+        f"<text><body>\n{divs}\n</body></text>\n</TEI>\n"
+    )
+
+
+class GrobidHandler(QuietHandler):
+    def do_GET(self):
+        if self.path.startswith("/api/isalive"):
+            self.send_body(200, b"true", "text/plain")
+        else:
+            self.send_body(404, b"not found", "text/plain")
+
+    def do_POST(self):
+        body = self.read_body()
+        if not self.path.startswith("/api/processFulltextDocument"):
+            self.send_body(404, b"not found", "text/plain")
+            return
+
+        owner = self.server.owner
+        owner.requests += 1
+        if owner.latency_seconds:
+            time.sleep(owner.latency_seconds)
+
+        match = INDEX_PATTERN.search(body)
+        if match:
+            index = int(match.group(1))
+        else:
+            index = int.from_bytes(hashlib.sha256(body).digest()[:4], "little")
+        paper = synthetic_paper(index, words_per_section=owner.words_per_section)
+        self.send_body(200, tei_document(paper).encode("utf-8"), "application/xml")
+
+
+class GrobidStubServer(BackgroundServer):
+    """
+    Grobid stand-in on a local port.
+
+    Args:
+        latency_seconds: Processing time simulated per document
+        words_per_section: Length of the synthetic papers' sections
+        port: Port to listen on (0 picks a free one)
+
+    Usage:
+        with GrobidStubServer() as grobid:
+            os.environ["GROBID_URL"] = grobid.url
+    """
+
+    handler_class = GrobidHandler
+
+    def __init__(self, latency_seconds: float = 0.0, words_per_section: int = 250, port: int = 0):
+        super().__init__(port)
+        self.latency_seconds = latency_seconds
+        self.words_per_section = words_per_section
+        self.requests = 0
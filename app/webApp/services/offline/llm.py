@@ -0,0 +1,655 @@
+"""
+Offline stand-in for the OpenAI API.
+
+StubOpenAI answers the endpoints the workflow nodes call
+(chat.completions.create/parse, responses.create/parse, embeddings.create)
+and the Batch API (files.create/content, batches.create/retrieve/cancel)
+without network access or spend:
+
+- Structured outputs are generated from the requested pydantic model or JSON
+  schema, so they always validate against webApp.services.pydantic_schemas.
+  ``json_object`` requests of the code analysis aspects get the schema of
+  the aspect they ask for.
+- Values are derived from a hash of the request, so the same request gets
+  the same answer in every run.
+- Usage reports the prompt tokens counted with the local tokenizer and the
+  tokens of the generated output.
+- Latency and provider rate limits (RPM/TPM, 429 with retry-after) are
+  simulated as configured in StubLLMConfig.
+- Chat requests whose leading messages (all but the last) were sent before
+  with the same model report those tokens as cached
+  (``usage.prompt_tokens_details.cached_tokens``) once they reach
+  PROMPT_CACHE_MIN_TOKENS, like the provider's prompt caching.
+- Batch jobs report "in_progress" until they have been retrieved
+  ``batch_polls`` times; then every line is answered like a synchronous
+  request and the output file holds the raw API response bodies.
+
+Responses are plain objects with the attributes the OpenAI SDK types expose
+(``choices[0].message.parsed``, ``output_parsed``, ``usage.prompt_tokens``,
+``data[0].embedding``, ...).
+"""
+
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Type
+
+import numpy as np
+
+from webApp.services.token_counter import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Deterministic values for free-text fields whose content the nodes act on
+# ("theoretical" papers skip the code and dataset branches, so it is not used)
+FIELD_CHOICES = {
+    "paper_type": ("method", "method", "both", "dataset"),
+    "importance": ("critical", "important", "optional"),
+    "methodology_type": ("deep_learning", "machine_learning", "algorithm"),
+    "category": ("models", "datasets", "experiments"),
+}
+FIELD_VALUES = {
+    "included_patterns": ["README*", "*.py", "*.yaml", "*.json", "requirements*.txt"],
+    "repository_url": None,
+}
+
+# Shortest prefix the provider caches, and the granularity of cache hits
+PROMPT_CACHE_MIN_TOKENS = 1024
+PROMPT_CACHE_INCREMENT = 128
+
+# Cosine similarity of stub embeddings of texts without common words
+EMBEDDING_BASELINE_SIMILARITY = 0.3
+
+# Sentence fragments used for generated text
+WORDS = (
+    "the paper reports training details and evaluation protocol with public data "
+    "splits hyperparameters baselines metrics code documentation and hardware"
+).split()
+
+
+@dataclass
+class StubLLMConfig:
+    """
+    Behaviour of StubOpenAI.
+
+    Attributes:
+        latency_seconds: Fixed latency of every chat/responses request
+        seconds_per_output_token: Added latency per generated token
+        embedding_latency_seconds: Latency of every embeddings request
+        embedding_dimension: Length of embedding vectors
+        rpm: Requests per minute before 429s (None for unlimited)
+        tpm: Tokens per minute before 429s (None for unlimited)
+        max_retries: 429s retried after retry-after before raising
+            openai.RateLimitError, like the OpenAI SDK (default 2)
+        words_per_text: Length of generated free-text fields
+        seed: Changes every generated answer at once
+        batch_polls: batches.retrieve() calls before a batch job completes
+    """
+
+    latency_seconds: float = 0.0
+    seconds_per_output_token: float = 0.0
+    embedding_latency_seconds: float = 0.0
+    embedding_dimension: int = 1536
+    rpm: Optional[int] = None
+    tpm: Optional[int] = None
+    max_retries: int = 2
+    words_per_text: int = 12
+    seed: int = 0
+    batch_polls: int = 1
+
+
+# ============================================================================
+# Generated values
+# ============================================================================
+
+
+def request_digest(*parts: Any) -> str:
+    """Stable hash of the parts of a request that determine its answer."""
+    encoded = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def sample_from_schema(
+    schema: Dict[str, Any],
+    digest: str,
+    words_per_text: int = 12,
+    path: str = "",
+    defs: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """
+    Value matching a JSON schema, derived deterministically from ``digest``.
+
+    Supports the subset pydantic emits: objects, arrays, strings, numbers
+    with bounds, booleans, enums, ``anyOf`` (Optional) and ``$ref``.
+    """
+    if defs is None:
+        defs = schema.get("$defs", {})
+    if "$ref" in schema:
+        schema = defs[schema["$ref"].rsplit("/", 1)[-1]]
+
+    name = path.rsplit(".", 1)[-1]
+    rng = random.Random(f"{digest}:{path}")
+
+    if name in FIELD_VALUES:
+        value = FIELD_VALUES[name]
+        return list(value) if isinstance(value, list) else value
+    if name in FIELD_CHOICES and schema.get("type", "string") == "string":
+        return rng.choice(FIELD_CHOICES[name])
+
+    if "anyOf" in schema:
+        options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+        return sample_from_schema(options[0], digest, words_per_text, path, defs)
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if "const" in schema:
+        return schema["const"]
+
+    kind = schema.get("type", "object")
+    if kind == "object":
+        return {
+            key: sample_from_schema(value, digest, words_per_text, f"{path}.{key}", defs)
+            for key, value in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        count = max(schema.get("minItems", 1), 1 + rng.randrange(3))
+        return [
+            sample_from_schema(schema.get("items", {}), digest, words_per_text, f"{path}.{i}", defs)
+            for i in range(count)
+        ]
+    if kind == "boolean":
+        return rng.random() < 0.6
+    if kind in ("number", "integer"):
+        low = schema.get("minimum", schema.get("exclusiveMinimum", 0))
+        high = schema.get("maximum", schema.get("exclusiveMaximum", 100))
+        if kind == "integer":
+            return rng.randint(int(low), int(high))
+        return round(low + (high - low) * rng.uniform(0.5, 0.95), 3)
+    return " ".join(rng.choice(WORDS) for _ in range(words_per_text)).capitalize() + "."
+
+
+def sample_model(model: Type, digest: str, words_per_text: int = 12):
+    """Instance of a pydantic model with values derived from ``digest``."""
+    return model.model_validate(
+        sample_from_schema(model.model_json_schema(), digest, words_per_text)
+    )
+
+
+def stub_embedding(text: str, dimension: int, seed: int = 0) -> List[float]:
+    """
+    Unit vector derived from the text.
+
+    Texts sharing words get similar vectors (a hashed bag of words), so
+    similarity retrieval still ranks related sections first. Like real
+    embeddings, unrelated texts keep a baseline similarity
+    (EMBEDDING_BASELINE_SIMILARITY) instead of being orthogonal.
+    """
+    words = np.zeros(dimension)
+    for word in (text or "").lower().split():
+        digest = hashlib.blake2b(f"{seed}:{word}".encode("utf-8"), digest_size=8).digest()
+        index = 1 + int.from_bytes(digest[:4], "little") % (dimension - 1)
+        words[index] += 1.0 if digest[4] & 1 else -1.0
+    norm = np.linalg.norm(words)
+    if norm:
+        words /= norm
+
+    shared = np.zeros(dimension)
+    shared[0] = 1.0
+    vector = (
+        np.sqrt(EMBEDDING_BASELINE_SIMILARITY) * shared
+        + np.sqrt(1 - EMBEDDING_BASELINE_SIMILARITY) * words
+    )
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def _aspect_schemas():
+    """First prompt line of each code analysis aspect -> expected pydantic model."""
+    from webApp.services import pydantic_schemas as schemas
+    from webApp.services.nodes.reproducibility_aspects import REPRODUCIBILITY_ASPECTS
+
+    models = {
+        "methodology": schemas.ResearchMethodologyAnalysis,
+        "structure": schemas.RepositoryStructureAnalysis,
+        "components": schemas.CodeAvailabilityAnalysis,
+        "artifacts": schemas.ArtifactsAnalysis,
+        "dataset_splits": schemas.DatasetSplitsAnalysis,
+        "documentation": schemas.ReproducibilityDocumentation,
+    }
+    return {
+        aspect.analysis_prompt_template.strip().splitlines()[0]: models[aspect_id]
+        for aspect_id, aspect in REPRODUCIBILITY_ASPECTS.items()
+        if aspect_id in models
+    }
+
+
+# ============================================================================
+# Client
+# ============================================================================
+
+
+class _Endpoint:
+    def __init__(self, **methods):
+        for name, method in methods.items():
+            setattr(self, name, method)
+
+
+class StubOpenAI:
+    """
+    OpenAI client stand-in (see module docstring).
+
+    Usage:
+        client = StubOpenAI(StubLLMConfig(latency_seconds=0.5, rpm=500))
+        with override_openai_client(client):
+            await execute_workflow(paper_id)
+        client.stats  # requests, tokens, rate-limit retries per endpoint
+    """
+
+    def __init__(self, config: Optional[StubLLMConfig] = None):
+        self.config = config or StubLLMConfig()
+        self.chat = SimpleNamespace(
+            completions=_Endpoint(create=self._chat_create, parse=self._chat_parse)
+        )
+        self.responses = _Endpoint(create=self._responses_create, parse=self._responses_parse)
+        self.embeddings = _Endpoint(create=self._embeddings_create)
+        self.files = _Endpoint(create=self._files_create, content=self._files_content)
+        self.batches = _Endpoint(
+            create=self._batches_create, retrieve=self._batches_retrieve, cancel=self._batches_cancel
+        )
+
+        self._lock = threading.Lock()
+        self._window = deque()  # (timestamp, tokens) of the last minute
+        self._aspects = None
+        self._files: Dict[str, bytes] = {}
+        self._batches: Dict[str, SimpleNamespace] = {}
+        self._prefixes = set()  # digests of chat prefixes seen so far
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    # ------------------------------------------------------------------
+    # Accounting and simulated limits
+    # ------------------------------------------------------------------
+
+    def _count(self, endpoint: str, **values: int):
+        with self._lock:
+            entry = self.stats.setdefault(
+                endpoint,
+                {
+                    "requests": 0,
+                    "input_tokens": 0,
+                    "cached_tokens": 0,
+                    "output_tokens": 0,
+                    "retries": 0,
+                    "rate_limited": 0,
+                },
+            )
+            for key, value in values.items():
+                entry[key] += value
+
+    def _cached_tokens(self, model: str, messages) -> int:
+        """Prompt tokens of a chat request served from the simulated prompt cache."""
+        leading = list(messages or [])[:-1]
+        if not leading:
+            return 0
+        tokens = count_tokens(json.dumps(leading, default=str, ensure_ascii=False))
+        if tokens < PROMPT_CACHE_MIN_TOKENS:
+            return 0
+        digest = request_digest(model, leading)
+        with self._lock:
+            seen = digest in self._prefixes
+            self._prefixes.add(digest)
+        if not seen:
+            return 0
+        cached = tokens - tokens % PROMPT_CACHE_INCREMENT
+        self._count("chat.completions", cached_tokens=cached)
+        return cached
+
+    def _retry_after(self, tokens: int) -> float:
+        """Seconds until the request fits the RPM/TPM window (0 if it fits now)."""
+        now = time.monotonic()
+        while self._window and now - self._window[0][0] >= 60:
+            self._window.popleft()
+        over_rpm = self.config.rpm is not None and len(self._window) >= self.config.rpm
+        over_tpm = (
+            self.config.tpm is not None
+            and self._window
+            and sum(used for _, used in self._window) + tokens > self.config.tpm
+        )
+        if over_rpm or over_tpm:
+            return max(60 - (now - self._window[0][0]), 0.001)
+        self._window.append((now, tokens))
+        return 0.0
+
+    def _admit(self, endpoint: str, tokens: int):
+        """Wait for the simulated provider limits, raising a 429 when retries run out."""
+        if self.config.rpm is None and self.config.tpm is None:
+            return
+        for attempt in range(self.config.max_retries + 1):
+            with self._lock:
+                retry_after = self._retry_after(tokens)
+            if not retry_after:
+                return
+            if attempt == self.config.max_retries:
+                break
+            self._count(endpoint, retries=1)
+            time.sleep(retry_after)
+
+        self._count(endpoint, rate_limited=1)
+        import httpx
+        import openai
+
+        request = httpx.Request("POST", f"https://api.openai.com/v1/{endpoint.replace('.', '/')}")
+        response = httpx.Response(
+            429, request=request, headers={"retry-after": f"{retry_after:.3f}"}
+        )
+        raise openai.RateLimitError(
+            f"Rate limit reached for requests (stub, retry after {retry_after:.1f}s)",
+            response=response,
+            body=None,
+        )
+
+    def _respond(self, endpoint: str, request: Any, schema: Any, model_class: Optional[Type]):
+        """Generate the output of a chat/responses request and simulate its cost."""
+        prompt = json.dumps(request, default=str, ensure_ascii=False)
+        input_tokens = count_tokens(prompt)
+        self._admit(endpoint, input_tokens)
+
+        digest = request_digest(self.config.seed, request)
+        if model_class is not None:
+            parsed = sample_model(model_class, digest, self.config.words_per_text)
+            content = parsed.model_dump_json()
+        elif schema is not None:
+            parsed = None
+            content = json.dumps(sample_from_schema(schema, digest, self.config.words_per_text))
+        else:
+            parsed = None
+            content = sample_from_schema({"type": "string"}, digest, self.config.words_per_text)
+
+        output_tokens = count_tokens(content)
+        latency = self.config.latency_seconds + output_tokens * self.config.seconds_per_output_token
+        if latency > 0:
+            time.sleep(latency)
+
+        self._count(endpoint, requests=1, input_tokens=input_tokens, output_tokens=output_tokens)
+        return parsed, content, input_tokens, output_tokens
+
+    # ------------------------------------------------------------------
+    # Structured output schemas
+    # ------------------------------------------------------------------
+
+    def _json_object_schema(self, messages) -> Dict[str, Any]:
+        """Schema of a ``json_object`` request, recognised from its prompt."""
+        if self._aspects is None:
+            self._aspects = _aspect_schemas()
+        for message in messages or []:
+            content = message.get("content") if isinstance(message, dict) else None
+            if not isinstance(content, str):
+                continue
+            first_line = content.strip().splitlines()[0] if content.strip() else ""
+            if first_line in self._aspects:
+                return self._aspects[first_line].model_json_schema()
+            if "overall_assessment" in content:
+                return {"type": "object", "properties": {"overall_assessment": {"type": "string"}}}
+        return {"type": "object", "properties": {}}
+
+    def _chat_schema(self, response_format) -> Any:
+        if isinstance(response_format, dict):
+            if response_format.get("type") == "json_schema":
+                return response_format["json_schema"]["schema"]
+        return None
+
+    # ------------------------------------------------------------------
+    # Endpoints
+    # ------------------------------------------------------------------
+
+    def _chat_completion(self, parsed, content, input_tokens, output_tokens, model, cached_tokens=0):
+        message = SimpleNamespace(role="assistant", content=content, parsed=parsed, refusal=None)
+        return SimpleNamespace(
+            id=f"chatcmpl-stub-{request_digest(content)[:12]}",
+            model=model,
+            choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+            usage=SimpleNamespace(
+                prompt_tokens=input_tokens,
+                completion_tokens=output_tokens,
+                total_tokens=input_tokens + output_tokens,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=min(cached_tokens, input_tokens)),
+            ),
+        )
+
+    def _chat_create(self, *, model: str, messages, response_format=None, **kwargs):
+        schema = self._chat_schema(response_format)
+        if schema is None and isinstance(response_format, dict) and response_format.get("type") == "json_object":
+            schema = self._json_object_schema(messages)
+        request = {"model": model, "messages": messages, "response_format": response_format}
+        _, content, input_tokens, output_tokens = self._respond(
+            "chat.completions", request, schema, None
+        )
+        cached_tokens = self._cached_tokens(model, messages)
+        return self._chat_completion(None, content, input_tokens, output_tokens, model, cached_tokens)
+
+    def _chat_parse(self, *, model: str, messages, response_format=None, **kwargs):
+        request = {"model": model, "messages": messages, "schema": getattr(response_format, "__name__", None)}
+        parsed, content, input_tokens, output_tokens = self._respond(
+            "chat.completions", request, None, response_format
+        )
+        cached_tokens = self._cached_tokens(model, messages)
+        return self._chat_completion(parsed, content, input_tokens, output_tokens, model, cached_tokens)
+
+    def _response(self, parsed, content, input_tokens, output_tokens, model):
+        return SimpleNamespace(
+            id=f"resp-stub-{request_digest(content)[:12]}",
+            model=model,
+            status="completed",
+            output_text=content,
+            output_parsed=parsed,
+            usage=SimpleNamespace(
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                total_tokens=input_tokens + output_tokens,
+            ),
+        )
+
+    def _responses_create(self, *, model: str, input=None, text=None, **kwargs):
+        schema = None
+        if isinstance(text, dict) and text.get("format", {}).get("type") == "json_schema":
+            schema = text["format"]["schema"]
+        request = {"model": model, "input": input, "instructions": kwargs.get("instructions")}
+        _, content, input_tokens, output_tokens = self._respond("responses", request, schema, None)
+        return self._response(None, content, input_tokens, output_tokens, model)
+
+    def _responses_parse(self, *, model: str, input=None, text_format=None, **kwargs):
+        request = {
+            "model": model,
+            "input": input,
+            "instructions": kwargs.get("instructions"),
+            "schema": getattr(text_format, "__name__", None),
+        }
+        parsed, content, input_tokens, output_tokens = self._respond(
+            "responses", request, None, text_format
+        )
+        return self._response(parsed, content, input_tokens, output_tokens, model)
+
+    def _embeddings_create(self, *, model: str, input, **kwargs):
+        texts = [input] if isinstance(input, str) else list(input)
+        tokens = sum(count_tokens(text) for text in texts)
+        self._admit("embeddings", tokens)
+        if self.config.embedding_latency_seconds > 0:
+            time.sleep(self.config.embedding_latency_seconds)
+
+        data = [
+            SimpleNamespace(
+                index=i,
+                object="embedding",
+                embedding=stub_embedding(text, self.config.embedding_dimension, self.config.seed),
+            )
+            for i, text in enumerate(texts)
+        ]
+        self._count("embeddings", requests=1, input_tokens=tokens)
+        return SimpleNamespace(
+            model=model,
+            data=data,
+            usage=SimpleNamespace(prompt_tokens=tokens, total_tokens=tokens),
+        )
+
+    # ------------------------------------------------------------------
+    # Batch API
+    # ------------------------------------------------------------------
+
+    def _store_file(self, content: bytes, purpose: str) -> SimpleNamespace:
+        with self._lock:
+            file_id = f"file-stub-{len(self._files) + 1}"
+            self._files[file_id] = content
+        return SimpleNamespace(id=file_id, object="file", bytes=len(content), purpose=purpose)
+
+    def _files_create(self, *, file, purpose: str, **kwargs):
+        if isinstance(file, tuple):
+            file = file[1]
+        content = file.read() if hasattr(file, "read") else file
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        return self._store_file(content, purpose)
+
+    def _files_content(self, file_id: str, **kwargs):
+        content = self._files[file_id]
+        return SimpleNamespace(content=content, text=content.decode("utf-8"))
+
+    def _batches_create(self, *, input_file_id: str, endpoint: str, completion_window: str, **kwargs):
+        lines = [line for line in self._files[input_file_id].decode("utf-8").splitlines() if line.strip()]
+        with self._lock:
+            batch = SimpleNamespace(
+                id=f"batch-stub-{len(self._batches) + 1}",
+                object="batch",
+                endpoint=endpoint,
+                completion_window=completion_window,
+                input_file_id=input_file_id,
+                output_file_id=None,
+                error_file_id=None,
+                status="in_progress",
+                errors=None,
+                metadata=kwargs.get("metadata"),
+                request_counts=SimpleNamespace(total=len(lines), completed=0, failed=0),
+                polls=0,
+            )
+            self._batches[batch.id] = batch
+        self._count("batches", requests=1)
+        return batch
+
+    def _batches_retrieve(self, batch_id: str, **kwargs):
+        batch = self._batches[batch_id]
+        if batch.status == "in_progress":
+            batch.polls += 1
+            if batch.polls >= self.config.batch_polls:
+                self._run_batch(batch)
+        return batch
+
+    def _batches_cancel(self, batch_id: str, **kwargs):
+        batch = self._batches[batch_id]
+        if batch.status == "in_progress":
+            batch.status = "cancelled"
+        return batch
+
+    def _run_batch(self, batch: SimpleNamespace):
+        """Answer every line of a batch job and write its output/error files."""
+        outputs, errors = [], []
+        for line in self._files[batch.input_file_id].decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            try:
+                body = self._batch_response(request["url"], dict(request["body"]))
+            except Exception as e:
+                errors.append(
+                    {
+                        "id": f"batch_req_{request_digest(request['custom_id'])[:12]}",
+                        "custom_id": request["custom_id"],
+                        "response": {"status_code": 400, "body": {"error": {"message": str(e)}}},
+                        "error": None,
+                    }
+                )
+                continue
+            outputs.append(
+                {
+                    "id": f"batch_req_{request_digest(request['custom_id'])[:12]}",
+                    "custom_id": request["custom_id"],
+                    "response": {"status_code": 200, "request_id": batch.id, "body": body},
+                    "error": None,
+                }
+            )
+
+        if outputs:
+            batch.output_file_id = self._store_file(
+                "\n".join(json.dumps(entry) for entry in outputs).encode("utf-8"), "batch_output"
+            ).id
+        if errors:
+            batch.error_file_id = self._store_file(
+                "\n".join(json.dumps(entry) for entry in errors).encode("utf-8"), "batch_output"
+            ).id
+        batch.request_counts = SimpleNamespace(
+            total=len(outputs) + len(errors), completed=len(outputs), failed=len(errors)
+        )
+        batch.status = "completed"
+
+    def _batch_response(self, url: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Raw API response body of one batch line."""
+        model = body.get("model")
+        if url == "/v1/chat/completions":
+            response_format = body.get("response_format")
+            schema = self._chat_schema(response_format)
+            if schema is None and isinstance(response_format, dict) and response_format.get("type") == "json_object":
+                schema = self._json_object_schema(body.get("messages"))
+            request = {"model": model, "messages": body.get("messages"), "response_format": response_format}
+            _, content, input_tokens, output_tokens = self._respond("chat.completions", request, schema, None)
+            return {
+                "id": f"chatcmpl-stub-{request_digest(content)[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content, "refusal": None},
+                        "finish_reason": "stop",
+                        "logprobs": None,
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": input_tokens,
+                    "completion_tokens": output_tokens,
+                    "total_tokens": input_tokens + output_tokens,
+                },
+            }
+        if url == "/v1/responses":
+            text = body.get("text")
+            schema = None
+            if isinstance(text, dict) and text.get("format", {}).get("type") == "json_schema":
+                schema = text["format"]["schema"]
+            request = {"model": model, "input": body.get("input"), "instructions": body.get("instructions")}
+            _, content, input_tokens, output_tokens = self._respond("responses", request, schema, None)
+            return {
+                "id": f"resp-stub-{request_digest(content)[:12]}",
+                "object": "response",
+                "created_at": int(time.time()),
+                "model": model,
+                "status": "completed",
+                "output": [
+                    {
+                        "type": "message",
+                        "id": f"msg-stub-{request_digest(content)[:12]}",
+                        "role": "assistant",
+                        "status": "completed",
+                        "content": [{"type": "output_text", "text": content, "annotations": []}],
+                    }
+                ],
+                "parallel_tool_calls": True,
+                "tool_choice": "auto",
+                "tools": [],
+                "usage": {
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens,
+                    "total_tokens": input_tokens + output_tokens,
+                },
+            }
+        raise ValueError(f"Unsupported batch endpoint: {url}")
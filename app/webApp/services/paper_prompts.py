@@ -0,0 +1,155 @@
+"""
+Cache-friendly prompts for per-criterion LLM calls.
+
+OpenAI caches prompt prefixes of 1024+ tokens and bills cached input tokens
+at a discount, with a shorter time to first token. The reproducibility
+checklist and dataset documentation check used to start each of their
+20 + 10 requests per paper with a criterion-specific system prompt, so no
+two requests shared a prefix.
+
+Requests are now assembled as:
+
+1. A paper prefix, identical for every criterion of both nodes: evaluation
+   instructions, the paper title and type, and all of its sections in paper
+   order (up to PREFIX_TOKEN_BUDGET tokens)
+2. A short criterion-specific user message
+
+and carry a per-paper ``prompt_cache_key`` so the provider routes them to
+the same cache. cached_input_tokens() reads the part of a request's input
+served from the cache; nodes record the total on
+WorkflowNode.cached_input_tokens.
+
+Usage:
+    prefix = await apaper_prefix(paper, paper_type)
+    response = await acall(
+        client.chat.completions.parse,
+        model=model,
+        messages=criterion_messages(prefix, criterion_prompt),
+        prompt_cache_key=prefix.cache_key,
+        ...
+    )
+    cached = cached_input_tokens(response.usage)
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from asgiref.sync import sync_to_async
+
+from webApp.models import PaperSectionEmbedding
+from webApp.services.token_counter import count_tokens, token_counter
+
+# Paper text included in the shared prefix; longer papers are truncated
+PREFIX_TOKEN_BUDGET = 24000
+
+# Shared by every criterion request, so it must not name a criterion or node
+EVALUATOR_INSTRUCTIONS = """You are an expert reviewer assessing the reproducibility and documentation of a medical imaging research paper.
+
+The full paper is given below. Each request names a single criterion: assess only that criterion, based on this paper.
+Be precise and evidence-based. Quote specific text when possible."""
+
+
+@dataclass
+class PaperPrefix:
+    """
+    Messages shared by every criterion request for one paper.
+
+    Attributes:
+        messages: Leading messages of each request
+        cache_key: prompt_cache_key of the requests
+        sections: Section rows in paper order, for per-criterion ranking
+        tokens: Tokens of the paper text included
+        truncated: Whether sections were cut to fit PREFIX_TOKEN_BUDGET
+    """
+
+    messages: List[Dict[str, str]]
+    cache_key: str
+    sections: List[Any] = field(default_factory=list)
+    tokens: int = 0
+    truncated: bool = False
+
+
+def load_paper_sections(paper_id: int) -> List[PaperSectionEmbedding]:
+    """Section rows of a paper in the order they were extracted."""
+    return list(PaperSectionEmbedding.objects.filter(paper_id=paper_id).order_by("id"))
+
+
+def paper_prefix(
+    paper,
+    paper_type: str,
+    sections: Sequence[PaperSectionEmbedding],
+    token_budget: int = PREFIX_TOKEN_BUDGET,
+) -> PaperPrefix:
+    """
+    Build the shared prefix of a paper (abstract only if it has no sections).
+
+    Args:
+        paper: Paper instance
+        paper_type: Classified paper type ("unknown" if not classified)
+        sections: Section rows in paper order
+        token_budget: Maximum tokens of paper text
+    """
+    blocks = []
+    used = 0
+    truncated = False
+    for section in sections:
+        remaining = token_budget - used
+        if remaining <= 0:
+            truncated = True
+            break
+        text = section.section_text or ""
+        tokens = count_tokens(text)
+        if tokens > remaining:
+            text = token_counter.truncate(text, remaining) + "... [truncated]"
+            tokens = remaining
+            truncated = True
+        blocks.append(f"=== {section.section_type.upper()} ===\n{text}")
+        used += tokens
+
+    if not blocks:
+        abstract = paper.abstract or "N/A"
+        blocks.append(f"=== ABSTRACT ===\n{abstract}")
+        used = count_tokens(abstract)
+
+    content = (
+        f"{EVALUATOR_INSTRUCTIONS}\n\n"
+        f"Paper Title: {paper.title}\n"
+        f"Paper Type: {paper_type}\n\n"
+        f"Paper Sections:\n\n" + "\n\n".join(blocks)
+    )
+    return PaperPrefix(
+        messages=[{"role": "system", "content": content}],
+        cache_key=f"paper-{paper.id}",
+        sections=list(sections),
+        tokens=used,
+        truncated=truncated,
+    )
+
+
+async def apaper_prefix(paper, paper_type: str) -> PaperPrefix:
+    """Load a paper's sections and build its shared prefix."""
+    sections = await sync_to_async(load_paper_sections)(paper.id)
+    return paper_prefix(paper, paper_type, sections)
+
+
+def criterion_messages(prefix: PaperPrefix, prompt: str) -> List[Dict[str, str]]:
+    """Messages of one criterion request: the shared prefix, then ``prompt``."""
+    return [*prefix.messages, {"role": "user", "content": prompt}]
+
+
+def format_section_hint(ranked: Sequence[Tuple[float, str]]) -> str:
+    """Line pointing a criterion request at its most similar sections."""
+    if not ranked:
+        return "Most relevant sections: none stood out, consider the whole paper"
+    return "Most relevant sections: " + ", ".join(
+        f"{section_type.upper()} (similarity: {similarity:.3f})"
+        for similarity, section_type in ranked
+    )
+
+
+def cached_input_tokens(usage: Optional[Any]) -> int:
+    """Input tokens of a chat or responses request served from the prompt cache."""
+    details = getattr(usage, "prompt_tokens_details", None) or getattr(
+        usage, "input_tokens_details", None
+    )
+    return getattr(details, "cached_tokens", None) or 0
@@ -0,0 +1,211 @@
+"""
+Ranked full-text search over papers.
+
+Papers are indexed on title, authors, abstract and full text by the
+database itself, so every save (scraper, uploads, admin, bulk updates) is
+reflected immediately without a separate indexing step:
+
+- MySQL/MariaDB: a FULLTEXT index queried with MATCH ... AGAINST in
+  boolean mode (all terms required, the last one matched as a prefix for
+  search-as-you-type)
+- SQLite (development and tests): an external-content FTS5 table kept in
+  sync by triggers, ranked with bm25()
+
+Both are created by migration 0031_paper_search_index; ensure_search_index()
+restores them after migrations that rebuild the paper table. Other backends
+fall back to unranked icontains filtering.
+
+Usage:
+    papers = search_papers("graph neural segmentation", Paper.objects.filter(conference=c))
+    for paper in papers[:20]:
+        print(paper.title, paper.search_rank)
+"""
+
+import re
+from typing import List, Optional
+
+from django.db import connection
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+from webApp.models import Paper
+
+# Columns covered by the index, in index order (MATCH must list them all)
+SEARCH_COLUMNS = ("title", "authors", "abstract", "text")
+
+FULLTEXT_INDEX_NAME = "webapp_paper_search"
+FTS_TABLE_NAME = "webApp_paper_fts"
+
+# bm25() column weights on SQLite, in SEARCH_COLUMNS order
+FTS_COLUMN_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+# InnoDB ignores shorter words (innodb_ft_min_token_size)
+MIN_TERM_LENGTH = 3
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+_DOI = re.compile(r"^10\.\d{4,}/\S*$")
+
+
+# ============================================================================
+# Index maintenance
+# ============================================================================
+
+
+def ensure_search_index(using=None) -> bool:
+    """
+    Create the full-text index for the connection's backend if it is missing.
+
+    Idempotent. On SQLite this also restores the sync triggers, which are
+    lost whenever a migration rebuilds the paper table.
+
+    Returns:
+        True if the index had to be (re)created
+    """
+    conn = using or connection
+    table = Paper._meta.db_table
+
+    if conn.vendor == "mysql":
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+                [table, FULLTEXT_INDEX_NAME],
+            )
+            if cursor.fetchone():
+                return False
+            columns = ", ".join(f"`{column}`" for column in SEARCH_COLUMNS)
+            cursor.execute(
+                f"ALTER TABLE `{table}` ADD FULLTEXT INDEX `{FULLTEXT_INDEX_NAME}` ({columns})"
+            )
+        return True
+
+    if conn.vendor == "sqlite":
+        columns = ", ".join(SEARCH_COLUMNS)
+        new_values = ", ".join(f"new.{column}" for column in SEARCH_COLUMNS)
+        old_values = ", ".join(f"old.{column}" for column in SEARCH_COLUMNS)
+        delete_old = (
+            f"INSERT INTO {FTS_TABLE_NAME}({FTS_TABLE_NAME}, rowid, {columns}) "
+            f"VALUES ('delete', old.id, {old_values});"
+        )
+        insert_new = (
+            f"INSERT INTO {FTS_TABLE_NAME}(rowid, {columns}) VALUES (new.id, {new_values});"
+        )
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+                [f"{FTS_TABLE_NAME}_%"],
+            )
+            if cursor.fetchone()[0] == 3:
+                return False
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE_NAME} USING fts5("
+                f"{columns}, content='{table}', content_rowid='id', "
+                f"tokenize='unicode61 remove_diacritics 2')"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE_NAME}_ai AFTER INSERT ON {table} "
+                f"BEGIN {insert_new} END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE_NAME}_ad AFTER DELETE ON {table} "
+                f"BEGIN {delete_old} END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE_NAME}_au AFTER UPDATE OF {columns} "
+                f"ON {table} BEGIN {delete_old} {insert_new} END"
+            )
+            # Re-index everything written while the triggers were missing
+            cursor.execute(f"INSERT INTO {FTS_TABLE_NAME}({FTS_TABLE_NAME}) VALUES ('rebuild')")
+        return True
+
+    return False
+
+
+def drop_search_index(using=None) -> None:
+    """Remove the full-text index created by ensure_search_index()."""
+    conn = using or connection
+    table = Paper._meta.db_table
+    with conn.cursor() as cursor:
+        if conn.vendor == "mysql":
+            cursor.execute(f"ALTER TABLE `{table}` DROP INDEX `{FULLTEXT_INDEX_NAME}`")
+        elif conn.vendor == "sqlite":
+            for suffix in ("ai", "ad", "au"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE_NAME}_{suffix}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE_NAME}")
+
+
+# ============================================================================
+# Querying
+# ============================================================================
+
+
+def search_terms(query: str) -> List[str]:
+    """Split a user query into index terms (operators and punctuation dropped)."""
+    return [term for term in _TERM.findall(query.lower()) if len(term) >= MIN_TERM_LENGTH]
+
+
+def search_papers(query: str, queryset: Optional[QuerySet] = None) -> QuerySet:
+    """
+    Papers matching a query, best matches first.
+
+    DOIs (and DOI prefixes) are looked up on the indexed doi column instead
+    of the text index.
+
+    Args:
+        query: User search string
+        queryset: Paper queryset to restrict the search to
+
+    Returns:
+        Queryset annotated with ``search_rank`` and ordered by it
+    """
+    queryset = Paper.objects.all() if queryset is None else queryset
+    query = query.strip()
+    if not query:
+        return queryset.none()
+
+    if _DOI.match(query):
+        return (
+            queryset.filter(doi__istartswith=query)
+            .annotate(search_rank=RawSQL("1", ()))
+            .order_by("doi")
+        )
+
+    terms = search_terms(query)
+    vendor = connection.vendor
+
+    if terms and vendor == "mysql":
+        boolean_query = " ".join(f"+{term}" for term in terms[:-1]) + f" +{terms[-1]}*"
+        columns = ", ".join(f"`{Paper._meta.db_table}`.`{column}`" for column in SEARCH_COLUMNS)
+        rank = RawSQL(f"MATCH({columns}) AGAINST (%s IN BOOLEAN MODE)", (boolean_query,))
+        return (
+            queryset.annotate(search_rank=rank)
+            .filter(search_rank__gt=0)
+            .order_by("-search_rank", "title")
+        )
+
+    if terms and vendor == "sqlite":
+        fts_query = " ".join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+        table = Paper._meta.db_table
+        matches = f"SELECT rowid FROM {FTS_TABLE_NAME} WHERE {FTS_TABLE_NAME} MATCH %s"
+        weights = ", ".join(str(weight) for weight in FTS_COLUMN_WEIGHTS)
+        rank = RawSQL(
+            f"(SELECT -bm25({FTS_TABLE_NAME}, {weights}) FROM {FTS_TABLE_NAME} "
+            f'WHERE {FTS_TABLE_NAME} MATCH %s AND rowid = "{table}"."id")',
+            (fts_query,),
+        )
+        return (
+            queryset.filter(id__in=RawSQL(matches, (fts_query,)))
+            .annotate(search_rank=rank)
+            .order_by("-search_rank", "title")
+        )
+
+    # No index available (or only very short words): unranked substring match
+    return (
+        queryset.filter(
+            Q(title__icontains=query)
+            | Q(doi__icontains=query)
+            | Q(authors__icontains=query)
+        )
+        .annotate(search_rank=RawSQL("0", ()))
+        .order_by("title")
+    )
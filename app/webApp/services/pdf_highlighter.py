@@ -0,0 +1,186 @@
+"""
+Evidence highlighting for paper PDFs.
+
+The text of the document is extracted once (words with their positions) and
+all evidence strings are located in a single pass over it: every evidence
+fragment is indexed by its word shingles, and each shingle seen in the
+document votes for the position where the fragment would start. A fragment
+is matched where it collects the most votes, which finds exact quotes as well
+as quotes that differ slightly from the PDF text (hyphenation, ligatures,
+small LLM paraphrases) without a per-page search for every evidence string.
+
+Fragments shorter than a shingle (a single term or figure) cannot be placed
+by votes; they are searched for verbatim on every page instead.
+"""
+
+import hashlib
+import json
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import pymupdf
+
+# Bump when matching changes so cached outputs are regenerated
+HIGHLIGHTER_VERSION = 2
+
+# Words per shingle used for indexing fragments
+SHINGLE_SIZE = 3
+
+# Minimum fraction of a fragment's shingles found in place for a match
+MIN_MATCH_SCORE = 0.6
+
+_QUOTED = re.compile(r"[\"“”]([^\"“”]{12,})[\"“”]")
+_TRUNCATED = re.compile(r"(\.\.\.|…)?\s*\[truncated\]\s*$", re.IGNORECASE)
+_WORD = re.compile(r"\w+")
+
+
+def normalize_words(text: str) -> List[str]:
+    """Lowercase alphanumeric words with ligatures and accents folded."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return _WORD.findall(text.lower())
+
+
+def evidence_fragments(evidence_text: str) -> List[str]:
+    """
+    Split an evidence string into the fragments worth searching for.
+
+    Evidence usually quotes the paper ("...") with commentary around the
+    quotes; only the quoted parts are searched when there are any.
+    """
+    quoted = [_TRUNCATED.sub("", match).strip() for match in _QUOTED.findall(evidence_text)]
+    quoted = [fragment for fragment in quoted if fragment]
+    if quoted:
+        return quoted
+    return [_TRUNCATED.sub("", evidence_text).strip().strip("\"“”")]
+
+
+def evidence_hash(evidence: Sequence[Dict]) -> str:
+    """Stable hash of an evidence set (texts and colors) for output caching."""
+    payload = json.dumps(
+        {"version": HIGHLIGHTER_VERSION, "evidence": sorted(
+            [item["text"], list(item["color"])] for item in evidence
+        )},
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class EvidenceMatcher:
+    """
+    Locates many text fragments in a sequence of document words at once.
+
+    Usage:
+        matcher = EvidenceMatcher(["first quote", "second quote"])
+        spans = matcher.match(document_words)  # {fragment index: (start, end)}
+    """
+
+    def __init__(self, fragments: Iterable[str], min_score: float = MIN_MATCH_SCORE):
+        self.min_score = min_score
+        self.fragments: List[List[str]] = [normalize_words(f) for f in fragments]
+        self._index: Dict[Tuple[str, ...], List[Tuple[int, int]]] = defaultdict(list)
+        for fragment_id, words in enumerate(self.fragments):
+            # Shorter fragments are too ambiguous to place reliably
+            for offset in range(len(words) - SHINGLE_SIZE + 1):
+                shingle = tuple(words[offset : offset + SHINGLE_SIZE])
+                self._index[shingle].append((fragment_id, offset))
+
+    def match(self, words: Sequence[str]) -> Dict[int, Tuple[int, int]]:
+        """
+        Find the best placement of every fragment in ``words``.
+
+        Returns:
+            {fragment index: (start, end)} word spans for matched fragments
+        """
+        votes: Dict[int, Counter] = defaultdict(Counter)
+        for position in range(len(words) - SHINGLE_SIZE + 1):
+            candidates = self._index.get(tuple(words[position : position + SHINGLE_SIZE]))
+            if not candidates:
+                continue
+            for fragment_id, offset in candidates:
+                votes[fragment_id][position - offset] += 1
+
+        spans = {}
+        for fragment_id, starts in votes.items():
+            length = len(self.fragments[fragment_id])
+            start, hits = starts.most_common(1)[0]
+            if hits / (length - SHINGLE_SIZE + 1) < self.min_score:
+                continue
+            spans[fragment_id] = (max(start, 0), min(start + length, len(words)))
+        return spans
+
+
+def highlight_pdf(input_path: str, evidence: Sequence[Dict]) -> Tuple[bytes, int]:
+    """
+    Highlight evidence in a PDF.
+
+    Args:
+        input_path: Path of the source PDF
+        evidence: [{"text": evidence string, "color": (r, g, b)}, ...]
+
+    Returns:
+        (highlighted PDF bytes, number of evidence items found)
+    """
+    fragments, owners = [], []
+    for item_id, item in enumerate(evidence):
+        for fragment in evidence_fragments(item["text"]):
+            fragments.append(fragment)
+            owners.append(item_id)
+
+    doc = pymupdf.open(input_path)
+    try:
+        # One text extraction for the whole document: normalized words with
+        # the page and line each came from
+        words, places = [], []
+        for page in doc:
+            for x0, y0, x1, y1, text, block, line, _ in page.get_text("words"):
+                rect = pymupdf.Rect(x0, y0, x1, y1)
+                for word in normalize_words(text):
+                    words.append(word)
+                    places.append((page.number, block, line, rect))
+
+        spans = EvidenceMatcher(fragments).match(words)
+
+        found_items = set()
+        for fragment_id, fragment in enumerate(fragments):
+            if 0 < len(normalize_words(fragment)) < SHINGLE_SIZE:
+                if _highlight_exact(doc, fragment, evidence[owners[fragment_id]]["color"]):
+                    found_items.add(owners[fragment_id])
+
+        for fragment_id, (start, end) in spans.items():
+            color = evidence[owners[fragment_id]]["color"]
+            found_items.add(owners[fragment_id])
+
+            # One highlight rectangle per text line covered by the span
+            lines: Dict[Tuple[int, int, int], pymupdf.Rect] = {}
+            for page_number, block, line, rect in places[start:end]:
+                key = (page_number, block, line)
+                lines[key] = lines[key] | rect if key in lines else pymupdf.Rect(rect)
+
+            by_page = defaultdict(list)
+            for (page_number, _, _), rect in lines.items():
+                by_page[page_number].append(rect)
+            for page_number, rects in by_page.items():
+                # Keep a reference to the page while its annotation is used
+                page = doc[page_number]
+                annot = page.add_highlight_annot(rects)
+                annot.set_colors(stroke=color)
+                annot.update()
+
+        return doc.tobytes(garbage=1, deflate=True), len(found_items)
+    finally:
+        doc.close()
+
+
+def _highlight_exact(doc, fragment: str, color) -> bool:
+    """Highlight every verbatim occurrence of a short fragment; True if any was found."""
+    found = False
+    for page in doc:
+        for rect in page.search_for(fragment):
+            annot = page.add_highlight_annot(rect)
+            annot.set_colors(stroke=color)
+            annot.update()
+            found = True
+    return found
@@ -0,0 +1,422 @@
+"""
+Provider-aware LLM rate limiting.
+
+A token bucket per LLMModelConfig, stored in the database so every web and
+Celery worker process draws from the same TPM/RPM budget. Before each call
+the estimated prompt size (plus any requested output cap) is reserved; once
+the response arrives the reservation is reconciled with the real ``usage``.
+
+Callers that overdraw a bucket sleep until it has refilled, instead of
+bursting into provider 429s. Coroutines (the workflow nodes) call endpoints
+through acall(), which waits with asyncio.sleep() and runs the request in a
+thread, so a node waiting for budget does not stall the other LangGraph
+branches on its event loop. The time spent waiting is added to the
+WorkflowNode that made the call (see node_scope()), and the calls themselves
+are timed as ``llm``/``embedding`` spans (see webApp.services.spans).
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from webApp.models import LLMModelConfig, LLMRateLimitBucket
+from webApp.services.spans import collect_spans, save_node_spans, span
+from workflow_engine.models import WorkflowNode
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio used for pre-call estimates
+CHARS_PER_TOKEN = 4
+
+# How long model -> limits lookups are cached in-process
+LIMITS_CACHE_SECONDS = 60
+
+# (workflow_run_id, node_id) of the node currently issuing LLM calls
+_current_node: ContextVar[Optional[Tuple[str, str]]] = ContextVar(
+    "rate_limit_current_node", default=None
+)
+
+# Synchronous calls made on an event loop thread (outside acall()) cannot use
+# the ORM there, so their DB work is handed off here.
+_db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rate-limiter-db")
+
+
+def _run_db(fn, *args):
+    """Run a DB callable, off the event loop thread if one is running."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return fn(*args)
+    return _db_executor.submit(_run_and_close, fn, *args).result()
+
+
+def _run_and_close(fn, *args):
+    """Run a DB callable on the executor thread without keeping its connection open."""
+    try:
+        return fn(*args)
+    finally:
+        close_old_connections()
+
+
+@contextmanager
+def node_scope(workflow_run_id: str, node_id: str):
+    """
+    Attribute rate-limiter wait time and spans of the block to a node.
+
+    Yields:
+        SpanCollector of the block (see run_scoped() to also store it)
+
+    Usage:
+        with node_scope(state["workflow_run_id"], "paper_type_classification"):
+            result = await paper_type_classification_node(state)
+    """
+    token = _current_node.set((str(workflow_run_id), node_id))
+    try:
+        with collect_spans(workflow_run_id, node_id) as collector:
+            yield collector
+    finally:
+        _current_node.reset(token)
+
+
+def current_node() -> Optional[Tuple[str, str]]:
+    """(workflow_run_id, node_id) of the enclosing node_scope(), if any."""
+    return _current_node.get()
+
+
+async def run_scoped(workflow_run_id: str, node_id: str, coro):
+    """
+    Await a node coroutine in node_scope() and store its spans on the node.
+
+    Usage:
+        result = await run_scoped(run_id, node_id, self._execute_node_function(node_id, state))
+    """
+    with node_scope(workflow_run_id, node_id) as collector:
+        result = await coro
+    spans = collector.summary()
+    if spans:
+        try:
+            await sync_to_async(save_node_spans)(str(workflow_run_id), node_id, spans)
+        except Exception as e:
+            # Instrumentation must never fail the node
+            logger.warning(f"Failed to store spans of node {node_id}: {e}")
+    return result
+
+
+def scoped_node(node_id: str, node_fn):
+    """Wrap a LangGraph node function so it runs in run_scoped()."""
+
+    async def wrapper(state):
+        return await run_scoped(state["workflow_run_id"], node_id, node_fn(state))
+
+    wrapper.__name__ = getattr(node_fn, "__name__", node_id)
+    wrapper.__doc__ = getattr(node_fn, "__doc__", None)
+    return wrapper
+
+
+# ============================================================================
+# Token accounting helpers
+# ============================================================================
+
+
+def estimate_request_tokens(request: Dict[str, Any]) -> int:
+    """
+    Estimate the tokens a request will count against the provider's TPM limit.
+
+    Providers charge the prompt plus the requested output cap at admission,
+    so both are included when the cap is given.
+    """
+    prompt_parts = [
+        request.get(key)
+        for key in ("messages", "input", "instructions")
+        if request.get(key) is not None
+    ]
+    prompt_chars = len(json.dumps(prompt_parts, default=str, ensure_ascii=False))
+    output_cap = (
+        request.get("max_completion_tokens")
+        or request.get("max_output_tokens")
+        or request.get("max_tokens")
+        or 0
+    )
+    return max(prompt_chars // CHARS_PER_TOKEN, 1) + int(output_cap)
+
+
+def usage_tokens(response: Any) -> Optional[int]:
+    """Total tokens billed for a chat, responses or embeddings API response."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    total = getattr(usage, "total_tokens", None)
+    if total is not None:
+        return total
+    prompt = getattr(usage, "input_tokens", None) or getattr(usage, "prompt_tokens", 0)
+    completion = getattr(usage, "output_tokens", None) or getattr(
+        usage, "completion_tokens", 0
+    )
+    return (prompt or 0) + (completion or 0)
+
+
+# ============================================================================
+# Rate limiter
+# ============================================================================
+
+
+class LLMRateLimiter:
+    """
+    Shared token-bucket limiter keyed by LLMModelConfig.
+
+    Reservations are taken under a row lock on the bucket, so the queue is
+    effectively FIFO across processes: each caller is told how long to wait
+    for the budget it just claimed.
+    """
+
+    def __init__(self):
+        self._limits_cache: Dict[str, Tuple[float, Optional[Tuple[int, Optional[int], Optional[int]]]]] = {}
+        self._lock = threading.Lock()
+
+    def get_limits(self, model: str) -> Optional[Tuple[int, Optional[int], Optional[int]]]:
+        """
+        Look up (config_id, tokens_per_minute, requests_per_minute) for a model.
+
+        Returns:
+            None if no active configuration sets a limit for this model
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._limits_cache.get(model)
+        if cached and now - cached[0] < LIMITS_CACHE_SECONDS:
+            return cached[1]
+
+        limits = _run_db(self._load_limits, model)
+        with self._lock:
+            self._limits_cache[model] = (now, limits)
+        return limits
+
+    @staticmethod
+    def _load_limits(model: str):
+        return (
+            LLMModelConfig.objects.filter(model=model, is_active=True)
+            .filter(Q(tokens_per_minute__isnull=False) | Q(requests_per_minute__isnull=False))
+            .order_by("pk")
+            .values_list("id", "tokens_per_minute", "requests_per_minute")
+            .first()
+        )
+
+    def reserve(self, model: str, tokens: int) -> Tuple[float, int]:
+        """
+        Reserve budget for one request.
+
+        Args:
+            model: Model name used in the API call
+            tokens: Estimated tokens for the request
+
+        Returns:
+            (seconds to wait before sending, tokens actually charged)
+        """
+        limits = self.get_limits(model)
+        if not limits:
+            return 0.0, 0
+        return _run_db(self._reserve, limits, tokens)
+
+    @staticmethod
+    def _reserve(limits, tokens: int) -> Tuple[float, int]:
+        config_id, tpm, rpm = limits
+        now = timezone.now()
+
+        with transaction.atomic():
+            bucket, _ = LLMRateLimitBucket.objects.select_for_update().get_or_create(
+                config_id=config_id,
+                defaults={
+                    "available_tokens": tpm or 0,
+                    "available_requests": rpm or 0,
+                    "refilled_at": now,
+                },
+            )
+            elapsed = max((now - bucket.refilled_at).total_seconds(), 0.0)
+
+            wait = 0.0
+            charged = 0
+            if tpm:
+                # A single request larger than the bucket would never fit
+                charged = min(tokens, tpm)
+                level = min(tpm, bucket.available_tokens + elapsed * tpm / 60) - charged
+                bucket.available_tokens = level
+                if level < 0:
+                    wait = max(wait, -level / (tpm / 60))
+            if rpm:
+                level = min(rpm, bucket.available_requests + elapsed * rpm / 60) - 1
+                bucket.available_requests = level
+                if level < 0:
+                    wait = max(wait, -level / (rpm / 60))
+
+            bucket.refilled_at = now
+            bucket.save(update_fields=["available_tokens", "available_requests", "refilled_at"])
+
+        return wait, charged
+
+    def reconcile(self, model: str, charged: int, actual: int) -> None:
+        """Refund (or charge) the difference between a reservation and real usage."""
+        limits = self.get_limits(model)
+        if not limits or not limits[1] or charged == actual:
+            return
+        _run_db(self._adjust, limits[0], charged - actual)
+
+    @staticmethod
+    def _adjust(config_id: int, delta: int) -> None:
+        LLMRateLimitBucket.objects.filter(config_id=config_id).update(
+            available_tokens=F("available_tokens") + delta
+        )
+
+    def record_wait(self, seconds: float) -> None:
+        """Add rate-limiter wait time to the node in the current node_scope()."""
+        scope = _current_node.get()
+        if not scope or seconds <= 0:
+            return
+        workflow_run_id, node_id = scope
+        _run_db(self._record_wait, workflow_run_id, node_id, seconds)
+
+    @staticmethod
+    def _record_wait(workflow_run_id: str, node_id: str, seconds: float) -> None:
+        WorkflowNode.objects.filter(
+            workflow_run_id=workflow_run_id, node_id=node_id
+        ).update(rate_limit_wait_seconds=F("rate_limit_wait_seconds") + seconds)
+
+    def call(self, fn, **kwargs):
+        """
+        Issue an API call under the limiter.
+
+        Blocks (like the synchronous client call itself) until the bucket
+        has room, then reconciles the reservation against ``usage``.
+        """
+        model = kwargs.get("model", "")
+        estimated = estimate_request_tokens(kwargs)
+        wait, charged = self.reserve(model, estimated)
+
+        if wait > 0:
+            logger.info(f"Rate limiter: waiting {wait:.1f}s for {model} ({estimated} tokens)")
+            time.sleep(wait)
+            self.record_wait(wait)
+
+        try:
+            response = fn(**kwargs)
+        except Exception:
+            # The provider did not bill a failed request; give the tokens back
+            self.reconcile(model, charged, 0)
+            raise
+
+        actual = usage_tokens(response)
+        if actual is not None and charged:
+            self.reconcile(model, charged, actual)
+        return response
+
+    async def acall(self, fn, **kwargs):
+        """
+        Issue an API call under the limiter from a coroutine.
+
+        Same as call(), but waits for the bucket with asyncio.sleep(), does
+        its DB work through sync_to_async and runs ``fn`` in a thread.
+        """
+        model = kwargs.get("model", "")
+        estimated = estimate_request_tokens(kwargs)
+        wait, charged = await sync_to_async(self.reserve)(model, estimated)
+
+        if wait > 0:
+            logger.info(f"Rate limiter: waiting {wait:.1f}s for {model} ({estimated} tokens)")
+            await asyncio.sleep(wait)
+            await sync_to_async(self.record_wait)(wait)
+
+        try:
+            response = await asyncio.to_thread(fn, **kwargs)
+        except Exception:
+            await sync_to_async(self.reconcile)(model, charged, 0)
+            raise
+
+        actual = usage_tokens(response)
+        if actual is not None and charged:
+            await sync_to_async(self.reconcile)(model, charged, actual)
+        return response
+
+
+class RateLimitedClient:
+    """
+    Proxy around an OpenAI client that routes billable calls through the limiter.
+
+    Only the endpoints below are limited; every other attribute is passed
+    through to the wrapped client unchanged.
+    """
+
+    LIMITED_ENDPOINTS = {
+        ("chat", "completions", "create"),
+        ("chat", "completions", "parse"),
+        ("responses", "create"),
+        ("responses", "parse"),
+        ("embeddings", "create"),
+    }
+
+    def __init__(self, target, limiter: Optional[LLMRateLimiter] = None, path: Tuple[str, ...] = ()):
+        self._target = target
+        self._limiter = limiter or llm_rate_limiter
+        self._path = path
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        path = self._path + (name,)
+
+        if path in self.LIMITED_ENDPOINTS:
+            limiter = self._limiter
+            kind = "embedding" if path[0] == "embeddings" else "llm"
+
+            def timed_call(**kwargs):
+                with span(kind, model=kwargs.get("model"), endpoint=".".join(path)):
+                    return attr(**kwargs)
+
+            def limited_call(**kwargs):
+                return limiter.call(timed_call, **kwargs)
+
+            async def async_limited_call(**kwargs):
+                return await limiter.acall(timed_call, **kwargs)
+
+            limited_call.acall = async_limited_call
+            return limited_call
+
+        if any(endpoint[: len(path)] == path for endpoint in self.LIMITED_ENDPOINTS):
+            return RateLimitedClient(attr, self._limiter, path)
+
+        return attr
+
+
+async def acall(endpoint, **kwargs):
+    """
+    Await an OpenAI client endpoint from a coroutine.
+
+    Endpoints of a RateLimitedClient use LLMRateLimiter.acall(); any other
+    callable (unwrapped or stub clients) just runs in a thread.
+
+    Usage:
+        response = await acall(client.chat.completions.parse, model=model, messages=messages)
+    """
+    limited = getattr(endpoint, "acall", None)
+    if limited is not None:
+        return await limited(**kwargs)
+    return await asyncio.to_thread(endpoint, **kwargs)
+
+
+def rate_limited_client(client) -> RateLimitedClient:
+    """Wrap an OpenAI client so its calls respect the configured TPM/RPM limits."""
+    if isinstance(client, RateLimitedClient):
+        return client
+    return RateLimitedClient(client)
+
+
+# Convenience singleton instance
+llm_rate_limiter = LLMRateLimiter()
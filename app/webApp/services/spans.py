@@ -0,0 +1,239 @@
+"""
+Span instrumentation of workflow nodes.
+
+WorkflowNode records when a node started and finished, but not where that
+time went. Spans time the operations that dominate a node's run:
+
+- ``llm`` / ``embedding``: OpenAI calls made through RateLimitedClient
+  (after any rate-limiter wait, which is recorded separately)
+- ``db``: SQL queries, via a connection execute wrapper
+- ``repository_ingest`` / ``git_clone``: ingest_with_steroids() and the clone
+  inside it
+- ``grobid``: the Grobid request of get_pdf_content()
+
+Inside a node_scope() the spans are folded into a SpanCollector, which
+run_scoped() stores compactly on the node (WorkflowNode.spans) as
+``{kind: {"count", "seconds"}}``; conference statistics aggregate them per
+node (see conference_stats).
+
+If OTEL_EXPORTER_OTLP_ENDPOINT is set and the OpenTelemetry SDK with the
+OTLP/HTTP exporter is installed, every span is also exported, nested under a
+``node`` span carrying the workflow run and node IDs.
+"""
+
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Environment variable enabling OpenTelemetry export
+OTEL_ENDPOINT_ENV = "OTEL_EXPORTER_OTLP_ENDPOINT"
+
+# Collector of the node currently running, if any
+_collector: ContextVar[Optional["SpanCollector"]] = ContextVar(
+    "span_collector", default=None
+)
+
+_tracer = None
+_tracer_loaded = False
+_tracer_lock = threading.Lock()
+
+
+class SpanCollector:
+    """
+    Per-node totals of span count and duration by kind.
+
+    Spans arrive from the node's event loop thread and from sync_to_async
+    threads (which inherit the collector through the context), so updates
+    are locked.
+    """
+
+    def __init__(self):
+        self._totals: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def add(self, kind: str, seconds: float) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(kind, [0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Compact ``{kind: {"count": n, "seconds": s}}`` form stored on nodes."""
+        with self._lock:
+            return {
+                kind: {"count": count, "seconds": round(seconds, 4)}
+                for kind, (count, seconds) in sorted(self._totals.items())
+            }
+
+
+def merge_spans(summaries: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Add up several span summaries (e.g. all nodes of a run)."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for summary in summaries:
+        for kind, entry in (summary or {}).items():
+            totals = merged.setdefault(kind, {"count": 0, "seconds": 0.0})
+            totals["count"] += entry.get("count", 0)
+            totals["seconds"] = round(totals["seconds"] + entry.get("seconds", 0.0), 4)
+    return merged
+
+
+# ============================================================================
+# OpenTelemetry export
+# ============================================================================
+
+
+def _otel_tracer():
+    """OpenTelemetry tracer exporting to the configured collector, or None."""
+    global _tracer, _tracer_loaded
+    if _tracer_loaded:
+        return _tracer
+    with _tracer_lock:
+        if _tracer_loaded:
+            return _tracer
+        if os.getenv(OTEL_ENDPOINT_ENV):
+            try:
+                from opentelemetry import trace
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                    OTLPSpanExporter,
+                )
+                from opentelemetry.sdk.resources import Resource
+                from opentelemetry.sdk.trace import TracerProvider
+                from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+                # The exporter reads the endpoint and headers from OTEL_* variables
+                provider = TracerProvider(
+                    resource=Resource.create(
+                        {"service.name": os.getenv("OTEL_SERVICE_NAME", "papersnitch")}
+                    )
+                )
+                provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+                trace.set_tracer_provider(provider)
+                _tracer = trace.get_tracer(__name__)
+                logger.info(f"Exporting workflow spans to {os.getenv(OTEL_ENDPOINT_ENV)}")
+            except ImportError as e:
+                logger.warning(
+                    f"{OTEL_ENDPOINT_ENV} is set but the OpenTelemetry SDK is not "
+                    f"installed, spans are only stored on nodes: {e}"
+                )
+        _tracer_loaded = True
+    return _tracer
+
+
+def _otel_span(name: str, attributes: Dict[str, Any]):
+    tracer = _otel_tracer()
+    if tracer is None:
+        return nullcontext()
+    return tracer.start_as_current_span(
+        name,
+        attributes={key: value for key, value in attributes.items() if value is not None},
+    )
+
+
+# ============================================================================
+# Spans
+# ============================================================================
+
+
+@contextmanager
+def span(kind: str, **attributes):
+    """
+    Time the enclosed block as a span of ``kind``.
+
+    Usage:
+        with span("grobid", path=pdf_path):
+            response = requests.post(grobid_url, files=files)
+    """
+    with _otel_span(kind, attributes):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            collector = _collector.get()
+            if collector is not None:
+                collector.add(kind, time.perf_counter() - started)
+
+
+def traced(kind: str):
+    """Decorator running every call of a (sync or async) function in span(kind)."""
+
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(kind):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(kind):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def collect_spans(workflow_run_id: str, node_id: str):
+    """
+    Collect the spans of the enclosed block for one node.
+
+    Yields:
+        SpanCollector; persisting its summary is left to the caller so the
+        write itself is not counted
+    """
+    collector = SpanCollector()
+    with _otel_span("node", {"workflow_run_id": str(workflow_run_id), "node_id": node_id}):
+        token = _collector.set(collector)
+        try:
+            yield collector
+        finally:
+            _collector.reset(token)
+
+
+def save_node_spans(workflow_run_id: str, node_id: str, spans: Dict[str, Dict[str, Any]]) -> None:
+    """Store a node's span summary, replacing the one of an earlier execution."""
+    from workflow_engine.models import WorkflowNode
+
+    WorkflowNode.objects.filter(workflow_run_id=workflow_run_id, node_id=node_id).update(
+        spans=spans
+    )
+
+
+# ============================================================================
+# Database queries
+# ============================================================================
+
+
+def _time_query(execute, sql, params, many, context):
+    if _collector.get() is None:
+        return execute(sql, params, many, context)
+    with span("db"):
+        return execute(sql, params, many, context)
+
+
+def instrument_connection(sender=None, connection=None, **kwargs):
+    """connection_created receiver adding query timing to a new connection."""
+    if connection is not None and _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+def install_db_instrumentation() -> None:
+    """Time the queries of every current and future database connection."""
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    connection_created.connect(instrument_connection, dispatch_uid="webApp.spans")
+    for connection in connections.all(initialized_only=True):
+        instrument_connection(connection=connection)
@@ -0,0 +1,159 @@
+"""
+Token counting with a local BPE tokenizer.
+
+Counts come from tiktoken's ``o200k_base`` encoding (the GPT-4o/GPT-5
+tokenizer). Encoding files are read from TIKTOKEN_CACHE_DIR, which the image
+fills at build time, so counting works offline. If the tokenizer cannot be
+loaded, counts fall back to the ~4 characters per token estimate.
+
+Counts are memoized by content hash, and embedding rows store their count at
+write time (PaperSectionEmbedding.token_count, CodeFileEmbedding.token_count)
+so budget selection sums integers instead of re-tokenizing text.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "o200k_base"
+
+# Fallback estimate when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+# Memoized counts kept per process
+CACHE_SIZE = 16384
+
+
+class TokenCounter:
+    """Memoizing token counter around a lazily loaded tiktoken encoding."""
+
+    def __init__(self, encoding_name: str = DEFAULT_ENCODING, cache_size: int = CACHE_SIZE):
+        self.encoding_name = encoding_name
+        self.cache_size = cache_size
+        self._encoding = None
+        self._loaded = False
+        self._cache: "OrderedDict[bytes, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def encoding(self):
+        """The tiktoken encoding, or None if it cannot be loaded."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        import tiktoken
+
+                        self._encoding = tiktoken.get_encoding(self.encoding_name)
+                    except Exception as e:
+                        logger.warning(
+                            f"Tokenizer {self.encoding_name} unavailable, estimating "
+                            f"{CHARS_PER_TOKEN} characters per token: {e}"
+                        )
+                    self._loaded = True
+        return self._encoding
+
+    @staticmethod
+    def content_key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def _lookup(self, key: bytes) -> Optional[int]:
+        with self._lock:
+            count = self._cache.get(key)
+            if count is not None:
+                self._cache.move_to_end(key)
+            return count
+
+    def _store(self, key: bytes, count: int):
+        with self._lock:
+            self._cache[key] = count
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _encode_count(self, text: str) -> int:
+        encoding = self.encoding
+        if encoding is None:
+            return len(text) // CHARS_PER_TOKEN
+        # Special-token strings in papers/code are counted as plain text
+        return len(encoding.encode(text, disallowed_special=()))
+
+    def count(self, text: Optional[str]) -> int:
+        """Number of tokens in ``text``."""
+        if not text:
+            return 0
+        key = self.content_key(text)
+        count = self._lookup(key)
+        if count is None:
+            count = self._encode_count(text)
+            self._store(key, count)
+        return count
+
+    def count_many(self, texts: Sequence[Optional[str]]) -> List[int]:
+        """Token counts of several texts, encoding the uncached ones in one batch."""
+        keys = [self.content_key(text) if text else None for text in texts]
+        counts = [self._lookup(key) if key else 0 for key in keys]
+        missing = [i for i, count in enumerate(counts) if count is None]
+        if missing:
+            encoding = self.encoding
+            if encoding is None:
+                fresh = [len(texts[i]) // CHARS_PER_TOKEN for i in missing]
+            else:
+                fresh = [
+                    len(tokens)
+                    for tokens in encoding.encode_batch(
+                        [texts[i] for i in missing], disallowed_special=()
+                    )
+                ]
+            for i, count in zip(missing, fresh):
+                counts[i] = count
+                self._store(keys[i], count)
+        return counts
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Head of ``text`` with at most ``max_tokens`` tokens, cut at a line
+        break if one is near the end.
+        """
+        if max_tokens <= 0 or not text:
+            return ""
+        encoding = self.encoding
+        if encoding is None:
+            head = text[: max_tokens * CHARS_PER_TOKEN]
+        else:
+            tokens = encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            head = encoding.decode(tokens[:max_tokens])
+        if len(head) >= len(text):
+            return text
+
+        newline = head.rfind("\n")
+        if newline > len(head) * 0.8:
+            head = head[: newline + 1]
+        return head
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+# Convenience singleton instance
+token_counter = TokenCounter()
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """Number of tokens in ``text`` (see TokenCounter.count)."""
+    return token_counter.count(text)
+
+
+def stored_token_count(row, text: Optional[str]) -> int:
+    """
+    Token count stored on an embedding row, counting ``text`` for rows
+    written before counts were stored.
+    """
+    return row.token_count or count_tokens(text)
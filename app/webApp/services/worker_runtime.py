@@ -0,0 +1,330 @@
+"""
+Per-process runtime state for Celery workers.
+
+Workflow tasks used to pay their setup on every call: a new event loop, a
+StateGraph rebuilt and compiled, the WorkflowDefinition re-read, the handler
+resolved with importlib and a new OpenAI client with its own connection pool.
+Worker processes now keep all of these for their lifetime:
+
+- run_async(): runs coroutines on one persistent event loop per thread
+- get_compiled_graph(): compiled LangGraph graphs keyed by (name, version)
+- workflow_handler(): handler functions of WorkflowDefinitions, with the
+  definition lookup cached for DEFINITION_TTL_SECONDS
+- ensure_workflow_definition(): a graph's get-or-create of its definition,
+  done once per process and (name, version)
+- openai_client(): one OpenAI client (and HTTP connection pool) per API key;
+  override_openai_client() substitutes another client (e.g. the offline stub)
+
+warm_worker() runs at worker_process_init and fills these before the first
+task arrives.
+"""
+
+import asyncio
+import importlib
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached WorkflowDefinition lookup is trusted, so deactivating a
+# definition reaches long-lived workers without a restart
+DEFINITION_TTL_SECONDS = 300
+
+# Graph modules imported and compiled when a worker process starts
+WORKFLOW_MODULES = (
+    "webApp.services.graphs.paper_processing_workflow",
+    "webApp.services.graphs.code_only_workflow",
+    "webApp.services.graphs.process_code_availability",
+)
+
+_lock = threading.Lock()
+_local = threading.local()
+_compiled_graphs: Dict[Tuple[str, str], Any] = {}
+_handlers: Dict[Tuple[str, str], Callable] = {}
+_definitions: Dict[Hashable, Tuple[float, Any]] = {}
+_openai_clients: Dict[Optional[str], Any] = {}
+_openai_override: Optional[Any] = None
+
+
+# ============================================================================
+# Event loop
+# ============================================================================
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """The persistent event loop of the calling thread."""
+    loop = getattr(_local, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _local.loop = loop
+    asyncio.set_event_loop(loop)
+    return loop
+
+
+def run_async(coro: Awaitable, refresh_connections: bool = True) -> Any:
+    """
+    Run a coroutine to completion on the thread's persistent event loop.
+
+    Args:
+        coro: Coroutine to run
+        refresh_connections: First drop expired or broken DB connections of
+            the sync_to_async thread, which outlives individual tasks
+
+    Raises:
+        RuntimeError: If called from inside a running event loop
+    """
+    loop = get_event_loop()
+    if loop.is_running():
+        raise RuntimeError("run_async() cannot be called from a running event loop")
+    if refresh_connections:
+        loop.run_until_complete(sync_to_async(close_old_connections)())
+    return loop.run_until_complete(coro)
+
+
+# ============================================================================
+# Compiled graphs and handlers
+# ============================================================================
+
+
+def get_compiled_graph(name: str, version, build: Callable[[], Any]) -> Any:
+    """
+    Compiled graph for (name, version), built with ``build`` on first use.
+
+    Compiled graphs without a checkpointer hold no per-run state, so one
+    instance serves every run in the process.
+    """
+    key = (name, str(version))
+    graph = _compiled_graphs.get(key)
+    if graph is None:
+        with _lock:
+            graph = _compiled_graphs.get(key)
+            if graph is None:
+                graph = build()
+                _compiled_graphs[key] = graph
+                logger.debug(f"Compiled workflow graph {name} v{version}")
+    return graph
+
+
+def _cached_definition(key: Hashable):
+    entry = _definitions.get(key)
+    if entry and time.monotonic() - entry[0] < DEFINITION_TTL_SECONDS:
+        return entry[1]
+    return None
+
+
+def _cache_definition(key: Hashable, definition):
+    _definitions[key] = (time.monotonic(), definition)
+
+
+def active_workflow_definition(workflow_id):
+    """
+    Active WorkflowDefinition by id, cached for DEFINITION_TTL_SECONDS.
+
+    Raises:
+        ValueError: If the definition does not exist or is not active
+    """
+    from workflow_engine.models import WorkflowDefinition
+
+    key = ("id", str(workflow_id))
+    definition = _cached_definition(key)
+    if definition is None:
+        definition = WorkflowDefinition.objects.filter(
+            id=workflow_id, is_active=True
+        ).first()
+        if definition is None:
+            raise ValueError(f"Workflow {workflow_id} not found or not active")
+        _cache_definition(key, definition)
+    return definition
+
+
+def workflow_handler(workflow_id) -> Callable:
+    """
+    Execute function named by a definition's ``workflow_handler``.
+
+    Raises:
+        ValueError: If the definition is missing, inactive, has no handler
+            configured, or the handler cannot be imported
+    """
+    definition = active_workflow_definition(workflow_id)
+    handler_info = definition.dag_structure.get("workflow_handler")
+    if not handler_info:
+        raise ValueError(
+            f"Workflow {workflow_id} does not have handler information configured"
+        )
+
+    key = (handler_info["module"], handler_info["function"])
+    handler = _handlers.get(key)
+    if handler is None:
+        try:
+            handler = getattr(importlib.import_module(key[0]), key[1])
+        except (ImportError, AttributeError) as e:
+            raise ValueError(f"Failed to load workflow handler: {e}") from e
+        _handlers[key] = handler
+        logger.info(f"Loaded workflow handler: {key[0]}.{key[1]}")
+    return handler
+
+
+async def ensure_workflow_definition(name: str, version, **kwargs):
+    """
+    Get or create a graph's WorkflowDefinition once per process.
+
+    Args:
+        name: Workflow name
+        version: Workflow version
+        **kwargs: Other arguments of async_ops.get_or_create_workflow_definition
+
+    Returns:
+        WorkflowDefinition instance
+    """
+    from workflow_engine.services.async_orchestrator import async_ops
+
+    key = ("name", name, str(version))
+    definition = _cached_definition(key)
+    if definition is None:
+        definition = await async_ops.get_or_create_workflow_definition(
+            name=name, version=version, **kwargs
+        )
+        _cache_definition(key, definition)
+    return definition
+
+
+# ============================================================================
+# Clients
+# ============================================================================
+
+
+def openai_client(api_key: Optional[str] = None):
+    """
+    Shared OpenAI client for ``api_key`` (OPENAI_API_KEY if not given).
+
+    The client is thread-safe and keeps its HTTP connections alive between
+    runs.
+    """
+    if _openai_override is not None:
+        return _openai_override
+
+    from openai import OpenAI
+
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    client = _openai_clients.get(api_key)
+    if client is None:
+        with _lock:
+            client = _openai_clients.get(api_key)
+            if client is None:
+                client = OpenAI(api_key=api_key)
+                _openai_clients[api_key] = client
+    return client
+
+
+@contextmanager
+def override_openai_client(client):
+    """
+    Make openai_client() return ``client`` for every API key inside the block.
+
+    Usage:
+        with override_openai_client(StubOpenAI()):
+            await execute_workflow(paper_id)
+    """
+    global _openai_override
+    previous = _openai_override
+    _openai_override = client
+    try:
+        yield client
+    finally:
+        _openai_override = previous
+
+
+# ============================================================================
+# Warm-up
+# ============================================================================
+
+
+def _warm_graphs() -> int:
+    from webApp.services.graphs.base_workflow_graph import BaseWorkflowGraph
+
+    compiled = 0
+    for module_name in WORKFLOW_MODULES:
+        module = importlib.import_module(module_name)
+        for value in vars(module).values():
+            if isinstance(value, BaseWorkflowGraph):
+                value.compiled_workflow()
+                compiled += 1
+    return compiled
+
+
+def _warm_handlers() -> int:
+    from workflow_engine.models import WorkflowDefinition
+
+    loaded = 0
+    for workflow_id in WorkflowDefinition.objects.filter(is_active=True).values_list(
+        "id", flat=True
+    ):
+        try:
+            workflow_handler(workflow_id)
+            loaded += 1
+        except ValueError as e:
+            logger.debug(f"Skipping handler of workflow {workflow_id}: {e}")
+    return loaded
+
+
+def _warm_db(loop) -> bool:
+    loop.run_until_complete(sync_to_async(connection.ensure_connection)())
+    return True
+
+
+def _warm_tokenizer():
+    from webApp.services.token_counter import token_counter
+
+    return token_counter.encoding is not None
+
+
+def warm_worker() -> Dict[str, Any]:
+    """
+    Prepare a worker process before it takes its first task.
+
+    Imports and compiles the workflow graphs, loads the handlers of active
+    definitions, opens the DB connection of the sync_to_async thread (where
+    workflow ORM calls run), creates the default OpenAI client and loads the
+    tokenizer. Failures are logged and left to the first task to surface.
+
+    Returns:
+        Outcome of each step (for logging)
+    """
+    started = time.monotonic()
+    loop = get_event_loop()
+    steps = {
+        "graphs": _warm_graphs,
+        "handlers": _warm_handlers,
+        "db": lambda: _warm_db(loop),
+        "openai": lambda: openai_client() is not None,
+        "tokenizer": _warm_tokenizer,
+    }
+
+    outcome = {}
+    for step, warm in steps.items():
+        try:
+            outcome[step] = warm()
+        except Exception as e:
+            outcome[step] = False
+            logger.warning(f"Worker warm-up step '{step}' failed: {e}")
+
+    logger.info(
+        f"Worker process {os.getpid()} warmed in {time.monotonic() - started:.2f}s: {outcome}"
+    )
+    return outcome
+
+
+def reset():
+    """Forget all cached graphs, handlers, definitions and clients."""
+    with _lock:
+        _compiled_graphs.clear()
+        _handlers.clear()
+        _definitions.clear()
+        _openai_clients.clear()
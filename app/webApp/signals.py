@@ -104,3 +104,16 @@ def generate_schema_diagram(sender, **kwargs):
 
     except Exception as e:
         print(f"⚠️  Error generating schema diagram: {e}")
+
+
+@receiver(post_migrate)
+def restore_paper_search_index(sender, using="default", **kwargs):
+    """Recreate the paper full-text index if a migration rebuilt the paper table."""
+    if sender.name != "webApp":
+        return
+
+    from django.db import connections
+    from webApp.services.paper_search import ensure_search_index
+
+    if ensure_search_index(connections[using]):
+        print("✅ Paper full-text search index restored")
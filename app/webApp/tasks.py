@@ -13,6 +13,7 @@ import asyncio
 
 from django.contrib.auth.models import User
 from annotator.models import AnnotationCategory
+from workflow_engine.models import WorkflowRun
 from .models import (
     AnalysisTask,
     Paper,
@@ -405,91 +406,58 @@ def process_paper_workflow_task(
     force_reprocess: bool = True,
     model: str = "gpt-5",
     workflow_id: int = None,
+    priority: int = WorkflowRun.PRIORITY_NORMAL,
 ):
     """
     Celery task to process a paper workflow.
 
     This task is picked up by Celery workers when capacity is available.
     Workers are configured with concurrency limits to prevent overload.
+    Enqueue it with enqueue_paper_workflow() so it lands on the Celery
+    queue matching its priority.
 
     Args:
         paper_id: Database ID of paper to process
         force_reprocess: If True, reprocess even if already analyzed
         model: OpenAI model to use
         workflow_id: Optional workflow definition ID. If provided, uses specific workflow; otherwise uses default
+        priority: Scheduling priority (WorkflowRun.PRIORITY_*)
 
     Returns:
         Dictionary with workflow results (not stored in backend due to ignore_result=True)
     """
-    import asyncio
-    import importlib
+    from webApp.services.worker_runtime import run_async, workflow_handler
 
     logger.info(f"Celery task started for paper {paper_id}, workflow_id={workflow_id}")
 
     try:
-        # Run async workflow in this thread's event loop
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-        try:
-            # If workflow_id is specified, load the workflow dynamically
-            if workflow_id:
-                from workflow_engine.models import WorkflowDefinition
-
-                try:
-                    workflow_def = WorkflowDefinition.objects.get(
-                        id=workflow_id, is_active=True
-                    )
-                except WorkflowDefinition.DoesNotExist:
-                    error_msg = f"Workflow {workflow_id} not found or not active"
-                    logger.error(error_msg)
-                    return {"success": False, "error": error_msg}
-
-                # Get handler information from dag_structure
-                handler_info = workflow_def.dag_structure.get("workflow_handler")
-                if not handler_info:
-                    error_msg = f"Workflow {workflow_id} does not have handler information configured"
-                    logger.error(error_msg)
-                    return {"success": False, "error": error_msg}
-
-                # Dynamically import and execute the workflow
-                try:
-                    workflow_module = importlib.import_module(handler_info["module"])
-                    execute_workflow_func = getattr(
-                        workflow_module, handler_info["function"]
-                    )
-                    logger.info(
-                        f"Loaded workflow handler: {handler_info['module']}.{handler_info['function']}"
-                    )
-                except (ImportError, AttributeError) as e:
-                    error_msg = f"Failed to load workflow handler: {str(e)}"
-                    logger.error(error_msg)
-                    return {"success": False, "error": error_msg}
-
-                # Execute the dynamically loaded workflow
-                result = loop.run_until_complete(
-                    execute_workflow_func(
-                        paper_id=paper_id, force_reprocess=force_reprocess, model=model
-                    )
-                )
-            else:
-                # Use default workflow
-                from webApp.services.graphs.paper_processing_workflow import (
-                    process_paper_workflow,
-                )
-
-                result = loop.run_until_complete(
-                    process_paper_workflow(
-                        paper_id=paper_id, force_reprocess=force_reprocess, model=model
-                    )
-                )
+        # If workflow_id is specified, use its handler (cached per worker process)
+        if workflow_id:
+            try:
+                execute_workflow_func = workflow_handler(workflow_id)
+            except ValueError as e:
+                logger.error(str(e))
+                return {"success": False, "error": str(e)}
+        else:
+            # Use default workflow
+            from webApp.services.graphs.paper_processing_workflow import (
+                process_paper_workflow as execute_workflow_func,
+            )
 
-            logger.info(
-                f"Celery task completed for paper {paper_id}: {result.get('success')}"
+        # Run on the worker's persistent event loop
+        result = run_async(
+            execute_workflow_func(
+                paper_id=paper_id,
+                force_reprocess=force_reprocess,
+                model=model,
+                priority=priority,
             )
-            return result
-        finally:
-            loop.close()
+        )
+
+        logger.info(
+            f"Celery task completed for paper {paper_id}: {result.get('success')}"
+        )
+        return result
 
     except Exception as e:
         logger.exception(f"Celery task failed for paper {paper_id}: {str(e)}")
@@ -497,6 +465,94 @@ def process_paper_workflow_task(
         raise
 
 
+def enqueue_paper_workflow(priority: int = WorkflowRun.PRIORITY_NORMAL, **kwargs):
+    """
+    Enqueue process_paper_workflow_task on the Celery queue of its priority.
+
+    Interactive requests go to a queue that is never behind a bulk backlog;
+    the same priority is then applied to workflow admission.
+
+    Args:
+        priority: Scheduling priority (WorkflowRun.PRIORITY_*)
+        **kwargs: Arguments of process_paper_workflow_task
+
+    Returns:
+        Celery AsyncResult
+    """
+    return paper_workflow_signature(priority, **kwargs).apply_async()
+
+
+def paper_workflow_signature(priority: int = WorkflowRun.PRIORITY_NORMAL, **kwargs):
+    """
+    Signature of process_paper_workflow_task routed like enqueue_paper_workflow().
+
+    Used to publish many workflows at once with a Celery group.
+    """
+    return process_paper_workflow_task.signature(
+        kwargs={**kwargs, "priority": priority},
+        queue=WorkflowRun.queue_for_priority(priority),
+    )
+
+
+@shared_task(bind=True, max_retries=0, ignore_result=True)
+def bulk_workflow_operation_task(self, operation_id: str):
+    """
+    Carry out a conference-wide workflow rerun or stop in the background.
+
+    Args:
+        operation_id: BulkOperation to execute (progress is recorded on it)
+    """
+    from .services.bulk_operations import run_bulk_operation
+
+    run_bulk_operation(operation_id)
+
+
+@shared_task(bind=True, max_retries=0, time_limit=300, ignore_result=True)
+def generate_highlighted_pdf_task(self, highlighted_pdf_id: int, paper_id: int):
+    """
+    Generate a cached evidence-highlighted PDF in the background.
+
+    Args:
+        highlighted_pdf_id: HighlightedPDF row to fill in
+        paper_id: Paper whose PDF file is the source
+    """
+    from django.core.files.base import ContentFile
+    from django.utils import timezone
+    from .models import HighlightedPDF
+    from .services.pdf_highlighter import highlight_pdf
+
+    # Claim the row so duplicate dispatches do not generate it twice
+    claimed = HighlightedPDF.objects.filter(
+        id=highlighted_pdf_id, status__in=["pending", "failed"]
+    ).update(status="running", error=None, updated_at=timezone.now())
+    if not claimed:
+        return
+
+    highlighted = HighlightedPDF.objects.get(id=highlighted_pdf_id)
+    try:
+        paper = Paper.objects.get(id=paper_id)
+        content, found = highlight_pdf(paper.file.path, highlighted.evidence)
+
+        highlighted.file.save(
+            f"highlighted_{highlighted.pdf_sha256[:16]}_{highlighted.evidence_sha256[:16]}.pdf",
+            ContentFile(content),
+            save=False,
+        )
+        highlighted.highlights_found = found
+        highlighted.status = "completed"
+        highlighted.save(update_fields=["file", "highlights_found", "status", "updated_at"])
+
+        logger.info(
+            f"Generated highlighted PDF {highlighted_pdf_id} for paper {paper_id}: "
+            f"{found}/{len(highlighted.evidence)} evidence items found"
+        )
+    except Exception as e:
+        logger.exception(f"Error generating highlighted PDF {highlighted_pdf_id}: {e}")
+        HighlightedPDF.objects.filter(id=highlighted_pdf_id).update(
+            status="failed", error=str(e)
+        )
+
+
 @shared_task(bind=True)
 def scrape_conference_task(
     self,
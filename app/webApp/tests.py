@@ -1,3 +1,660 @@
+"""
+Tests for webApp.
+
+Run with:
+    python manage.py test webApp
+"""
 from django.test import TestCase
+from webApp.models import Paper
+from workflow_engine.models import (
+    WorkflowDefinition,
+    WorkflowRun,
+    WorkflowNode,
+    NodeLog
+)
+from workflow_engine.services.orchestrator import WorkflowOrchestrator
+
+
+class PDFHighlighterTestCase(TestCase):
+    """Test single-pass evidence matching for highlighted PDFs."""
+    
+    def test_exact_and_fuzzy_evidence_are_highlighted(self):
+        """Test that quoted, near-verbatim and absent evidence are handled in one pass."""
+        import os
+        import tempfile
+        import pymupdf
+        from webApp.services.pdf_highlighter import evidence_hash, highlight_pdf
+        
+        doc = pymupdf.open()
+        page = doc.new_page()
+        page.insert_text((50, 72), 'We train the network with stochastic gradient descent')
+        page.insert_text((50, 90), 'for two hundred epochs on the public benchmark dataset.')
+        doc.new_page().insert_text((50, 72), 'Source code and weights are released under an open licence online.')
+        path = os.path.join(tempfile.mkdtemp(), 'paper.pdf')
+        doc.save(path)
+        doc.close()
+        
+        evidence = [
+            # Quote spanning two lines, with commentary around it
+            {'text': 'Training: "stochastic gradient descent for two hundred epochs" (see text)',
+             'color': [1.0, 0.8, 0.0]},
+            # Slightly different wording than the PDF
+            {'text': 'Source code and weights are released under the open licence online... [truncated]',
+             'color': [0.8, 0.0, 1.0]},
+            {'text': 'Hyperparameters were tuned by random search', 'color': [0.0, 1.0, 0.5]},
+        ]
+        content, found = highlight_pdf(path, evidence)
+        
+        self.assertEqual(found, 2)
+        result = pymupdf.open(stream=content, filetype='pdf')
+        annots = [len(list(page.annots())) for page in result]
+        self.assertEqual(annots, [1, 1])
+        
+        self.assertEqual(evidence_hash(evidence), evidence_hash(list(reversed(evidence))))
+    
+    def test_short_evidence_is_searched_verbatim(self):
+        """Test that evidence shorter than a shingle falls back to an exact page search."""
+        import os
+        import tempfile
+        import pymupdf
+        from webApp.services.pdf_highlighter import highlight_pdf
+        
+        doc = pymupdf.open()
+        doc.new_page().insert_text((50, 72), 'The backbone is a U-Net trained on CT scans.')
+        doc.new_page().insert_text((50, 72), 'Our U-Net variant adds attention gates.')
+        path = os.path.join(tempfile.mkdtemp(), 'paper.pdf')
+        doc.save(path)
+        doc.close()
+        
+        content, found = highlight_pdf(path, [
+            {'text': '"U-Net"', 'color': [1.0, 0.8, 0.0]},
+            {'text': 'ResNet', 'color': [0.0, 1.0, 0.5]},
+        ])
+        
+        self.assertEqual(found, 1)
+        result = pymupdf.open(stream=content, filetype='pdf')
+        self.assertEqual([len(list(page.annots())) for page in result], [1, 1])
+    
+    def test_file_hash_is_cached_per_file_version(self):
+        """Test that a PDF is hashed once until it changes."""
+        import os
+        import tempfile
+        from unittest import mock
+        from webApp.services import file_hashing
+        
+        path = os.path.join(tempfile.mkdtemp(), 'paper.pdf')
+        with open(path, 'wb') as f:
+            f.write(b'first')
+        
+        with mock.patch.object(file_hashing, 'file_hash', wraps=file_hashing.file_hash) as hashed:
+            first = file_hashing.cached_file_hash(path)
+            self.assertEqual(file_hashing.cached_file_hash(path), first)
+            self.assertEqual(hashed.call_count, 1)
+            
+            with open(path, 'wb') as f:
+                f.write(b'second version')
+            self.assertNotEqual(file_hashing.cached_file_hash(path), first)
+            self.assertEqual(hashed.call_count, 2)
+
+
+class PaperSearchTestCase(TestCase):
+    """Test ranked full-text paper search."""
+    
+    def setUp(self):
+        self.segmentation = Paper.objects.create(
+            title='Graph Neural Networks for Vessel Segmentation',
+            authors='Ada Lovelace',
+            doi='10.1234/gnn.seg'
+        )
+        self.survey = Paper.objects.create(
+            title='A Survey of Registration Methods',
+            abstract='We compare segmentation-free registration pipelines.',
+            doi='10.1234/survey'
+        )
+    
+    def test_ranked_prefix_and_doi_search(self):
+        """Test that the index follows saves and ranks title matches first."""
+        from webApp.services.paper_search import search_papers
+        
+        self.survey.text = 'Segmentation results are reported in the appendix.'
+        self.survey.save()
+        
+        results = list(search_papers('segment'))
+        self.assertEqual(results, [self.segmentation, self.survey])
+        self.assertTrue(all(paper.search_rank > 0 for paper in results))
+        
+        self.assertEqual(list(search_papers('lovelace vessel')), [self.segmentation])
+        # Only the word being typed is a prefix
+        self.assertEqual(list(search_papers('lovelace vess')), [self.segmentation])
+        self.assertEqual(list(search_papers('lovel vessel')), [])
+        self.assertEqual(list(search_papers('10.1234/surv')), [self.survey])
+        
+        self.segmentation.delete()
+        self.assertEqual(list(search_papers('segment')), [self.survey])
+        
+        response = self.client.get('/papers/search/', {'q': 'registration'})
+        self.assertEqual([r['id'] for r in response.json()['results']], [self.survey.id])
+    
+    def test_invalid_parameters_are_rejected(self):
+        """Test that malformed limit and conference parameters return 400."""
+        for params in ({'q': 'segment', 'limit': 'ten'}, {'q': 'segment', 'conference': 'abc'}):
+            response = self.client.get('/papers/search/', params)
+            self.assertEqual(response.status_code, 400)
+        
+        response = self.client.get('/papers/search/', {'q': 'segment', 'conference': '999'})
+        self.assertEqual(response.json()['results'], [])
+
+
+class BulkOperationTestCase(TestCase):
+    """Test background bulk reruns and stops."""
+    
+    def setUp(self):
+        from webApp.models import Conference
+        
+        self.definition = WorkflowDefinition.objects.create(
+            name='bulk_workflow',
+            version=1,
+            dag_structure={'nodes': [{'id': 'n1'}, {'id': 'n2'}], 'edges': []},
+            is_active=True
+        )
+        self.conference = Conference.objects.create(name='Bulk Conf 2025', acronym='BC', year=2025)
+        self.papers = [
+            Paper.objects.create(title=f'Paper {i}', doi=f'10.1234/bulk{i}', conference=self.conference)
+            for i in range(3)
+        ]
+        self.stuck = WorkflowOrchestrator().create_workflow_run(
+            workflow_name='bulk_workflow', paper=self.papers[0]
+        )
+        WorkflowRun.objects.filter(id=self.stuck.id).update(status='running')
+        self.stuck.nodes.filter(node_id='n1').update(status='running')
+    
+    def test_rerun_cancels_set_based_and_dispatches_in_groups(self):
+        """Test that a rerun is queued, cancels active runs and publishes grouped tasks."""
+        from unittest import mock
+        from webApp.models import BulkOperation
+        from webApp.services import bulk_operations
+        from webApp.tasks import bulk_workflow_operation_task
+        
+        with mock.patch.object(bulk_workflow_operation_task, 'delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                operation = bulk_operations.start_bulk_operation(
+                    self.conference, 'rerun', workflow_id=str(self.definition.id), limit=2
+                )
+        delay.assert_called_once_with(str(operation.id))
+        self.assertEqual(operation.status, 'pending')
+        
+        with mock.patch.object(bulk_operations, 'DISPATCH_CHUNK_SIZE', 1), \
+                mock.patch('celery.group') as group:
+            bulk_operations.run_bulk_operation(operation.id)
+        
+        operation = BulkOperation.objects.get(id=operation.id)
+        self.assertEqual(operation.status, 'completed')
+        self.assertEqual(operation.total_papers, 2)
+        self.assertEqual(operation.processed_papers, 2)
+        self.assertEqual(operation.cancelled_runs, 1)
+        self.assertEqual(operation.tasks_enqueued, 2)
+        self.assertEqual(group.call_count, 2)
+        
+        self.stuck.refresh_from_db()
+        self.assertEqual(self.stuck.status, 'failed')
+        self.assertEqual(self.stuck.error_message, 'Workflow cancelled for bulk rerun')
+        self.assertFalse(self.stuck.nodes.filter(status__in=['running', 'pending']).exists())
+        
+        # Claimed operations are not run twice
+        with mock.patch('celery.group') as group:
+            bulk_operations.run_bulk_operation(operation.id)
+        group.assert_not_called()
+    
+    def test_stop_takes_effect_within_the_request(self):
+        """Test that a bulk stop is not queued behind workflow tasks."""
+        from unittest import mock
+        from django.urls import reverse
+        from webApp.models import BulkOperation
+        from webApp.tasks import bulk_workflow_operation_task
+        
+        with mock.patch.object(bulk_workflow_operation_task, 'delay') as delay, \
+                mock.patch('webApp.services.bulk_operations.purge_pending_tasks', return_value=0):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse('bulk_stop_workflows', args=[self.conference.id]))
+        delay.assert_not_called()
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['success'])
+        operation = BulkOperation.objects.get(id=response.json()['operation_id'])
+        self.assertEqual((operation.status, operation.cancelled_runs), ('completed', 1))
+        self.stuck.refresh_from_db()
+        self.assertEqual(self.stuck.status, 'failed')
+    
+    def test_cancel_active_runs_uses_two_updates(self):
+        """Test that cancellation does not save runs and nodes one by one."""
+        from webApp.services.bulk_operations import cancel_active_runs
+        
+        for paper in self.papers[1:]:
+            run = WorkflowOrchestrator().create_workflow_run(workflow_name='bulk_workflow', paper=paper)
+            WorkflowRun.objects.filter(id=run.id).update(status='pending')
+        
+        # SELECT runs, UPDATE nodes, UPDATE runs, INSERT status events
+        # (plus the savepoints of the two atomic blocks)
+        with self.assertNumQueries(8):
+            cancelled = cancel_active_runs([p.id for p in self.papers], 'by user (bulk stop)')
+        self.assertEqual(cancelled, 3)
+        self.assertEqual(WorkflowRun.objects.filter(status='failed').count(), 3)
+
+
+class NodeDetailAPITestCase(TestCase):
+    """Test the lightweight node detail, log paging and artifact endpoints."""
+    
+    def setUp(self):
+        from django.utils import timezone
+        from workflow_engine.models import NodeArtifact
+        
+        WorkflowDefinition.objects.create(
+            name='detail_workflow',
+            version=1,
+            dag_structure={'nodes': [{'id': 'n1'}], 'edges': []},
+            is_active=True
+        )
+        paper = Paper.objects.create(title='Detail Paper', doi='10.1234/detail')
+        run = WorkflowOrchestrator().create_workflow_run(workflow_name='detail_workflow', paper=paper)
+        self.node = run.nodes.get(node_id='n1')
+        WorkflowNode.objects.filter(id=self.node.id).update(input_data={'big': 'x' * 1000})
+        
+        NodeLog.objects.filter(node=self.node).delete()
+        NodeLog.objects.bulk_create(
+            NodeLog(node=self.node, message=f'line {i}') for i in range(5)
+        )
+        # Identical timestamps must not break the cursor
+        NodeLog.objects.filter(node=self.node).update(timestamp=timezone.now())
+        NodeArtifact.objects.create(
+            node=self.node, artifact_type='inline', name='result', inline_data={'score': 7}
+        )
+    
+    def test_detail_is_summary_only_and_logs_page_by_cursor(self):
+        """Test field selection, artifact metadata and log pagination."""
+        import json
+        from django.urls import reverse
+        
+        response = self.client.get(
+            reverse('workflow_node_detail', args=[self.node.id]), {'logs': 2}
+        )
+        data = response.json()
+        self.assertNotIn('input_data', data)
+        self.assertIn('duration', data)
+        self.assertEqual([a['name'] for a in data['artifacts']], ['result'])
+        self.assertNotIn('data', data['artifacts'][0])
+        self.assertEqual(len(data['logs']), 2)
+        self.assertTrue(data['logs_has_more'])
+        
+        messages = [log['message'] for log in data['logs']]
+        cursor = data['logs_next_cursor']
+        while cursor:
+            page = self.client.get(
+                reverse('workflow_node_logs', args=[self.node.id]), {'after': cursor, 'limit': 2}
+            ).json()
+            messages += [log['message'] for log in page['logs']]
+            cursor = page['next_cursor'] if page['has_more'] else None
+        self.assertEqual(sorted(messages), [f'line {i}' for i in range(5)])
+        
+        response = self.client.get(
+            reverse('workflow_node_detail', args=[self.node.id]), {'fields': 'input_data', 'logs': 0}
+        )
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), {
+            'id': str(self.node.id), 'input_data': {'big': 'x' * 1000}, 'artifacts': [
+                {**data['artifacts'][0]}
+            ]
+        })
+        self.assertEqual(
+            self.client.get(reverse('workflow_node_detail', args=[self.node.id]), {'fields': 'secret'}).status_code,
+            400
+        )
+    
+    def test_artifact_is_fetched_on_demand_and_gzipped(self):
+        """Test per-artifact fetch with gzip compression."""
+        import gzip
+        import json
+        from django.urls import reverse
+        
+        url = reverse('workflow_node_artifact', args=[self.node.id, 'result'])
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        artifact = json.loads(gzip.decompress(b''.join(response.streaming_content)))
+        self.assertEqual(artifact['data'], {'score': 7})
+        
+        missing = reverse('workflow_node_artifact', args=[self.node.id, 'missing'])
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+
+class WorkflowEvaluationTestCase(TestCase):
+    """Test DB-backed agreement metrics between workflow output and human labels."""
+    
+    def setUp(self):
+        from workflow_engine.models import NodeArtifact
+        from webApp.models import HumanEvaluation
+        
+        self.definition = WorkflowDefinition.objects.create(
+            name='evaluated_workflow',
+            version=1,
+            dag_structure={
+                'nodes': [{'id': 'reproducibility_checklist'}, {'id': 'code_repository_analysis'}],
+                'edges': []
+            },
+            is_active=True
+        )
+        paper = Paper.objects.create(title='Evaluated Paper', doi='10.1234/evaluated')
+        run = WorkflowOrchestrator().create_workflow_run(workflow_name='evaluated_workflow', paper=paper)
+        WorkflowRun.objects.filter(id=run.id).update(status='completed')
+        run.nodes.filter(node_id='reproducibility_checklist').update(total_tokens=100)
+        
+        def criterion(criterion_id, category, present):
+            return {'criterion_id': criterion_id, 'category': category, 'present': present}
+        
+        checklist = run.nodes.get(node_id='reproducibility_checklist')
+        NodeArtifact.objects.create(
+            node=checklist, artifact_type='inline', name='criterion_analyses',
+            inline_data={'value': [
+                criterion('m1', 'models', True),
+                criterion('m2', 'models', False),
+                criterion('e1', 'experiments', True),
+                criterion('e2', 'experiments', True),
+            ]}
+        )
+        NodeArtifact.objects.create(
+            node=run.nodes.get(node_id='code_repository_analysis'), artifact_type='inline',
+            name='result', inline_data={'documentation': {'has_readme': True, 'has_results_table': False}}
+        )
+        self.evaluation = HumanEvaluation.objects.create(paper=paper, paper_type='method', labels={
+            'paper_analysis': [
+                criterion('m1', 'models', True),
+                criterion('m2', 'models', False),
+                criterion('e1', 'experiments', True),
+                criterion('e2', 'experiments', False),
+            ],
+            'code_analysis': {'documentation': {'has_readme': True, 'has_results_table': False}},
+        })
+    
+    def test_metrics_match_weighted_aggregation_and_are_cached(self):
+        """Test per-category, per-section and global metrics and the snapshot cache."""
+        from webApp.models import EvaluationResult
+        from webApp.services.evaluation import evaluate_workflow
+        
+        results = evaluate_workflow(self.definition)
+        self.assertEqual(results['paper_count'], 1)
+        self.assertEqual(results['categories']['Paper.models']['accuracy'], 100.0)
+        self.assertEqual(results['categories']['Paper.models']['mcc'], 1.0)
+        self.assertEqual(results['categories']['Paper.experiments']['accuracy'], 50.0)
+        self.assertIsNone(results['categories']['Paper.experiments']['mcc'])
+        self.assertEqual(results['criteria']['e2']['fp'], 1)
+        
+        # Paper: (100 * .45 + 50 * .35) / .8; undefined MCC still weighs in
+        self.assertAlmostEqual(results['summary']['Paper']['mean_accuracy'], 78.125)
+        self.assertAlmostEqual(results['summary']['Paper']['mean_mcc'], 0.5625)
+        self.assertEqual(results['summary']['Code']['mean_accuracy'], 100.0)
+        self.assertAlmostEqual(results['summary']['Global']['mean_accuracy'], 78.125 * 0.6 + 100 * 0.4)
+        self.assertNotIn('Dataset', results['summary'])
+        self.assertEqual(results['tokens']['totals']['paper']['total_tokens'], 100)
+        
+        with self.assertNumQueries(3):
+            self.assertEqual(evaluate_workflow(self.definition), results)
+        
+        # A changed label is a new snapshot
+        self.evaluation.labels['paper_analysis'][3]['present'] = True
+        self.evaluation.save()
+        updated = evaluate_workflow(self.definition)
+        self.assertEqual(updated['categories']['Paper.experiments']['accuracy'], 100.0)
+        self.assertEqual(EvaluationResult.objects.count(), 2)
+    
+    def test_management_command(self):
+        """Test the evaluate_workflow command selects the definition and writes results."""
+        import json
+        import os
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+    
+        output = os.path.join(tempfile.mkdtemp(), 'results.json')
+        stdout = StringIO()
+        call_command(
+            'evaluate_workflow', workflow='evaluated_workflow', workflow_version=1,
+            output=output, stdout=stdout
+        )
+        self.assertIn('evaluated_workflow v1: 1 paper(s) evaluated', stdout.getvalue())
+        with open(output) as f:
+            self.assertEqual(json.load(f)['paper_count'], 1)
+    
+        with self.assertRaises(CommandError):
+            call_command('evaluate_workflow', '--workflow=evaluated_workflow', '--workflow-version=2')
+
+
+class TokenCounterTestCase(TestCase):
+    """Test tokenizer-based counting, memoization and stored per-row counts."""
+    
+    def test_counts_are_memoized_and_fall_back_without_tokenizer(self):
+        """Test the counter encodes each distinct text once."""
+        from webApp.services.token_counter import TokenCounter
+        
+        class WordEncoding:
+            calls = 0
+            
+            def encode(self, text, disallowed_special=()):
+                WordEncoding.calls += 1
+                return text.split()
+            
+            def encode_batch(self, texts, disallowed_special=()):
+                return [self.encode(text) for text in texts]
+        
+        counter = TokenCounter(cache_size=2)
+        counter._encoding, counter._loaded = WordEncoding(), True
+        self.assertEqual(counter.count('a b c'), 3)
+        self.assertEqual(counter.count('a b c'), 3)
+        self.assertEqual(WordEncoding.calls, 1)
+        self.assertEqual(counter.count_many(['a b c', 'd e', '', None]), [3, 2, 0, 0])
+        self.assertEqual(WordEncoding.calls, 2)
+        
+        fallback = TokenCounter()
+        fallback._loaded = True
+        self.assertEqual(fallback.count('x' * 40), 10)
+    
+    def test_embedding_rows_store_token_counts(self):
+        """Test section and code embeddings record their token count on save."""
+        from webApp.models import CodeFileEmbedding, PaperSectionEmbedding
+        from webApp.services.token_counter import count_tokens
+        
+        paper = Paper.objects.create(title='Token Paper', doi='10.1234/tokens')
+        section = PaperSectionEmbedding.objects.create(
+            paper=paper, section_type='methods', section_text='We train a U-Net ' * 50, embedding=[1.0]
+        )
+        code = CodeFileEmbedding.objects.create(
+            paper=paper, code_url='https://github.com/example/tokens', file_path='train.py',
+            file_content='import torch\n' * 20, content_hash='x', embedding=[1.0]
+        )
+        self.assertEqual(section.token_count, count_tokens(section.section_text))
+        self.assertGreater(section.token_count, 0)
+        self.assertEqual(code.token_count, count_tokens(code.file_content))
+        
+        section.section_text = 'Short.'
+        section.save()
+        self.assertEqual(PaperSectionEmbedding.objects.get(id=section.id).token_count, count_tokens('Short.'))
+    
+    def test_embedding_file_selection_respects_token_budget(self):
+        """Test files over the budget are skipped while smaller later files still fit."""
+        from webApp.services.nodes.code_embedding import select_files_within_budget
+        from webApp.services.token_counter import count_tokens
+        
+        files = {'a.py': 'x' * 400, 'big.py': 'y' * 4000, 'b.py': 'z' * 200}
+        budget = count_tokens(files['a.py']) + count_tokens(files['b.py'])
+        selected, dropped, used = select_files_within_budget(files, budget)
+        self.assertEqual(list(selected), ['a.py', 'b.py'])
+        self.assertEqual(dropped, ['big.py'])
+        self.assertEqual(used, budget)
+
+
+class ContextPackingTestCase(TestCase):
+    """Test knapsack context packing with redundancy and truncation."""
+    
+    def item(self, key, relevance, text, embedding):
+        from webApp.services.context_packing import PackItem
+        from webApp.services.token_counter import count_tokens
+        
+        return PackItem(key=key, text=text, tokens=count_tokens(text), relevance=relevance, embedding=embedding)
+    
+    def test_large_item_does_not_end_selection(self):
+        """Test smaller items still fill the budget after an oversized top hit."""
+        from webApp.services.context_packing import pack_context
+        
+        large = self.item('large', 0.9, 'line of code\n' * 400, [1.0, 0.0, 0.0])
+        small = self.item('small', 0.8, 'x' * 400, [0.0, 1.0, 0.0])
+        other = self.item('other', 0.7, 'y' * 400, [0.0, 0.0, 1.0])
+        budget = small.tokens + other.tokens + 250
+        
+        result = pack_context([large, small, other], budget)
+        keys = [packed.item.key for packed in result.packed]
+        self.assertEqual(keys, ['large', 'small', 'other'])
+        self.assertTrue(result.packed[0].truncated)
+        self.assertLessEqual(result.report.tokens_used, budget)
+        self.assertEqual(result.report.truncated, ['large'])
+        self.assertEqual(result.report.dropped, [])
+        
+        no_truncation = pack_context([large, small, other], budget, allow_truncation=False)
+        self.assertEqual([p.item.key for p in no_truncation.packed], ['small', 'other'])
+        self.assertEqual([d['key'] for d in no_truncation.report.dropped], ['large'])
+        self.assertLess(no_truncation.report.utilisation, 1.0)
+    
+    def test_near_duplicates_have_diminishing_returns(self):
+        """Test a duplicate chunk loses to a less similar but distinct one."""
+        from webApp.services.context_packing import pack_context
+        
+        first = self.item('first', 0.9, 'a' * 400, [1.0, 0.0])
+        duplicate = self.item('duplicate', 0.89, 'b' * 400, [1.0, 0.01])
+        distinct = self.item('distinct', 0.5, 'c' * 400, [0.0, 1.0])
+        
+        result = pack_context([first, duplicate, distinct], first.tokens * 2, allow_truncation=False)
+        self.assertEqual([p.item.key for p in result.packed], ['first', 'distinct'])
+        self.assertEqual(result.report.to_dict()['dropped'][0]['key'], 'duplicate')
+
+
+class OfflineBenchmarkTestCase(TestCase):
+    """Test the offline service stubs and the end-to-end workflow benchmark."""
+    
+    def test_stub_openai_returns_deterministic_schema_valid_outputs(self):
+        """Test structured outputs validate, repeat for the same request and report usage."""
+        import openai
+        from webApp.services.offline import StubLLMConfig, StubOpenAI
+        from webApp.services.pydantic_schemas import PaperTypeClassification, SingleCriterionAnalysis
+        
+        client = StubOpenAI()
+        messages = [{'role': 'user', 'content': 'Classify this paper'}]
+        first = client.chat.completions.parse(model='gpt-5', messages=messages, response_format=SingleCriterionAnalysis)
+        second = client.chat.completions.parse(model='gpt-5', messages=messages, response_format=SingleCriterionAnalysis)
+        self.assertIsInstance(first.choices[0].message.parsed, SingleCriterionAnalysis)
+        self.assertEqual(first.choices[0].message.content, second.choices[0].message.content)
+        self.assertGreater(first.usage.prompt_tokens, 0)
+        
+        response = client.chat.completions.create(
+            model='gpt-5', messages=messages,
+            response_format={'type': 'json_schema', 'json_schema': {
+                'name': 'paper_type', 'schema': PaperTypeClassification.model_json_schema()
+            }}
+        )
+        PaperTypeClassification.model_validate_json(response.choices[0].message.content)
+        
+        embeddings = client.embeddings.create(model='text-embedding-3-small', input=['a b', 'a b', 'c d'])
+        vectors = [item.embedding for item in embeddings.data]
+        self.assertEqual(len(vectors[0]), 1536)
+        self.assertEqual(vectors[0], vectors[1])
+        self.assertEqual(client.stats['chat.completions']['requests'], 3)
+        
+        limited = StubOpenAI(StubLLMConfig(rpm=1, max_retries=0))
+        limited.embeddings.create(model='text-embedding-3-small', input='first')
+        with self.assertRaises(openai.RateLimitError):
+            limited.embeddings.create(model='text-embedding-3-small', input='second')
+        self.assertEqual(limited.stats['embeddings']['rate_limited'], 1)
+    
+    def test_benchmark_runs_workflow_offline(self):
+        """Test the benchmark ingests, clones and analyzes synthetic papers end to end."""
+        from webApp.services.benchmark import run_benchmark
+        from webApp.services.worker_runtime import openai_client
+        
+        report = run_benchmark(papers=2, concurrency=1, code_fraction=0.5, words_per_section=60, trace_memory=False)
+        
+        self.assertEqual(report['runs']['statuses'], {'completed': 2})
+        self.assertEqual(report['runs']['failed_papers'], [])
+        self.assertEqual(report['grobid_requests'], 2)
+        nodes = report['nodes']
+        self.assertEqual(nodes['final_aggregation']['statuses'], {'completed': 2})
+        self.assertEqual(nodes['code_embedding']['statuses'], {'completed': 1, 'skipped': 1})
+        self.assertIn('git_clone', nodes['code_availability_check']['spans'])
+        self.assertGreater(nodes['reproducibility_checklist']['queries']['mean'], 0)
+        self.assertIn('p95', nodes['paper_type_classification']['latency_seconds'])
+        self.assertGreater(report['llm']['chat.completions']['requests'], 0)
+        self.assertNotIn('StubOpenAI', type(openai_client('key')).__name__)
+
 
-# Create your tests here.
+class PaperPromptPrefixTestCase(TestCase):
+    """Test the shared per-paper prompt prefix of criterion requests."""
+    
+    def setUp(self):
+        from webApp.models import PaperSectionEmbedding
+        
+        self.paper = Paper.objects.create(title='Prefix Paper', doi='10.1234/prefix', abstract='Abstract')
+        for section_type, text, vector in (
+            ('introduction', 'We study segmentation. ' * 40, [0.0, 1.0]),
+            ('methods', 'We train a U-Net on public data. ' * 400, [1.0, 0.0]),
+        ):
+            PaperSectionEmbedding.objects.create(
+                paper=self.paper, section_type=section_type, section_text=text,
+                embedding=vector, embedding_dimension=2
+            )
+    
+    def test_prefix_is_shared_and_criterion_is_suffix(self):
+        """Test every criterion request starts with the same paper prefix."""
+        from webApp.services.nodes.dataset_documentation_check import _rank_sections_for_criterion
+        from webApp.services.paper_prompts import (
+            criterion_messages, format_section_hint, load_paper_sections, paper_prefix
+        )
+        from webApp.services.token_counter import count_tokens
+        
+        sections = load_paper_sections(self.paper.id)
+        prefix = paper_prefix(self.paper, 'method', sections)
+        self.assertEqual(prefix.cache_key, f'paper-{self.paper.id}')
+        self.assertFalse(prefix.truncated)
+        content = prefix.messages[0]['content']
+        self.assertLess(content.index('=== INTRODUCTION ==='), content.index('=== METHODS ==='))
+        
+        first = criterion_messages(prefix, 'Criterion: Code availability')
+        second = criterion_messages(prefix, 'Criterion: Data splits')
+        self.assertEqual(first[:-1], second[:-1])
+        self.assertNotIn('Criterion:', content)
+        
+        ranked = _rank_sections_for_criterion(sections, [1.0, 0.5])
+        self.assertEqual([section_type for _, section_type in ranked], ['methods', 'introduction'])
+        self.assertIn('METHODS (similarity: 0.894)', format_section_hint(ranked))
+        
+        small = paper_prefix(self.paper, 'method', sections, token_budget=300)
+        self.assertTrue(small.truncated)
+        self.assertLessEqual(small.tokens, 300)
+        self.assertLess(count_tokens(small.messages[0]['content']), 500)
+        self.assertIn('=== ABSTRACT ===\nAbstract', paper_prefix(self.paper, 'method', []).messages[0]['content'])
+    
+    def test_cached_tokens_are_read_from_usage(self):
+        """Test cached input tokens are read from chat and responses usage."""
+        from types import SimpleNamespace
+        from webApp.services.offline.llm import StubOpenAI
+        from webApp.services.paper_prompts import cached_input_tokens, criterion_messages, paper_prefix
+        from webApp.services.paper_prompts import load_paper_sections
+        
+        self.assertEqual(cached_input_tokens(None), 0)
+        self.assertEqual(cached_input_tokens(SimpleNamespace(prompt_tokens=10)), 0)
+        self.assertEqual(cached_input_tokens(
+            SimpleNamespace(input_tokens_details=SimpleNamespace(cached_tokens=7))
+        ), 7)
+        
+        prefix = paper_prefix(self.paper, 'method', load_paper_sections(self.paper.id))
+        stub = StubOpenAI()
+        usages = [
+            stub.chat.completions.create(model='gpt-5', messages=criterion_messages(prefix, prompt)).usage
+            for prompt in ('Criterion: A', 'Criterion: B')
+        ]
+        self.assertEqual(cached_input_tokens(usages[0]), 0)
+        self.assertGreaterEqual(cached_input_tokens(usages[1]), 1024)
+        self.assertEqual(stub.stats['chat.completions']['cached_tokens'], cached_input_tokens(usages[1]))
@@ -32,18 +32,24 @@ from .views import (
     ConferenceListView,
     ConferenceDetailView,
     ConferencePaperStatusView,
+    PaperSearchView,
     ConferenceNodeStatisticsView,
     ActiveWorkflowsView,
+    WorkflowQueuePositionView,
     PaperDetailView,
     RerunWorkflowView,
     WorkflowStatusView,
+    WorkflowStatusStreamView,
     LatestWorkflowStatusView,
     WorkflowNodeDetailView,
+    WorkflowNodeLogsView,
+    WorkflowNodeArtifactView,
     RerunSingleNodeView,
     RerunFromNodeView,
     GenerateHighlightedPDFView,
     BulkRerunWorkflowsView,
     BulkStopWorkflowsView,
+    BulkOperationStatusView,
     BulkRerunPreviewView,
 )
 
@@ -65,6 +71,7 @@ urlpatterns = [
         ConferenceDetailView.as_view(),
         name="conference_detail",
     ),
+    path("papers/search/", PaperSearchView.as_view(), name="paper_search"),
     path(
         "conference/<int:conference_id>/paper-statuses/",
         ConferencePaperStatusView.as_view(),
@@ -76,6 +83,11 @@ urlpatterns = [
         name="conference_node_statistics",
     ),
     path("workflows/active/", ActiveWorkflowsView.as_view(), name="active_workflows"),
+    path(
+        "workflows/queue/<int:paper_id>/",
+        WorkflowQueuePositionView.as_view(),
+        name="workflow_queue_position",
+    ),
     path(
         "conference/<int:conference_id>/bulk-rerun-workflows/",
         BulkRerunWorkflowsView.as_view(),
@@ -91,6 +103,11 @@ urlpatterns = [
         BulkRerunPreviewView.as_view(),
         name="bulk_rerun_preview",
     ),
+    path(
+        "bulk-operations/<uuid:operation_id>/",
+        BulkOperationStatusView.as_view(),
+        name="bulk_operation_status",
+    ),
     path("paper/<int:paper_id>/", PaperDetailView.as_view(), name="paper_detail"),
     path(
         "paper/<int:paper_id>/rerun-workflow/",
@@ -107,11 +124,26 @@ urlpatterns = [
         LatestWorkflowStatusView.as_view(),
         name="latest_workflow_status",
     ),
+    path(
+        "workflow/stream/",
+        WorkflowStatusStreamView.as_view(),
+        name="workflow_status_stream",
+    ),
     path(
         "workflow/node/<uuid:node_id>/",
         WorkflowNodeDetailView.as_view(),
         name="workflow_node_detail",
     ),
+    path(
+        "workflow/node/<uuid:node_id>/logs/",
+        WorkflowNodeLogsView.as_view(),
+        name="workflow_node_logs",
+    ),
+    path(
+        "workflow/node/<uuid:node_id>/artifacts/<str:name>/",
+        WorkflowNodeArtifactView.as_view(),
+        name="workflow_node_artifact",
+    ),
     path(
         "workflow/node/<uuid:node_id>/rerun/",
         RerunSingleNodeView.as_view(),
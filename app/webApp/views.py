@@ -7,19 +7,20 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth import login
 from django.contrib import messages
-from django.http import JsonResponse, FileResponse
+from django.http import JsonResponse, FileResponse, StreamingHttpResponse
+from django.urls import reverse
 import json
+import hashlib
 from django.views import View
+from django.utils.decorators import method_decorator
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition
 from django.core.paginator import Paginator
 from django.db.models import (
     Q,
+    F,
     Count,
-    Prefetch,
     Sum,
-    Subquery,
-    OuterRef,
-    Avg,
-    StdDev,
     Count,
 )
 from webApp.models import (
@@ -28,6 +29,8 @@ from webApp.models import (
     BugReport,
     Paper,
     Conference,
+    BulkOperation,
+    HighlightedPDF,
     LLMModelConfig,
 )
 from django.core.paginator import Paginator
@@ -52,7 +55,21 @@ from .tasks import (
     create_analysis_task,
     cleanup_task,
     get_available_models,
+    generate_highlighted_pdf_task,
 )
+from .services.node_details import (
+    DEFAULT_LOG_LIMIT,
+    HEAVY_FIELDS as NODE_HEAVY_FIELDS,
+    iter_json,
+    node_artifact,
+    node_artifacts,
+    node_detail,
+    node_logs,
+    parse_fields as parse_node_fields,
+)
+from .services.paper_search import search_papers
+from .services.file_hashing import cached_file_hash
+from .services.pdf_highlighter import evidence_hash
 
 # Import workflow models
 from workflow_engine.models import (
@@ -61,153 +78,59 @@ from workflow_engine.models import (
     WorkflowDefinition,
     NodeArtifact,
 )
+from webApp.services.conference_stats import conference_summaries, node_summaries
+from workflow_engine.services.status_feed import (
+    latest_event_id,
+    status_feed,
+    StatusFeedFull,
+)
 
 
 def compute_conference_token_statistics(conferences):
     """
-    Compute token statistics for conferences based on latest workflow run per paper.
-    Optimized to compute all aggregations natively inside the database.
+    Attach token statistics (based on the latest completed run per paper) to conferences.
+
+    Reads the materialized ConferenceTokenStats rows, so the cost does not
+    depend on the size of the workflow history.
     """
     if not conferences:
         return
 
-    conference_ids = [c.id for c in conferences]
-
-    # 1. Subquery to find the ID of the latest completed run for each paper
-    latest_run_sq = (
-        WorkflowRun.objects.filter(paper_id=OuterRef("paper_id"), status="completed")
-        .order_by("-created_at")
-        .values("id")[:1]
-    )
-
-    # 2. Query to aggregate stats grouped directly by conference_id
-    # We filter WorkflowRun to only include those latest runs for the current page of conferences
-    stats = (
-        WorkflowRun.objects.filter(
-            paper__conference_id__in=conference_ids,
-            status="completed",
-            id=Subquery(latest_run_sq),
-        )
-        .values("paper__conference_id")
-        .annotate(
-            avg_input=Avg("total_input_tokens"),
-            stddev_input=StdDev("total_input_tokens", sample=True),
-            avg_output=Avg("total_output_tokens"),
-            stddev_output=StdDev("total_output_tokens", sample=True),
-            avg_total=Avg("total_tokens"),
-            stddev_total=StdDev("total_tokens", sample=True),
-            sum_total=Sum("total_tokens"),
-        )
-    )
-
-    # 3. Create a quick lookup dictionary mapping conference_id -> stats
-    stats_dict = {item["paper__conference_id"]: item for item in stats}
+    stats_dict = conference_summaries(c.id for c in conferences)
 
-    # 4. Attach the computed numbers to the conference objects in memory
     for conference in conferences:
         conf_stats = stats_dict.get(conference.id, {})
+        conference.avg_input_tokens = conf_stats.get("avg_input_tokens")
+        conference.stddev_input_tokens = conf_stats.get("stddev_input_tokens")
+        conference.avg_output_tokens = conf_stats.get("avg_output_tokens")
+        conference.stddev_output_tokens = conf_stats.get("stddev_output_tokens")
+        conference.avg_total_tokens = conf_stats.get("avg_total_tokens")
+        conference.stddev_total_tokens = conf_stats.get("stddev_total_tokens")
 
-        # Input
-        conference.avg_input_tokens = conf_stats.get("avg_input")
-        if conference.avg_input_tokens is not None:
-            # MariaDB returns None for StdDev if there's only 1 row. We default to 0.0 like your original code.
-            conference.stddev_input_tokens = (
-                conf_stats.get("stddev_input")
-                if conf_stats.get("stddev_input") is not None
-                else 0.0
-            )
-        else:
-            conference.stddev_input_tokens = None
-
-        # Output
-        conference.avg_output_tokens = conf_stats.get("avg_output")
-        if conference.avg_output_tokens is not None:
-            conference.stddev_output_tokens = (
-                conf_stats.get("stddev_output")
-                if conf_stats.get("stddev_output") is not None
-                else 0.0
-            )
-        else:
-            conference.stddev_output_tokens = None
-
-        # Total
-        conference.avg_total_tokens = conf_stats.get("avg_total")
-        if conference.avg_total_tokens is not None:
-            conference.stddev_total_tokens = (
-                conf_stats.get("stddev_total")
-                if conf_stats.get("stddev_total") is not None
-                else 0.0
-            )
-        else:
-            conference.stddev_total_tokens = None
-
-        # Sum of latest-run tokens per paper (replaces the old annotation)
-        conference.total_tokens = conf_stats.get("sum_total")
+        # Sum of latest-run tokens per paper
+        conference.total_tokens = conf_stats.get("sum_total_tokens")
 
 
 def compute_node_statistics(conference_id):
     """
-    Compute per-node token statistics for a conference based on latest workflow runs.
-    Optimized to compute all aggregations natively inside the database.
+    Per-node token and span statistics for a conference based on latest completed runs.
+
+    Reads the materialized ConferenceTokenStats rows (one per node).
     """
-    # 1. Subquery to find the ID of the latest completed run for each paper
-    latest_run_sq = (
-        WorkflowRun.objects.filter(paper_id=OuterRef("paper_id"), status="completed")
-        .order_by("-created_at")
-        .values("id")[:1]
-    )
-
-    # 2. Get the actual list of run IDs for this conference using the subquery
-    latest_run_ids = WorkflowRun.objects.filter(
-        paper__conference_id=conference_id,
-        status="completed",
-        id=Subquery(latest_run_sq),
-    ).values_list("id", flat=True)
-
-    if not latest_run_ids:
-        return {}
-
-    # 3. Filter nodes belonging to those runs and compute math natively in the DB.
-    # Exclude nodes with zero or null total_tokens (e.g. cached runs that tracked
-    # no tokens) so that they do not artificially deflate averages and inflate stddev.
-    # sample=True maps to STDDEV_SAMP, matching Python's statistics.stdev()
-    node_stats = (
-        WorkflowNode.objects.filter(
-            workflow_run_id__in=latest_run_ids,
-            total_tokens__gt=0,
-        )
-        .values("node_id")
-        .annotate(
-            avg_input=Avg("input_tokens"),
-            stddev_input=StdDev("input_tokens", sample=True),
-            avg_output=Avg("output_tokens"),
-            stddev_output=StdDev("output_tokens", sample=True),
-            avg_total=Avg("total_tokens"),
-            stddev_total=StdDev("total_tokens", sample=True),
-            node_count=Count("id"),
-        )
-    )
-
-    # 4. Format the result to match the exact JSON dictionary expected by your view
-    result = {}
-    for stat in node_stats:
-        result[stat["node_id"]] = {
-            "avg_input_tokens": stat["avg_input"],
-            "stddev_input_tokens": (
-                stat["stddev_input"] if stat["stddev_input"] is not None else 0.0
-            ),
-            "avg_output_tokens": stat["avg_output"],
-            "stddev_output_tokens": (
-                stat["stddev_output"] if stat["stddev_output"] is not None else 0.0
-            ),
-            "avg_total_tokens": stat["avg_total"],
-            "stddev_total_tokens": (
-                stat["stddev_total"] if stat["stddev_total"] is not None else 0.0
-            ),
-            "count": stat["node_count"],
+    return {
+        node_id: {
+            "avg_input_tokens": stats["avg_input_tokens"],
+            "stddev_input_tokens": stats["stddev_input_tokens"],
+            "avg_output_tokens": stats["avg_output_tokens"],
+            "stddev_output_tokens": stats["stddev_output_tokens"],
+            "avg_total_tokens": stats["avg_total_tokens"],
+            "stddev_total_tokens": stats["stddev_total_tokens"],
+            "count": stats["count"],
+            "span_count": stats["span_count"],
+            "spans": stats["spans"],
         }
-
-    return result
+        for node_id, stats in node_summaries(conference_id).items()
+    }
 
 
 class PaperSnitchLoginView(LoginView):
@@ -543,7 +466,10 @@ class AnalyzePaperView(View):
 
         # Start background analysis
         # run_analysis_task(task_id)
-        run_analysis_celery_task.delay(task_id)
+        run_analysis_celery_task.apply_async(
+            args=[task_id],
+            queue=WorkflowRun.queue_for_priority(WorkflowRun.PRIORITY_INTERACTIVE),
+        )
 
         return JsonResponse({"task_id": task_id})
 
@@ -772,48 +698,36 @@ class ConferenceDetailView(View):
         # Get total paper count for this conference (optimized)
         total_papers = Paper.objects.filter(conference=conference).count()
 
-        # Prefetch latest workflow run for each paper (single additional query)
-        latest_workflow_prefetch = Prefetch(
-            "workflow_runs",
-            queryset=WorkflowRun.objects.order_by("-created_at").only(
-                "id", "status", "created_at"
-            )[:1],
-            to_attr="latest_workflow_list",
-        )
-
-        # Subquery to get token count from latest completed workflow run
-        latest_completed_tokens_subquery = Subquery(
-            WorkflowRun.objects.filter(paper_id=OuterRef("pk"), status="completed")
-            .order_by("-created_at")
-            .values("total_tokens")[:1]
-        )
-
-        # Get papers for this conference with workflow stats annotated
-        # Use only() to fetch only required fields for better performance
+        # Latest run status, run count and latest completed run tokens come
+        # from the denormalized pointers on Paper (joins, no per-paper subqueries)
         papers = (
             Paper.objects.filter(conference=conference)
-            .select_related("conference")
-            .prefetch_related(latest_workflow_prefetch)
-            .only("id", "title", "doi", "authors", "conference__id", "conference__name")
+            .select_related("conference", "latest_workflow_run")
+            .only(
+                "id",
+                "title",
+                "doi",
+                "authors",
+                "workflow_run_count",
+                "conference__id",
+                "conference__name",
+                "latest_workflow_run__id",
+                "latest_workflow_run__status",
+                "latest_workflow_run__created_at",
+            )
             .annotate(
-                workflow_count=Count("workflow_runs"),
-                latest_run_tokens=latest_completed_tokens_subquery,
+                latest_run_tokens=F("latest_completed_workflow_run__total_tokens")
             )
         )
 
         # Compute per-node statistics for this conference
         node_statistics = compute_node_statistics(conference_id)
 
-        # Apply search filter
+        # Apply ranked full-text search, otherwise order by title
         if search_query:
-            papers = papers.filter(
-                Q(title__icontains=search_query)
-                | Q(doi__icontains=search_query)
-                | Q(authors__icontains=search_query)
-            )
-
-        # Order by title
-        papers = papers.order_by("title")
+            papers = search_papers(search_query, papers)
+        else:
+            papers = papers.order_by("title")
 
         # Pagination - paginate BEFORE accessing the data
         paginator = Paginator(papers, 25)  # 25 papers per page
@@ -832,9 +746,58 @@ class ConferenceDetailView(View):
         return render(request, self.template_name, context)
 
 
+class PaperSearchView(View):
+    """API view for ranked full-text paper search (public, no auth required)."""
+
+    MAX_RESULTS = 100
+
+    def get(self, request):
+        """Search papers by title, authors, abstract, full text or DOI."""
+
+        query = request.GET.get("q", "").strip()
+        if not query:
+            return JsonResponse({"error": "Missing search query"}, status=400)
+
+        try:
+            limit = min(int(request.GET.get("limit", 20)), self.MAX_RESULTS)
+        except ValueError:
+            return JsonResponse({"error": "Invalid limit"}, status=400)
+
+        papers = Paper.objects.only("id", "title", "authors", "doi", "conference_id")
+        if request.GET.get("conference"):
+            try:
+                conference_id = int(request.GET["conference"])
+            except ValueError:
+                return JsonResponse({"error": "Invalid conference"}, status=400)
+            papers = papers.filter(conference_id=conference_id)
+
+        results = [
+            {
+                "id": paper.id,
+                "title": paper.title,
+                "authors": paper.authors,
+                "doi": paper.doi,
+                "conference_id": paper.conference_id,
+                "rank": float(paper.search_rank or 0),
+            }
+            for paper in search_papers(query, papers)[: max(limit, 1)]
+        ]
+
+        return JsonResponse({"query": query, "results": results})
+
+
+def _conference_statuses_etag(request, conference_id):
+    """Changes whenever a workflow of the conference (or the requested page) changes."""
+    paper_ids = request.GET.get("paper_ids", "")
+    page_key = hashlib.md5(paper_ids.encode()).hexdigest()[:12]
+    latest = latest_event_id(paper__conference_id=conference_id)
+    return f"conference-{conference_id}-{latest}-{page_key}"
+
+
 class ConferencePaperStatusView(View):
     """API view to get current status of papers in a conference (for auto-refresh)."""
 
+    @method_decorator(condition(etag_func=_conference_statuses_etag))
     def get(self, request, conference_id):
         """Return current workflow statuses for papers in the conference."""
 
@@ -843,21 +806,11 @@ class ConferencePaperStatusView(View):
         # Get paper IDs from query parameter (for pagination support)
         paper_ids_param = request.GET.get("paper_ids", "")
 
-        # Prefetch latest workflow run for each paper
-        latest_workflow_prefetch = Prefetch(
-            "workflow_runs",
-            queryset=WorkflowRun.objects.order_by("-created_at").only(
-                "id", "status", "created_at"
-            )[:1],
-            to_attr="latest_workflow_list",
-        )
-
-        # Get papers for this conference
+        # Get papers for this conference with their latest run (single join)
         papers = (
             Paper.objects.filter(conference=conference)
-            .prefetch_related(latest_workflow_prefetch)
-            .only("id")
-            .annotate(workflow_count=Count("workflow_runs"))
+            .select_related("latest_workflow_run")
+            .only("id", "workflow_run_count", "latest_workflow_run__status")
         )
 
         # Filter by paper IDs if provided
@@ -874,21 +827,19 @@ class ConferencePaperStatusView(View):
         statuses = {}
         for paper in papers:
             status = "none"
-            workflow_count = paper.workflow_count
-
-            if paper.latest_workflow_list:
-                status = paper.latest_workflow_list[0].status
+            if paper.latest_workflow_run:
+                status = paper.latest_workflow_run.status
 
             statuses[str(paper.id)] = {
                 "status": status,
-                "workflow_count": workflow_count,
+                "workflow_count": paper.workflow_run_count,
             }
 
         return JsonResponse({"statuses": statuses})
 
 
 class ConferenceNodeStatisticsView(View):
-    """API view to get per-node token statistics for a conference (for auto-refresh)."""
+    """API view to get per-node token and span statistics for a conference (for auto-refresh)."""
 
     def get(self, request, conference_id):
         """Return current node statistics for the conference."""
@@ -935,6 +886,9 @@ class ConferenceNodeStatisticsView(View):
                     else None
                 ),
                 "count": stats["count"],
+                # Mean time per operation kind (llm, embedding, db, ...) per node run
+                "span_count": stats["span_count"],
+                "spans": stats["spans"],
             }
 
         return JsonResponse({"node_statistics": stats_json})
@@ -944,32 +898,47 @@ class ActiveWorkflowsView(View):
     """API view to get currently active workflows (for monitoring concurrency)."""
 
     def get(self, request):
-        """Return current active workflow count and limit."""
+        """Return cluster-wide active workflow count, limits and queue length."""
         from asgiref.sync import async_to_sync
         from webApp.services.graphs.base_workflow_graph import (
-            get_active_workflow_count,
             get_active_workflows,
-            MAX_CONCURRENT_WORKFLOWS,
             cleanup_stale_workflows,
         )
+        from workflow_engine.services.concurrency import workflow_admission
 
-        # Clean up stale workflows (older than 30 minutes) - now async
+        # Expire leases that stopped heartbeating (and legacy runs by age)
         async_to_sync(cleanup_stale_workflows)(max_age_minutes=30)
 
-        # Get counts and workflows - now async
-        active_count = async_to_sync(get_active_workflow_count)()
+        snapshot = workflow_admission.snapshot()
         active_workflows = async_to_sync(get_active_workflows)()
 
         return JsonResponse(
             {
-                "active_count": active_count,
-                "max_concurrent": MAX_CONCURRENT_WORKFLOWS,
-                "available_slots": MAX_CONCURRENT_WORKFLOWS - active_count,
+                "active_count": snapshot["active_count"],
+                "max_concurrent": snapshot["max_concurrent"],
+                "available_slots": snapshot["available_slots"],
+                "waiting_count": snapshot["waiting_count"],
+                "per_model_limits": snapshot["per_model_limits"],
+                "per_user_limit": snapshot["per_user_limit"],
                 "workflows": active_workflows,
             }
         )
 
 
+class WorkflowQueuePositionView(View):
+    """API view returning a paper's position in the cluster-wide workflow queue."""
+
+    def get(self, request, paper_id):
+        """Return 0 when running, the 1-based queue position when waiting."""
+        from workflow_engine.services.concurrency import workflow_admission
+
+        queue_info = workflow_admission.queue_position_for_paper(paper_id)
+        if queue_info is None:
+            return JsonResponse({"paper_id": paper_id, "queued": False})
+
+        return JsonResponse({"paper_id": paper_id, "queued": True, **queue_info})
+
+
 class PaperDetailView(View):
     """View for paper details with workflow visualization (public, no auth required)."""
 
@@ -1194,7 +1163,7 @@ class RerunWorkflowView(View):
 
         # Enqueue workflow as Celery task (non-blocking, queued for processing)
         try:
-            from webApp.tasks import process_paper_workflow_task
+            from webApp.tasks import enqueue_paper_workflow
 
             # Resolve model string from model_key.
             # TODO: refactor process_paper_workflow_task (and all downstream node functions)
@@ -1211,8 +1180,9 @@ class RerunWorkflowView(View):
                         f"model '{model}' not found or inactive, falling back to default model"
                     )
 
-            # Submit task to Celery queue with selected workflow
-            task = process_paper_workflow_task.delay(
+            # Submit task to the interactive Celery queue with selected workflow
+            task = enqueue_paper_workflow(
+                priority=WorkflowRun.PRIORITY_INTERACTIVE,
                 paper_id=paper_id,
                 force_reprocess=force_reprocess,
                 model=resolved_model,
@@ -1244,9 +1214,18 @@ class RerunWorkflowView(View):
             )
 
 
+def _workflow_status_etag(request, workflow_run_id):
+    return f"run-{workflow_run_id}-{latest_event_id(workflow_run_id=workflow_run_id)}"
+
+
+def _latest_workflow_etag(request, paper_id):
+    return f"paper-{paper_id}-{latest_event_id(paper_id=paper_id)}"
+
+
 class WorkflowStatusView(View):
     """API view for getting workflow run status (for polling)."""
 
+    @method_decorator(condition(etag_func=_workflow_status_etag))
     def get(self, request, workflow_run_id):
         """Get workflow run status and nodes as JSON."""
         try:
@@ -1294,17 +1273,15 @@ class WorkflowStatusView(View):
 class LatestWorkflowStatusView(View):
     """API view for getting the latest workflow run for a paper."""
 
+    @method_decorator(condition(etag_func=_latest_workflow_etag))
     def get(self, request, paper_id):
         """Get latest workflow run ID for a paper."""
         try:
-            paper = Paper.objects.get(id=paper_id)
+            paper = Paper.objects.select_related("latest_workflow_run").get(id=paper_id)
         except Paper.DoesNotExist:
             return JsonResponse({"error": "Paper not found"}, status=404)
 
-        # Get the most recent workflow run for this paper
-        latest_run = (
-            WorkflowRun.objects.filter(paper=paper).order_by("-created_at").first()
-        )
+        latest_run = paper.latest_workflow_run
 
         if latest_run:
             return JsonResponse(
@@ -1320,87 +1297,147 @@ class LatestWorkflowStatusView(View):
             )
 
 
+class WorkflowStatusStreamView(View):
+    """
+    Server-sent events stream of workflow run/node status changes.
+
+    Filter with ?workflow_run=<uuid>, ?paper=<id> or ?conference=<id>.
+    Resumes after the Last-Event-ID header (or ?last_event_id=). When this
+    process already serves its maximum number of streams, responds 503 and
+    clients fall back to conditional polling of the status views.
+    """
+
+    def get(self, request):
+        workflow_run_id = request.GET.get("workflow_run") or None
+        paper_ids = None
+        try:
+            if request.GET.get("paper"):
+                paper_ids = {int(request.GET["paper"])}
+            elif request.GET.get("conference"):
+                paper_ids = set(
+                    Paper.objects.filter(
+                        conference_id=int(request.GET["conference"])
+                    ).values_list("id", flat=True)
+                )
+            last_event_id = request.META.get("HTTP_LAST_EVENT_ID") or request.GET.get(
+                "last_event_id"
+            )
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            return JsonResponse({"error": "Invalid stream parameters"}, status=400)
+
+        try:
+            events = status_feed.subscribe(
+                last_event_id=last_event_id,
+                workflow_run_id=workflow_run_id,
+                paper_ids=paper_ids,
+            )
+        except StatusFeedFull:
+            response = JsonResponse(
+                {"error": "Too many status streams, poll instead"}, status=503
+            )
+            response["Retry-After"] = "30"
+            return response
+
+        def event_stream():
+            try:
+                yield "retry: 3000\n\n"
+                for event in events:
+                    if event is None:
+                        yield ": keep-alive\n\n"
+                        continue
+                    yield (
+                        f"id: {event['event_id']}\n"
+                        "event: status\n"
+                        f"data: {json.dumps(event)}\n\n"
+                    )
+            finally:
+                # Release the subscriber slot when the client disconnects
+                events.close()
+
+        response = StreamingHttpResponse(
+            event_stream(), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
 class WorkflowNodeDetailView(View):
-    """API view for getting workflow node details (public, no auth required)."""
+    """
+    API view for getting workflow node details (public, no auth required).
+
+    Query parameters:
+        fields: Comma-separated node fields. Summary fields by default;
+            input_data, output_data and error_traceback only when listed.
+        logs: Number of log lines to include (default 200, 0 for none).
+            Continue with WorkflowNodeLogsView from ``logs_next_cursor``.
+
+    Artifacts are listed as metadata only; their data is fetched per
+    artifact from WorkflowNodeArtifactView.
+    """
 
+    @method_decorator(gzip_page)
     def get(self, request, node_id):
         """Get node execution details as JSON."""
         try:
-            node = WorkflowNode.objects.get(id=node_id)
-        except WorkflowNode.DoesNotExist:
+            fields = parse_node_fields(request.GET.get("fields"))
+            log_limit = int(request.GET.get("logs", DEFAULT_LOG_LIMIT))
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        data = node_detail(node_id, fields)
+        if data is None:
             return JsonResponse({"error": "Node not found"}, status=404)
-        except Exception as e:
-            return JsonResponse({"error": f"Server error: {str(e)}"}, status=500)
 
-        try:
-            # Get node logs
-            logs = node.logs.all().order_by("timestamp")
-            logs_data = [
-                {
-                    "level": log.level,
-                    "message": log.message,
-                    "context": log.context,
-                    "timestamp": log.timestamp.isoformat(),
-                }
-                for log in logs
-            ]
+        if log_limit > 0:
+            page = node_logs(node_id, limit=log_limit)
+            data["logs"] = page["logs"]
+            data["logs_next_cursor"] = page["next_cursor"]
+            data["logs_has_more"] = page["has_more"]
+        data["artifacts"] = node_artifacts(node_id)
 
-            # Get node artifacts
-            artifacts = node.artifacts.all()
-            artifacts_data = {}
-            for artifact in artifacts:
-                if artifact.artifact_type == "inline":
-                    inline_data = artifact.inline_data
-
-                    # For code_embedding node's result artifact, exclude embedded_files to reduce size
-                    # (embeddings are stored in DB, not needed for display)
-                    if (
-                        node.node_id == "code_embedding"
-                        and artifact.name == "result"
-                        and inline_data
-                    ):
-                        inline_data = inline_data.copy()
-                        if "embedded_files" in inline_data:
-                            inline_data["embedded_files"] = []
-
-                    artifacts_data[artifact.name] = inline_data
-                else:
-                    artifacts_data[artifact.name] = {
-                        "type": artifact.artifact_type,
-                        "file_path": artifact.file_path,
-                        "url": artifact.url,
-                        "mime_type": artifact.mime_type,
-                        "size_bytes": artifact.size_bytes,
-                        "metadata": artifact.metadata,
-                    }
+        if set(fields) & set(NODE_HEAVY_FIELDS):
+            return StreamingHttpResponse(iter_json(data), content_type="application/json")
+        return JsonResponse(data)
 
-            data = {
-                "id": str(node.id),
-                "node_id": node.node_id,
-                "node_type": node.node_type,
-                "handler": node.handler,
-                "status": node.status,
-                "attempt_count": node.attempt_count,
-                "max_retries": node.max_retries,
-                "input_data": node.input_data,
-                "output_data": node.output_data,
-                "artifacts": artifacts_data,
-                "error_message": node.error_message,
-                "error_traceback": node.error_traceback,
-                "celery_task_id": node.celery_task_id,
-                "started_at": node.started_at.isoformat() if node.started_at else None,
-                "completed_at": (
-                    node.completed_at.isoformat() if node.completed_at else None
-                ),
-                "duration": node.duration,
-                "logs": logs_data,
-            }
 
-            return JsonResponse(data)
-        except Exception as e:
-            return JsonResponse(
-                {"error": f"Error serializing data: {str(e)}"}, status=500
+class WorkflowNodeLogsView(View):
+    """
+    API view for paging through a node's logs (public, no auth required).
+
+    Query parameters:
+        after: Cursor from a previous response (logs_next_cursor / next_cursor)
+        limit: Page size (default 200, at most 1000)
+    """
+
+    @method_decorator(gzip_page)
+    def get(self, request, node_id):
+        """Get the log lines after a cursor as JSON."""
+        try:
+            page = node_logs(
+                node_id,
+                after=request.GET.get("after") or None,
+                limit=int(request.GET.get("limit", DEFAULT_LOG_LIMIT)),
             )
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        if not page["logs"] and not WorkflowNode.objects.filter(id=node_id).exists():
+            return JsonResponse({"error": "Node not found"}, status=404)
+        return JsonResponse(page)
+
+
+class WorkflowNodeArtifactView(View):
+    """API view returning one node artifact with its data (public, no auth required)."""
+
+    @method_decorator(gzip_page)
+    def get(self, request, node_id, name):
+        """Stream an artifact as JSON."""
+        artifact = node_artifact(node_id, name)
+        if artifact is None:
+            return JsonResponse({"error": "Artifact not found"}, status=404)
+        return StreamingHttpResponse(iter_json(artifact), content_type="application/json")
 
 
 class RerunSingleNodeView(View):
@@ -1653,7 +1690,13 @@ class RerunFromNodeView(View):
 
 
 class GenerateHighlightedPDFView(View):
-    """API view to generate highlighted PDF with evidence from workflow run."""
+    """
+    API view for the evidence-highlighted PDF of a workflow run.
+
+    Generation runs in generate_highlighted_pdf_task and is cached by (PDF
+    hash, evidence hash); until the file is ready the response only carries
+    the generation status, and the client polls.
+    """
 
     # Color mapping for different criterion categories
     CATEGORY_COLORS = {
@@ -1665,13 +1708,16 @@ class GenerateHighlightedPDFView(View):
         "default": (1.0, 1.0, 0.0),  # Yellow (fallback)
     }
 
-    def get(self, request, workflow_run_id):
-        """Generate or retrieve highlighted PDF for workflow run."""
+    # Generations that made no progress for this long are dispatched again
+    STALE_AFTER = timedelta(minutes=10)
 
-        logger = logging.getLogger(__name__)
+    def get(self, request, workflow_run_id):
+        """Return the highlighted PDF URL, or the status of its generation."""
 
         try:
-            workflow_run = WorkflowRun.objects.get(id=workflow_run_id)
+            workflow_run = WorkflowRun.objects.select_related("paper").get(
+                id=workflow_run_id
+            )
         except WorkflowRun.DoesNotExist:
             return JsonResponse({"error": "Workflow run not found"}, status=404)
 
@@ -1683,7 +1729,7 @@ class GenerateHighlightedPDFView(View):
                 {"error": "No PDF file available for this paper"}, status=404
             )
 
-        # Check if highlighted PDF artifact already exists in any of the workflow nodes
+        # Highlighted PDFs generated before the shared cache was introduced
         existing_artifact = NodeArtifact.objects.filter(
             node__workflow_run=workflow_run,
             name="highlighted_pdf",
@@ -1691,172 +1737,123 @@ class GenerateHighlightedPDFView(View):
         ).first()
 
         if existing_artifact and existing_artifact.file:
-            # Return the existing highlighted PDF URL
             return JsonResponse(
-                {"success": True, "pdf_url": existing_artifact.file.url, "cached": True}
+                {
+                    "success": True,
+                    "status": "completed",
+                    "pdf_url": existing_artifact.file.url,
+                    "cached": True,
+                }
             )
 
-        # Generate the highlighted PDF
-        try:
-            # Try to get evaluation details from workflow run output_data first
-            evaluation_details = workflow_run.output_data.get("evaluation_details", {})
-
-            # If not in output_data, try to find it in NodeArtifacts
-            if not evaluation_details:
-                # Look for artifacts containing evaluation details in workflow nodes
-                artifacts = NodeArtifact.objects.filter(
-                    node__workflow_run=workflow_run, artifact_type="inline"
-                ).order_by("-created_at")
-
-                for artifact in artifacts:
-                    if artifact.inline_data and isinstance(artifact.inline_data, dict):
-                        if "evaluation_details" in artifact.inline_data:
-                            evaluation_details = artifact.inline_data[
-                                "evaluation_details"
-                            ]
-                            break
-                        # Check if the artifact itself is the evaluation details
-                        elif "paper_checklist" in artifact.inline_data:
-                            evaluation_details = artifact.inline_data
-                            break
-
-            if not evaluation_details:
-                return JsonResponse(
-                    {
-                        "error": "No evaluation details found in workflow output or artifacts"
-                    },
-                    status=400,
-                )
+        evaluation_details = self._get_evaluation_details(workflow_run)
+        if not evaluation_details:
+            return JsonResponse(
+                {"error": "No evaluation details found in workflow output or artifacts"},
+                status=400,
+            )
 
-            paper_checklist = evaluation_details.get("paper_checklist", {})
-            criteria_obj = paper_checklist.get("criteria", {})
+        paper_checklist = evaluation_details.get("paper_checklist", {})
+        criteria_obj = paper_checklist.get("criteria", {})
 
-            # Handle both direct array and {value: [...]} structures
-            if isinstance(criteria_obj, dict):
-                criteria = criteria_obj.get("value", [])
-            else:
-                criteria = criteria_obj if isinstance(criteria_obj, list) else []
+        # Handle both direct array and {value: [...]} structures
+        if isinstance(criteria_obj, dict):
+            criteria = criteria_obj.get("value", [])
+        else:
+            criteria = criteria_obj if isinstance(criteria_obj, list) else []
 
-            if not criteria:
-                return JsonResponse(
-                    {"error": "No evaluation criteria found in workflow output"},
-                    status=400,
-                )
+        if not criteria:
+            return JsonResponse(
+                {"error": "No evaluation criteria found in workflow output"},
+                status=400,
+            )
 
-            # Prepare text to highlight with colors
-            text_color_map = []
-            total_evidence_count = 0
-            all_criteria = []
-            for criterion in criteria:
-                all_criteria.append(criterion.get("criterion_name", "unknown"))
-                evidence_text = criterion.get("evidence_text", "")
-                category = criterion.get("category", "default")
-
-                # Skip empty evidence
-                if not evidence_text or evidence_text.strip() == "":
-                    continue
-
-                # Get color for this category
-                color = self.CATEGORY_COLORS.get(
-                    category, self.CATEGORY_COLORS["default"]
-                )
-                text_color_map.append((evidence_text, color))
-                total_evidence_count += 1
-            if not text_color_map:
-                return JsonResponse(
-                    {"error": "No evidence text found to highlight"}, status=400
-                )
+        # Evidence to highlight with the color of its category
+        evidence = []
+        for criterion in criteria:
+            evidence_text = criterion.get("evidence_text", "")
 
-            # Generate highlighted PDF
-            input_pdf_path = paper.file.path
-            output_filename = f"highlighted_{workflow_run.id}.pdf"
-            output_pdf_path = os.path.join(tempfile.gettempdir(), output_filename)
-
-            # Open the document
-            doc = pymupdf.open(input_pdf_path)
-            total_instances = 0
-            highlighted_crit = []
-            for text_to_search, color in text_color_map:
-                for page in doc:
-                    # Find the coordinates (quads) of the text to search
-                    instances = page.search_for(text_to_search)
-
-                    if len(instances) != 0:
-                        total_instances += 1
-
-                    # Apply highlight for each occurrence found
-                    for inst in instances:
-                        annot = page.add_highlight_annot(inst)
-                        annot.set_colors(stroke=color)
-                        annot.update()
-
-            # Save the result
-            doc.save(output_pdf_path)
-            doc.close()
+            # Skip empty evidence
+            if not evidence_text or evidence_text.strip() == "":
+                continue
 
-            logger.info(
-                f"Generated highlighted PDF with {total_instances} highlights for workflow run {workflow_run.id}"
+            color = self.CATEGORY_COLORS.get(
+                criterion.get("category", "default"), self.CATEGORY_COLORS["default"]
             )
+            evidence.append({"text": evidence_text, "color": list(color)})
 
-            # Save as NodeArtifact
-            # Find a suitable node to attach the artifact to (prefer last completed node)
-            target_node = (
-                workflow_run.nodes.filter(status="completed")
-                .order_by("-completed_at")
-                .first()
+        if not evidence:
+            return JsonResponse(
+                {"error": "No evidence text found to highlight"}, status=400
             )
 
-            if not target_node:
-                # Fallback to any node if no completed nodes
-                target_node = workflow_run.nodes.first()
+        try:
+            pdf_sha256 = cached_file_hash(paper.file.path)
+        except OSError as e:
+            return JsonResponse({"error": f"PDF file is not readable: {e}"}, status=404)
+
+        highlighted, created = HighlightedPDF.objects.get_or_create(
+            pdf_sha256=pdf_sha256,
+            evidence_sha256=evidence_hash(evidence),
+            defaults={"evidence": evidence},
+        )
 
-            if not target_node:
-                return JsonResponse(
-                    {"error": "No nodes found in workflow run to attach artifact"},
-                    status=400,
-                )
+        if highlighted.status == "completed" and highlighted.file:
+            return JsonResponse(
+                {
+                    "success": True,
+                    "status": "completed",
+                    "pdf_url": highlighted.file.url,
+                    "cached": not created,
+                    "highlights_count": highlighted.highlights_found,
+                }
+            )
 
-            # Read file content
-            with open(output_pdf_path, "rb") as f:
-                file_content = f.read()
-
-            # Create NodeArtifact with FileField
-            artifact = NodeArtifact.objects.create(
-                node=target_node,
-                artifact_type="file",
-                name="highlighted_pdf",
-                mime_type="application/pdf",
-                size_bytes=len(file_content),
-                metadata={
-                    "highlights_found": f"{total_instances}/{total_evidence_count}",
-                    "generated_at": timezone.now().isoformat(),
-                    "paper_id": paper.id,
-                    "workflow_run_id": str(workflow_run.id),
+        retry = request.GET.get("retry") == "1"
+        if highlighted.status == "failed" and not retry:
+            return JsonResponse(
+                {
+                    "status": "failed",
+                    "error": f"Failed to generate highlighted PDF: {highlighted.error}",
                 },
+                status=500,
             )
 
-            # Save file to the artifact's file field
-            artifact.file.save(output_filename, ContentFile(file_content), save=True)
+        stale = highlighted.updated_at < timezone.now() - self.STALE_AFTER
+        if created or highlighted.status == "failed" or stale:
+            HighlightedPDF.objects.filter(id=highlighted.id).update(
+                status="pending", updated_at=timezone.now()
+            )
+            highlighted.status = "pending"
+            generate_highlighted_pdf_task.delay(highlighted.id, paper.id)
 
-            # Clean up temp file
-            os.remove(output_pdf_path)
+        return JsonResponse(
+            {"success": True, "status": highlighted.status}, status=202
+        )
 
-            file_url = artifact.file.url
+    @staticmethod
+    def _get_evaluation_details(workflow_run):
+        """Evaluation details from the run output, else from its latest artifact that has them."""
+        evaluation_details = workflow_run.output_data.get("evaluation_details", {})
+        if evaluation_details:
+            return evaluation_details
 
-            return JsonResponse(
-                {
-                    "success": True,
-                    "pdf_url": file_url,
-                    "cached": False,
-                    "highlights_count": total_instances,
-                }
+        artifact = (
+            NodeArtifact.objects.filter(
+                node__workflow_run=workflow_run, artifact_type="inline"
             )
-
-        except Exception as e:
-            logger.error(f"Error generating highlighted PDF: {e}", exc_info=True)
-            return JsonResponse(
-                {"error": f"Failed to generate highlighted PDF: {str(e)}"}, status=500
+            .filter(
+                Q(inline_data__has_key="evaluation_details")
+                | Q(inline_data__has_key="paper_checklist")
             )
+            .order_by("-created_at")
+            .only("inline_data")
+            .first()
+        )
+        if not artifact:
+            return {}
+        # Either a wrapper around the evaluation details or the details themselves
+        return artifact.inline_data.get("evaluation_details") or artifact.inline_data
 
 
 class BulkRerunPreviewView(View):
@@ -1882,17 +1879,9 @@ class BulkRerunPreviewView(View):
                 pass
 
         # Get papers for this conference with latest workflow status
-        latest_workflow_prefetch = Prefetch(
-            "workflow_runs",
-            queryset=WorkflowRun.objects.order_by("-created_at").only(
-                "id", "status", "created_at"
-            )[:1],
-            to_attr="latest_workflow_list",
-        )
-
         papers = (
             Paper.objects.filter(conference=conference)
-            .prefetch_related(latest_workflow_prefetch)
+            .select_related("latest_workflow_run")
             .order_by("id")
         )
 
@@ -1904,8 +1893,8 @@ class BulkRerunPreviewView(View):
         paper_list = []
         for paper in papers:
             status = "none"
-            if paper.latest_workflow_list:
-                status = paper.latest_workflow_list[0].status
+            if paper.latest_workflow_run:
+                status = paper.latest_workflow_run.status
 
             paper_list.append(
                 {
@@ -1929,7 +1918,13 @@ class BulkRerunWorkflowsView(View):
     """API view to trigger workflow reruns for all papers in a conference."""
 
     def post(self, request, conference_id):
-        """Trigger workflow reruns for all papers in the specified conference."""
+        """
+        Start a background rerun for the papers of the specified conference.
+
+        Returns the id of a BulkOperation that reports progress (see
+        BulkOperationStatusView).
+        """
+        from webApp.services.bulk_operations import start_bulk_operation
 
         logger = logging.getLogger(__name__)
 
@@ -1942,6 +1937,7 @@ class BulkRerunWorkflowsView(View):
         limit = None
         workflow_id = None
         force_reprocess = True  # Default to True for backward compatibility
+        llm_batch = False
         if request.body:
             try:
                 data = json.loads(request.body)
@@ -1950,6 +1946,7 @@ class BulkRerunWorkflowsView(View):
                     limit = int(limit)
                 workflow_id = data.get("workflow_id")
                 force_reprocess = data.get("force_reprocess", True)
+                llm_batch = bool(data.get("llm_batch", False))
             except (json.JSONDecodeError, ValueError) as e:
                 logger.warning(f"Failed to parse request data: {e}")
 
@@ -1967,116 +1964,34 @@ class BulkRerunWorkflowsView(View):
                 {"error": f"Workflow not found or not active"}, status=404
             )
 
-        # Get papers for this conference
-        papers = Paper.objects.filter(conference=conference)
-
-        # Apply limit if specified
-        if limit and limit > 0:
-            papers = papers[:limit]
-
-        papers = list(papers)  # Convert to list for iteration
-        total_papers = len(papers)
-
-        if total_papers == 0:
+        if not Paper.objects.filter(conference=conference).exists():
             return JsonResponse(
                 {"error": "No papers found for this conference"}, status=400
             )
 
-        # Clean up ALL running/pending workflows for these papers (forced cleanup for bulk rerun)
-        stuck_workflows_cleaned = 0
-        for paper in papers:
-            # Get ALL running or pending workflows for this paper
-            running_workflows = WorkflowRun.objects.filter(
-                paper=paper, status__in=["running", "pending"]
-            )
-
-            for running_workflow in running_workflows:
-                last_update = running_workflow.started_at or running_workflow.created_at
-                time_since_update = timezone.now() - last_update
-
-                # Force cleanup for bulk rerun (mark as cancelled regardless of time)
-                logger.warning(
-                    f"Cancelling workflow {running_workflow.id} for paper {paper.id} "
-                    f"(time since update: {time_since_update}) for bulk rerun"
-                )
-                running_workflow.status = "failed"
-                running_workflow.completed_at = timezone.now()
-                running_workflow.error_message = f"Workflow cancelled for bulk rerun"
-                running_workflow.save()
-
-                # Also mark all running/pending nodes as failed
-                stuck_nodes = WorkflowNode.objects.filter(
-                    workflow_run=running_workflow,
-                    status__in=["running", "pending"],
-                )
-                for node in stuck_nodes:
-                    node.status = "failed"
-                    node.completed_at = timezone.now()
-                    node.error_message = "Node cancelled for bulk rerun"
-                    node.save()
-
-                stuck_workflows_cleaned += 1
-
-        # Enqueue all workflow tasks to Celery (they'll be processed when workers are available)
-        from webApp.tasks import process_paper_workflow_task
-
-        paper_ids = [p.id for p in papers]
-        logger.info(
-            f"Enqueueing {total_papers} workflow tasks for conference {conference_id}: {paper_ids} "
-            f"(workflow: {workflow_definition.name} v{workflow_definition.version})"
+        bulk_operation = start_bulk_operation(
+            conference,
+            "rerun",
+            user=request.user,
+            workflow_id=str(workflow_definition.id),
+            force_reprocess=force_reprocess,
+            limit=limit if limit and limit > 0 else None,
+            llm_batch=llm_batch,
         )
-
-        task_ids = []
-        for idx, paper in enumerate(papers, 1):
-            try:
-                task = process_paper_workflow_task.delay(
-                    paper_id=paper.id,
-                    force_reprocess=force_reprocess,
-                    model="gpt-5",
-                    workflow_id=workflow_id,  # Pass the selected workflow ID
-                )
-                task_ids.append(str(task.id))
-                logger.info(
-                    f"[{idx}/{total_papers}] Enqueued workflow task for paper {paper.id}: {task.id} (workflow: {workflow_id})"
-                )
-            except Exception as e:
-                logger.error(
-                    f"[{idx}/{total_papers}] Failed to enqueue task for paper {paper.id}: {e}",
-                    exc_info=True,
-                )
-
         logger.info(
-            f"Successfully enqueued {len(task_ids)} workflow tasks for conference {conference_id} "
-            f"(workflow: {workflow_definition.name} v{workflow_definition.version})"
-        )
-
-        message = f"{len(task_ids)} workflow task{'s' if len(task_ids) != 1 else ''} queued for processing"
-        message += (
-            f" using '{workflow_definition.description or workflow_definition.name}'"
-        )
-        if limit and limit > 0:
-            message += f" (limited to {limit})"
-
-        # Get concurrency info
-        from webApp.services.graphs.paper_processing_workflow import (
-            MAX_CONCURRENT_WORKFLOWS,
-        )
-
-        message += (
-            f". Celery workers will process {MAX_CONCURRENT_WORKFLOWS} at a time."
+            f"Started bulk rerun {bulk_operation.id} for conference {conference_id} "
+            f"(workflow: {workflow_definition.name} v{workflow_definition.version}, limit: {limit}, "
+            f"llm_batch: {llm_batch})"
         )
 
         return JsonResponse(
             {
                 "success": True,
-                "message": message,
-                "total_papers": total_papers,
-                "tasks_enqueued": len(task_ids),
-                "task_ids": task_ids,
-                "stuck_cleaned": stuck_workflows_cleaned,
+                "operation_id": str(bulk_operation.id),
+                "status_url": reverse("bulk_operation_status", args=[bulk_operation.id]),
                 "limit": limit,
-                "max_concurrent": MAX_CONCURRENT_WORKFLOWS,
-            }
+            },
+            status=202,
         )
 
 
@@ -2084,8 +1999,8 @@ class BulkStopWorkflowsView(View):
     """API view to stop all running workflows for a conference."""
 
     def post(self, request, conference_id):
-        """Stop all running and pending workflows for the specified conference."""
-        from celery import current_app
+        """Stop all running and pending workflows of a conference."""
+        from webApp.services.bulk_operations import start_bulk_operation
 
         logger = logging.getLogger(__name__)
 
@@ -2094,66 +2009,37 @@ class BulkStopWorkflowsView(View):
         except Conference.DoesNotExist:
             return JsonResponse({"error": "Conference not found"}, status=404)
 
-        # Get all papers for this conference
-        papers = Paper.objects.filter(conference=conference)
-        paper_ids = list(papers.values_list("id", flat=True))
-
-        if not paper_ids:
+        if not Paper.objects.filter(conference=conference).exists():
             return JsonResponse(
                 {"error": "No papers found for this conference"}, status=400
             )
 
-        # Cancel all running/pending workflows for these papers
-        cancelled_workflows = 0
-        running_workflows = WorkflowRun.objects.filter(
-            paper__in=papers, status__in=["running", "pending"]
-        )
-
-        for running_workflow in running_workflows:
-            logger.info(
-                f"Cancelling workflow {running_workflow.id} for paper {running_workflow.paper.id}"
-            )
-            running_workflow.status = "failed"
-            running_workflow.completed_at = timezone.now()
-            running_workflow.error_message = "Workflow cancelled by user (bulk stop)"
-            running_workflow.save()
-
-            # Also mark all running/pending nodes as failed
-            stuck_nodes = WorkflowNode.objects.filter(
-                workflow_run=running_workflow,
-                status__in=["running", "pending"],
-            )
-            for node in stuck_nodes:
-                node.status = "failed"
-                node.completed_at = timezone.now()
-                node.error_message = "Node cancelled (bulk stop)"
-                node.save()
-
-            cancelled_workflows += 1
-
-        # Purge all pending tasks from Celery queue
-        try:
-            purged_count = current_app.control.purge()
-            logger.info(f"Purged {purged_count} pending tasks from Celery queue")
-        except Exception as e:
-            logger.error(f"Failed to purge Celery queue: {e}", exc_info=True)
-            purged_count = 0
-
-        message = f"Successfully stopped {cancelled_workflows} workflow{'s' if cancelled_workflows != 1 else ''}"
-        if purged_count > 0:
-            message += f" and removed {purged_count} pending task{'s' if purged_count != 1 else ''} from queue"
-
+        # Runs in the request; the status URL already reports the outcome
+        bulk_operation = start_bulk_operation(conference, "stop", user=request.user)
         logger.info(
-            f"Bulk stop completed for conference {conference_id}: "
-            f"{cancelled_workflows} workflows cancelled, {purged_count} tasks purged"
+            f"Bulk stop {bulk_operation.id} for conference {conference_id}: "
+            f"{bulk_operation.status}"
         )
 
         return JsonResponse(
             {
-                "success": True,
-                "message": message,
-                "cancelled_workflows": cancelled_workflows,
-                "purged_tasks": purged_count,
+                "success": bulk_operation.status == "completed",
+                "operation_id": str(bulk_operation.id),
+                "status_url": reverse("bulk_operation_status", args=[bulk_operation.id]),
                 "conference_id": conference_id,
+                "message": bulk_operation.message or bulk_operation.error,
             }
         )
+
+
+class BulkOperationStatusView(View):
+    """API view reporting the progress of a bulk rerun or stop."""
+
+    def get(self, request, operation_id):
+        """Return the state, progress and outcome of a bulk operation."""
+        try:
+            bulk_operation = BulkOperation.objects.get(id=operation_id)
+        except BulkOperation.DoesNotExist:
+            return JsonResponse({"error": "Bulk operation not found"}, status=404)
+
+        return JsonResponse({"success": True, **bulk_operation.to_dict()})
@@ -13,6 +13,12 @@ from .models import (
     WorkflowNode,
     NodeArtifact,
     NodeLog,
+    NodeCheckpoint,
+    LLMBatchJob,
+    LLMBatchRequest,
+    ConcurrencyPool,
+    WorkflowLease,
+    WorkflowStatusEvent,
 )
 
 
@@ -95,7 +101,7 @@ class WorkflowRunAdmin(admin.ModelAdmin):
         "created_at",
         "duration_display",
     ]
-    list_filter = ["status", "workflow_definition", "created_at"]
+    list_filter = ["status", "priority", "workflow_definition", "created_at"]
     search_fields = ["id", "paper__title"]
     readonly_fields = [
         "id",
@@ -110,7 +116,16 @@ class WorkflowRunAdmin(admin.ModelAdmin):
     fieldsets = [
         (
             "Workflow Information",
-            {"fields": ["id", "workflow_definition", "paper", "run_number", "status"]},
+            {
+                "fields": [
+                    "id",
+                    "workflow_definition",
+                    "paper",
+                    "run_number",
+                    "status",
+                    "priority",
+                ]
+            },
         ),
         ("Input/Output", {"fields": ["input_data", "output_data"]}),
         ("Error Information", {"fields": ["error_message"], "classes": ["collapse"]}),
@@ -283,6 +298,8 @@ class WorkflowNodeAdmin(admin.ModelAdmin):
                     "claimed_by",
                     "claimed_at",
                     "claim_expires_at",
+                    "rate_limit_wait_seconds",
+                    "spans",
                 ]
             },
         ),
@@ -315,6 +332,7 @@ class WorkflowNodeAdmin(admin.ModelAdmin):
             "ready": "lightblue",
             "claimed": "yellow",
             "running": "blue",
+            "waiting": "purple",
             "completed": "green",
             "failed": "red",
             "skipped": "orange",
@@ -397,3 +415,53 @@ class NodeLogAdmin(admin.ModelAdmin):
     message_short.short_description = "Message"
 
     node_link.short_description = "Node"
+
+
+@admin.register(ConcurrencyPool)
+class ConcurrencyPoolAdmin(admin.ModelAdmin):
+    list_display = ["name", "max_concurrent", "per_user_limit", "lease_ttl_seconds", "updated_at"]
+    readonly_fields = ["created_at", "updated_at"]
+
+
+@admin.register(WorkflowLease)
+class WorkflowLeaseAdmin(admin.ModelAdmin):
+    list_display = ["id", "status", "priority", "paper", "model", "user", "holder", "created_at", "expires_at"]
+    list_filter = ["status", "priority", "pool", "model"]
+    search_fields = ["holder", "paper__title"]
+    readonly_fields = ["id", "created_at", "acquired_at", "heartbeat_at", "released_at"]
+    raw_id_fields = ["paper", "workflow_run", "user"]
+
+
+@admin.register(WorkflowStatusEvent)
+class WorkflowStatusEventAdmin(admin.ModelAdmin):
+    list_display = ["id", "workflow_run", "node_id", "status", "created_at"]
+    list_filter = ["status"]
+    search_fields = ["workflow_run__id", "node_id"]
+    readonly_fields = ["id", "created_at"]
+    raw_id_fields = ["workflow_run", "paper"]
+
+
+@admin.register(NodeCheckpoint)
+class NodeCheckpointAdmin(admin.ModelAdmin):
+    list_display = ["id", "paper", "node_id", "item_key", "created_at"]
+    list_filter = ["node_id"]
+    search_fields = ["paper__title", "node_id", "item_key"]
+    readonly_fields = ["id", "created_at"]
+    raw_id_fields = ["paper"]
+
+
+@admin.register(LLMBatchJob)
+class LLMBatchJobAdmin(admin.ModelAdmin):
+    list_display = ["provider_batch_id", "status", "provider_status", "endpoint", "model", "request_count", "created_at", "completed_at"]
+    list_filter = ["status", "endpoint", "model"]
+    search_fields = ["provider_batch_id"]
+    readonly_fields = ["created_at", "checked_at", "completed_at"]
+
+
+@admin.register(LLMBatchRequest)
+class LLMBatchRequestAdmin(admin.ModelAdmin):
+    list_display = ["custom_id", "status", "endpoint", "model", "job", "created_at", "completed_at"]
+    list_filter = ["status", "endpoint", "model"]
+    search_fields = ["custom_id"]
+    readonly_fields = ["created_at", "completed_at"]
+    raw_id_fields = ["job", "nodes"]
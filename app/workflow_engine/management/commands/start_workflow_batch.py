@@ -42,6 +42,17 @@ class Command(BaseCommand):
             action='store_true',
             help='Show which papers would be processed without actually starting workflows'
         )
+        parser.add_argument(
+            '--priority',
+            type=int,
+            default=WorkflowRun.PRIORITY_BULK,
+            help='Scheduling priority of the runs (0=interactive, 5=normal, 9=bulk; default: 9)'
+        )
+        parser.add_argument(
+            '--llm-batch',
+            action='store_true',
+            help='Send the runs\' LLM requests as provider batch jobs (cheaper, answers within 24h)'
+        )
     
     def handle(self, *args, **options):
         workflow_name = options['workflow_name']
@@ -81,20 +92,27 @@ class Command(BaseCommand):
         skipped = []
         failed = []
         
-        for paper in papers:
-            # Check if paper already has a running workflow
-            if options['skip_running']:
-                running_workflow = WorkflowRun.objects.filter(
-                    paper=paper,
+        # Resolve running workflows for the whole batch in one query
+        running_run_numbers = {}
+        if options['skip_running']:
+            running_run_numbers = dict(
+                WorkflowRun.objects.filter(
+                    paper__in=papers,
                     status='running'
-                ).first()
-                
-                if running_workflow:
-                    skipped.append({
-                        'paper_id': paper.id,
-                        'reason': f'Already running (Run #{running_workflow.run_number})'
-                    })
-                    continue
+                ).values_list('paper_id', 'run_number')
+            )
+        
+        orchestrator = WorkflowOrchestrator()
+        input_data = {'llm_batch': True} if options['llm_batch'] else None
+        
+        for paper in papers.only('id', 'title'):
+            # Check if paper already has a running workflow
+            if paper.id in running_run_numbers:
+                skipped.append({
+                    'paper_id': paper.id,
+                    'reason': f'Already running (Run #{running_run_numbers[paper.id]})'
+                })
+                continue
             
             # Dry run - just report what would happen
             if options['dry_run']:
@@ -106,11 +124,11 @@ class Command(BaseCommand):
             
             # Actually start the workflow
             try:
-                orchestrator = WorkflowOrchestrator()
                 workflow_run = orchestrator.create_workflow_run(
                     workflow_name=workflow_name,
                     paper=paper,
-                    input_data=None
+                    input_data=input_data,
+                    priority=options['priority']
                 )
                 
                 workflow_run.status = 'running'
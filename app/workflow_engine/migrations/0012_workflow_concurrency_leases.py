@@ -0,0 +1,60 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:35
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webApp', '0026_datasetdocumentationcriterion'),
+        ('workflow_engine', '0011_delete_langgraphcheckpoint'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConcurrencyPool',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text="Pool name (e.g., 'workflows')", max_length=100, unique=True)),
+                ('max_concurrent', models.IntegerField(default=8, help_text='Maximum number of concurrently active leases')),
+                ('per_model_limits', models.JSONField(blank=True, default=dict, help_text="Optional per-model caps, e.g. {'gpt-5': 4}")),
+                ('per_user_limit', models.IntegerField(blank=True, help_text='Optional cap on concurrently active leases per user', null=True)),
+                ('lease_ttl_seconds', models.IntegerField(default=300, help_text='Lease expires if not renewed by a heartbeat within this time')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Concurrency Pool',
+                'verbose_name_plural': 'Concurrency Pools',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkflowLease',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('model', models.CharField(blank=True, default='', help_text='LLM model used by the run', max_length=100)),
+                ('holder', models.CharField(help_text='Worker/host:pid that requested this lease', max_length=255)),
+                ('status', models.CharField(choices=[('waiting', 'Waiting'), ('active', 'Active'), ('released', 'Released'), ('expired', 'Expired')], db_index=True, default='waiting', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('acquired_at', models.DateTimeField(blank=True, null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('released_at', models.DateTimeField(blank=True, null=True)),
+                ('paper', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='workflow_leases', to='webApp.paper')),
+                ('pool', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leases', to='workflow_engine.concurrencypool')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='workflow_leases', to=settings.AUTH_USER_MODEL)),
+                ('workflow_run', models.ForeignKey(blank=True, help_text='Run executing under this lease (attached once created)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='leases', to='workflow_engine.workflowrun')),
+            ],
+            options={
+                'verbose_name': 'Workflow Lease',
+                'verbose_name_plural': 'Workflow Leases',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['pool', 'status', 'created_at'], name='workflow_en_pool_id_1014ae_idx'), models.Index(fields=['status', 'expires_at'], name='workflow_en_status_6965fa_idx')],
+            },
+        ),
+    ]
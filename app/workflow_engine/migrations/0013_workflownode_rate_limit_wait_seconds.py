@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow_engine', '0012_workflow_concurrency_leases'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workflownode',
+            name='rate_limit_wait_seconds',
+            field=models.FloatField(default=0, help_text='Time spent waiting for the provider rate limiter before LLM calls'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webApp', '0027_llm_rate_limits'),
+        ('workflow_engine', '0013_workflownode_rate_limit_wait_seconds'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workflowlease',
+            name='priority',
+            field=models.PositiveSmallIntegerField(default=5, help_text='Admission priority (see WorkflowRun.PRIORITY_CHOICES)'),
+        ),
+        migrations.AddField(
+            model_name='workflownode',
+            name='priority',
+            field=models.PositiveSmallIntegerField(default=5, help_text='Copied from the workflow run so claims can be ordered without a join'),
+        ),
+        migrations.AddField(
+            model_name='workflowrun',
+            name='priority',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Interactive'), (5, 'Normal'), (9, 'Bulk')], db_index=True, default=5, help_text='Scheduling priority (interactive runs go ahead of bulk backfills)'),
+        ),
+        migrations.AddIndex(
+            model_name='workflowlease',
+            index=models.Index(fields=['pool', 'status', 'priority', 'created_at'], name='workflow_en_pool_id_804bbc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workflownode',
+            index=models.Index(fields=['status', 'priority', 'created_at'], name='workflow_en_status_a59282_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webApp', '0027_llm_rate_limits'),
+        ('workflow_engine', '0014_workflow_priorities'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkflowStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('node_id', models.CharField(blank=True, default='', help_text='Node ID from workflow definition; empty for run-level events', max_length=255)),
+                ('status', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('paper', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workflow_status_events', to='webApp.paper')),
+                ('workflow_run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='workflow_engine.workflowrun')),
+            ],
+            options={
+                'verbose_name': 'Workflow Status Event',
+                'verbose_name_plural': 'Workflow Status Events',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['workflow_run', 'id'], name='workflow_en_workflo_124d31_idx'), models.Index(fields=['paper', 'id'], name='workflow_en_paper_i_47c7fe_idx')],
+            },
+        ),
+    ]
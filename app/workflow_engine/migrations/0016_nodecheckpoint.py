@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webApp', '0034_embedding_token_count'),
+        ('workflow_engine', '0015_workflowstatusevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NodeCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('node_id', models.CharField(help_text='Node ID from workflow definition', max_length=255)),
+                ('scope', models.CharField(max_length=64)),
+                ('item_key', models.CharField(max_length=255)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('paper', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='node_checkpoints', to='webApp.paper')),
+            ],
+            options={
+                'verbose_name': 'Node Checkpoint',
+                'verbose_name_plural': 'Node Checkpoints',
+                'constraints': [models.UniqueConstraint(fields=('paper', 'node_id', 'scope', 'item_key'), name='unique_node_checkpoint_item')],
+            },
+        ),
+    ]
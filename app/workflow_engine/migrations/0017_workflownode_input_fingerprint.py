@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow_engine', '0016_nodecheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workflownode',
+            name='input_fingerprint',
+            field=models.CharField(blank=True, default='', help_text="Hash of the node's effective inputs; results are reused only when it matches", max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='workflownode',
+            index=models.Index(fields=['node_id', 'input_fingerprint'], name='workflow_en_node_id_f50e40_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow_engine', '0017_workflownode_input_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workflownode',
+            name='spans',
+            field=models.JSONField(blank=True, default=dict, help_text='Time spent per operation kind (llm, embedding, db, ...): {kind: {count, seconds}}'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow_engine', '0018_workflownode_spans'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMBatchJob',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('provider_batch_id', models.CharField(max_length=255, unique=True)),
+                ('endpoint', models.CharField(help_text="API path of the requests (e.g., '/v1/chat/completions')", max_length=100)),
+                ('model', models.CharField(blank=True, default='', max_length=100)),
+                ('status', models.CharField(choices=[('submitted', 'Submitted'), ('completed', 'Completed'), ('failed', 'Failed'), ('expired', 'Expired'), ('cancelled', 'Cancelled')], db_index=True, default='submitted', max_length=20)),
+                ('provider_status', models.CharField(blank=True, default='', help_text='Last status reported by the provider', max_length=50)),
+                ('input_file_id', models.CharField(blank=True, default='', max_length=255)),
+                ('output_file_id', models.CharField(blank=True, default='', max_length=255)),
+                ('error_file_id', models.CharField(blank=True, default='', max_length=255)),
+                ('request_count', models.IntegerField(default=0)),
+                ('error_message', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('checked_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'LLM Batch Job',
+                'verbose_name_plural': 'LLM Batch Jobs',
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='workflownode',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('claimed', 'Claimed'), ('running', 'Running'), ('waiting', 'Waiting'), ('completed', 'Completed'), ('failed', 'Failed'), ('skipped', 'Skipped'), ('cancelled', 'Cancelled')], db_index=True, default='pending', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='LLMBatchRequest',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('custom_id', models.CharField(max_length=64, unique=True)),
+                ('endpoint', models.CharField(max_length=100)),
+                ('model', models.CharField(blank=True, default='', max_length=100)),
+                ('body', models.JSONField(help_text='Request body as sent to the endpoint')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('submitted', 'Submitted'), ('completed', 'Completed'), ('failed', 'Failed')], db_index=True, default='pending', max_length=20)),
+                ('response', models.JSONField(blank=True, help_text='Response body returned by the provider', null=True)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='requests', to='workflow_engine.llmbatchjob')),
+                ('nodes', models.ManyToManyField(blank=True, related_name='llm_batch_requests', to='workflow_engine.workflownode')),
+            ],
+            options={
+                'verbose_name': 'LLM Batch Request',
+                'verbose_name_plural': 'LLM Batch Requests',
+                'indexes': [models.Index(fields=['status', 'endpoint', 'model'], name='workflow_en_status_2c950b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow_engine', '0019_llm_batches'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workflownode',
+            name='cached_input_tokens',
+            field=models.IntegerField(default=0, help_text="Input tokens served from the provider's prompt cache (part of input_tokens)"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflow_engine', '0020_node_cached_input_tokens'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workflownode',
+            name='batch_rounds',
+            field=models.IntegerField(default=0, help_text='Times the node was suspended for batched LLM requests (not counted as attempts)'),
+        ),
+    ]
@@ -7,10 +7,12 @@ distributed task execution via Celery.
 
 import uuid
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 
+from django.conf import settings
 from django.db import models, transaction
+from django.db.models import Case, F, Value, When
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
@@ -169,6 +171,24 @@ class WorkflowRun(models.Model):
         ("cancelled", "Cancelled"),
     ]
 
+    # Lower values are scheduled first
+    PRIORITY_INTERACTIVE = 0
+    PRIORITY_NORMAL = 5
+    PRIORITY_BULK = 9
+
+    PRIORITY_CHOICES = [
+        (PRIORITY_INTERACTIVE, "Interactive"),
+        (PRIORITY_NORMAL, "Normal"),
+        (PRIORITY_BULK, "Bulk"),
+    ]
+
+    # Celery queue serving each priority class
+    PRIORITY_QUEUES = {
+        PRIORITY_INTERACTIVE: "interactive",
+        PRIORITY_NORMAL: "celery",
+        PRIORITY_BULK: "bulk",
+    }
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     workflow_definition = models.ForeignKey(
         WorkflowDefinition, on_delete=models.PROTECT, related_name="runs"
@@ -189,6 +209,12 @@ class WorkflowRun(models.Model):
     run_number = models.IntegerField(
         default=1, help_text="Sequential run number for this paper (1, 2, 3...)"
     )
+    priority = models.PositiveSmallIntegerField(
+        choices=PRIORITY_CHOICES,
+        default=PRIORITY_NORMAL,
+        db_index=True,
+        help_text="Scheduling priority (interactive runs go ahead of bulk backfills)",
+    )
 
     # Context data passed to the workflow
     input_data = models.JSONField(
@@ -249,6 +275,15 @@ class WorkflowRun(models.Model):
             paper_title = "[Deleted Paper]"
         return f"{self.workflow_definition.name} - Run #{self.run_number} for {paper_title}"
 
+    @classmethod
+    def queue_for_priority(cls, priority: int) -> str:
+        """Celery queue that tasks of the given priority are routed to."""
+        if priority <= cls.PRIORITY_INTERACTIVE:
+            return cls.PRIORITY_QUEUES[cls.PRIORITY_INTERACTIVE]
+        if priority >= cls.PRIORITY_BULK:
+            return cls.PRIORITY_QUEUES[cls.PRIORITY_BULK]
+        return cls.PRIORITY_QUEUES[cls.PRIORITY_NORMAL]
+
     def save(self, *args, **kwargs):
         """Auto-increment run_number for the same paper."""
         if not self.run_number:
@@ -282,6 +317,7 @@ class WorkflowRun(models.Model):
         completed = sum(1 for n in all_nodes if n.status == "completed")
         failed = sum(1 for n in all_nodes if n.status == "failed")
         running = sum(1 for n in all_nodes if n.status == "running")
+        waiting = sum(1 for n in all_nodes if n.status == "waiting")
         pending = sum(1 for n in all_nodes if n.status in ["pending", "ready"])
 
         # Total excludes skipped/cancelled nodes so progress reflects only
@@ -294,6 +330,7 @@ class WorkflowRun(models.Model):
                 "completed": 0,
                 "failed": 0,
                 "running": 0,
+                "waiting": 0,
                 "pending": 0,
                 "skipped": skipped,
                 "percentage": 100 if skipped > 0 else 0,
@@ -304,6 +341,7 @@ class WorkflowRun(models.Model):
             "completed": completed,
             "failed": failed,
             "running": running,
+            "waiting": waiting,
             "pending": pending,
             "skipped": skipped,
             "percentage": int((completed / total) * 100),
@@ -323,6 +361,7 @@ class WorkflowNode(models.Model):
         ("ready", "Ready"),  # Dependencies met, ready to be claimed
         ("claimed", "Claimed"),  # Claimed by a worker
         ("running", "Running"),  # Currently executing
+        ("waiting", "Waiting"),  # Suspended until its batched LLM requests finish
         ("completed", "Completed"),  # Successfully finished
         ("failed", "Failed"),  # Failed after all retries
         ("skipped", "Skipped"),  # Skipped due to upstream failure
@@ -352,10 +391,18 @@ class WorkflowNode(models.Model):
     status = models.CharField(
         max_length=20, choices=STATUS_CHOICES, default="pending", db_index=True
     )
+    priority = models.PositiveSmallIntegerField(
+        default=WorkflowRun.PRIORITY_NORMAL,
+        help_text="Copied from the workflow run so claims can be ordered without a join",
+    )
 
     # Retry and attempt tracking
     max_retries = models.IntegerField(default=3)
     attempt_count = models.IntegerField(default=0)
+    batch_rounds = models.IntegerField(
+        default=0,
+        help_text="Times the node was suspended for batched LLM requests (not counted as attempts)",
+    )
 
     # Worker claiming (for distributed execution)
     claimed_by = models.CharField(
@@ -396,10 +443,29 @@ class WorkflowNode(models.Model):
     total_tokens = models.IntegerField(
         default=0, help_text="Total tokens (input + output) used by this node"
     )
+    cached_input_tokens = models.IntegerField(
+        default=0,
+        help_text="Input tokens served from the provider's prompt cache (part of input_tokens)",
+    )
     was_cached = models.BooleanField(
         default=False,
         help_text="Whether this node reused cached results and copied token counts from previous execution",
     )
+    rate_limit_wait_seconds = models.FloatField(
+        default=0,
+        help_text="Time spent waiting for the provider rate limiter before LLM calls",
+    )
+    input_fingerprint = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="Hash of the node's effective inputs; results are reused only when it matches",
+    )
+    spans = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Time spent per operation kind (llm, embedding, db, ...): {kind: {count, seconds}}",
+    )
 
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -416,6 +482,8 @@ class WorkflowNode(models.Model):
             models.Index(fields=["node_id", "workflow_run"]),
             models.Index(fields=["celery_task_id"]),
             models.Index(fields=["workflow_run", "was_cached"]),
+            models.Index(fields=["status", "priority", "created_at"]),
+            models.Index(fields=["node_id", "input_fingerprint"]),
         ]
         unique_together = [["workflow_run", "node_id"]]
 
@@ -568,3 +636,342 @@ class NodeLog(models.Model):
 
     def __str__(self):
         return f"[{self.level}] {self.node.node_id}: {self.message[:50]}"
+
+
+class NodeCheckpoint(models.Model):
+    """
+    Progress of one item inside a long-running node (a criterion analysed,
+    a chunk embedded).
+
+    Rows are written as items finish and deleted when the node completes, so
+    a node retried after a crash or failure only redoes unfinished items.
+    Checkpoints belong to the paper rather than the run, so a rerun after a
+    dead worker resumes too. ``scope`` is a hash of the settings the items
+    depend on (model, paper type, repository URL, ...); items of another
+    scope are ignored.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    paper = models.ForeignKey(
+        "webApp.Paper", on_delete=models.CASCADE, related_name="node_checkpoints"
+    )
+    node_id = models.CharField(
+        max_length=255, help_text="Node ID from workflow definition"
+    )
+    scope = models.CharField(max_length=64)
+    item_key = models.CharField(max_length=255)
+    data = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Node Checkpoint"
+        verbose_name_plural = "Node Checkpoints"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["paper", "node_id", "scope", "item_key"],
+                name="unique_node_checkpoint_item",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.node_id}/{self.item_key} (Paper {self.paper_id})"
+
+
+class LLMBatchJob(models.Model):
+    """
+    A provider-side batch job (OpenAI Batch API) of LLM requests.
+
+    Jobs are submitted from the LLMBatchRequests that suspended nodes left
+    behind, one JSONL input file per endpoint and model, and polled until
+    the provider reports a terminal status.
+    """
+
+    STATUS_CHOICES = [
+        ("submitted", "Submitted"),  # Uploaded, provider still processing
+        ("completed", "Completed"),  # Output fanned back into its requests
+        ("failed", "Failed"),
+        ("expired", "Expired"),
+        ("cancelled", "Cancelled"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    provider_batch_id = models.CharField(max_length=255, unique=True)
+    endpoint = models.CharField(
+        max_length=100, help_text="API path of the requests (e.g., '/v1/chat/completions')"
+    )
+    model = models.CharField(max_length=100, blank=True, default="")
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="submitted", db_index=True
+    )
+    provider_status = models.CharField(
+        max_length=50, blank=True, default="", help_text="Last status reported by the provider"
+    )
+    input_file_id = models.CharField(max_length=255, blank=True, default="")
+    output_file_id = models.CharField(max_length=255, blank=True, default="")
+    error_file_id = models.CharField(max_length=255, blank=True, default="")
+    request_count = models.IntegerField(default=0)
+    error_message = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    checked_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "LLM Batch Job"
+        verbose_name_plural = "LLM Batch Jobs"
+        ordering = ["created_at"]
+
+    def __str__(self):
+        return f"Batch {self.provider_batch_id} ({self.status}, {self.request_count} requests)"
+
+
+class LLMBatchRequest(models.Model):
+    """
+    One LLM request of a batch-mode workflow node.
+
+    ``custom_id`` is a hash of the endpoint and request body, so identical
+    requests of different nodes or papers are sent once, and a suspended node
+    finds its answers again when it is re-executed. ``nodes`` are the nodes
+    waiting for (or having used) the response.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),  # Not yet part of a batch job
+        ("submitted", "Submitted"),  # In a batch job the provider is processing
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    custom_id = models.CharField(max_length=64, unique=True)
+    endpoint = models.CharField(max_length=100)
+    model = models.CharField(max_length=100, blank=True, default="")
+    body = models.JSONField(help_text="Request body as sent to the endpoint")
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="pending", db_index=True
+    )
+    job = models.ForeignKey(
+        LLMBatchJob,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="requests",
+    )
+    response = models.JSONField(
+        null=True, blank=True, help_text="Response body returned by the provider"
+    )
+    error = models.TextField(blank=True, default="")
+    nodes = models.ManyToManyField(
+        WorkflowNode, blank=True, related_name="llm_batch_requests"
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "LLM Batch Request"
+        verbose_name_plural = "LLM Batch Requests"
+        indexes = [
+            models.Index(fields=["status", "endpoint", "model"]),
+        ]
+
+    def __str__(self):
+        return f"{self.endpoint} {self.custom_id[:12]} ({self.status})"
+
+
+class WorkflowStatusEvent(models.Model):
+    """
+    Append-only feed of workflow run and node status changes.
+
+    The auto-increment id is the event id clients resume from. Web processes
+    tail this table once and fan events out to every status subscriber,
+    instead of each open page re-querying all nodes on a timer.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    workflow_run = models.ForeignKey(
+        WorkflowRun, on_delete=models.CASCADE, related_name="status_events"
+    )
+    paper = models.ForeignKey(
+        "webApp.Paper",
+        on_delete=models.CASCADE,
+        related_name="workflow_status_events",
+    )
+    node_id = models.CharField(
+        max_length=255,
+        blank=True,
+        default="",
+        help_text="Node ID from workflow definition; empty for run-level events",
+    )
+    status = models.CharField(max_length=20)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Workflow Status Event"
+        verbose_name_plural = "Workflow Status Events"
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["workflow_run", "id"]),
+            models.Index(fields=["paper", "id"]),
+        ]
+
+    def __str__(self):
+        target = self.node_id or "run"
+        return f"#{self.id} {target} -> {self.status} (Run {self.workflow_run_id})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "event_id": self.id,
+            "workflow_run_id": str(self.workflow_run_id),
+            "paper_id": self.paper_id,
+            "node_id": self.node_id or None,
+            "status": self.status,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class ConcurrencyPool(models.Model):
+    """
+    Cluster-wide admission limits for workflow executions.
+
+    The pool row doubles as the admission mutex: every admission decision locks
+    it with SELECT ... FOR UPDATE, so all web and Celery worker processes share
+    one consistent view of how many workflows are running.
+    """
+
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        help_text="Pool name (e.g., 'workflows')",
+    )
+    max_concurrent = models.IntegerField(
+        default=8, help_text="Maximum number of concurrently active leases"
+    )
+    per_model_limits = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Optional per-model caps, e.g. {'gpt-5': 4}",
+    )
+    per_user_limit = models.IntegerField(
+        null=True,
+        blank=True,
+        help_text="Optional cap on concurrently active leases per user",
+    )
+    lease_ttl_seconds = models.IntegerField(
+        default=300,
+        help_text="Lease expires if not renewed by a heartbeat within this time",
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Concurrency Pool"
+        verbose_name_plural = "Concurrency Pools"
+        ordering = ["name"]
+
+    def __str__(self):
+        return f"{self.name} (max {self.max_concurrent})"
+
+
+class WorkflowLease(models.Model):
+    """
+    A request for (or grant of) one execution slot in a ConcurrencyPool.
+
+    Leases are created as 'waiting', admitted in FIFO order to 'active' when the
+    pool and quota limits allow, renewed by heartbeats and finally 'released'.
+    Active leases whose holder stops heartbeating are moved to 'expired'.
+    """
+
+    STATUS_CHOICES = [
+        ("waiting", "Waiting"),
+        ("active", "Active"),
+        ("released", "Released"),
+        ("expired", "Expired"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    pool = models.ForeignKey(
+        ConcurrencyPool, on_delete=models.CASCADE, related_name="leases"
+    )
+
+    paper = models.ForeignKey(
+        "webApp.Paper",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="workflow_leases",
+    )
+    workflow_run = models.ForeignKey(
+        WorkflowRun,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="leases",
+        help_text="Run executing under this lease (attached once created)",
+    )
+    model = models.CharField(
+        max_length=100, blank=True, default="", help_text="LLM model used by the run"
+    )
+    user = models.ForeignKey(
+        "auth.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="workflow_leases",
+    )
+    holder = models.CharField(
+        max_length=255, help_text="Worker/host:pid that requested this lease"
+    )
+    priority = models.PositiveSmallIntegerField(
+        default=WorkflowRun.PRIORITY_NORMAL,
+        help_text="Admission priority (see WorkflowRun.PRIORITY_CHOICES)",
+    )
+
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="waiting", db_index=True
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    acquired_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    released_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Workflow Lease"
+        verbose_name_plural = "Workflow Leases"
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["pool", "status", "created_at"]),
+            models.Index(fields=["pool", "status", "priority", "created_at"]),
+            models.Index(fields=["status", "expires_at"]),
+        ]
+
+    def __str__(self):
+        return f"Lease {self.id} ({self.status}) - {self.holder}"
+
+
+def aged_priority(now=None):
+    """
+    Scheduling priority with starvation protection, as a query expression.
+
+    Work below normal priority that has waited longer than
+    WORKFLOW_PRIORITY_AGING_SECONDS is promoted to normal priority, so a
+    steady stream of normal runs cannot starve a backfill. Interactive work
+    always stays ahead.
+
+    Usable on any model with ``priority`` and ``created_at`` fields
+    (WorkflowNode, WorkflowLease).
+    """
+    now = now or timezone.now()
+    aging = timedelta(seconds=getattr(settings, "WORKFLOW_PRIORITY_AGING_SECONDS", 600))
+    return Case(
+        When(
+            priority__gt=WorkflowRun.PRIORITY_NORMAL,
+            created_at__lt=now - aging,
+            then=Value(WorkflowRun.PRIORITY_NORMAL),
+        ),
+        default=F("priority"),
+        output_field=models.PositiveSmallIntegerField(),
+    )
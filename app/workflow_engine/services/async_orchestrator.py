@@ -90,7 +90,8 @@ class AsyncWorkflowOperations:
         workflow_name: str,
         paper_id: int,
         input_data: Dict[str, Any] = None,
-        user = None
+        user = None,
+        priority: int = WorkflowRun.PRIORITY_NORMAL
     ) -> WorkflowRun:
         """
         Create a workflow run using paper_id instead of paper object.
@@ -102,6 +103,7 @@ class AsyncWorkflowOperations:
             paper_id: Paper database ID
             input_data: Input parameters
             user: User initiating workflow
+            priority: Scheduling priority (WorkflowRun.PRIORITY_*)
             
         Returns:
             WorkflowRun instance
@@ -113,7 +115,8 @@ class AsyncWorkflowOperations:
             workflow_name=workflow_name,
             paper=paper,
             input_data=input_data,
-            user=user
+            user=user,
+            priority=priority
         )
     
     # ========================================================================
@@ -173,7 +176,12 @@ class AsyncWorkflowOperations:
         for key, value in kwargs.items():
             setattr(workflow_run, key, value)
         
-        workflow_run.save()
+        with transaction.atomic():
+            workflow_run.save()
+            if status == 'completed':
+                self.orchestrator.refresh_paper_run_pointers(
+                    [workflow_run.paper_id], completed_only=True
+                )
         logger.info(f"Workflow run {workflow_run_id} status updated to: {status}")
     
     # ========================================================================
@@ -530,7 +538,8 @@ class AsyncWorkflowOperations:
         node: WorkflowNode,
         input_tokens: int,
         output_tokens: int,
-        was_cached: bool = False
+        was_cached: bool = False,
+        cached_input_tokens: int = 0
     ):
         """
         Update token counts for a node.
@@ -540,15 +549,20 @@ class AsyncWorkflowOperations:
             input_tokens: Number of input tokens consumed
             output_tokens: Number of output tokens generated
             was_cached: Whether tokens were copied from cached result
+            cached_input_tokens: Input tokens served from the provider's prompt cache
         """
         node.input_tokens = input_tokens
         node.output_tokens = output_tokens
         node.total_tokens = input_tokens + output_tokens
+        node.cached_input_tokens = cached_input_tokens
         node.was_cached = was_cached
-        node.save(update_fields=['input_tokens', 'output_tokens', 'total_tokens', 'was_cached'])
+        node.save(update_fields=[
+            'input_tokens', 'output_tokens', 'total_tokens', 'cached_input_tokens', 'was_cached'
+        ])
         
         logger.info(
-            f"Updated node {node.node_id} tokens: {input_tokens} in, {output_tokens} out, "
+            f"Updated node {node.node_id} tokens: {input_tokens} in "
+            f"({cached_input_tokens} from prompt cache), {output_tokens} out, "
             f"total {node.total_tokens}, cached={was_cached}"
         )
     
@@ -592,6 +606,44 @@ class AsyncWorkflowOperations:
         
         return node
     
+    @sync_to_async
+    def get_completed_node_by_fingerprint(
+        self,
+        paper_id: int,
+        node_id: str,
+        fingerprint: str,
+        exclude_run_id: str = None
+    ) -> Optional[WorkflowNode]:
+        """
+        Get the most recent completed node for a paper computed from the same inputs.
+        
+        Args:
+            paper_id: Paper database ID
+            node_id: Node ID (e.g., 'paper_type_classification')
+            fingerprint: Input fingerprint the node must have been computed with
+            exclude_run_id: Workflow run ID to exclude (current run)
+            
+        Returns:
+            WorkflowNode instance or None
+        """
+        query = WorkflowNode.objects.filter(
+            node_id=node_id,
+            input_fingerprint=fingerprint,
+            workflow_run__paper_id=paper_id,
+            status='completed'
+        )
+        
+        if exclude_run_id:
+            query = query.exclude(workflow_run_id=exclude_run_id)
+        
+        return query.select_related('workflow_run').order_by('-workflow_run__created_at').first()
+    
+    @sync_to_async
+    def set_node_input_fingerprint(self, node: WorkflowNode, fingerprint: str):
+        """Record the fingerprint of the inputs a node runs with."""
+        WorkflowNode.objects.filter(id=node.id).update(input_fingerprint=fingerprint)
+        node.input_fingerprint = fingerprint
+    
     @sync_to_async
     def get_workflow_run(self, workflow_run_id: str) -> WorkflowRun:
         """
@@ -0,0 +1,130 @@
+"""
+Durable per-item checkpoints for long-running nodes.
+
+Nodes that loop over many expensive items (LLM calls per criterion,
+embedding calls per chunk) record each finished item in NodeCheckpoint. When
+the node runs again after a worker crash, a Celery retry or a failure, it
+loads its checkpoints and skips the items already done. Checkpoints are
+deleted once the node completes, and leftovers of nodes that never complete
+expire after CHECKPOINT_MAX_AGE.
+
+Checkpoints are scoped by the node's input fingerprint (see
+webApp.services.nodes.fingerprints), so items computed from other inputs
+(edited criteria, changed sections, another model) are never reused.
+
+Usage inside a node:
+
+    checkpoints = NodeCheckpoints(paper_id, node_id, scope={"fingerprint": fingerprint})
+    done = await checkpoints.aload()
+    for item in items:
+        if item.key in done:
+            ...reuse done[item.key]...
+            continue
+        ...process item...
+        await checkpoints.asave(item.key, {...})
+    await checkpoints.aclear()   # after the node completed
+"""
+import hashlib
+import json
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from workflow_engine.models import NodeCheckpoint
+
+logger = logging.getLogger(__name__)
+
+# Checkpoints older than this are ignored and purged
+CHECKPOINT_MAX_AGE = timedelta(
+    hours=getattr(settings, "WORKFLOW_CHECKPOINT_MAX_AGE_HOURS", 24)
+)
+
+
+def scope_hash(scope: Optional[Dict[str, Any]]) -> str:
+    """Stable hash of the settings a node's items depend on."""
+    encoded = json.dumps(scope or {}, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class NodeCheckpoints:
+    """
+    Checkpoint store of one node for one paper.
+
+    Args:
+        paper_id: Paper the node processes
+        node_id: Node ID from the workflow definition
+        scope: Settings the items depend on; checkpoints written under a
+            different scope are not reused
+    """
+
+    def __init__(self, paper_id: int, node_id: str, scope: Optional[Dict[str, Any]] = None):
+        self.paper_id = paper_id
+        self.node_id = node_id
+        self.scope = scope_hash(scope)
+
+    def _items(self):
+        return NodeCheckpoint.objects.filter(
+            paper_id=self.paper_id, node_id=self.node_id, scope=self.scope
+        )
+
+    def load(self) -> Dict[str, Any]:
+        """Data of the finished items, keyed by item key in the order saved."""
+        cutoff = timezone.now() - CHECKPOINT_MAX_AGE
+        return dict(
+            self._items()
+            .filter(created_at__gte=cutoff)
+            .order_by("id")
+            .values_list("item_key", "data")
+        )
+
+    def save(self, item_key: str, data: Any = None) -> None:
+        """
+        Record an item as finished.
+
+        Checkpoints are best-effort: a failed write only means the item is
+        redone on resume, so errors are logged rather than raised.
+        """
+        try:
+            with transaction.atomic():
+                NodeCheckpoint.objects.update_or_create(
+                    paper_id=self.paper_id,
+                    node_id=self.node_id,
+                    scope=self.scope,
+                    item_key=item_key,
+                    defaults={"data": data if data is not None else {}},
+                )
+        except IntegrityError:
+            # A concurrent attempt recorded the same item
+            pass
+        except Exception as e:
+            logger.warning(
+                f"Failed to checkpoint {self.node_id}/{item_key} for paper {self.paper_id}: {e}"
+            )
+
+    def clear(self) -> int:
+        """Delete all checkpoints of the node (any scope) for the paper."""
+        deleted, _ = NodeCheckpoint.objects.filter(
+            paper_id=self.paper_id, node_id=self.node_id
+        ).delete()
+        return deleted
+
+    async def aload(self) -> Dict[str, Any]:
+        return await sync_to_async(self.load)()
+
+    async def asave(self, item_key: str, data: Any = None) -> None:
+        await sync_to_async(self.save)(item_key, data)
+
+    async def aclear(self) -> int:
+        return await sync_to_async(self.clear)()
+
+
+def purge_expired_checkpoints() -> int:
+    """Delete checkpoints older than CHECKPOINT_MAX_AGE."""
+    cutoff = timezone.now() - CHECKPOINT_MAX_AGE
+    deleted, _ = NodeCheckpoint.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,447 @@
+"""
+Cluster-wide workflow admission control.
+
+Replaces per-process semaphores with database-backed leases so that every
+web and Celery worker process enforces the same concurrency limits.
+
+A caller enqueues a lease, polls try_acquire() until it is admitted, keeps
+it alive with heartbeats while the workflow runs, and releases it at the end.
+Admission runs under a row lock on the ConcurrencyPool, in (priority, age)
+order, and honours the pool's global, per-model and per-user limits.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Optional, Dict, Any
+
+from django.conf import settings
+from django.db import transaction, connection
+from django.db.models import Q
+from django.utils import timezone
+
+from workflow_engine.models import (
+    ConcurrencyPool,
+    WorkflowLease,
+    WorkflowRun,
+    aged_priority,
+)
+from workflow_engine.services.status_feed import publish_run_transitions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_NAME = "workflows"
+
+
+class WorkflowAdmissionController:
+    """
+    Database-backed admission controller for workflow executions.
+    """
+
+    def __init__(self, pool_name: str = DEFAULT_POOL_NAME):
+        self.pool_name = pool_name
+        self.holder = f"{socket.gethostname()}:{os.getpid()}"
+
+    # ========================================================================
+    # Pool
+    # ========================================================================
+
+    def get_pool(self) -> ConcurrencyPool:
+        """Get the pool, creating it from settings on first use."""
+        pool, _ = ConcurrencyPool.objects.get_or_create(
+            name=self.pool_name,
+            defaults={
+                "max_concurrent": getattr(settings, "WORKFLOW_MAX_CONCURRENT", 8),
+                "per_model_limits": getattr(settings, "WORKFLOW_PER_MODEL_LIMITS", {}),
+                "per_user_limit": getattr(settings, "WORKFLOW_PER_USER_LIMIT", None),
+            },
+        )
+        return pool
+
+    def _lock_pool(self, pool_id: int) -> ConcurrencyPool:
+        """Lock the pool row; must be called inside transaction.atomic()."""
+        return ConcurrencyPool.objects.select_for_update().get(pk=pool_id)
+
+    # ========================================================================
+    # Lease lifecycle
+    # ========================================================================
+
+    def enqueue(
+        self,
+        paper_id: Optional[int] = None,
+        model: str = "",
+        user_id: Optional[int] = None,
+        priority: int = WorkflowRun.PRIORITY_NORMAL,
+    ) -> WorkflowLease:
+        """
+        Create a waiting lease at the back of its priority class.
+
+        Args:
+            paper_id: Paper the workflow will process
+            model: LLM model the workflow will use (for per-model quotas)
+            user_id: User who initiated the workflow (for per-user quotas)
+            priority: Admission priority (WorkflowRun.PRIORITY_*)
+
+        Returns:
+            WorkflowLease in 'waiting' status
+        """
+        pool = self.get_pool()
+        lease = WorkflowLease.objects.create(
+            pool=pool,
+            paper_id=paper_id,
+            model=model or "",
+            user_id=user_id,
+            holder=self.holder,
+            status="waiting",
+            priority=priority,
+        )
+        logger.info(
+            f"Enqueued lease {lease.id} for paper {paper_id} ({model}, priority {priority})"
+        )
+        return lease
+
+    def try_acquire(self, lease: WorkflowLease) -> bool:
+        """
+        Run an admission pass and report whether the lease is now active.
+
+        The pass admits every waiting lease that fits, not only this one, so
+        whichever process polls first moves the whole queue forward.
+        """
+        with transaction.atomic():
+            pool = self._lock_pool(lease.pool_id)
+            self._expire_stale(pool)
+            self._admit_waiting(pool)
+
+        lease.refresh_from_db(
+            fields=["status", "acquired_at", "heartbeat_at", "expires_at"]
+        )
+        return lease.status == "active"
+
+    def acquire(
+        self,
+        paper_id: Optional[int] = None,
+        model: str = "",
+        user_id: Optional[int] = None,
+        poll_interval: float = 2.0,
+        timeout: Optional[float] = None,
+        priority: int = WorkflowRun.PRIORITY_NORMAL,
+    ) -> WorkflowLease:
+        """
+        Enqueue a lease and block until it is admitted.
+
+        Raises:
+            TimeoutError: If the lease is not admitted within ``timeout`` seconds
+        """
+        lease = self.enqueue(
+            paper_id=paper_id, model=model, user_id=user_id, priority=priority
+        )
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        while not self.try_acquire(lease):
+            if deadline is not None and time.monotonic() >= deadline:
+                self.release(lease)
+                raise TimeoutError(f"Lease {lease.id} not admitted within {timeout}s")
+            time.sleep(poll_interval)
+
+        return lease
+
+    def heartbeat(self, lease: WorkflowLease) -> bool:
+        """
+        Renew an active lease.
+
+        Returns:
+            False if the lease is no longer active (e.g. it expired)
+        """
+        now = timezone.now()
+        ttl = self._lease_ttl(lease)
+        renewed = WorkflowLease.objects.filter(id=lease.id, status="active").update(
+            heartbeat_at=now, expires_at=now + ttl
+        )
+        if not renewed:
+            logger.warning(f"Heartbeat for lease {lease.id} rejected (not active)")
+        return bool(renewed)
+
+    def attach_run(self, lease: WorkflowLease, workflow_run_id) -> None:
+        """Link the workflow run executing under this lease."""
+        WorkflowLease.objects.filter(id=lease.id).update(workflow_run_id=workflow_run_id)
+        lease.workflow_run_id = workflow_run_id
+
+    def release(self, lease: WorkflowLease) -> None:
+        """Release a waiting or active lease and hand its slot to the queue."""
+        with transaction.atomic():
+            pool = self._lock_pool(lease.pool_id)
+            WorkflowLease.objects.filter(
+                id=lease.id, status__in=["waiting", "active"]
+            ).update(status="released", released_at=timezone.now())
+            self._admit_waiting(pool)
+        logger.info(f"Released lease {lease.id}")
+
+    @contextmanager
+    def slot(
+        self,
+        paper_id: Optional[int] = None,
+        model: str = "",
+        user_id: Optional[int] = None,
+        poll_interval: float = 2.0,
+        priority: int = WorkflowRun.PRIORITY_NORMAL,
+    ):
+        """
+        Context manager holding an admitted, heartbeating lease.
+
+        Usage:
+            with controller.slot(paper_id=1, model="gpt-5") as lease:
+                ...
+        """
+        lease = self.acquire(
+            paper_id=paper_id,
+            model=model,
+            user_id=user_id,
+            poll_interval=poll_interval,
+            priority=priority,
+        )
+        heartbeat = LeaseHeartbeat(self, lease)
+        heartbeat.start()
+        try:
+            yield lease
+        finally:
+            heartbeat.stop()
+            self.release(lease)
+
+    # ========================================================================
+    # Queue inspection
+    # ========================================================================
+
+    def queue_position(self, lease: WorkflowLease) -> Optional[int]:
+        """
+        Position of a lease in the admission queue.
+
+        Returns:
+            0 if active, 1-based position if waiting, None if finished
+        """
+        lease.refresh_from_db(fields=["status"])
+        if lease.status == "active":
+            return 0
+        if lease.status != "waiting":
+            return None
+
+        waiting = WorkflowLease.objects.filter(
+            pool_id=lease.pool_id, status="waiting"
+        ).annotate(effective_priority=aged_priority())
+        effective = (
+            waiting.filter(id=lease.id)
+            .values_list("effective_priority", flat=True)
+            .first()
+        )
+        if effective is None:
+            return None
+        ahead = waiting.filter(
+            Q(effective_priority__lt=effective)
+            | Q(effective_priority=effective, created_at__lt=lease.created_at)
+        ).count()
+        return ahead + 1
+
+    def queue_position_for_paper(self, paper_id: int) -> Optional[Dict[str, Any]]:
+        """Queue position of the most recent live lease of a paper, if any."""
+        lease = (
+            WorkflowLease.objects.filter(
+                pool__name=self.pool_name,
+                paper_id=paper_id,
+                status__in=["waiting", "active"],
+            )
+            .order_by("-created_at")
+            .first()
+        )
+        if not lease:
+            return None
+        return {
+            "lease_id": str(lease.id),
+            "status": lease.status,
+            "position": self.queue_position(lease),
+            "workflow_run_id": str(lease.workflow_run_id) if lease.workflow_run_id else None,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current limits, active leases and queue length for monitoring."""
+        pool = self.get_pool()
+        active = list(
+            pool.leases.filter(status="active").values(
+                "id",
+                "paper_id",
+                "workflow_run_id",
+                "model",
+                "user_id",
+                "priority",
+                "holder",
+                "acquired_at",
+                "expires_at",
+            )
+        )
+        waiting_count = pool.leases.filter(status="waiting").count()
+
+        return {
+            "max_concurrent": pool.max_concurrent,
+            "per_model_limits": pool.per_model_limits,
+            "per_user_limit": pool.per_user_limit,
+            "active_count": len(active),
+            "available_slots": max(pool.max_concurrent - len(active), 0),
+            "waiting_count": waiting_count,
+            "active": active,
+        }
+
+    # ========================================================================
+    # Expiry
+    # ========================================================================
+
+    def expire_stale(self) -> int:
+        """
+        Expire active leases that stopped heartbeating.
+
+        Workflow runs attached to an expired lease are marked failed, since
+        the process executing them is gone.
+
+        Returns:
+            Number of leases expired
+        """
+        pool = self.get_pool()
+        with transaction.atomic():
+            pool = self._lock_pool(pool.pk)
+            expired = self._expire_stale(pool)
+            self._admit_waiting(pool)
+        return expired
+
+    def _expire_stale(self, pool: ConcurrencyPool) -> int:
+        """Expire stale leases of a locked pool and fail their orphaned runs."""
+        now = timezone.now()
+        stale = pool.leases.filter(status="active", expires_at__lt=now)
+        stale_run_ids = [
+            run_id
+            for run_id in stale.values_list("workflow_run_id", flat=True)
+            if run_id
+        ]
+
+        expired = stale.update(status="expired", released_at=now)
+        if not expired:
+            return 0
+
+        if stale_run_ids:
+            orphaned = WorkflowRun.objects.filter(
+                id__in=stale_run_ids, status__in=["running", "pending"]
+            )
+            orphaned_ids = list(orphaned.values_list("id", flat=True))
+            orphaned.update(
+                status="failed",
+                completed_at=now,
+                error_message="Workflow lease expired (worker stopped heartbeating)",
+            )
+            publish_run_transitions(orphaned_ids, "failed")
+
+        logger.warning(
+            f"Expired {expired} stale lease(s) in pool '{pool.name}', "
+            f"failed {len(stale_run_ids)} orphaned run(s)"
+        )
+        return expired
+
+    # ========================================================================
+    # Admission
+    # ========================================================================
+
+    def _admit_waiting(self, pool: ConcurrencyPool) -> int:
+        """
+        Admit waiting leases of a locked pool in (priority, age) order.
+
+        A lease blocked by its model or user quota does not block leases
+        behind it; the global limit stops the pass. Bulk leases that have
+        waited too long are promoted (see aged_priority()).
+        """
+        active = list(pool.leases.filter(status="active").values_list("model", "user_id"))
+        total = len(active)
+        if total >= pool.max_concurrent:
+            return 0
+
+        per_model = Counter(model for model, _ in active)
+        per_user = Counter(user_id for _, user_id in active if user_id)
+        model_limits = pool.per_model_limits or {}
+
+        admitted = []
+        waiting = (
+            pool.leases.filter(status="waiting")
+            .annotate(effective_priority=aged_priority())
+            .order_by("effective_priority", "created_at")
+            .values_list("id", "model", "user_id")
+        )
+        for lease_id, model, user_id in waiting.iterator():
+            if total >= pool.max_concurrent:
+                break
+            model_limit = model_limits.get(model)
+            if model_limit is not None and per_model[model] >= model_limit:
+                continue
+            if pool.per_user_limit and user_id and per_user[user_id] >= pool.per_user_limit:
+                continue
+
+            admitted.append(lease_id)
+            total += 1
+            per_model[model] += 1
+            if user_id:
+                per_user[user_id] += 1
+
+        if admitted:
+            now = timezone.now()
+            WorkflowLease.objects.filter(id__in=admitted, status="waiting").update(
+                status="active",
+                acquired_at=now,
+                heartbeat_at=now,
+                expires_at=now + timedelta(seconds=pool.lease_ttl_seconds),
+            )
+            logger.info(f"Admitted {len(admitted)} lease(s) in pool '{pool.name}'")
+
+        return len(admitted)
+
+    def _lease_ttl(self, lease: WorkflowLease) -> timedelta:
+        ttl_seconds = (
+            ConcurrencyPool.objects.filter(pk=lease.pool_id)
+            .values_list("lease_ttl_seconds", flat=True)
+            .first()
+        )
+        return timedelta(seconds=ttl_seconds or 300)
+
+
+class LeaseHeartbeat(threading.Thread):
+    """
+    Background thread renewing a lease while a workflow runs.
+
+    A thread is used instead of an asyncio task so heartbeats keep flowing
+    even when a node blocks the event loop with synchronous I/O.
+    """
+
+    def __init__(self, controller: WorkflowAdmissionController, lease: WorkflowLease, interval: Optional[float] = None):
+        super().__init__(daemon=True, name=f"lease-heartbeat-{lease.id}")
+        self.controller = controller
+        self.lease = lease
+        ttl = (lease.expires_at - lease.heartbeat_at).total_seconds() if (
+            lease.expires_at and lease.heartbeat_at
+        ) else 300
+        self.interval = interval or max(ttl / 3, 1.0)
+        self._stop_event = threading.Event()
+
+    def run(self):
+        try:
+            while not self._stop_event.wait(self.interval):
+                try:
+                    if not self.controller.heartbeat(self.lease):
+                        break
+                except Exception as e:
+                    logger.warning(f"Heartbeat failed for lease {self.lease.id}: {e}")
+        finally:
+            connection.close()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(timeout=5)
+
+
+# Convenience singleton instance
+workflow_admission = WorkflowAdmissionController()
@@ -11,6 +11,7 @@ from typing import Optional, Dict, Any, Iterator, Tuple
 from datetime import datetime
 
 from workflow_engine.models import WorkflowNode
+from workflow_engine.services.checkpoints import NodeCheckpoints
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +21,8 @@ class MySQLCheckpointer:
     MySQL-backed checkpointer for LangGraph.
 
     This allows LangGraph agents to persist their state in MySQL,
-    enabling resumability and debugging of AI workflows.
+    enabling resumability and debugging of AI workflows. Checkpoints are
+    stored as NodeCheckpoint rows scoped to the node's thread.
     """
 
     def __init__(self, node: WorkflowNode):
@@ -32,6 +34,9 @@ class MySQLCheckpointer:
         """
         self.node = node
         self.thread_id = f"node_{node.id}"
+        self.store = NodeCheckpoints(
+            node.workflow_run.paper_id, node.node_id, scope={"thread_id": self.thread_id}
+        )
 
     def put(
         self,
@@ -40,20 +45,33 @@ class MySQLCheckpointer:
         metadata: Dict[str, Any] = None,
         parent_checkpoint_id: Optional[str] = None,
     ) -> None:
-        """No-op: checkpoint table has been removed."""
-        pass
+        """Store a checkpoint."""
+        self.store.save(
+            checkpoint_id,
+            {
+                "checkpoint": checkpoint_data,
+                "metadata": metadata or {},
+                "parent_checkpoint_id": parent_checkpoint_id,
+            },
+        )
 
     def get(self, checkpoint_id: str) -> Optional[Dict[str, Any]]:
-        """No-op: checkpoint table has been removed."""
-        return None
+        """Get a checkpoint's data, or None if it does not exist."""
+        entry = self.store.load().get(checkpoint_id)
+        return entry["checkpoint"] if entry else None
 
     def get_latest(self) -> Optional[Tuple[str, Dict[str, Any]]]:
-        """No-op: checkpoint table has been removed."""
-        return None
+        """Get the most recently stored (checkpoint_id, data), or None."""
+        entries = list(self.store.load().items())
+        if not entries:
+            return None
+        checkpoint_id, entry = entries[-1]
+        return checkpoint_id, entry["checkpoint"]
 
     def list(self) -> Iterator[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
-        """No-op: checkpoint table has been removed."""
-        return iter([])
+        """Iterate over (checkpoint_id, data, metadata) in the order stored."""
+        for checkpoint_id, entry in self.store.load().items():
+            yield checkpoint_id, entry["checkpoint"], entry["metadata"]
 
 
 class LangGraphNodeHandler:
@@ -0,0 +1,440 @@
+"""
+Provider-side batch execution of workflow LLM requests.
+
+Backfills do not need answers within seconds, and the OpenAI Batch API
+processes requests at half the price and outside the synchronous rate
+limits. Runs started with ``input_data={"llm_batch": True}`` (see
+start_workflow_batch --llm-batch and the bulk rerun's ``llm_batch`` option)
+execute their nodes with a BatchingClient instead of the synchronous client:
+
+1. A node's chat/responses calls are looked up among the answers of its
+   earlier executions. Unknown requests are recorded and the call raises
+   BatchPending; the nodes' per-item error handling moves on to the next
+   criterion or aspect, so one execution collects all independent requests
+   of the node. Before recording a result the node calls raise_if_pending(),
+   so BatchPending leaves the node instead of a partial result.
+2. NodeExecutor stores the collected requests as LLMBatchRequests and the
+   orchestrator suspends the node ('waiting'), discarding what the execution
+   recorded. Its dependents stay pending.
+3. process_llm_batches() (Celery beat) submits pending requests as JSONL
+   batch jobs, one per endpoint and model, polls the jobs and writes the
+   responses back to their requests.
+4. Waiting nodes whose requests are all answered become 'ready' again and
+   are re-executed by the scheduler, this time finding every answer. Items
+   finished before are taken from the node's checkpoints.
+
+Embeddings stay synchronous: they are cheap, and retrieval needs them
+before the LLM requests that depend on it can even be built.
+
+Usage:
+    client = BatchingClient(rate_limited_client(openai_client()), load_answers(node))
+    ...run the node with client...
+    if client.batch.pending:
+        queue_requests(node, client.batch.pending)
+"""
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from workflow_engine.models import LLMBatchJob, LLMBatchRequest, WorkflowNode
+
+logger = logging.getLogger(__name__)
+
+# SDK method paths answered from batch jobs -> API path of the batch lines
+BATCHED_ENDPOINTS = {
+    ("chat", "completions", "create"): "/v1/chat/completions",
+    ("chat", "completions", "parse"): "/v1/chat/completions",
+    ("responses", "create"): "/v1/responses",
+    ("responses", "parse"): "/v1/responses",
+}
+
+# SDK call options that are not part of the request body
+CLIENT_OPTIONS = {"extra_headers", "extra_query", "extra_body", "timeout"}
+
+# Provider limit of requests per batch job
+MAX_REQUESTS_PER_JOB = 50000
+
+# Batch rounds after which a node that still issues new requests fails
+MAX_BATCH_ROUNDS = getattr(settings, "WORKFLOW_LLM_BATCH_MAX_ROUNDS", 10)
+
+# Terminal provider statuses of a batch job
+TERMINAL_JOB_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchPending(Exception):
+    """The request was queued for a batch job and has no answer yet."""
+
+
+class BatchRequestFailed(Exception):
+    """The provider returned an error for the batched request."""
+
+
+class NodeSuspended(Exception):
+    """The node waits for batched LLM requests and is resumed when they finish."""
+
+    def __init__(self, request_count: int):
+        self.request_count = request_count
+        super().__init__(f"Waiting for {request_count} batched LLM request(s)")
+
+
+# ============================================================================
+# Requests
+# ============================================================================
+
+
+def request_body(path: Tuple[str, ...], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Body an SDK call sends to the API, as written to a batch line.
+
+    Pydantic ``response_format``/``text_format`` of parse() calls are converted
+    to the strict JSON schema format the SDK would send.
+    """
+    body = {key: value for key, value in kwargs.items() if key not in CLIENT_OPTIONS}
+    body.update(kwargs.get("extra_body") or {})
+
+    if path[-1] == "parse":
+        if path[0] == "chat" and isinstance(body.get("response_format"), type):
+            from openai.lib._parsing._completions import type_to_response_format_param
+
+            body["response_format"] = type_to_response_format_param(body["response_format"])
+        elif path[0] == "responses" and "text_format" in body:
+            from openai.lib._parsing._responses import type_to_text_format_param
+
+            text_format = body.pop("text_format")
+            body["text"] = {**(body.get("text") or {}), "format": type_to_text_format_param(text_format)}
+
+    # Round-trip so the stored body is exactly what is hashed and sent
+    return json.loads(json.dumps(body, default=str))
+
+
+def request_id(endpoint: str, body: Dict[str, Any]) -> str:
+    """custom_id of a request: identical requests share one answer."""
+    encoded = json.dumps([endpoint, body], sort_keys=True)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def build_response(path: Tuple[str, ...], kwargs: Dict[str, Any], body: Dict[str, Any]):
+    """SDK response object of a batched call, rebuilt from the response body."""
+    from openai import omit
+
+    if path[0] == "chat":
+        from openai.lib._parsing._completions import parse_chat_completion
+        from openai.types.chat import ChatCompletion
+
+        completion = ChatCompletion.construct(**body)
+        if path[-1] != "parse":
+            return completion
+        return parse_chat_completion(
+            response_format=kwargs.get("response_format", omit),
+            input_tools=kwargs.get("tools", omit),
+            chat_completion=completion,
+        )
+
+    from openai.lib._parsing._responses import parse_response
+    from openai.types.responses import Response
+
+    response = Response.construct(**body)
+    if path[-1] != "parse":
+        return response
+    return parse_response(
+        text_format=kwargs.get("text_format", omit),
+        input_tools=kwargs.get("tools", omit),
+        response=response,
+    )
+
+
+# ============================================================================
+# Client
+# ============================================================================
+
+
+class NodeBatch:
+    """
+    Answers available to one node execution and the requests it still needs.
+
+    Calls arrive from the node's event loop and from worker threads, so the
+    pending requests are locked.
+    """
+
+    def __init__(self, answers: Optional[Dict[str, Tuple[Optional[dict], str]]] = None):
+        self.answers = answers or {}
+        self.pending: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def call(self, path: Tuple[str, ...], kwargs: Dict[str, Any]):
+        endpoint = BATCHED_ENDPOINTS[path]
+        body = request_body(path, kwargs)
+        custom_id = request_id(endpoint, body)
+
+        answer = self.answers.get(custom_id)
+        if answer is None:
+            with self._lock:
+                self.pending[custom_id] = (endpoint, body)
+            raise BatchPending(f"Queued for a provider batch job (request {custom_id[:12]})")
+
+        response, error = answer
+        if response is None:
+            raise BatchRequestFailed(error or "Batched request failed")
+        return build_response(path, kwargs, response)
+
+
+class BatchingClient:
+    """
+    Proxy around an OpenAI client that answers chat/responses calls from
+    batch jobs (see module docstring).
+
+    Every other attribute, embeddings included, is passed through to the
+    wrapped client unchanged.
+    """
+
+    def __init__(self, target, batch: Optional[NodeBatch] = None, path: Tuple[str, ...] = ()):
+        self._target = target
+        self._path = path
+        self.batch = batch if batch is not None else NodeBatch()
+
+    def __getattr__(self, name):
+        path = self._path + (name,)
+
+        if path in BATCHED_ENDPOINTS:
+            batch = self.batch
+
+            def batched_call(**kwargs):
+                return batch.call(path, kwargs)
+
+            return batched_call
+
+        attr = getattr(self._target, name)
+        if any(endpoint[: len(path)] == path for endpoint in BATCHED_ENDPOINTS):
+            return BatchingClient(attr, self.batch, path)
+
+        return attr
+
+
+def raise_if_pending(client) -> None:
+    """
+    Raise BatchPending if ``client`` queued requests that have no answer yet.
+
+    Nodes call this after their per-item loops, so an execution that skipped
+    unanswered items suspends instead of completing with partial results.
+    """
+    if isinstance(client, BatchingClient) and client.batch.pending:
+        raise BatchPending(
+            f"{len(client.batch.pending)} request(s) queued for a provider batch job"
+        )
+
+
+# ============================================================================
+# Node side
+# ============================================================================
+
+
+def load_answers(node: WorkflowNode) -> Dict[str, Tuple[Optional[dict], str]]:
+    """Finished requests of a node's earlier executions: {custom_id: (response, error)}."""
+    finished = LLMBatchRequest.objects.filter(
+        nodes=node, status__in=["completed", "failed"]
+    ).values_list("custom_id", "status", "response", "error")
+    return {
+        custom_id: (response if status == "completed" else None, error)
+        for custom_id, status, response, error in finished
+    }
+
+
+def queue_requests(node: WorkflowNode, pending: Dict[str, Tuple[str, Dict[str, Any]]]) -> int:
+    """
+    Record the requests a node is waiting for.
+
+    Requests already known (from another node or paper) are shared rather
+    than sent again.
+
+    Returns:
+        Number of requests the node waits for
+    """
+    with transaction.atomic():
+        LLMBatchRequest.objects.bulk_create(
+            [
+                LLMBatchRequest(
+                    custom_id=custom_id,
+                    endpoint=endpoint,
+                    model=body.get("model", ""),
+                    body=body,
+                )
+                for custom_id, (endpoint, body) in pending.items()
+            ],
+            ignore_conflicts=True,
+        )
+        requests = LLMBatchRequest.objects.filter(custom_id__in=list(pending))
+        node.llm_batch_requests.add(*requests)
+    return len(pending)
+
+
+# ============================================================================
+# Batch jobs
+# ============================================================================
+
+
+def submit_pending_requests(client) -> List[LLMBatchJob]:
+    """
+    Upload pending requests of waiting nodes as batch jobs, one per
+    endpoint and model.
+
+    Upload errors are logged; the requests stay pending for the next call.
+    """
+    pending = (
+        LLMBatchRequest.objects.filter(status="pending", nodes__status="waiting")
+        .distinct()
+        .order_by("id")
+        .values_list("id", "custom_id", "endpoint", "model", "body")
+    )
+    groups: Dict[Tuple[str, str], list] = {}
+    for row in pending:
+        groups.setdefault((row[2], row[3]), []).append(row)
+
+    jobs = []
+    for (endpoint, model), rows in groups.items():
+        for start in range(0, len(rows), MAX_REQUESTS_PER_JOB):
+            chunk = rows[start : start + MAX_REQUESTS_PER_JOB]
+            lines = "\n".join(
+                json.dumps({"custom_id": custom_id, "method": "POST", "url": endpoint, "body": body})
+                for _, custom_id, _, _, body in chunk
+            )
+            try:
+                input_file = client.files.create(
+                    file=("workflow-batch.jsonl", lines.encode("utf-8")), purpose="batch"
+                )
+                batch = client.batches.create(
+                    input_file_id=input_file.id,
+                    endpoint=endpoint,
+                    completion_window="24h",
+                )
+            except Exception as e:
+                logger.error(f"Failed to submit {len(chunk)} {endpoint} request(s) for {model}: {e}")
+                continue
+
+            with transaction.atomic():
+                job = LLMBatchJob.objects.create(
+                    provider_batch_id=batch.id,
+                    endpoint=endpoint,
+                    model=model,
+                    provider_status=batch.status or "",
+                    input_file_id=input_file.id,
+                    request_count=len(chunk),
+                )
+                LLMBatchRequest.objects.filter(
+                    id__in=[row[0] for row in chunk], status="pending"
+                ).update(status="submitted", job=job)
+            jobs.append(job)
+            logger.info(f"Submitted batch job {batch.id}: {len(chunk)} {endpoint} request(s) for {model}")
+    return jobs
+
+
+def _read_results(client, file_id: Optional[str]) -> Dict[str, Tuple[Optional[dict], str]]:
+    """Lines of a batch output/error file: {custom_id: (response body, error)}."""
+    if not file_id:
+        return {}
+    results = {}
+    for line in client.files.content(file_id).text.splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        response = entry.get("response") or {}
+        error = entry.get("error")
+        if response.get("status_code") == 200 and not error:
+            results[entry["custom_id"]] = (response.get("body"), "")
+        else:
+            error = error or (response.get("body") or {}).get("error") or {}
+            message = error.get("message") if isinstance(error, dict) else str(error)
+            results[entry["custom_id"]] = (
+                None,
+                message or f"HTTP {response.get('status_code')}",
+            )
+    return results
+
+
+def _resolve_job(client, job: LLMBatchJob, batch) -> None:
+    """Write a finished job's responses back to its requests."""
+    results = _read_results(client, batch.output_file_id)
+    results.update(_read_results(client, batch.error_file_id))
+
+    now = timezone.now()
+    requests = list(job.requests.filter(status="submitted"))
+    for request in requests:
+        response, error = results.get(request.custom_id, (None, None))
+        if response is not None:
+            request.status, request.response, request.error = "completed", response, ""
+        elif error is not None:
+            request.status, request.error = "failed", error
+        elif batch.status in ("expired", "cancelled"):
+            # Unprocessed requests of an expired job go into the next one
+            request.status, request.job = "pending", None
+            continue
+        else:
+            request.status = "failed"
+            request.error = job.error_message or f"Missing from the output of batch {job.provider_batch_id}"
+        request.completed_at = now
+    LLMBatchRequest.objects.bulk_update(
+        requests, ["status", "response", "error", "job", "completed_at"], batch_size=500
+    )
+
+
+def poll_batch_jobs(client) -> int:
+    """
+    Check submitted jobs with the provider and resolve the finished ones.
+
+    Returns:
+        Number of jobs that finished
+    """
+    finished = 0
+    for job in LLMBatchJob.objects.filter(status="submitted"):
+        try:
+            batch = client.batches.retrieve(job.provider_batch_id)
+        except Exception as e:
+            logger.warning(f"Failed to check batch job {job.provider_batch_id}: {e}")
+            continue
+
+        job.provider_status = batch.status or ""
+        job.checked_at = timezone.now()
+        if batch.status in TERMINAL_JOB_STATUSES:
+            errors = getattr(batch, "errors", None)
+            if errors and getattr(errors, "data", None):
+                job.error_message = "; ".join(str(error.message) for error in errors.data)
+            job.output_file_id = batch.output_file_id or ""
+            job.error_file_id = batch.error_file_id or ""
+            with transaction.atomic():
+                _resolve_job(client, job, batch)
+                job.status = batch.status
+                job.completed_at = timezone.now()
+                job.save()
+            finished += 1
+            logger.info(f"Batch job {job.provider_batch_id} {batch.status}")
+        else:
+            job.save(update_fields=["provider_status", "checked_at"])
+    return finished
+
+
+def process_llm_batches(client=None) -> Dict[str, int]:
+    """
+    One round of batch processing: poll jobs, resume answered nodes, submit
+    new requests.
+
+    Args:
+        client: OpenAI client (the shared worker client by default)
+    """
+    from webApp.services.worker_runtime import openai_client
+    from workflow_engine.services.orchestrator import WorkflowOrchestrator
+
+    client = client or openai_client()
+    finished = poll_batch_jobs(client)
+    resumed = WorkflowOrchestrator().resume_waiting_nodes()
+    submitted = submit_pending_requests(client)
+    return {
+        "jobs_finished": finished,
+        "nodes_resumed": resumed,
+        "jobs_submitted": len(submitted),
+        "requests_submitted": sum(job.request_count for job in submitted),
+    }
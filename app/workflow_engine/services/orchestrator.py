@@ -11,14 +11,19 @@ from typing import Optional, List, Dict, Any
 
 from django.db import transaction
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 
+from webApp.models import Paper
 from workflow_engine.models import (
     WorkflowDefinition,
     WorkflowRun,
     WorkflowNode,
     NodeLog,
+    LLMBatchRequest,
+    aged_priority,
 )
+from workflow_engine.services.status_feed import publish as publish_status_events
 
 logger = logging.getLogger(__name__)
 
@@ -36,7 +41,8 @@ class WorkflowOrchestrator:
         workflow_name: str,
         paper,
         input_data: Dict[str, Any] = None,
-        user=None
+        user=None,
+        priority: int = WorkflowRun.PRIORITY_NORMAL
     ) -> WorkflowRun:
         """
         Create a new workflow run for a paper.
@@ -46,6 +52,7 @@ class WorkflowOrchestrator:
             paper: Paper instance to process
             input_data: Input parameters for the workflow
             user: User initiating the workflow
+            priority: Scheduling priority (WorkflowRun.PRIORITY_*)
             
         Returns:
             WorkflowRun instance
@@ -66,7 +73,8 @@ class WorkflowOrchestrator:
                 paper=paper,
                 input_data=input_data or {},
                 created_by=user,
-                status='pending'
+                status='pending',
+                priority=priority
             )
             
             # Initialize all nodes from definition
@@ -75,46 +83,159 @@ class WorkflowOrchestrator:
             # Mark nodes with no dependencies as ready
             self._update_ready_nodes(workflow_run)
             
+            # New runs are always the paper's latest
+            Paper.objects.filter(pk=paper.pk).update(
+                latest_workflow_run=workflow_run,
+                workflow_run_count=F('workflow_run_count') + 1
+            )
+            
             logger.info(
                 f"Created workflow run {workflow_run.id} for paper {paper.id}"
             )
         
         return workflow_run
     
+    def refresh_paper_run_pointers(self, paper_ids, completed_only: bool = False) -> int:
+        """
+        Recompute the denormalized latest-run pointers of papers in one UPDATE.
+        
+        Args:
+            paper_ids: Papers to refresh
+            completed_only: Only refresh latest_completed_workflow_run (after
+                a run completed); otherwise also the latest run and run count
+            
+        Returns:
+            Number of papers updated
+        """
+        runs = WorkflowRun.objects.filter(paper_id=OuterRef('pk')).order_by('-created_at')
+        fields = {
+            'latest_completed_workflow_run': Subquery(
+                runs.filter(status='completed').values('id')[:1]
+            ),
+        }
+        if not completed_only:
+            fields['latest_workflow_run'] = Subquery(runs.values('id')[:1])
+            fields['workflow_run_count'] = Coalesce(
+                Subquery(
+                    WorkflowRun.objects.filter(paper_id=OuterRef('pk'))
+                    .order_by()
+                    .values('paper_id')
+                    .annotate(count=Count('id'))
+                    .values('count')
+                ),
+                0
+            )
+        return Paper.objects.filter(id__in=list(paper_ids)).update(**fields)
+    
     def _initialize_nodes(self, workflow_run: WorkflowRun):
-        """Initialize all nodes for a workflow run from the definition."""
+        """Initialize all nodes for a workflow run from the definition in one INSERT."""
         nodes_data = workflow_run.workflow_definition.dag_structure.get('nodes', [])
         
-        for node_data in nodes_data:
-            WorkflowNode.objects.create(
+        WorkflowNode.objects.bulk_create([
+            WorkflowNode(
                 workflow_run=workflow_run,
                 node_id=node_data['id'],
                 node_type=node_data.get('type', 'celery'),
                 handler=node_data.get('handler', ''),
                 max_retries=node_data.get('max_retries', 3),
                 input_data=node_data.get('input', {}),
-                status='pending'
+                status='pending',
+                priority=workflow_run.priority
             )
+            for node_data in nodes_data
+        ])
+    
+    def _get_node_statuses(self, workflow_run: WorkflowRun) -> Dict[str, tuple]:
+        """Return {node_id: (pk, status)} for all nodes of a run in a single query."""
+        return {
+            node_id: (pk, status)
+            for pk, node_id, status in workflow_run.nodes.values_list('id', 'node_id', 'status')
+        }
+    
+    def _bulk_transition(
+        self,
+        workflow_run: WorkflowRun,
+        node_pks: List,
+        from_statuses: List[str],
+        to_status: str,
+        log_level: str,
+        log_message: str,
+        **extra_fields
+    ) -> int:
+        """
+        Move a set of nodes to a new status with one conditional UPDATE.
+        
+        The UPDATE only touches rows still in one of ``from_statuses``, so a
+        concurrent worker that already moved a node on is never overwritten.
+        One NodeLog row per node is inserted with a single bulk INSERT.
+        
+        Returns:
+            Number of nodes that were transitioned
+        """
+        if not node_pks:
+            return 0
+        
+        candidates = WorkflowNode.objects.filter(
+            workflow_run=workflow_run,
+            id__in=node_pks,
+            status__in=from_statuses
+        )
+        # Resolve the rows we are about to move so logs only cover actual transitions
+        transitioned = dict(candidates.values_list('id', 'node_id'))
+        if not transitioned:
+            return 0
+        
+        updated = WorkflowNode.objects.filter(
+            id__in=list(transitioned),
+            status__in=from_statuses
+        ).update(status=to_status, **extra_fields)
+        
+        NodeLog.objects.bulk_create([
+            NodeLog(node_id=pk, level=log_level, message=log_message)
+            for pk in transitioned
+        ])
+        # Bulk UPDATEs bypass save signals, so publish the transitions here
+        publish_status_events(
+            (workflow_run.id, workflow_run.paper_id, node_id, to_status)
+            for node_id in transitioned.values()
+        )
+        
+        return updated
     
     def _update_ready_nodes(self, workflow_run: WorkflowRun):
-        """Mark nodes as ready if their dependencies are met."""
-        pending_nodes = workflow_run.nodes.filter(status='pending')
+        """
+        Mark nodes as ready if their dependencies are met.
         
-        logger.info(f"_update_ready_nodes: Found {pending_nodes.count()} pending nodes for workflow {workflow_run.id}")
+        Node statuses are loaded once and dependencies are resolved in memory
+        against the workflow definition, instead of querying per pending node.
+        """
+        definition = workflow_run.workflow_definition
+        statuses = self._get_node_statuses(workflow_run)
+        pending = [node_id for node_id, (_, status) in statuses.items() if status == 'pending']
         
-        for node in pending_nodes:
-            logger.info(f"  Checking node {node.node_id}: dependencies_met()={node.dependencies_met()}")
-            if node.dependencies_met():
-                node.status = 'ready'
-                node.save(update_fields=['status'])
-                
-                logger.info(f"  -> Marked {node.node_id} as READY")
-                
-                NodeLog.objects.create(
-                    node=node,
-                    level='INFO',
-                    message='Node is ready to execute'
-                )
+        logger.info(f"_update_ready_nodes: Found {len(pending)} pending nodes for workflow {workflow_run.id}")
+        
+        ready_pks = []
+        for node_id in pending:
+            # Dependencies missing from the run are ignored, matching WorkflowNode.dependencies_met()
+            met = all(
+                statuses[dep_id][1] in ['completed', 'skipped']
+                for dep_id in definition.get_dependencies(node_id)
+                if dep_id in statuses
+            )
+            logger.info(f"  Checking node {node_id}: dependencies_met()={met}")
+            if met:
+                ready_pks.append(statuses[node_id][0])
+                logger.info(f"  -> Marked {node_id} as READY")
+        
+        self._bulk_transition(
+            workflow_run,
+            ready_pks,
+            from_statuses=['pending'],
+            to_status='ready',
+            log_level='INFO',
+            log_message='Node is ready to execute'
+        )
     
     def claim_ready_task(
         self,
@@ -125,6 +246,8 @@ class WorkflowOrchestrator:
         Claim a ready task using MySQL SELECT ... FOR UPDATE SKIP LOCKED.
         
         This ensures only one worker claims a task in a distributed environment.
+        Tasks are claimed by (priority, age); see aged_priority() for the
+        starvation protection applied to bulk work.
         
         Args:
             workflow_run_id: Optional specific workflow run to claim from
@@ -151,7 +274,12 @@ class WorkflowOrchestrator:
             # Use SELECT FOR UPDATE SKIP LOCKED for distributed claiming
             # This is the key to preventing duplicate work in multi-worker setups
             try:
-                node = query.select_for_update(skip_locked=True).first()
+                node = (
+                    query.annotate(effective_priority=aged_priority())
+                    .order_by('effective_priority', 'created_at')
+                    .select_for_update(skip_locked=True)
+                    .first()
+                )
             except Exception as e:
                 logger.error(f"Error claiming task: {e}")
                 return None
@@ -283,7 +411,14 @@ class WorkflowOrchestrator:
                     message='Node failed permanently',
                     context={'error': error_message}
                 )
-                
+            
+            # Persist the node before cascading so the completion check sees it as failed
+            node.save(update_fields=[
+                'status', 'error_message', 'error_traceback',
+                'claimed_by', 'claimed_at', 'claim_expires_at', 'completed_at'
+            ])
+            
+            if node.status == 'failed':
                 # Cancel sibling nodes (fail fast on permanent failure)
                 self._cancel_sibling_nodes(node)
                 
@@ -292,84 +427,189 @@ class WorkflowOrchestrator:
                 
                 # Check if workflow failed
                 self._check_workflow_completion(node.workflow_run)
-            
+    
+    def mark_node_waiting(self, node: WorkflowNode, request_count: int):
+        """
+        Suspend a node until its batched LLM requests are answered.
+        
+        Whatever the node recorded while its requests were unanswered is
+        discarded; resume_waiting_nodes() makes it ready to run again.
+        Dependents stay pending because 'waiting' is neither completed nor
+        terminal. The round counts towards batch_rounds, not attempt_count,
+        so it does not use up the node's retries.
+        """
+        with transaction.atomic():
+            node.artifacts.all().delete()
+            
+            node.status = 'waiting'
+            node.claimed_by = None
+            node.claimed_at = None
+            node.claim_expires_at = None
+            node.completed_at = None
+            node.output_data = {}
+            node.input_tokens = 0
+            node.output_tokens = 0
+            node.total_tokens = 0
+            node.cached_input_tokens = 0
+            node.was_cached = False
+            node.attempt_count = max(node.attempt_count - 1, 0)
+            node.batch_rounds += 1
             node.save(update_fields=[
-                'status', 'error_message', 'error_traceback',
-                'claimed_by', 'claimed_at', 'claim_expires_at', 'completed_at'
+                'status', 'claimed_by', 'claimed_at', 'claim_expires_at',
+                'completed_at', 'output_data', 'input_tokens', 'output_tokens',
+                'total_tokens', 'cached_input_tokens', 'was_cached',
+                'attempt_count', 'batch_rounds'
             ])
+            
+            NodeLog.objects.create(
+                node=node,
+                level='INFO',
+                message=f'Node waiting for {request_count} batched LLM request(s)',
+                context={'request_count': request_count}
+            )
+    
+    def resume_waiting_nodes(self) -> int:
+        """
+        Make waiting nodes of running workflows ready once none of their
+        batched LLM requests is still pending or submitted.
+        
+        Returns:
+            Number of nodes resumed
+        """
+        unanswered = LLMBatchRequest.nodes.through.objects.filter(
+            llmbatchrequest__status__in=['pending', 'submitted']
+        ).values('workflownode_id')
+        answered = (
+            WorkflowNode.objects.filter(status='waiting', workflow_run__status='running')
+            .exclude(id__in=unanswered)
+            .values_list('workflow_run_id', 'id')
+        )
+        by_run = {}
+        for run_id, pk in answered:
+            by_run.setdefault(run_id, []).append(pk)
+        
+        resumed = 0
+        for workflow_run in WorkflowRun.objects.filter(id__in=list(by_run)):
+            resumed += self._bulk_transition(
+                workflow_run,
+                by_run[workflow_run.id],
+                from_statuses=['waiting'],
+                to_status='ready',
+                log_level='INFO',
+                log_message='Batched LLM requests answered, node is ready to resume'
+            )
+        return resumed
     
     def _cancel_sibling_nodes(self, failed_node: WorkflowNode):
         """Cancel all sibling nodes (running/pending) when a node fails."""
         workflow_run = failed_node.workflow_run
+        active_statuses = ['running', 'claimed', 'ready', 'pending', 'waiting']
         
         # Get all nodes in the workflow that are not completed and not the failed node
-        sibling_nodes = workflow_run.nodes.filter(
-            status__in=['running', 'claimed', 'ready', 'pending']
-        ).exclude(id=failed_node.id)
+        siblings = list(
+            workflow_run.nodes.filter(status__in=active_statuses)
+            .exclude(id=failed_node.id)
+            .values_list('id', 'node_id', 'status')
+        )
         
-        for sibling in sibling_nodes:
-            sibling.status = 'cancelled'
-            sibling.completed_at = timezone.now()
-            sibling.save(update_fields=['status', 'completed_at'])
-            
-            NodeLog.objects.create(
-                node=sibling,
-                level='WARNING',
-                message=f'Node cancelled due to failure in {failed_node.node_id}'
-            )
-            
+        cancelled = self._bulk_transition(
+            workflow_run,
+            [pk for pk, _, _ in siblings],
+            from_statuses=active_statuses,
+            to_status='cancelled',
+            log_level='WARNING',
+            log_message=f'Node cancelled due to failure in {failed_node.node_id}',
+            completed_at=timezone.now()
+        )
+        
+        for _, node_id, previous_status in siblings:
             logger.info(
-                f"Cancelled node {sibling.node_id} (was {sibling.status}) due to failure in {failed_node.node_id}"
+                f"Cancelled node {node_id} (was {previous_status}) due to failure in {failed_node.node_id}"
             )
+        
+        return cancelled
     
     def _skip_dependent_nodes(self, node: WorkflowNode):
-        """Mark all downstream nodes as skipped due to upstream failure."""
-        dependents = node.get_dependents()
+        """
+        Mark all downstream nodes as skipped due to upstream failure.
         
-        for dependent in dependents:
-            if dependent.status in ['pending', 'ready', 'cancelled']:
-                dependent.status = 'skipped'
-                dependent.save(update_fields=['status'])
-                
-                NodeLog.objects.create(
-                    node=dependent,
-                    level='WARNING',
-                    message=f'Node skipped due to upstream failure in {node.node_id}'
-                )
-                
-                # Recursively skip further dependents
-                self._skip_dependent_nodes(dependent)
+        The transitive set of dependents is resolved in memory from the
+        definition and a single status snapshot, then skipped with one UPDATE.
+        Traversal stops at dependents that are not skippable (e.g. completed),
+        so their own descendants are left untouched.
+        """
+        workflow_run = node.workflow_run
+        definition = workflow_run.workflow_definition
+        skippable = ['pending', 'ready', 'cancelled']
+        statuses = self._get_node_statuses(workflow_run)
+        
+        to_skip = []
+        seen = set()
+        frontier = [node.node_id]
+        while frontier:
+            current = frontier.pop()
+            for dependent_id in definition.get_dependents(current):
+                if dependent_id in seen or dependent_id not in statuses:
+                    continue
+                seen.add(dependent_id)
+                pk, status = statuses[dependent_id]
+                if status in skippable:
+                    to_skip.append(pk)
+                    frontier.append(dependent_id)
+        
+        return self._bulk_transition(
+            workflow_run,
+            to_skip,
+            from_statuses=skippable,
+            to_status='skipped',
+            log_level='WARNING',
+            log_message=f'Node skipped due to upstream failure in {node.node_id}'
+        )
     
     def _check_workflow_completion(self, workflow_run: WorkflowRun):
-        """Check if workflow is complete and update status."""
-        nodes = workflow_run.nodes.all()
+        """Check if workflow is complete and update status using a single aggregate."""
+        from django.db.models import Count
+        
+        terminal_statuses = ['completed', 'failed', 'skipped', 'cancelled']
+        counts = workflow_run.nodes.aggregate(
+            total=Count('id'),
+            terminal=Count('id', filter=Q(status__in=terminal_statuses)),
+            completed=Count('id', filter=Q(status='completed')),
+            failed=Count('id', filter=Q(status='failed')),
+        )
         
         logger.info(f"_check_workflow_completion: Checking workflow {workflow_run.id}")
-        logger.info(f"  Node statuses: {[(n.node_id, n.status) for n in nodes]}")
+        logger.info(f"  Node status counts: {counts}")
         
         # Check if all nodes are in terminal states
-        terminal_statuses = ['completed', 'failed', 'skipped', 'cancelled']
-        all_terminal = all(node.status in terminal_statuses for node in nodes)
+        all_terminal = counts['terminal'] == counts['total']
         logger.info(f"  All nodes in terminal states? {all_terminal}")
         
         if all_terminal:
             # Workflow is done
-            if all(node.status == 'completed' for node in nodes):
+            if counts['completed'] == counts['total']:
                 workflow_run.status = 'completed'
-            elif any(node.status == 'failed' for node in nodes):
+            elif counts['failed'] > 0:
                 workflow_run.status = 'failed'
                 
                 # Collect error messages
-                failed_nodes = nodes.filter(status='failed')
-                errors = [f"{n.node_id}: {n.error_message}" for n in failed_nodes]
+                failed_nodes = workflow_run.nodes.filter(status='failed').values_list(
+                    'node_id', 'error_message'
+                )
+                errors = [f"{node_id}: {error}" for node_id, error in failed_nodes]
                 workflow_run.error_message = "\n".join(errors)
             else:
                 workflow_run.status = 'completed'  # Some skipped/cancelled but no failures
             
             workflow_run.completed_at = timezone.now()
-            workflow_run.save(update_fields=[
-                'status', 'completed_at', 'error_message'
-            ])
+            with transaction.atomic():
+                workflow_run.save(update_fields=[
+                    'status', 'completed_at', 'error_message'
+                ])
+                if workflow_run.status == 'completed':
+                    self.refresh_paper_run_pointers(
+                        [workflow_run.paper_id], completed_only=True
+                    )
             
             logger.info(
                 f"Workflow run {workflow_run.id} completed with status: {workflow_run.status}"
@@ -405,9 +645,15 @@ class WorkflowOrchestrator:
             workflow_run.save(update_fields=['status', 'completed_at'])
             
             # Cancel pending/ready nodes
-            workflow_run.nodes.filter(
-                status__in=['pending', 'ready', 'claimed']
-            ).update(status='skipped')
+            cancelled = workflow_run.nodes.filter(
+                status__in=['pending', 'ready', 'claimed', 'waiting']
+            )
+            cancelled_node_ids = list(cancelled.values_list('node_id', flat=True))
+            cancelled.update(status='skipped')
+            publish_status_events(
+                (workflow_run.id, workflow_run.paper_id, node_id, 'skipped')
+                for node_id in cancelled_node_ids
+            )
             
             logger.info(f"Cancelled workflow run {workflow_run.id}")
 
@@ -430,6 +676,8 @@ class NodeExecutor:
         """
         self.log('INFO', 'Starting node execution')
         
+        from workflow_engine.services.llm_batches import NodeSuspended
+        
         try:
             # Get handler function
             handler_func = self._get_handler()
@@ -441,12 +689,18 @@ class NodeExecutor:
             import asyncio
             import inspect
             
-            if inspect.iscoroutinefunction(handler_func):
-                # Async handler - run with asyncio
-                result = asyncio.run(handler_func(input_context))
-            else:
-                # Sync handler - call directly
-                result = handler_func(input_context)
+            try:
+                if inspect.iscoroutinefunction(handler_func):
+                    # Async handler - run with asyncio
+                    result = asyncio.run(handler_func(input_context))
+                else:
+                    # Sync handler - call directly
+                    result = handler_func(input_context)
+            except Exception:
+                # Errors caused by requests still waiting for a batch job are not failures
+                self._suspend_for_batch(input_context)
+                raise
+            self._suspend_for_batch(input_context)
             
             # Save output_data if node returned something and hasn't saved it yet
             # (Async nodes mark themselves as completed but don't save output_data)
@@ -469,10 +723,34 @@ class NodeExecutor:
             self.log('INFO', 'Node execution completed successfully')
             return result
             
+        except NodeSuspended:
+            raise
         except Exception as e:
             self.log('ERROR', f'Node execution failed: {str(e)}')
             raise
     
+    def _suspend_for_batch(self, state: Dict[str, Any]):
+        """Raise NodeSuspended if the node queued requests for a batch job."""
+        from workflow_engine.services.llm_batches import (
+            BatchingClient,
+            MAX_BATCH_ROUNDS,
+            NodeSuspended,
+            queue_requests,
+        )
+        
+        client = state.get('client')
+        if not isinstance(client, BatchingClient) or not client.batch.pending:
+            return
+        if self.node.batch_rounds >= MAX_BATCH_ROUNDS:
+            raise RuntimeError(
+                f'Node still issued {len(client.batch.pending)} new batched request(s) '
+                f'after {MAX_BATCH_ROUNDS} rounds'
+            )
+        
+        request_count = queue_requests(self.node, client.batch.pending)
+        self.log('INFO', f'Queued {request_count} LLM request(s) for a provider batch job')
+        raise NodeSuspended(request_count)
+    
     def _get_handler(self):
         """Dynamically import and return the handler function."""
         from importlib import import_module
@@ -489,15 +767,22 @@ class NodeExecutor:
         - workflow_run_id
         - paper_id  
         - current_node_id
-        - client, model (OpenAI)
+        - client, model (OpenAI; a BatchingClient for llm_batch runs)
         - force_reprocess
         - Upstream node outputs (merged into state)
         """
-        from openai import OpenAI
         import os
+        from webApp.services.rate_limiter import rate_limited_client
+        from webApp.services.worker_runtime import openai_client
         
         workflow_run = self.node.workflow_run
         
+        # Batch-mode runs answer LLM calls from provider batch jobs
+        client = rate_limited_client(openai_client())
+        if workflow_run.input_data.get('llm_batch'):
+            from workflow_engine.services.llm_batches import BatchingClient, NodeBatch, load_answers
+            client = BatchingClient(client, NodeBatch(load_answers(self.node)))
+        
         # Collect outputs from dependencies
         dependencies = self.node.get_dependencies()
         
@@ -506,7 +791,7 @@ class NodeExecutor:
             'workflow_run_id': str(workflow_run.id),
             'paper_id': workflow_run.paper.id,
             'current_node_id': self.node.node_id,
-            'client': OpenAI(api_key=os.getenv('OPENAI_API_KEY')),
+            'client': client,
             'model': os.getenv('OPENAI_MODEL', 'gpt-5'),
             'force_reprocess': workflow_run.input_data.get('force_reprocess', False),
         }
@@ -0,0 +1,299 @@
+"""
+Workflow status change feed.
+
+Status changes of runs and nodes are appended to WorkflowStatusEvent, either
+from model save signals (see workflow_engine.signals) or explicitly after
+bulk UPDATEs, which bypass signals.
+
+Each web process runs one StatusFeedBroadcaster thread that tails the table
+and fans new events out to all of its stream subscribers, so the database
+cost of live status updates no longer grows with the number of open pages.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from workflow_engine.models import WorkflowRun, WorkflowStatusEvent
+
+logger = logging.getLogger(__name__)
+
+
+class StatusFeedFull(Exception):
+    """Raised when a process already serves its maximum number of streams."""
+
+
+# ============================================================================
+# Publishing
+# ============================================================================
+
+
+def publish(events: Iterable[Tuple[Any, int, Optional[str], str]]) -> int:
+    """
+    Append status events to the feed.
+
+    Args:
+        events: (workflow_run_id, paper_id, node_id or None, status) tuples
+
+    Returns:
+        Number of events written
+    """
+    rows = [
+        WorkflowStatusEvent(
+            workflow_run_id=run_id,
+            paper_id=paper_id,
+            node_id=node_id or "",
+            status=status,
+        )
+        for run_id, paper_id, node_id, status in events
+    ]
+    if not rows:
+        return 0
+
+    # The feed is best-effort: never let it break a status transition
+    try:
+        with transaction.atomic():
+            WorkflowStatusEvent.objects.bulk_create(rows)
+    except Exception as e:
+        logger.warning(f"Failed to publish {len(rows)} status event(s): {e}")
+        return 0
+    return len(rows)
+
+
+def publish_run_transitions(run_ids: Iterable, status: str) -> int:
+    """Publish a status change for workflow runs updated in bulk."""
+    run_ids = list(run_ids)
+    if not run_ids:
+        return 0
+    rows = WorkflowRun.objects.filter(id__in=run_ids).values_list("id", "paper_id")
+    return publish((run_id, paper_id, None, status) for run_id, paper_id in rows)
+
+
+def latest_event_id(**filters) -> int:
+    """Highest event id matching the filters (0 if none), e.g. for ETags."""
+    return (
+        WorkflowStatusEvent.objects.filter(**filters).aggregate(latest=Max("id"))["latest"]
+        or 0
+    )
+
+
+def events_since(
+    last_event_id: int,
+    workflow_run_id: Optional[str] = None,
+    paper_ids: Optional[Set[int]] = None,
+    limit: int = 1000,
+) -> List[Dict[str, Any]]:
+    """Events after ``last_event_id`` from the database, for resuming streams."""
+    query = WorkflowStatusEvent.objects.filter(id__gt=last_event_id)
+    if workflow_run_id:
+        query = query.filter(workflow_run_id=workflow_run_id)
+    if paper_ids is not None:
+        query = query.filter(paper_id__in=paper_ids)
+    return [event.to_dict() for event in query.order_by("id")[:limit]]
+
+
+def prune_events(max_age: timedelta = timedelta(days=1)) -> int:
+    """Delete events older than ``max_age``; streams only need recent history."""
+    deleted, _ = WorkflowStatusEvent.objects.filter(
+        created_at__lt=timezone.now() - max_age
+    ).delete()
+    return deleted
+
+
+# ============================================================================
+# Fan-out
+# ============================================================================
+
+
+class StatusFeedBroadcaster:
+    """
+    Tails WorkflowStatusEvent once per process and fans events out.
+
+    The tail re-reads a small window below the highest id seen, because
+    auto-increment ids can commit out of order; duplicates are dropped.
+    The thread only runs while there are subscribers.
+    """
+
+    # Ids re-read below the high-water mark on each poll
+    OVERLAP = 100
+
+    def __init__(self, poll_interval: float = 1.0, buffer_size: int = 5000):
+        self.poll_interval = poll_interval
+        self.max_subscribers = getattr(
+            settings, "WORKFLOW_STATUS_STREAM_MAX_SUBSCRIBERS", 2
+        )
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._seen: deque = deque(maxlen=buffer_size)
+        self._seen_set: Set[int] = set()
+        self._seq = 0
+        self._high_water: Optional[int] = None
+        self._subscribers = 0
+        self._thread: Optional[threading.Thread] = None
+        self._cond = threading.Condition()
+
+    # ------------------------------------------------------------------
+    # Tail thread
+    # ------------------------------------------------------------------
+
+    def _ensure_running(self):
+        """Start the tail thread; caller holds self._cond."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, daemon=True, name="workflow-status-feed"
+            )
+            self._thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                with self._cond:
+                    if self._subscribers == 0:
+                        self._thread = None
+                        self._high_water = None
+                        return
+                try:
+                    self.poll()
+                except Exception as e:
+                    logger.warning(f"Status feed poll failed: {e}")
+                time.sleep(self.poll_interval)
+        finally:
+            connection.close()
+
+    def poll(self) -> int:
+        """Read new events into the buffer and wake subscribers."""
+        if self._high_water is None:
+            # Start from "now"; older history is served by events_since()
+            self._high_water = latest_event_id()
+            for event_id in WorkflowStatusEvent.objects.filter(
+                id__gt=max(self._high_water - self.OVERLAP, 0)
+            ).values_list("id", flat=True):
+                self._remember(event_id)
+            return 0
+
+        rows = list(
+            WorkflowStatusEvent.objects.filter(
+                id__gt=max(self._high_water - self.OVERLAP, 0)
+            ).order_by("id")[:1000]
+        )
+        fresh = [row for row in rows if row.id not in self._seen_set]
+        if not fresh:
+            return 0
+
+        with self._cond:
+            for row in fresh:
+                self._remember(row.id)
+                self._seq += 1
+                self._buffer.append((self._seq, row.to_dict()))
+            self._high_water = max(self._high_water, rows[-1].id)
+            self._cond.notify_all()
+        return len(fresh)
+
+    def _remember(self, event_id: int):
+        if len(self._seen) == self._seen.maxlen:
+            self._seen_set.discard(self._seen[0])
+        self._seen.append(event_id)
+        self._seen_set.add(event_id)
+
+    def _since(self, cursor: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Buffered events after ``cursor``; caller holds self._cond."""
+        if cursor >= self._seq:
+            return [], cursor
+        oldest = self._seq - len(self._buffer)
+        if cursor < oldest:
+            logger.warning(
+                f"Status subscriber fell behind by {oldest - cursor} event(s)"
+            )
+            cursor = oldest
+        events = [event for seq, event in list(self._buffer)[cursor - oldest:]]
+        return events, self._seq
+
+    # ------------------------------------------------------------------
+    # Subscribing
+    # ------------------------------------------------------------------
+
+    def subscribe(
+        self,
+        last_event_id: Optional[int] = None,
+        workflow_run_id: Optional[str] = None,
+        paper_ids: Optional[Set[int]] = None,
+        heartbeat: float = 15.0,
+        max_duration: float = 300.0,
+    ) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Stream matching events, resuming after ``last_event_id``.
+
+        Yields event dicts, or None when a keep-alive should be sent. Ends
+        after ``max_duration`` seconds so long-lived connections are recycled
+        (EventSource reconnects with Last-Event-ID).
+
+        Raises:
+            StatusFeedFull: If this process already serves max_subscribers
+        """
+        # Reserve the slot under the lock so concurrent requests cannot
+        # all pass the check before any of them is registered
+        with self._cond:
+            if self._subscribers >= self.max_subscribers:
+                raise StatusFeedFull()
+            self._subscribers += 1
+            self._ensure_running()
+            cursor = self._seq
+
+        stream = self._stream(
+            cursor, last_event_id, workflow_run_id, paper_ids, heartbeat, max_duration
+        )
+        # Enter the generator's try block, so closing or dropping the stream
+        # releases the slot even if it is never iterated
+        next(stream)
+        return stream
+
+    def _stream(
+        self, cursor, last_event_id, workflow_run_id, paper_ids, heartbeat, max_duration
+    ):
+        run_id = str(workflow_run_id) if workflow_run_id else None
+
+        def matches(event):
+            if run_id and event["workflow_run_id"] != run_id:
+                return False
+            if paper_ids is not None and event["paper_id"] not in paper_ids:
+                return False
+            return True
+
+        try:
+            yield  # primed by subscribe()
+            delivered: Set[int] = set()
+            if last_event_id is not None:
+                for event in events_since(last_event_id, run_id, paper_ids):
+                    delivered.add(event["event_id"])
+                    yield event
+
+            deadline = time.monotonic() + max_duration
+            last_yield = time.monotonic()
+            while time.monotonic() < deadline:
+                with self._cond:
+                    if cursor >= self._seq:
+                        self._cond.wait(timeout=min(heartbeat, self.poll_interval * 5))
+                    events, cursor = self._since(cursor)
+
+                for event in events:
+                    if event["event_id"] in delivered or not matches(event):
+                        continue
+                    last_yield = time.monotonic()
+                    yield event
+
+                if time.monotonic() - last_yield >= heartbeat:
+                    last_yield = time.monotonic()
+                    yield None
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+
+
+# Convenience singleton instance
+status_feed = StatusFeedBroadcaster()
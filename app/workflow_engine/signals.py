@@ -1,7 +1,8 @@
 """
 Signal handlers for workflow engine.
 """
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, post_init
 from django.dispatch import receiver
 import logging
 
@@ -39,3 +40,72 @@ def generate_workflow_diagram(sender, instance, created, **kwargs):
         else:
             logger.warning(f"Failed to generate DAG diagram for workflow: {instance.name}")
 
+
+# ============================================================================
+# Status change feed
+# ============================================================================
+
+@receiver(post_init, sender='workflow_engine.WorkflowRun')
+@receiver(post_init, sender='workflow_engine.WorkflowNode')
+def remember_loaded_status(sender, instance, **kwargs):
+    """Remember the status an instance was loaded with (without loading deferred fields)."""
+    instance._feed_status = instance.__dict__.get('status')
+
+
+@receiver(post_save, sender='workflow_engine.WorkflowRun')
+def publish_run_status(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Publish run status changes saved through the ORM to the status feed.
+    
+    Runs that completed are also folded into the materialized conference
+    statistics once the transaction commits.
+    """
+    if update_fields is not None and 'status' not in update_fields:
+        return
+    status = instance.__dict__.get('status')
+    if status is None or (not created and status == instance._feed_status):
+        return
+    
+    from workflow_engine.services.status_feed import publish
+    publish([(instance.id, instance.paper_id, None, status)])
+    instance._feed_status = status
+    
+    if status == 'completed':
+        from webApp.services.conference_stats import record_completed_runs
+        run_id = instance.id
+        transaction.on_commit(lambda: record_completed_runs([run_id]))
+
+
+@receiver(post_save, sender='workflow_engine.WorkflowNode')
+def publish_node_status(sender, instance, created, update_fields=None, **kwargs):
+    """Publish node status changes saved through the ORM to the status feed."""
+    if update_fields is not None and 'status' not in update_fields:
+        return
+    status = instance.__dict__.get('status')
+    if status is None or (not created and status == instance._feed_status):
+        return
+    
+    from workflow_engine.models import WorkflowRun
+    from workflow_engine.services.status_feed import publish
+    
+    run = instance._state.fields_cache.get('workflow_run')
+    paper_id = run.paper_id if run else (
+        WorkflowRun.objects.filter(id=instance.workflow_run_id)
+        .values_list('paper_id', flat=True)
+        .first()
+    )
+    if paper_id is None:
+        return
+    publish([(instance.workflow_run_id, paper_id, instance.node_id, status)])
+    instance._feed_status = status
+
+
+# ============================================================================
+# Paper run pointers
+# ============================================================================
+
+@receiver(post_delete, sender='workflow_engine.WorkflowRun')
+def refresh_paper_run_pointers(sender, instance, **kwargs):
+    """Keep Paper.latest_*_workflow_run and workflow_run_count right after deletions."""
+    from workflow_engine.services.orchestrator import WorkflowOrchestrator
+    WorkflowOrchestrator().refresh_paper_run_pointers([instance.paper_id])
@@ -13,6 +13,9 @@ from workflow_engine.services.orchestrator import (
     WorkflowOrchestrator,
     NodeExecutor
 )
+from workflow_engine.services.status_feed import publish as publish_status_events, prune_events
+from workflow_engine.services.checkpoints import purge_expired_checkpoints
+from workflow_engine.services.llm_batches import NodeSuspended, process_llm_batches
 
 logger = logging.getLogger(__name__)
 
@@ -23,41 +26,69 @@ def update_workflow_run_status():
     
     Updates runs to 'completed' or 'failed' when all nodes are finished.
     
+    Terminal node counts for every running run are computed with one grouped
+    aggregate (GROUP BY workflow_run HAVING all nodes terminal), and the
+    resulting status changes are applied with two bulk UPDATEs and published
+    to the status feed in one insert, so the scheduler tick costs a constant
+    number of queries.
+    
     Returns:
         Number of workflow runs updated
     """
-    from django.db.models import Count, Q
+    from django.db.models import Count, Q, F
     
-    # Get all running workflow runs
-    running_runs = WorkflowRun.objects.filter(status='running')
+    terminal_statuses = ['completed', 'failed', 'skipped', 'cancelled']
+    
+    # Per-run node counts, restricted to runs whose nodes are all terminal
+    finished_runs = (
+        WorkflowNode.objects
+        .filter(workflow_run__status='running')
+        .values('workflow_run_id', 'workflow_run__paper_id')
+        .annotate(
+            total=Count('id'),
+            terminal=Count('id', filter=Q(status__in=terminal_statuses)),
+            failed=Count('id', filter=Q(status='failed'))
+        )
+        .filter(terminal=F('total'))
+    )
+    
+    failed_ids = []
+    completed_ids = []
+    paper_ids = {}
+    for row in finished_runs:
+        paper_ids[row['workflow_run_id']] = row['workflow_run__paper_id']
+        if row['failed'] > 0:
+            failed_ids.append(row['workflow_run_id'])
+        else:
+            completed_ids.append(row['workflow_run_id'])
     
     updated_count = 0
     
-    for run in running_runs:
-        # Get node status counts
-        nodes = run.nodes.aggregate(
-            total=Count('id'),
-            completed=Count('id', filter=Q(status='completed')),
-            failed=Count('id', filter=Q(status='failed')),
-            skipped=Count('id', filter=Q(status='skipped')),
-            running=Count('id', filter=Q(status__in=['running', 'claimed'])),
-            pending=Count('id', filter=Q(status__in=['ready', 'pending']))
+    # Only touch runs that are still running when the UPDATE executes
+    if failed_ids:
+        updated_count += WorkflowRun.objects.filter(
+            id__in=failed_ids, status='running'
+        ).update(status='failed')
+        logger.info(f"Marked {len(failed_ids)} workflow runs as failed: {failed_ids}")
+    
+    if completed_ids:
+        updated_count += WorkflowRun.objects.filter(
+            id__in=completed_ids, status='running'
+        ).update(status='completed')
+        logger.info(f"Marked {len(completed_ids)} workflow runs as completed: {completed_ids}")
+    
+    # Bulk UPDATEs bypass the post_save signal that feeds status streams
+    # and conference statistics
+    publish_status_events(
+        [(run_id, paper_ids[run_id], None, 'failed') for run_id in failed_ids]
+        + [(run_id, paper_ids[run_id], None, 'completed') for run_id in completed_ids]
+    )
+    if completed_ids:
+        from webApp.services.conference_stats import record_completed_runs
+        WorkflowOrchestrator().refresh_paper_run_pointers(
+            {paper_ids[run_id] for run_id in completed_ids}, completed_only=True
         )
-        
-        # Check if all nodes are in a terminal state
-        terminal_nodes = nodes['completed'] + nodes['failed'] + nodes['skipped']
-        
-        if terminal_nodes == nodes['total']:
-            # All nodes are done - determine final status
-            if nodes['failed'] > 0:
-                run.status = 'failed'
-                logger.info(f"Workflow run {run.id} marked as failed ({nodes['failed']} failed nodes)")
-            else:
-                run.status = 'completed'
-                logger.info(f"Workflow run {run.id} marked as completed")
-            
-            run.save(update_fields=['status'])
-            updated_count += 1
+        record_completed_runs(completed_ids)
     
     return updated_count
 
@@ -74,7 +105,7 @@ def workflow_scheduler_task(self):
     # First, update status of any completed/failed workflow runs
     updated_runs = update_workflow_run_status()
     
-    # Claim and dispatch up to 100 ready tasks
+    # Claim and dispatch up to 100 ready tasks, highest priority first
     dispatched_count = 0
     max_dispatch = 100
     
@@ -85,8 +116,12 @@ def workflow_scheduler_task(self):
         if not node:
             break  # No more ready tasks
         
-        # Dispatch to execution task
-        execute_node_task.delay(str(node.id))
+        # Dispatch to the queue of the node's priority class so interactive
+        # work is not stuck behind a backlog of bulk messages in the broker
+        execute_node_task.apply_async(
+            args=[str(node.id)],
+            queue=WorkflowRun.queue_for_priority(node.priority)
+        )
         dispatched_count += 1
     
     if dispatched_count > 0:
@@ -133,6 +168,18 @@ def execute_node_task(self, node_id: str):
             'output': output_data
         }
         
+    except NodeSuspended as e:
+        # Resumed by process_llm_batches_task once the batch job answered
+        orchestrator.mark_node_waiting(node, e.request_count)
+        
+        logger.info(f"Node {node.node_id} waiting for {e.request_count} batched LLM request(s)")
+        
+        return {
+            'node_id': node.node_id,
+            'status': 'waiting',
+            'batched_requests': e.request_count
+        }
+        
     except Exception as e:
         error_msg = str(e)
         error_trace = traceback.format_exc()
@@ -214,32 +261,64 @@ def cleanup_stale_claims_task():
     """
     Cleanup stale task claims (tasks claimed but not completed).
     
+    Also prunes old status feed events, which streams only need for
+    short-term resumption, and node checkpoints of nodes that never
+    completed.
+    
     This should run periodically via Celery Beat.
     """
     from django.utils import timezone
     
-    stale_nodes = WorkflowNode.objects.filter(
-        status='claimed',
-        claim_expires_at__lt=timezone.now()
+    stale_nodes = list(
+        WorkflowNode.objects.filter(
+            status='claimed',
+            claim_expires_at__lt=timezone.now()
+        ).values_list('id', 'workflow_run_id', 'workflow_run__paper_id', 'node_id')
     )
     
-    count = stale_nodes.count()
-    
-    if count > 0:
-        # Reset stale claims to ready
-        stale_nodes.update(
+    count = 0
+    if stale_nodes:
+        # Reset stale claims to ready (unless a worker finished the claim meanwhile)
+        count = WorkflowNode.objects.filter(
+            id__in=[pk for pk, _, _, _ in stale_nodes],
+            status='claimed'
+        ).update(
             status='ready',
             claimed_by=None,
             claimed_at=None,
             claim_expires_at=None
         )
+        # Bulk UPDATEs bypass save signals, so publish the transitions here
+        publish_status_events(
+            (run_id, paper_id, node_id, 'ready')
+            for _, run_id, paper_id, node_id in stale_nodes
+        )
         
         logger.warning(f"Reset {count} stale task claims")
     
+    pruned_events = prune_events()
+    purged_checkpoints = purge_expired_checkpoints()
+    
     return {
-        'stale_claims_reset': count
+        'stale_claims_reset': count,
+        'status_events_pruned': pruned_events,
+        'checkpoints_purged': purged_checkpoints
     }
 
 
+@shared_task(max_retries=0)
+def process_llm_batches_task():
+    """
+    Periodic task driving provider batch jobs of llm_batch runs.
+    
+    Polls submitted jobs, resumes nodes whose requests were answered and
+    submits the requests queued since the last round.
+    """
+    result = process_llm_batches()
+    if any(result.values()):
+        logger.info(f"LLM batches: {result}")
+    return result
+
+
 # Import timezone at the top if not already imported
 from django.utils import timezone
@@ -10,7 +10,8 @@ from webApp.models import Paper
 from workflow_engine.models import (
     WorkflowDefinition,
     WorkflowRun,
-    WorkflowNode
+    WorkflowNode,
+    NodeLog
 )
 from workflow_engine.services.orchestrator import WorkflowOrchestrator
 
@@ -146,6 +147,36 @@ class WorkflowOrchestratorTestCase(TestCase):
         pending_nodes = run.nodes.filter(status='pending')
         self.assertEqual(pending_nodes.count(), 2)
     
+    def test_claim_orders_by_priority_with_aging(self):
+        """Test that interactive nodes are claimed first and stale bulk work is promoted."""
+        from datetime import timedelta
+        from django.utils import timezone
+        
+        bulk = self.orchestrator.create_workflow_run(
+            workflow_name='test_pipeline', paper=self.paper,
+            priority=WorkflowRun.PRIORITY_BULK
+        )
+        normal = self.orchestrator.create_workflow_run(
+            workflow_name='test_pipeline', paper=self.paper
+        )
+        interactive = self.orchestrator.create_workflow_run(
+            workflow_name='test_pipeline', paper=self.paper,
+            priority=WorkflowRun.PRIORITY_INTERACTIVE
+        )
+        self.assertEqual(
+            interactive.nodes.get(node_id='step1').priority,
+            WorkflowRun.PRIORITY_INTERACTIVE
+        )
+        
+        self.assertEqual(self.orchestrator.claim_ready_task().workflow_run_id, interactive.id)
+        
+        # Bulk work older than the aging window overtakes newer normal work
+        WorkflowNode.objects.filter(workflow_run=bulk).update(
+            created_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(self.orchestrator.claim_ready_task().workflow_run_id, bulk.id)
+        self.assertEqual(self.orchestrator.claim_ready_task().workflow_run_id, normal.id)
+    
     def test_dependency_resolution(self):
         """Test that completing a node marks dependents as ready."""
         run = self.orchestrator.create_workflow_run(
@@ -203,6 +234,60 @@ class WorkflowOrchestratorTestCase(TestCase):
         # Dependent nodes should be skipped
         skipped = run.nodes.filter(status='skipped')
         self.assertTrue(skipped.exists())
+    
+    def test_permanent_failure_fails_workflow_run(self):
+        """Test that a permanent failure skips dependents and fails the run."""
+        run = self.orchestrator.create_workflow_run(
+            workflow_name='test_pipeline',
+            paper=self.paper
+        )
+        
+        step1 = run.nodes.get(node_id='step1')
+        step1.attempt_count = step1.max_retries
+        step1.save()
+        
+        self.orchestrator.mark_node_failed(step1, error_message='Boom', retry=True)
+        
+        run.refresh_from_db()
+        self.assertEqual(run.status, 'failed')
+        self.assertIn('step1: Boom', run.error_message)
+        self.assertEqual(
+            set(run.nodes.filter(status='skipped').values_list('node_id', flat=True)),
+            {'step2', 'step3'}
+        )
+        self.assertTrue(
+            NodeLog.objects.filter(node__workflow_run=run, node__node_id='step2').exists()
+        )
+    
+    def test_create_workflow_run_query_count_independent_of_node_count(self):
+        """Test that node initialization is bulk and does not scale with DAG size."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        WorkflowDefinition.objects.create(
+            name='wide_pipeline',
+            version=1,
+            dag_structure={
+                'nodes': [
+                    {'id': f'n{i}', 'type': 'celery', 'handler': 'test.handler'}
+                    for i in range(30)
+                ],
+                'edges': [{'from': 'n0', 'to': f'n{i}'} for i in range(1, 30)]
+            },
+            is_active=True
+        )
+        
+        with CaptureQueriesContext(connection) as small:
+            self.orchestrator.create_workflow_run(
+                workflow_name='test_pipeline', paper=self.paper
+            )
+        with CaptureQueriesContext(connection) as wide:
+            run = self.orchestrator.create_workflow_run(
+                workflow_name='wide_pipeline', paper=self.paper
+            )
+        
+        self.assertEqual(run.nodes.count(), 30)
+        self.assertEqual(len(wide.captured_queries), len(small.captured_queries))
 
 
 class WorkflowUtilsTestCase(TestCase):
@@ -236,3 +321,1050 @@ class WorkflowUtilsTestCase(TestCase):
         self.assertIn('active_runs', stats)
         self.assertIn('total_nodes', stats)
         self.assertIsInstance(stats['total_runs'], int)
+    
+    def test_update_workflow_run_status_is_set_based(self):
+        """Test that finished runs are resolved with a constant number of queries."""
+        from workflow_engine.services.orchestrator import WorkflowOrchestrator
+        from workflow_engine.tasks import update_workflow_run_status
+        
+        orchestrator = WorkflowOrchestrator()
+        runs = []
+        for _ in range(3):
+            run = orchestrator.create_workflow_run(
+                workflow_name='test_workflow', paper=self.paper
+            )
+            WorkflowRun.objects.filter(id=run.id).update(status='running')
+            runs.append(run)
+        
+        done, broken, busy = runs
+        done.nodes.update(status='completed')
+        broken.nodes.update(status='failed')
+        busy.nodes.update(status='running')
+        
+        # Aggregate, two UPDATEs, one status-feed insert (in a savepoint), the
+        # paper latest-run pointer UPDATE and the conference statistics lookup
+        with self.assertNumQueries(8):
+            updated = update_workflow_run_status()
+        
+        self.assertEqual(updated, 2)
+        statuses = dict(
+            WorkflowRun.objects.filter(id__in=[r.id for r in runs]).values_list('id', 'status')
+        )
+        self.assertEqual(statuses[done.id], 'completed')
+        self.assertEqual(statuses[broken.id], 'failed')
+        self.assertEqual(statuses[busy.id], 'running')
+
+
+class WorkflowAdmissionControllerTestCase(TestCase):
+    """Test cluster-wide workflow admission leases."""
+    
+    def setUp(self):
+        from workflow_engine.models import ConcurrencyPool
+        from workflow_engine.services.concurrency import WorkflowAdmissionController
+        
+        self.pool = ConcurrencyPool.objects.create(
+            name='test_pool',
+            max_concurrent=2,
+            per_model_limits={'gpt-5': 1}
+        )
+        self.controller = WorkflowAdmissionController(pool_name='test_pool')
+        self.paper = Paper.objects.create(title='Test Paper', doi='10.1234/test')
+    
+    def test_global_limit_and_fifo_queue(self):
+        """Test that leases are admitted in order up to the pool limit."""
+        leases = [self.controller.enqueue(paper_id=self.paper.id, model='m') for _ in range(3)]
+        
+        self.assertFalse(self.controller.try_acquire(leases[2]))
+        self.assertTrue(self.controller.try_acquire(leases[0]))
+        self.assertTrue(self.controller.try_acquire(leases[1]))
+        self.assertEqual(self.controller.queue_position(leases[2]), 1)
+        
+        self.controller.release(leases[0])
+        leases[2].refresh_from_db()
+        self.assertEqual(leases[2].status, 'active')
+        self.assertEqual(self.controller.queue_position(leases[2]), 0)
+    
+    def test_per_model_limit_does_not_block_other_models(self):
+        """Test that a model quota skips only leases of that model."""
+        first = self.controller.enqueue(model='gpt-5')
+        second = self.controller.enqueue(model='gpt-5')
+        other = self.controller.enqueue(model='gpt-5-mini')
+        
+        self.assertTrue(self.controller.try_acquire(first))
+        self.assertFalse(self.controller.try_acquire(second))
+        self.assertTrue(self.controller.try_acquire(other))
+    
+    def test_interactive_lease_jumps_bulk_queue(self):
+        """Test that interactive leases are admitted ahead of earlier bulk leases."""
+        blocker = self.controller.enqueue(model='m')
+        self.assertTrue(self.controller.try_acquire(blocker))
+        bulk = [
+            self.controller.enqueue(model='m', priority=WorkflowRun.PRIORITY_BULK)
+            for _ in range(2)
+        ]
+        interactive = self.controller.enqueue(
+            model='m', priority=WorkflowRun.PRIORITY_INTERACTIVE
+        )
+        
+        self.assertEqual(self.controller.queue_position(interactive), 1)
+        self.assertEqual(self.controller.queue_position(bulk[1]), 3)
+        self.assertTrue(self.controller.try_acquire(interactive))
+        self.assertFalse(self.controller.try_acquire(bulk[0]))
+    
+    def test_expired_lease_fails_attached_run(self):
+        """Test that a lease without heartbeats expires and fails its run."""
+        from datetime import timedelta
+        from django.utils import timezone
+        from workflow_engine.models import WorkflowLease
+        
+        WorkflowDefinition.objects.create(
+            name='lease_workflow',
+            version=1,
+            dag_structure={'nodes': [{'id': 'n1'}], 'edges': []},
+            is_active=True
+        )
+        run = WorkflowOrchestrator().create_workflow_run(
+            workflow_name='lease_workflow', paper=self.paper
+        )
+        WorkflowRun.objects.filter(id=run.id).update(status='running')
+        
+        lease = self.controller.enqueue(paper_id=self.paper.id)
+        self.assertTrue(self.controller.try_acquire(lease))
+        self.controller.attach_run(lease, run.id)
+        WorkflowLease.objects.filter(id=lease.id).update(
+            expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        
+        self.assertEqual(self.controller.expire_stale(), 1)
+        self.assertFalse(self.controller.heartbeat(lease))
+        run.refresh_from_db()
+        self.assertEqual(run.status, 'failed')
+
+
+class LLMRateLimiterTestCase(TestCase):
+    """Test the shared TPM/RPM token-bucket limiter."""
+    
+    def setUp(self):
+        from webApp.models import LLMModelConfig
+        from webApp.services.rate_limiter import LLMRateLimiter
+        
+        self.config = LLMModelConfig.objects.create(
+            model_key='limited',
+            visual_name='Limited',
+            model='limited-model',
+            api_key_env_var='OPENAI_API_KEY',
+            base_url='https://api.example.com',
+            token_var='TOTAL_TOKEN_TEST',
+            tokens_per_minute=600,
+            requests_per_minute=60
+        )
+        self.limiter = LLMRateLimiter()
+    
+    def test_overdraw_waits_and_reconcile_refunds(self):
+        """Test that overdrawing the bucket returns a wait and usage is reconciled."""
+        from webApp.models import LLMRateLimitBucket
+        
+        wait, charged = self.limiter.reserve('limited-model', 500)
+        self.assertEqual((wait, charged), (0.0, 500))
+        
+        # 200 more tokens overdraws by ~100, i.e. ~10s at 10 tokens/s
+        wait, charged = self.limiter.reserve('limited-model', 200)
+        self.assertAlmostEqual(wait, 10.0, delta=0.5)
+        
+        self.limiter.reconcile('limited-model', charged, 50)
+        bucket = LLMRateLimitBucket.objects.get(config=self.config)
+        self.assertAlmostEqual(bucket.available_tokens, 50, delta=5)
+        
+        self.assertEqual(self.limiter.reserve('unlimited-model', 10**6), (0.0, 0))
+    
+    def test_client_records_wait_on_scoped_node(self):
+        """Test that the client proxy limits calls and attributes waits to the node."""
+        from types import SimpleNamespace
+        from unittest import mock
+        from django.utils import timezone
+        from webApp.models import LLMRateLimitBucket
+        from webApp.services.rate_limiter import RateLimitedClient, node_scope
+        
+        WorkflowDefinition.objects.create(
+            name='limited_workflow',
+            version=1,
+            dag_structure={'nodes': [{'id': 'n1'}], 'edges': []},
+            is_active=True
+        )
+        paper = Paper.objects.create(title='Test Paper', doi='10.1234/test')
+        run = WorkflowOrchestrator().create_workflow_run(
+            workflow_name='limited_workflow', paper=paper
+        )
+        
+        response = SimpleNamespace(usage=SimpleNamespace(total_tokens=100))
+        raw_client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kw: response)),
+            api_key='secret'
+        )
+        client = RateLimitedClient(raw_client, limiter=self.limiter)
+        self.assertEqual(client.api_key, 'secret')
+        
+        LLMRateLimitBucket.objects.create(
+            config=self.config,
+            available_tokens=0,
+            available_requests=60,
+            refilled_at=timezone.now()
+        )
+        with mock.patch('webApp.services.rate_limiter.time.sleep') as sleep:
+            with node_scope(str(run.id), 'n1'):
+                result = client.chat.completions.create(
+                    model='limited-model',
+                    messages=[{'role': 'user', 'content': 'x' * 400}]
+                )
+        
+        self.assertIs(result, response)
+        sleep.assert_called_once()
+        node = run.nodes.get(node_id='n1')
+        self.assertGreater(node.rate_limit_wait_seconds, 0)
+        bucket = LLMRateLimitBucket.objects.get(config=self.config)
+        self.assertLess(bucket.available_tokens, 0)
+    
+    def test_acall_waits_without_blocking_the_event_loop(self):
+        """Test that coroutines wait for budget with asyncio.sleep while other tasks run."""
+        import asyncio
+        from types import SimpleNamespace
+        from asgiref.sync import async_to_sync
+        from django.utils import timezone
+        from webApp.models import LLMRateLimitBucket
+        from webApp.services.rate_limiter import RateLimitedClient, acall, node_scope
+        
+        WorkflowDefinition.objects.create(
+            name='async_limited_workflow', version=1,
+            dag_structure={'nodes': [{'id': 'n1'}], 'edges': []}, is_active=True
+        )
+        paper = Paper.objects.create(title='Async Paper', doi='10.1234/async-limited')
+        run = WorkflowOrchestrator().create_workflow_run(workflow_name='async_limited_workflow', paper=paper)
+        
+        # 100 tokens/s: a ~20 token request on an empty bucket waits ~0.2s
+        self.config.tokens_per_minute = 6000
+        self.config.save()
+        LLMRateLimitBucket.objects.create(
+            config=self.config, available_tokens=0, available_requests=60, refilled_at=timezone.now()
+        )
+        response = SimpleNamespace(usage=SimpleNamespace(total_tokens=20))
+        raw_client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kw: response))
+        )
+        client = RateLimitedClient(raw_client, limiter=self.limiter)
+        
+        async def scenario():
+            ticks = 0
+            
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+            
+            task = asyncio.ensure_future(ticker())
+            with node_scope(str(run.id), 'n1'):
+                result = await acall(
+                    client.chat.completions.create,
+                    model='limited-model', messages=[{'role': 'user', 'content': 'x' * 40}]
+                )
+            task.cancel()
+            plain = await acall(raw_client.chat.completions.create, model='limited-model')
+            return result, plain, ticks
+        
+        result, plain, ticks = async_to_sync(scenario)()
+        
+        self.assertIs(result, response)
+        self.assertIs(plain, response)
+        self.assertGreater(ticks, 5)
+        self.assertGreater(run.nodes.get(node_id='n1').rate_limit_wait_seconds, 0.1)
+
+
+class WorkflowStatusFeedTestCase(TestCase):
+    """Test the workflow status change feed and its ETag polling fallback."""
+    
+    def setUp(self):
+        WorkflowDefinition.objects.create(
+            name='feed_workflow',
+            version=1,
+            dag_structure={'nodes': [{'id': 'n1'}, {'id': 'n2'}], 'edges': []},
+            is_active=True
+        )
+        self.paper = Paper.objects.create(title='Test Paper', doi='10.1234/test')
+        self.run = WorkflowOrchestrator().create_workflow_run(
+            workflow_name='feed_workflow', paper=self.paper
+        )
+    
+    def test_saves_and_bulk_transitions_publish_events(self):
+        """Test that node saves and bulk transitions both reach the feed."""
+        from workflow_engine.services.status_feed import events_since, latest_event_id
+        
+        start = latest_event_id()
+        node = self.run.nodes.get(node_id='n1')
+        node.status = 'running'
+        node.save()
+        # Saves that don't touch status are not events
+        node.save(update_fields=['attempt_count'])
+        WorkflowOrchestrator().cancel_workflow_run(self.run)
+        
+        events = events_since(start, workflow_run_id=str(self.run.id))
+        node_events = [(e['node_id'], e['status']) for e in events if e['node_id']]
+        self.assertEqual(node_events[0], ('n1', 'running'))
+        self.assertIn(('n2', 'skipped'), node_events)
+        self.assertTrue(all(e['paper_id'] == self.paper.id for e in events))
+    
+    def test_stale_cleanups_publish_node_transitions(self):
+        """Test that stale claim and stale workflow cleanups reach the feed."""
+        from datetime import timedelta
+        from asgiref.sync import async_to_sync
+        from django.utils import timezone
+        from webApp.services.graphs.base_workflow_graph import cleanup_stale_workflows
+        from workflow_engine.services.status_feed import events_since, latest_event_id
+        from workflow_engine.tasks import cleanup_stale_claims_task
+        
+        start = latest_event_id()
+        self.run.nodes.filter(node_id='n1').update(
+            status='claimed', claim_expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        cleanup_stale_claims_task()
+        
+        WorkflowRun.objects.filter(id=self.run.id).update(
+            status='running', started_at=timezone.now() - timedelta(hours=2)
+        )
+        self.run.nodes.filter(node_id='n1').update(status='running')
+        self.run.nodes.filter(node_id='n2').update(status='pending')
+        async_to_sync(cleanup_stale_workflows)(max_age_minutes=30)
+        
+        events = events_since(start, workflow_run_id=str(self.run.id))
+        node_events = [(e['node_id'], e['status']) for e in events if e['node_id']]
+        self.assertEqual(node_events, [('n1', 'ready'), ('n1', 'failed'), ('n2', 'failed')])
+    
+    def test_status_view_answers_304_until_a_status_changes(self):
+        """Test that the polling endpoint honours If-None-Match."""
+        from django.urls import reverse
+        
+        url = reverse('latest_workflow_status', args=[self.paper.id])
+        
+        first = self.client.get(url)
+        etag = first['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        
+        node = self.run.nodes.get(node_id='n1')
+        node.status = 'running'
+        node.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+    
+    
+    def test_subscriber_slot_is_reserved_when_subscribing(self):
+        """Test the subscriber cap counts streams that have not started yet."""
+        import gc
+        from unittest import mock
+        from workflow_engine.services.status_feed import StatusFeedBroadcaster, StatusFeedFull
+        
+        feed = StatusFeedBroadcaster()
+        feed.max_subscribers = 1
+        with mock.patch.object(feed, '_ensure_running'):
+            first = feed.subscribe()
+            with self.assertRaises(StatusFeedFull):
+                feed.subscribe()
+            
+            first.close()
+            self.assertEqual(feed._subscribers, 0)
+            
+            unconsumed = feed.subscribe()
+            del unconsumed
+            gc.collect()
+            self.assertEqual(feed._subscribers, 0)
+
+class ConferenceStatsTestCase(TestCase):
+    """Test the materialized conference token statistics."""
+    
+    def setUp(self):
+        from webApp.models import Conference
+        
+        WorkflowDefinition.objects.create(
+            name='stats_workflow',
+            version=1,
+            dag_structure={'nodes': [{'id': 'n1'}, {'id': 'n2'}], 'edges': []},
+            is_active=True
+        )
+        self.conference = Conference.objects.create(name='Test Conf 2025', acronym='TC', year=2025)
+        self.papers = [
+            Paper.objects.create(title=f'Paper {i}', doi=f'10.1234/stats{i}', conference=self.conference)
+            for i in range(2)
+        ]
+        self.orchestrator = WorkflowOrchestrator()
+    
+    def _complete_run(self, paper, tokens):
+        run = self.orchestrator.create_workflow_run(workflow_name='stats_workflow', paper=paper)
+        run.nodes.filter(node_id='n1').update(
+            input_tokens=tokens, output_tokens=tokens, total_tokens=2 * tokens
+        )
+        run.nodes.update(status='completed')
+        WorkflowRun.objects.filter(id=run.id).update(
+            total_input_tokens=tokens, total_output_tokens=tokens, total_tokens=2 * tokens
+        )
+        run.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.orchestrator._check_workflow_completion(run)
+        return run
+    
+    def test_latest_run_replaces_paper_contribution(self):
+        """Test incremental updates track the latest completed run per paper."""
+        from webApp.services.conference_stats import (
+            conference_summaries, node_summaries, rebuild_conference_stats
+        )
+        
+        self._complete_run(self.papers[0], 100)
+        self._complete_run(self.papers[1], 300)
+        latest = self._complete_run(self.papers[0], 200)
+        
+        paper = Paper.objects.get(id=self.papers[0].id)
+        self.assertEqual(paper.workflow_run_count, 2)
+        self.assertEqual(paper.latest_workflow_run_id, latest.id)
+        self.assertEqual(paper.latest_completed_workflow_run_id, latest.id)
+        
+        summary = conference_summaries([self.conference.id])[self.conference.id]
+        self.assertEqual(summary['count'], 2)
+        self.assertEqual(summary['avg_input_tokens'], 250)
+        self.assertAlmostEqual(summary['stddev_input_tokens'], 70.7107, places=3)
+        self.assertEqual(summary['sum_total_tokens'], 1000)
+        
+        nodes = node_summaries(self.conference.id)
+        self.assertEqual(list(nodes), ['n1'])
+        self.assertEqual(nodes['n1']['count'], 2)
+        
+        rebuild_conference_stats([self.conference.id])
+        self.assertEqual(conference_summaries([self.conference.id])[self.conference.id], summary)
+        self.assertEqual(node_summaries(self.conference.id), nodes)
+        
+        from django.urls import reverse
+        response = self.client.get(reverse('conference_paper_statuses', args=[self.conference.id]))
+        self.assertEqual(
+            response.json()['statuses'][str(paper.id)],
+            {'status': 'completed', 'workflow_count': 2}
+        )
+        
+        latest.delete()
+        paper.refresh_from_db()
+        self.assertEqual(paper.workflow_run_count, 1)
+        self.assertNotEqual(paper.latest_completed_workflow_run_id, latest.id)
+
+
+class ParallelAspectAnalysisTestCase(TestCase):
+    """Test batched aspect retrieval and concurrent aspect analysis."""
+    
+    ASPECT_IDS = ['methodology', 'structure', 'components', 'artifacts', 'dataset_splits', 'documentation']
+    
+    def setUp(self):
+        from webApp.models import CodeFileEmbedding, PaperSectionEmbedding, ReproducibilityAspectEmbedding
+        
+        self.paper = Paper.objects.create(title='Aspect Paper', doi='10.1234/aspects')
+        self.code_url = 'https://github.com/example/aspects'
+        for i, aspect_id in enumerate(self.ASPECT_IDS):
+            ReproducibilityAspectEmbedding.objects.create(
+                aspect_id=aspect_id, aspect_name=aspect_id, aspect_description='',
+                aspect_context='', embedding=[1.0, i / 5, 0.0], embedding_dimension=3
+            )
+        for i, vector in enumerate([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0], [1.0, 1.0, 0.0]]):
+            PaperSectionEmbedding.objects.create(
+                paper=self.paper, section_type=f'section{i}', section_text='s' * 400 * (i + 1),
+                embedding=vector, embedding_dimension=3
+            )
+            CodeFileEmbedding.objects.create(
+                paper=self.paper, code_url=self.code_url, file_path=f'file{i}.py',
+                file_content='c' * 400 * (i + 1), content_hash=str(i), embedding=vector,
+                embedding_dimension=3
+            )
+    
+    def test_batched_retrieval_matches_per_aspect_retrieval(self):
+        """Test one-pass retrieval selects what the per-aspect functions select."""
+        from asgiref.sync import async_to_sync
+        from webApp.models import ReproducibilityAspectEmbedding
+        from webApp.services.nodes.aspect_based_retrieval import (
+            retrieve_aspect_contexts, retrieve_relevant_code, retrieve_relevant_sections
+        )
+        
+        embeddings = {e.aspect_id: e for e in ReproducibilityAspectEmbedding.objects.all()}
+        contexts = async_to_sync(retrieve_aspect_contexts)(
+            self.paper.id, self.code_url, embeddings, section_budget=500, code_budget=700
+        )
+        
+        def names(selected):
+            return [(getattr(row, 'section_type', None) or row.file_path, round(sim, 6)) for row, sim in selected]
+        
+        for aspect_id, embedding in embeddings.items():
+            sections = async_to_sync(retrieve_relevant_sections)(self.paper.id, embedding, token_budget=500)
+            code = async_to_sync(retrieve_relevant_code)(self.paper.id, self.code_url, embedding, token_budget=700)
+            self.assertEqual(names(contexts[aspect_id][0]), names(sections))
+            self.assertEqual(names(contexts[aspect_id][1]), names(code))
+    
+    def test_aspects_run_concurrently_and_errors_stay_isolated(self):
+        """Test aspect LLM calls overlap and one failure does not stop the others."""
+        import json
+        import threading
+        import time
+        from types import SimpleNamespace
+        from asgiref.sync import async_to_sync
+        from webApp.services.nodes.shared_helpers_v2 import analyze_repository_with_aspects
+        
+        state = {'active': 0, 'peak': 0, 'calls': 0}
+        lock = threading.Lock()
+        
+        def create(**kwargs):
+            with lock:
+                state['calls'] += 1
+                call = state['calls']
+                state['active'] += 1
+                state['peak'] = max(state['peak'], state['active'])
+            time.sleep(0.05)
+            with lock:
+                state['active'] -= 1
+            if call == 2:
+                raise RuntimeError('provider error')
+            usage = SimpleNamespace(prompt_tokens=10, completion_tokens=1)
+            overall = 'synthesizing' in kwargs['messages'][0]['content']
+            message = SimpleNamespace(content='{"overall_assessment": "ok"}' if overall else '{}')
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+        
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        result = async_to_sync(analyze_repository_with_aspects)(
+            self.code_url, self.paper, client, 'gpt-5'
+        )
+        
+        self.assertGreater(state['peak'], 1)
+        self.assertEqual(state['calls'], 7)
+        self.assertEqual(result['overall_assessment'], 'ok')
+        errors = [a for a, r in json.loads(result['llm_analysis_text']).items() if 'error' in r]
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(result['input_tokens'], 60)
+    
+    def test_retrieval_failure_only_affects_its_aspect(self):
+        """Test a failing aspect embedding leaves the other aspects analyzed."""
+        import json
+        from types import SimpleNamespace
+        from asgiref.sync import async_to_sync
+        from webApp.models import ReproducibilityAspectEmbedding
+        from webApp.services.nodes.shared_helpers_v2 import analyze_repository_with_aspects
+        
+        ReproducibilityAspectEmbedding.objects.filter(aspect_id='artifacts').delete()
+        calls = []
+        
+        def create(**kwargs):
+            calls.append(kwargs)
+            message = SimpleNamespace(content='{"overall_assessment": "ok"}')
+            usage = SimpleNamespace(prompt_tokens=10, completion_tokens=1)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+        
+        def embed(**kwargs):
+            raise RuntimeError('embedding service down')
+        
+        client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=create)),
+            embeddings=SimpleNamespace(create=embed),
+        )
+        result = async_to_sync(analyze_repository_with_aspects)(
+            self.code_url, self.paper, client, 'gpt-5'
+        )
+        
+        analyses = json.loads(result['llm_analysis_text'])
+        self.assertEqual(analyses['artifacts'], {'error': 'embedding service down'})
+        self.assertEqual([a for a, r in analyses.items() if 'error' in r], ['artifacts'])
+        self.assertEqual(len(calls), 6)
+    
+    def test_batch_pending_aspects_are_not_turned_into_a_result(self):
+        """Test batch mode collects every aspect request and then propagates BatchPending."""
+        from asgiref.sync import async_to_sync
+        from webApp.services.nodes.shared_helpers_v2 import analyze_repository_with_aspects
+        from webApp.services.offline import StubOpenAI
+        from workflow_engine.services.llm_batches import BatchingClient, BatchPending
+        
+        client = BatchingClient(StubOpenAI())
+        with self.assertRaises(BatchPending):
+            async_to_sync(analyze_repository_with_aspects)(self.code_url, self.paper, client, 'gpt-5')
+        # One request per aspect; the overall assessment waits for their answers
+        self.assertEqual(len(client.batch.pending), len(self.ASPECT_IDS))
+
+
+class WorkerRuntimeTestCase(TestCase):
+    """Test per-process reuse of compiled graphs, handlers and the event loop."""
+    
+    def setUp(self):
+        from webApp.services import worker_runtime
+        
+        worker_runtime.reset()
+        self.addCleanup(worker_runtime.reset)
+    
+    def test_compiled_graph_is_built_once_per_name_and_version(self):
+        """Test every workflow instance shares one compiled graph."""
+        from unittest.mock import patch
+        from webApp.services.graphs.code_only_workflow import CodeOnlyWorkflow
+        
+        original = CodeOnlyWorkflow.build_workflow
+        with patch.object(CodeOnlyWorkflow, 'build_workflow', autospec=True, side_effect=original) as build:
+            graph = CodeOnlyWorkflow().compiled_workflow()
+            self.assertIs(CodeOnlyWorkflow().compiled_workflow(), graph)
+            self.assertEqual(build.call_count, 1)
+        self.assertTrue(hasattr(graph, 'ainvoke'))
+    
+    def test_workflow_handler_is_cached(self):
+        """Test handler resolution hits the database once and reports bad definitions."""
+        from webApp.services.graphs import code_only_workflow
+        from webApp.services.worker_runtime import workflow_handler
+        
+        definition = WorkflowDefinition.objects.create(
+            name='cached_handler', version=1, dag_structure={
+                'workflow_handler': {'module': 'webApp.services.graphs.code_only_workflow', 'function': 'execute_workflow'},
+                'nodes': [], 'edges': [],
+            }
+        )
+        self.assertIs(workflow_handler(definition.id), code_only_workflow.execute_workflow)
+        with self.assertNumQueries(0):
+            self.assertIs(workflow_handler(definition.id), code_only_workflow.execute_workflow)
+        
+        broken = WorkflowDefinition.objects.create(
+            name='broken_handler', version=1, dag_structure={
+                'workflow_handler': {'module': 'webApp.services.graphs.code_only_workflow', 'function': 'missing'},
+            }
+        )
+        with self.assertRaisesMessage(ValueError, 'Failed to load workflow handler'):
+            workflow_handler(broken.id)
+        
+        inactive = WorkflowDefinition.objects.create(name='inactive', version=1, dag_structure={}, is_active=False)
+        with self.assertRaisesMessage(ValueError, 'not found or not active'):
+            workflow_handler(inactive.id)
+    
+    def test_run_async_reuses_event_loop(self):
+        """Test consecutive tasks run on the same event loop."""
+        import asyncio
+        from webApp.services.worker_runtime import run_async
+        
+        async def current_loop():
+            return asyncio.get_running_loop()
+        
+        first = run_async(current_loop())
+        self.assertIs(run_async(current_loop()), first)
+        self.assertFalse(first.is_closed())
+
+
+class NodeCheckpointTestCase(TestCase):
+    """Test durable per-item checkpoints and mid-node resume."""
+    
+    def setUp(self):
+        self.paper = Paper.objects.create(title='Checkpoint Paper', doi='10.1234/checkpoints')
+    
+    def test_store_scopes_expires_and_clears(self):
+        """Test checkpoints are scoped, ignored once expired and cleared on completion."""
+        from datetime import timedelta
+        from django.utils import timezone
+        from workflow_engine.models import NodeCheckpoint
+        from workflow_engine.services.checkpoints import (
+            CHECKPOINT_MAX_AGE, NodeCheckpoints, purge_expired_checkpoints
+        )
+        
+        store = NodeCheckpoints(self.paper.id, 'node', scope={'model': 'gpt-5'})
+        store.save('a', {'value': 1})
+        store.save('b', {'value': 2})
+        store.save('a', {'value': 3})
+        self.assertEqual(store.load(), {'a': {'value': 3}, 'b': {'value': 2}})
+        self.assertEqual(NodeCheckpoints(self.paper.id, 'node', scope={'model': 'other'}).load(), {})
+        
+        NodeCheckpoint.objects.filter(item_key='b').update(
+            created_at=timezone.now() - CHECKPOINT_MAX_AGE - timedelta(minutes=1)
+        )
+        self.assertEqual(list(store.load()), ['a'])
+        self.assertEqual(purge_expired_checkpoints(), 1)
+        
+        self.assertEqual(store.clear(), 1)
+        self.assertFalse(NodeCheckpoint.objects.exists())
+    
+    def test_checklist_node_resumes_from_checkpoints(self):
+        """Test a rerun only analyzes the criteria an interrupted attempt did not finish."""
+        from types import SimpleNamespace
+        from asgiref.sync import async_to_sync
+        from webApp.models import ReproducibilityChecklistCriterion
+        from webApp.services.nodes.fingerprints import node_fingerprint
+        from webApp.services.nodes.reproducibility_checklist import reproducibility_checklist_node
+        from workflow_engine.models import NodeArtifact, NodeCheckpoint
+        from workflow_engine.services.checkpoints import NodeCheckpoints
+        
+        for number in range(1, 21):
+            ReproducibilityChecklistCriterion.objects.create(
+                criterion_id=f'c{number}', criterion_number=number, criterion_name=f'Criterion {number}',
+                category='models', description='', criterion_context='', embedding=[1.0, 0.0],
+                embedding_dimension=2
+            )
+        definition = WorkflowDefinition.objects.create(
+            name='checklist_only', version=1, dag_structure={
+                'nodes': [{'id': 'reproducibility_checklist', 'type': 'python', 'handler': 'x'}], 'edges': []
+            }
+        )
+        run = WorkflowOrchestrator().create_workflow_run(workflow_name=definition.name, paper=self.paper)
+        
+        def analysis(number, present):
+            return {
+                'criterion_id': f'c{number}', 'criterion_number': number, 'criterion_name': f'Criterion {number}',
+                'category': 'models', 'present': present, 'confidence': 0.9, 'importance': 'important',
+            }
+        
+        state = {
+            'workflow_run_id': str(run.id), 'paper_id': self.paper.id, 'model': 'gpt-5',
+            'force_reprocess': True, 'paper_type_result': None,
+        }
+        fingerprint = async_to_sync(node_fingerprint)('reproducibility_checklist', state)
+        store = NodeCheckpoints(self.paper.id, 'reproducibility_checklist', scope={'fingerprint': fingerprint})
+        for number in range(1, 20):
+            store.save(f'c{number}', {'analysis': analysis(number, True), 'input_tokens': 100, 'output_tokens': 10})
+        # Written for other inputs, so not reused
+        NodeCheckpoints(
+            self.paper.id, 'reproducibility_checklist', scope={'model': 'gpt-5', 'paper_type': 'unknown'}
+        ).save('c20', {'analysis': analysis(20, True), 'input_tokens': 100, 'output_tokens': 10})
+        
+        calls = []
+        
+        def parse(**kwargs):
+            calls.append(kwargs)
+            from webApp.services.pydantic_schemas import SingleCriterionAnalysis
+            parsed = SingleCriterionAnalysis(**analysis(0, False))
+            usage = SimpleNamespace(
+                prompt_tokens=50, completion_tokens=5, prompt_tokens_details=SimpleNamespace(cached_tokens=40)
+            )
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(parsed=parsed))], usage=usage)
+        
+        client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(parse=parse)))
+        result = async_to_sync(reproducibility_checklist_node)(
+            {**state, 'client': client}
+        )['reproducibility_checklist_result']
+        
+        self.assertEqual(len(calls), 1)
+        self.assertIn('Criterion 20', calls[0]['messages'][-1]['content'])
+        self.assertEqual(calls[0]['prompt_cache_key'], f'paper-{self.paper.id}')
+        node = WorkflowNode.objects.get(workflow_run=run, node_id='reproducibility_checklist')
+        self.assertEqual(node.status, 'completed')
+        self.assertEqual(node.input_tokens, 19 * 100 + 50)
+        self.assertEqual(node.cached_input_tokens, 40)
+        analyses = NodeArtifact.objects.get(node=node, name='criterion_analyses').inline_data['value']
+        self.assertEqual(len(analyses), 20)
+        self.assertEqual(sum(a['present'] for a in analyses), 19)
+        self.assertIsNotNone(result.weighted_score)
+        self.assertFalse(NodeCheckpoint.objects.exists())
+
+
+class NodeFingerprintTestCase(TestCase):
+    """Test input fingerprints and fingerprint-based result reuse."""
+    
+    def setUp(self):
+        from webApp.models import ReproducibilityChecklistCriterion
+        
+        self.paper = Paper.objects.create(title='Fingerprint Paper', doi='10.1234/fingerprints', abstract='Abstract')
+        self.criterion = ReproducibilityChecklistCriterion.objects.create(
+            criterion_id='c1', criterion_number=1, criterion_name='Criterion 1', category='models',
+            description='Original', criterion_context='', embedding=[1.0, 0.0], embedding_dimension=2
+        )
+        self.state = {'paper_id': self.paper.id, 'model': 'gpt-5', 'paper_type_result': None}
+    
+    def fingerprint(self, node_id, state=None):
+        from asgiref.sync import async_to_sync
+        from webApp.services.nodes.fingerprints import node_fingerprint
+        
+        return async_to_sync(node_fingerprint)(node_id, state or self.state)
+    
+    def test_fingerprint_follows_node_inputs(self):
+        """Test editing a criterion changes the checklist fingerprint only."""
+        checklist = self.fingerprint('reproducibility_checklist')
+        availability = self.fingerprint('code_availability_check')
+        self.assertEqual(self.fingerprint('reproducibility_checklist'), checklist)
+        
+        self.criterion.description = 'Edited'
+        self.criterion.save()
+        self.assertNotEqual(self.fingerprint('reproducibility_checklist'), checklist)
+        self.assertEqual(self.fingerprint('code_availability_check'), availability)
+        
+        self.assertNotEqual(
+            self.fingerprint('code_availability_check', {**self.state, 'model': 'gpt-5-mini'}), availability
+        )
+        self.paper.abstract = 'Changed abstract'
+        self.paper.save()
+        self.assertNotEqual(self.fingerprint('code_availability_check'), availability)
+    
+    def test_content_hash_ignores_volatile_fields(self):
+        """Test run-specific fields such as timestamps do not change a result's hash."""
+        from webApp.services.nodes.fingerprints import content_hash
+        
+        first = {'score': 1, 'analysis_timestamp': '2026-01-01', 'nested': [{'clone_path': '/tmp/a'}]}
+        second = {'score': 1, 'analysis_timestamp': '2026-02-01', 'nested': [{'clone_path': '/tmp/b'}]}
+        self.assertEqual(content_hash(first), content_hash(second))
+        self.assertNotEqual(content_hash(first), content_hash({**second, 'score': 2}))
+        self.assertIsNone(content_hash(None))
+    
+    def test_repository_revision_is_resolved_once_per_run(self):
+        """Test code nodes take the revision from the state instead of asking the remote."""
+        from unittest.mock import AsyncMock, patch
+        from asgiref.sync import async_to_sync
+        from webApp.services.nodes.fingerprints import availability_revision
+        from webApp.services.pydantic_schemas import CodeAvailabilityCheck
+        
+        availability = CodeAvailabilityCheck(
+            code_available=True, code_url='-uhttps://example.com/repo', found_online=False, availability_notes='Found'
+        )
+        state = {**self.state, 'code_availability_result': availability}
+        with patch('webApp.services.nodes.fingerprints._git_output', new=AsyncMock(return_value='a' * 40)) as git:
+            revision = async_to_sync(availability_revision)(availability)
+            self.assertEqual(revision, 'a' * 40)
+            git.assert_awaited_once_with('ls-remote', '--quiet', '--', '-uhttps://example.com/repo', 'HEAD')
+            
+            git.reset_mock()
+            run_state = {**state, 'repository_revision': revision}
+            embedding = self.fingerprint('code_embedding', run_state)
+            self.fingerprint('code_repository_analysis', run_state)
+            git.assert_not_awaited()
+            
+            self.assertNotEqual(
+                self.fingerprint('code_embedding', {**run_state, 'repository_revision': 'b' * 40}), embedding
+            )
+            self.assertEqual(self.fingerprint('code_embedding', state), embedding)
+            git.assert_awaited_once()
+    
+    def test_reuse_requires_matching_fingerprint(self):
+        """Test a result is reused only from a completed node with the same fingerprint."""
+        from asgiref.sync import async_to_sync
+        from webApp.services.nodes.fingerprints import reuse_previous_result
+        from workflow_engine.models import NodeArtifact
+        
+        definition = WorkflowDefinition.objects.create(
+            name='availability_only', version=1, dag_structure={
+                'nodes': [{'id': 'code_availability_check', 'type': 'python', 'handler': 'x'}], 'edges': []
+            }
+        )
+        orchestrator = WorkflowOrchestrator()
+        previous_run = orchestrator.create_workflow_run(workflow_name=definition.name, paper=self.paper)
+        previous = WorkflowNode.objects.get(workflow_run=previous_run, node_id='code_availability_check')
+        previous.status = 'completed'
+        previous.input_fingerprint = 'a' * 64
+        previous.input_tokens = 120
+        previous.save()
+        NodeArtifact.objects.create(node=previous, name='result', inline_data={'code_available': False})
+        
+        run = orchestrator.create_workflow_run(workflow_name=definition.name, paper=self.paper)
+        node = WorkflowNode.objects.get(workflow_run=run, node_id='code_availability_check')
+        state = {**self.state, 'workflow_run_id': str(run.id)}
+        
+        self.assertIsNone(async_to_sync(reuse_previous_result)(node, state, 'b' * 64))
+        self.assertEqual(
+            async_to_sync(reuse_previous_result)(node, state, 'a' * 64), {'code_available': False}
+        )
+        node.refresh_from_db()
+        self.assertEqual(node.status, 'completed')
+        self.assertTrue(node.was_cached)
+        self.assertEqual(node.input_tokens, 120)
+        self.assertTrue(NodeArtifact.objects.filter(node=node, name='result').exists())
+
+
+class SpanInstrumentationTestCase(TestCase):
+    """Test per-node span collection and its conference statistics."""
+    
+    def setUp(self):
+        from webApp.models import Conference
+        
+        WorkflowDefinition.objects.create(
+            name='span_workflow',
+            version=1,
+            dag_structure={'nodes': [{'id': 'n1'}, {'id': 'n2'}], 'edges': []},
+            is_active=True
+        )
+        self.conference = Conference.objects.create(name='Span Conf 2025', acronym='SC', year=2025)
+        self.paper = Paper.objects.create(title='Span Paper', doi='10.1234/spans', conference=self.conference)
+        self.orchestrator = WorkflowOrchestrator()
+    
+    def _run_nodes(self):
+        from asgiref.sync import async_to_sync, sync_to_async
+        from webApp.services.offline import StubOpenAI
+        from webApp.services.rate_limiter import RateLimitedClient, run_scoped
+        from webApp.services.spans import span
+        
+        run = self.orchestrator.create_workflow_run(workflow_name='span_workflow', paper=self.paper)
+        client = RateLimitedClient(StubOpenAI())
+        
+        def node():
+            client.chat.completions.create(model='gpt-5', messages=[{'role': 'user', 'content': 'hi'}])
+            client.embeddings.create(model='text-embedding-3-small', input='hi')
+            with span('grobid'):
+                Paper.objects.count()
+        
+        async def execute():
+            await run_scoped(str(run.id), 'n1', sync_to_async(node)())
+        
+        async_to_sync(execute)()
+        
+        run.nodes.update(status='completed')
+        run.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.orchestrator._check_workflow_completion(run)
+        return run
+    
+    def test_node_scope_stores_spans_summarized_per_conference(self):
+        """Test spans are stored on the node and averaged over latest runs per node."""
+        from django.urls import reverse
+        from webApp.services.conference_stats import conference_summaries, rebuild_conference_stats
+        
+        run = self._run_nodes()
+        spans = run.nodes.get(node_id='n1').spans
+        self.assertEqual(spans['llm']['count'], 1)
+        self.assertEqual(spans['embedding']['count'], 1)
+        self.assertEqual(spans['grobid']['count'], 1)
+        self.assertGreaterEqual(spans['db']['count'], 1)
+        self.assertEqual(run.nodes.get(node_id='n2').spans, {})
+        
+        # A newer run replaces the paper's contribution instead of adding to it
+        self._run_nodes()
+        response = self.client.get(reverse('conference_node_statistics', args=[self.conference.id]))
+        stats = response.json()['node_statistics']
+        self.assertEqual(list(stats), ['n1'])
+        self.assertEqual(stats['n1']['count'], 0)
+        self.assertEqual(stats['n1']['span_count'], 1)
+        self.assertEqual(stats['n1']['spans']['llm']['avg_count'], 1)
+        self.assertIsNone(stats['n1']['avg_total_tokens'])
+        
+        run_summary = conference_summaries([self.conference.id])[self.conference.id]
+        self.assertEqual(run_summary['spans']['embedding']['avg_count'], 1)
+        rebuild_conference_stats([self.conference.id])
+        self.assertEqual(conference_summaries([self.conference.id])[self.conference.id], run_summary)
+
+
+class LLMBatchModeTestCase(TestCase):
+    """Test provider batch mode: suspending nodes, batch jobs and resuming."""
+    
+    def setUp(self):
+        from webApp.models import ReproducibilityChecklistCriterion
+        
+        self.paper = Paper.objects.create(title='Batch Paper', doi='10.1234/batch')
+        for number in range(1, 21):
+            ReproducibilityChecklistCriterion.objects.create(
+                criterion_id=f'c{number}', criterion_number=number, criterion_name=f'Criterion {number}',
+                category='models', description='', criterion_context='', embedding=[1.0, 0.0],
+                embedding_dimension=2
+            )
+        WorkflowDefinition.objects.create(
+            name='checklist_batch', version=1, is_active=True, dag_structure={
+                'nodes': [
+                    {'id': 'reproducibility_checklist', 'type': 'python',
+                     'handler': 'webApp.services.nodes.reproducibility_checklist.reproducibility_checklist_node'},
+                    {'id': 'report', 'type': 'python', 'handler': 'x'},
+                ],
+                'edges': [{'from': 'reproducibility_checklist', 'to': 'report'}]
+            }
+        )
+    
+    def _execute(self, node):
+        from unittest import mock
+        from asgiref.sync import async_to_sync
+        from workflow_engine.services.orchestrator import NodeExecutor
+        from workflow_engine.tasks import execute_node_task
+        
+        # Run the async handler through async_to_sync so its DB work stays on the test connection
+        get_handler = NodeExecutor._get_handler
+        with mock.patch.object(NodeExecutor, '_get_handler', lambda executor: async_to_sync(get_handler(executor))):
+            return execute_node_task.apply(args=[str(node.id)]).get()
+    
+    def test_node_waits_for_batch_job_and_resumes(self):
+        """Test all criteria go into one batch job and the node completes from its output."""
+        from webApp.services.offline import StubOpenAI
+        from webApp.services.worker_runtime import override_openai_client
+        from workflow_engine.models import LLMBatchJob, LLMBatchRequest, NodeArtifact, WorkflowStatusEvent
+        from workflow_engine.services.llm_batches import process_llm_batches
+        
+        stub = StubOpenAI()
+        run = WorkflowOrchestrator().create_workflow_run(
+            workflow_name='checklist_batch', paper=self.paper, input_data={'llm_batch': True}
+        )
+        WorkflowRun.objects.filter(id=run.id).update(status='running')
+        node = run.nodes.get(node_id='reproducibility_checklist')
+        # Left over from an earlier execution; a suspended node keeps nothing
+        NodeArtifact.objects.create(node=node, name='result', inline_data={'partial': True})
+        WorkflowNode.objects.filter(id=node.id).update(input_tokens=50, total_tokens=50)
+        
+        with override_openai_client(stub):
+            result = self._execute(node)
+            self.assertEqual(result['status'], 'waiting')
+            self.assertEqual(result['batched_requests'], 20)
+            node.refresh_from_db()
+            self.assertEqual(node.status, 'waiting')
+            self.assertEqual(node.output_data, {})
+            self.assertFalse(node.artifacts.exists())
+            self.assertEqual((node.input_tokens, node.total_tokens), (0, 0))
+            # A batch round is not an attempt, so retries stay available
+            self.assertEqual((node.attempt_count, node.batch_rounds), (0, 1))
+            self.assertFalse(
+                WorkflowStatusEvent.objects.filter(
+                    workflow_run=run, node_id=node.node_id, status__in=['completed', 'failed']
+                ).exists()
+            )
+            self.assertEqual(run.nodes.get(node_id='report').status, 'pending')
+            self.assertNotIn('chat.completions', stub.stats)
+            
+            submitted = process_llm_batches(stub)
+            self.assertEqual((submitted['jobs_submitted'], submitted['requests_submitted']), (1, 20))
+            self.assertFalse(LLMBatchRequest.objects.exclude(status='submitted').exists())
+            
+            # The stub job completes on its first poll
+            polled = process_llm_batches(stub)
+            self.assertEqual((polled['jobs_finished'], polled['nodes_resumed']), (1, 1))
+            self.assertEqual(LLMBatchJob.objects.get().status, 'completed')
+            self.assertEqual(LLMBatchRequest.objects.filter(status='completed').count(), 20)
+            node.refresh_from_db()
+            self.assertEqual(node.status, 'ready')
+            
+            self.assertEqual(self._execute(node)['status'], 'completed')
+        
+        node.refresh_from_db()
+        self.assertEqual(node.status, 'completed')
+        self.assertEqual((node.attempt_count, node.batch_rounds), (1, 1))
+        self.assertGreater(node.input_tokens, 0)
+        analyses = NodeArtifact.objects.get(node=node, name='criterion_analyses').inline_data['value']
+        self.assertEqual(len(analyses), 20)
+        self.assertEqual(run.nodes.get(node_id='report').status, 'ready')
+        self.assertEqual(stub.stats['chat.completions']['requests'], 20)
+        self.assertEqual(stub.stats['batches']['requests'], 1)
+    
+    def test_identical_requests_share_one_answer(self):
+        """Test requests are keyed by body, failed lines raise and parse() answers are rebuilt."""
+        from webApp.services.offline import StubOpenAI
+        from webApp.services.pydantic_schemas import SingleCriterionAnalysis
+        from workflow_engine.services.llm_batches import (
+            BatchPending, BatchRequestFailed, BatchingClient, NodeBatch, load_answers, poll_batch_jobs,
+            queue_requests, request_id, submit_pending_requests
+        )
+        
+        stub = StubOpenAI()
+        run = WorkflowOrchestrator().create_workflow_run(workflow_name='checklist_batch', paper=self.paper)
+        node = run.nodes.get(node_id='reproducibility_checklist')
+        WorkflowNode.objects.filter(id=node.id).update(status='waiting')
+        
+        client = BatchingClient(stub)
+        messages = [{'role': 'user', 'content': 'Evaluate'}]
+        for _ in range(2):
+            with self.assertRaises(BatchPending):
+                client.chat.completions.parse(model='gpt-5', messages=messages, response_format=SingleCriterionAnalysis)
+        with self.assertRaises(BatchPending):
+            client.responses.create(model='gpt-5', input='Summarize')
+        self.assertEqual(len(client.batch.pending), 2)
+        self.assertEqual(len(client.embeddings.create(model='e', input='text').data), 1)
+        
+        # A line the provider rejects fails only its own request
+        client.batch.pending['bad'] = ('/v1/unknown', {'model': 'gpt-5'})
+        self.assertEqual(queue_requests(node, client.batch.pending), 3)
+        self.assertEqual(len(submit_pending_requests(stub)), 3)
+        self.assertEqual(poll_batch_jobs(stub), 3)
+        
+        batch = NodeBatch(load_answers(node))
+        client = BatchingClient(stub, batch)
+        response = client.chat.completions.parse(model='gpt-5', messages=messages, response_format=SingleCriterionAnalysis)
+        self.assertIsInstance(response.choices[0].message.parsed, SingleCriterionAnalysis)
+        self.assertGreater(response.usage.prompt_tokens, 0)
+        self.assertTrue(client.responses.create(model='gpt-5', input='Summarize').output_text)
+        self.assertEqual(batch.pending, {})
+        
+        failed = {'model': 'gpt-5', 'input': 'Rejected'}
+        batch.answers[request_id('/v1/responses', failed)] = batch.answers['bad']
+        self.assertIn('Unsupported batch endpoint', batch.answers['bad'][1])
+        with self.assertRaises(BatchRequestFailed):
+            client.responses.create(**failed)